@@ -0,0 +1,413 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Classes to cache the logical blocks read from a backing ISO."""
+
+import collections
+import io
+import itertools
+import os
+import threading
+import weakref
+
+from pycdlib import iostats
+from pycdlib import pycdlibexception
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Any, BinaryIO, Dict, Hashable, List, Optional, Tuple  # NOQA pylint: disable=unused-import
+
+
+class BlockCacheStats:
+    """
+    A class to hold the counters for a BlockCache.  Hits and misses count
+    blocks that were asked for; readahead counts the additional blocks that
+    were fetched past the end of a request that missed, and bypassed counts
+    the reads that were too large to go through the cache.
+    """
+    __slots__ = ('hits', 'misses', 'readahead', 'evictions', 'bypassed')
+
+    def __init__(self):
+        # type: () -> None
+        self.hits = 0
+        self.misses = 0
+        self.readahead = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    def as_dict(self):
+        # type: () -> Dict[str, int]
+        """
+        Get these counters as a plain dictionary, suitable for serializing.
+
+        Parameters:
+         None.
+        Returns:
+         A dictionary of the counters.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'readahead': self.readahead,
+            'evictions': self.evictions,
+            'bypassed': self.bypassed,
+        }
+
+    def __repr__(self):
+        # type: () -> str
+        return 'BlockCacheStats(hits=%d, misses=%d, readahead=%d, evictions=%d, bypassed=%d)' % (self.hits,
+                                                                                                 self.misses,
+                                                                                                 self.readahead,
+                                                                                                 self.evictions,
+                                                                                                 self.bypassed)
+
+
+class BlockCache:
+    """
+    A class to cache the logical blocks read from backing ISOs.  The cache is
+    a least-recently-used map from (file, block number) to the data of that
+    block, bounded by the total size of the blocks it holds.  Pass an instance
+    to the PyCdlib constructor to send all of the reads of the ISO through it;
+    the same instance can be passed to several PyCdlib objects, in which case
+    objects opened on the same file share the cached blocks.
+    """
+    __slots__ = ('block_size', 'max_blocks', 'readahead', 'bypass_size',
+                 'stats', '_blocks', '_lock', '_tokens', '_counter')
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, block_size=2048,
+                 readahead=8, bypass_size=65536):
+        # type: (int, int, int, int) -> None
+        """
+        Create a new block cache.
+
+        Parameters:
+         max_bytes - The maximum number of bytes of blocks to keep.
+         block_size - The size of each cached block.
+         readahead - The number of blocks to read past the end of a request
+                     that misses the cache.
+         bypass_size - Reads larger than this many bytes go straight to the
+                       file, so that copying out large files does not throw
+                       away the rest of the cache.
+        Returns:
+         Nothing.
+        """
+        if block_size < 1:
+            raise pycdlibexception.PyCdlibInvalidInput('The block size must be a positive number')
+        if max_bytes < block_size:
+            raise pycdlibexception.PyCdlibInvalidInput('The cache must be able to hold at least one block')
+        if readahead < 0:
+            raise pycdlibexception.PyCdlibInvalidInput('The readahead must be non-negative')
+
+        self.block_size = block_size
+        self.max_blocks = max_bytes // block_size
+        self.readahead = readahead
+        self.bypass_size = bypass_size
+        self.stats = BlockCacheStats()
+        self._blocks = collections.OrderedDict()  # type: collections.OrderedDict[Tuple[Hashable, int], bytes]
+        self._lock = threading.Lock()
+        self._tokens = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary[Any, int]
+        self._counter = itertools.count()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._blocks)
+
+    def _file_key(self, fp):
+        # type: (BinaryIO) -> Hashable
+        """
+        An internal method to get the key that identifies the file underneath
+        a file object.  Real files are identified by their device, inode, size,
+        and modification time, so that separate file objects opened on the
+        same file share blocks.  Other file objects get a token of their own
+        that is never reused.
+
+        Parameters:
+         fp - The file object to get the key for.
+        Returns:
+         The key for the file.
+        """
+        while isinstance(fp, (iostats.AccountingFile, CachedFile)):
+            fp = fp.wrapped
+
+        try:
+            st = os.fstat(fp.fileno())
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+        else:
+            return ('file', st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            try:
+                token = self._tokens.get(fp)
+                if token is None:
+                    token = next(self._counter)
+                    self._tokens[fp] = token
+            except TypeError:
+                # Objects that cannot be weakly referenced cannot be shared.
+                token = next(self._counter)
+        return ('object', token)
+
+    def wrap(self, fp, key=None):
+        # type: (BinaryIO, Optional[Hashable]) -> CachedFile
+        """
+        Wrap a file object so that reads from it go through this cache.
+
+        Parameters:
+         fp - The file object to wrap.
+         key - The key that identifies the data behind the file object.  File
+               objects wrapped with equal keys share cached blocks.  If None
+               (the default), the key is worked out from the file object.
+        Returns:
+         The wrapped file object.
+        """
+        if key is None:
+            key = self._file_key(fp)
+        return CachedFile(fp, self, key)
+
+    def read_blocks(self, fp, key, first, last):
+        # type: (BinaryIO, Hashable, int, int) -> bytes
+        """
+        Get the data for a range of blocks, reading any that are not cached
+        from the file object.  Runs of missing blocks are read with a single
+        request, which is extended by the readahead if it reaches the end of
+        the range.
+
+        Parameters:
+         fp - The file object to read missing blocks from.
+         key - The key of the file.
+         first - The first block to get.
+         last - The last block to get (inclusive).
+        Returns:
+         The data for the blocks, which is short if the file ends in the range.
+        """
+        block_size = self.block_size
+        blocks = self._blocks
+        stats = self.stats
+        chunks = []  # type: List[bytes]
+        blk = first
+        while blk <= last:
+            with self._lock:
+                data = blocks.get((key, blk))
+                if data is not None:
+                    blocks.move_to_end((key, blk))
+                    stats.hits += 1
+                else:
+                    run_end = blk
+                    while run_end < last and (key, run_end + 1) not in blocks:
+                        run_end += 1
+
+            if data is not None:
+                chunks.append(data)
+                if len(data) < block_size:
+                    break
+                blk += 1
+                continue
+
+            fetch_end = run_end
+            if run_end == last:
+                fetch_end += self.readahead
+            fp.seek(blk * block_size)
+            raw = fp.read((fetch_end - blk + 1) * block_size)
+
+            with self._lock:
+                stats.misses += run_end - blk + 1
+                offset = 0
+                num = blk
+                while num <= fetch_end:
+                    data = raw[offset:offset + block_size]
+                    if num > run_end:
+                        if not data:
+                            break
+                        stats.readahead += 1
+                    else:
+                        chunks.append(data)
+                    blocks[(key, num)] = data
+                    blocks.move_to_end((key, num))
+                    if len(data) < block_size:
+                        break
+                    offset += block_size
+                    num += 1
+
+                while len(blocks) > self.max_blocks:
+                    blocks.popitem(last=False)
+                    stats.evictions += 1
+
+            if len(raw) < (run_end - blk + 1) * block_size:
+                # The file ended inside of the range.
+                break
+            blk = run_end + 1
+
+        return b''.join(chunks)
+
+    def invalidate(self, key, offset, length):
+        # type: (Hashable, int, int) -> None
+        """
+        Throw away the cached blocks that overlap a range of a file.
+
+        Parameters:
+         key - The key of the file.
+         offset - The offset of the start of the range.
+         length - The length of the range.
+        Returns:
+         Nothing.
+        """
+        if length <= 0:
+            return
+        with self._lock:
+            for blk in range(offset // self.block_size, (offset + length - 1) // self.block_size + 1):
+                self._blocks.pop((key, blk), None)
+
+    def clear(self):
+        # type: () -> None
+        """
+        Throw away all of the cached blocks.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        with self._lock:
+            self._blocks.clear()
+
+
+class CachedFile:
+    """
+    A class that wraps a file object and sends reads from it through a
+    BlockCache.  Writes go straight to the wrapped file object and throw away
+    the blocks that they overlap.  All attributes other than read, readinto,
+    write, seek, and tell are passed straight through to the wrapped file
+    object.
+    """
+    __slots__ = ('_fp', '_cache', '_key', '_pos')
+
+    def __init__(self, fp, cache, key):
+        # type: (BinaryIO, BlockCache, Hashable) -> None
+        self._fp = fp
+        self._cache = cache
+        self._key = key
+        self._pos = fp.tell()
+
+    @property
+    def wrapped(self):
+        # type: () -> BinaryIO
+        """The file object being wrapped."""
+        return self._fp
+
+    @property
+    def cache(self):
+        # type: () -> BlockCache
+        """The cache that reads go through."""
+        return self._cache
+
+    def read(self, size=-1):
+        # type: (int) -> bytes
+        """
+        Read data, going through the cache.
+
+        Parameters:
+         size - The number of bytes to read, or -1 to read until the end.
+        Returns:
+         The data that was read.
+        """
+        if size is None or size < 0 or size > self._cache.bypass_size:
+            self._cache.stats.bypassed += 1
+            self._fp.seek(self._pos)
+            data = self._fp.read(size)
+        elif size == 0:
+            return b''
+        else:
+            block_size = self._cache.block_size
+            first = self._pos // block_size
+            last = (self._pos + size - 1) // block_size
+            blocks = self._cache.read_blocks(self._fp, self._key, first, last)
+            start = self._pos - first * block_size
+            data = blocks[start:start + size]
+
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buf):
+        # type: (Any) -> int
+        """
+        Read data into a buffer, going through the cache.
+
+        Parameters:
+         buf - The buffer to read into.
+        Returns:
+         The number of bytes read.
+        """
+        view = memoryview(buf).cast('B')
+        data = self.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def write(self, data):
+        # type: (bytes) -> int
+        """
+        Write data to the wrapped file object.
+
+        Parameters:
+         data - The data to write.
+        Returns:
+         The number of bytes written.
+        """
+        self._fp.seek(self._pos)
+        ret = self._fp.write(data)
+        self._cache.invalidate(self._key, self._pos, len(data))
+        self._pos += len(data)
+        return ret
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> int
+        """
+        Seek to a new position.  Seeking relative to the end is passed to the
+        wrapped file object to find the size.
+
+        Parameters:
+         offset - The offset to seek to.
+         whence - Where the offset is relative to.
+        Returns:
+         The new position in the file.
+        """
+        if whence == os.SEEK_SET:
+            newpos = offset
+        elif whence == os.SEEK_CUR:
+            newpos = self._pos + offset
+        else:
+            newpos = self._fp.seek(offset, whence)
+            if newpos is None:
+                newpos = self._fp.tell()
+        if newpos < 0:
+            raise OSError('Negative seek position %d' % (newpos))
+        self._pos = newpos
+        return newpos
+
+    def tell(self):
+        # type: () -> int
+        """
+        Get the current position.
+
+        Parameters:
+         None.
+        Returns:
+         The current position.
+        """
+        return self._pos
+
+    def __getattr__(self, name):
+        # type: (str) -> Any
+        return getattr(self._fp, name)
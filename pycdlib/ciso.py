@@ -0,0 +1,605 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""
+Classes to read and write block-compressed ISO containers (the CISO format,
+with deflate-compressed blocks, and the ZISO format, with LZ4-compressed
+blocks).
+"""
+
+import concurrent.futures
+import io
+import os
+import struct
+import tempfile
+import zlib
+
+try:
+    import lz4.block  # pylint: disable=import-error
+except ImportError:
+    lz4 = None  # type: ignore
+
+from pycdlib import pycdlibexception
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Any, BinaryIO, List, Optional, Tuple  # NOQA pylint: disable=unused-import
+
+FORMAT_CISO = b'CISO'
+FORMAT_ZISO = b'ZISO'
+
+_HEADER_FMT = '<4sIQIBB2s'
+_HEADER_SIZE = struct.calcsize(_HEADER_FMT)
+# In version 1 of the formats, the top bit of an index entry marks a block
+# that is stored uncompressed.
+_PLAIN_FLAG = 0x80000000
+_OFFSET_MASK = 0x7fffffff
+
+
+def _check_format(fmt):
+    # type: (bytes) -> None
+    """
+    An internal function to check that a container format can be used.
+
+    Parameters:
+     fmt - The format (FORMAT_CISO or FORMAT_ZISO).
+    Returns:
+     Nothing.
+    """
+    if fmt not in (FORMAT_CISO, FORMAT_ZISO):
+        raise pycdlibexception.PyCdlibInvalidInput('Unknown container format %r' % (fmt))
+    if fmt == FORMAT_ZISO and lz4 is None:
+        raise pycdlibexception.PyCdlibInvalidInput('The lz4 module is required for ZISO containers')
+
+
+def _compress_blocks(blocks, fmt, level):
+    # type: (List[bytes], bytes, int) -> List[Tuple[bytes, bool]]
+    """
+    An internal function to compress a batch of blocks.  This runs in the
+    threads of the writer's pool; both zlib and lz4 release the GIL while
+    compressing.
+
+    Parameters:
+     blocks - The uncompressed blocks.
+     fmt - The format (FORMAT_CISO or FORMAT_ZISO).
+     level - The compression level.
+    Returns:
+     A list of tuples of the data to store for each block and whether it is
+     stored uncompressed.
+    """
+    ret = []  # type: List[Tuple[bytes, bool]]
+    for block in blocks:
+        if fmt == FORMAT_ZISO:
+            data = lz4.block.compress(block, store_size=False)
+        else:
+            comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            data = comp.compress(block) + comp.flush()
+        if len(data) >= len(block):
+            ret.append((block, True))
+        else:
+            ret.append((data, False))
+    return ret
+
+
+class CisoFile(io.RawIOBase):
+    """
+    A read-only, seekable file object for the ISO inside of a CISO or ZISO
+    container, suitable for passing to PyCdlib.open_fp().  The container keeps
+    a table of the offset of every compressed block, so a read only needs to
+    decompress the blocks that it covers.
+    """
+    __slots__ = ('_fp', '_close_fp', '_format', 'block_size', 'size',
+                 '_align', '_index', '_pos', '_last_block', '_last_data',
+                 '_open')
+
+    def __init__(self, fp, close_fp=False):
+        # type: (BinaryIO, bool) -> None
+        """
+        Open a container.
+
+        Parameters:
+         fp - The file object of the container.
+         close_fp - Whether to close the file object when this one is closed.
+        Returns:
+         Nothing.
+        """
+        super(CisoFile, self).__init__()  # pylint: disable=super-with-arguments
+        fp.seek(0)
+        header = fp.read(_HEADER_SIZE)
+        if len(header) != _HEADER_SIZE:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid compressed ISO header')
+        (magic, header_size, total_bytes, block_size, version, align,
+         reserved_unused) = struct.unpack(_HEADER_FMT, header)
+        if magic not in (FORMAT_CISO, FORMAT_ZISO):
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid compressed ISO magic')
+        _check_format(magic)
+        if version > 1:
+            raise pycdlibexception.PyCdlibInvalidInput('Unsupported compressed ISO version %d' % (version))
+        if block_size < 1 or block_size & (block_size - 1):
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid compressed ISO block size %d' % (block_size))
+
+        # Some writers leave the header size as 0.
+        if header_size == 0:
+            header_size = _HEADER_SIZE
+
+        num_blocks = (total_bytes + block_size - 1) // block_size
+        fp.seek(header_size)
+        index_data = fp.read((num_blocks + 1) * 4)
+        if len(index_data) != (num_blocks + 1) * 4:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid compressed ISO block index')
+
+        self._fp = fp
+        self._close_fp = close_fp
+        self._format = magic
+        self.block_size = block_size
+        self.size = total_bytes
+        self._align = align
+        self._index = struct.unpack('<%dI' % (num_blocks + 1), index_data)
+        self._pos = 0
+        self._last_block = -1
+        self._last_data = b''
+        self._open = True
+
+    @property
+    def format(self):
+        # type: () -> bytes
+        """The format of the container (FORMAT_CISO or FORMAT_ZISO)."""
+        return self._format
+
+    def _check_open(self):
+        # type: () -> None
+        """
+        An internal method to make sure that the file is still open.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if not self._open:
+            raise pycdlibexception.PyCdlibInvalidInput('I/O operation on closed file.')
+
+    def _read_block(self, blk):
+        # type: (int) -> bytes
+        """
+        An internal method to read and decompress a single block.  The last
+        block read is kept, since reads of the ISO are often smaller than a
+        block.
+
+        Parameters:
+         blk - The number of the block to read.
+        Returns:
+         The uncompressed data of the block.
+        """
+        if blk == self._last_block:
+            return self._last_data
+
+        entry = self._index[blk]
+        start = (entry & _OFFSET_MASK) << self._align
+        end = (self._index[blk + 1] & _OFFSET_MASK) << self._align
+        if end < start:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid compressed ISO block index')
+        expected = min(self.block_size, self.size - blk * self.block_size)
+
+        self._fp.seek(start)
+        raw = self._fp.read(end - start)
+        if entry & _PLAIN_FLAG:
+            data = raw[:expected]
+        elif self._format == FORMAT_ZISO:
+            try:
+                data = lz4.block.decompress(raw, uncompressed_size=self.block_size)
+            except lz4.block.LZ4BlockError as e:
+                raise pycdlibexception.PyCdlibInvalidInput('Invalid compressed ISO block %d (%s)' % (blk, e))
+        else:
+            try:
+                data = zlib.decompressobj(-zlib.MAX_WBITS).decompress(raw, self.block_size)
+            except zlib.error as e:
+                raise pycdlibexception.PyCdlibInvalidInput('Invalid compressed ISO block %d (%s)' % (blk, e))
+        if len(data) < expected:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid compressed ISO block %d (short data)' % (blk))
+
+        self._last_block = blk
+        self._last_data = data[:expected]
+        return self._last_data
+
+    def read(self, size=-1):
+        # type: (Optional[int]) -> bytes
+        """
+        Read and return up to size bytes.
+
+        Parameters:
+         size - The number of bytes to read, or -1 (or None) to read until the
+                end of the file.
+        Returns:
+         The data that was read.
+        """
+        self._check_open()
+        end = self.size
+        if size is not None and size >= 0:
+            end = min(end, self._pos + size)
+        if end <= self._pos:
+            return b''
+
+        chunks = []  # type: List[bytes]
+        pos = self._pos
+        while pos < end:
+            blk = pos // self.block_size
+            data = self._read_block(blk)
+            offset = pos - blk * self.block_size
+            chunk = data[offset:offset + end - pos]
+            chunks.append(chunk)
+            pos += len(chunk)
+
+        self._pos = pos
+        return b''.join(chunks)
+
+    def readall(self):
+        # type: () -> bytes
+        """
+        Read and return the rest of the file.
+
+        Parameters:
+         None.
+        Returns:
+         The rest of the data in the file.
+        """
+        return self.read(-1)
+
+    def readinto(self, b):
+        # type: (Any) -> int
+        """
+        Read bytes into a pre-allocated, writable bytes-like object.
+
+        Parameters:
+         b - The buffer to read into.
+        Returns:
+         The number of bytes read.
+        """
+        view = memoryview(b).cast('B')
+        data = self.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> int
+        """
+        Change the stream position.
+
+        Parameters:
+         offset - The offset to seek to.
+         whence - Where the offset is relative to.
+        Returns:
+         The new position.
+        """
+        self._check_open()
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid value for whence (options are 0, 1, and 2)')
+
+        if pos < 0:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid offset value (cannot seek before start of file)')
+        self._pos = pos
+        return pos
+
+    def tell(self):
+        # type: () -> int
+        """
+        Get the current stream position.
+
+        Parameters:
+         None.
+        Returns:
+         The current position.
+        """
+        self._check_open()
+        return self._pos
+
+    def readable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is readable.
+
+        Parameters:
+         None.
+        Returns:
+         True.
+        """
+        return True
+
+    def seekable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is seekable.
+
+        Parameters:
+         None.
+        Returns:
+         True.
+        """
+        return True
+
+    def close(self):
+        # type: () -> None
+        """
+        Close the file.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if self._open:
+            self._open = False
+            self._last_data = b''
+            if self._close_fp:
+                self._fp.close()
+        super(CisoFile, self).close()  # pylint: disable=super-with-arguments
+
+
+class CisoWriter(io.RawIOBase):
+    """
+    A write-only, seekable file object that produces a CISO or ZISO container,
+    suitable for passing to PyCdlib.write_fp().  Since writing an ISO seeks
+    back to fill in earlier extents, the uncompressed data is spooled (in
+    memory up to spool_size, then in a temporary file) and the blocks are
+    compressed by a pool of threads when the writer is closed.  The container
+    is not complete until close() has been called.
+    """
+    __slots__ = ('_fp', '_format', 'block_size', '_level', '_threads',
+                 '_spool', '_size', '_open')
+
+    def __init__(self, fp, fmt=FORMAT_CISO, block_size=2048, level=9,
+                 threads=None, spool_size=64 * 1024 * 1024):
+        # type: (BinaryIO, bytes, int, int, Optional[int], int) -> None
+        """
+        Create a new container writer.
+
+        Parameters:
+         fp - The file object to write the container to.
+         fmt - The format of the container (FORMAT_CISO or FORMAT_ZISO).
+         block_size - The size of each compressed block; this must be a power
+                      of 2.
+         level - The zlib compression level for CISO containers.
+         threads - The number of threads to compress with.  If None (the
+                   default), the number of CPUs is used.
+         spool_size - The number of bytes of uncompressed data to keep in
+                      memory before spooling to a temporary file.
+        Returns:
+         Nothing.
+        """
+        super(CisoWriter, self).__init__()  # pylint: disable=super-with-arguments
+        _check_format(fmt)
+        if block_size < 1 or block_size & (block_size - 1):
+            raise pycdlibexception.PyCdlibInvalidInput('The block size must be a power of 2')
+        if threads is not None and threads < 1:
+            raise pycdlibexception.PyCdlibInvalidInput('The number of threads must be a positive number')
+
+        self._fp = fp
+        self._format = fmt
+        self.block_size = block_size
+        self._level = level
+        self._threads = threads
+        self._spool = tempfile.SpooledTemporaryFile(max_size=spool_size)  # pylint: disable=consider-using-with
+        self._size = 0
+        self._open = True
+
+    def _check_open(self):
+        # type: () -> None
+        """
+        An internal method to make sure that the file is still open.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if not self._open:
+            raise pycdlibexception.PyCdlibInvalidInput('I/O operation on closed file.')
+
+    def write(self, b):
+        # type: (Any) -> int
+        """
+        Write data at the current position.
+
+        Parameters:
+         b - The data to write.
+        Returns:
+         The number of bytes written.
+        """
+        self._check_open()
+        ret = self._spool.write(b)
+        self._size = max(self._size, self._spool.tell())
+        return ret
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> int
+        """
+        Change the stream position.
+
+        Parameters:
+         offset - The offset to seek to.
+         whence - Where the offset is relative to.
+        Returns:
+         The new position.
+        """
+        self._check_open()
+        if whence not in (os.SEEK_SET, os.SEEK_CUR, os.SEEK_END):
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid value for whence (options are 0, 1, and 2)')
+        if whence == os.SEEK_END:
+            offset += self._size
+            whence = os.SEEK_SET
+        elif whence == os.SEEK_CUR:
+            offset += self._spool.tell()
+            whence = os.SEEK_SET
+        if offset < 0:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid offset value (cannot seek before start of file)')
+        return self._spool.seek(offset, whence)
+
+    def tell(self):
+        # type: () -> int
+        """
+        Get the current stream position.
+
+        Parameters:
+         None.
+        Returns:
+         The current position.
+        """
+        self._check_open()
+        return self._spool.tell()
+
+    def writable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is writable.
+
+        Parameters:
+         None.
+        Returns:
+         True.
+        """
+        return True
+
+    def seekable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is seekable.
+
+        Parameters:
+         None.
+        Returns:
+         True.
+        """
+        return True
+
+    def _finish(self):
+        # type: () -> None
+        """
+        An internal method to compress the spooled data and write out the
+        container.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        block_size = self.block_size
+        num_blocks = (self._size + block_size - 1) // block_size
+
+        # The index entries only have 31 bits for the offset, so larger
+        # containers align the blocks and store the offset shifted down.  The
+        # container can never be larger than the header, index, and every
+        # block stored uncompressed.
+        index_size = (num_blocks + 1) * 4
+        align = 0
+        while (_HEADER_SIZE + index_size + self._size + num_blocks * ((1 << align) - 1)) >> align > _OFFSET_MASK:
+            align += 1
+
+        start = self._fp.tell()
+        self._fp.write(struct.pack(_HEADER_FMT, self._format, _HEADER_SIZE,
+                                   self._size, block_size, 1, align, b'\x00\x00'))
+        self._fp.write(b'\x00' * index_size)
+        offset = _HEADER_SIZE + index_size
+
+        index = []  # type: List[int]
+        batch_blocks = max(1, 65536 // block_size)
+        threads = self._threads or os.cpu_count() or 1
+        self._spool.seek(0)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            remaining = num_blocks
+            while remaining > 0:
+                # Keep a bounded number of batches in flight, so that memory
+                # use does not grow with the size of the ISO.
+                futures = []
+                for i_unused in range(threads * 4):
+                    if remaining <= 0:
+                        break
+                    count = min(batch_blocks, remaining)
+                    data = self._spool.read(count * block_size)
+                    data += b'\x00' * (count * block_size - len(data))
+                    blocks = [data[i:i + block_size] for i in range(0, len(data), block_size)]
+                    futures.append(executor.submit(_compress_blocks, blocks,
+                                                   self._format, self._level))
+                    remaining -= count
+
+                for future in futures:
+                    for data, plain in future.result():
+                        pad = -offset % (1 << align)
+                        if pad:
+                            self._fp.write(b'\x00' * pad)
+                            offset += pad
+                        entry = offset >> align
+                        if plain:
+                            entry |= _PLAIN_FLAG
+                        index.append(entry)
+                        self._fp.write(data)
+                        offset += len(data)
+
+        pad = -offset % (1 << align)
+        if pad:
+            self._fp.write(b'\x00' * pad)
+            offset += pad
+        index.append(offset >> align)
+
+        end = self._fp.tell()
+        self._fp.seek(start + _HEADER_SIZE)
+        self._fp.write(struct.pack('<%dI' % (len(index)), *index))
+        self._fp.seek(end)
+
+    def close(self):
+        # type: () -> None
+        """
+        Compress the data written so far and finish the container.  The
+        underlying file object is not closed.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if self._open:
+            self._open = False
+            try:
+                self._finish()
+            finally:
+                self._spool.close()
+        super(CisoWriter, self).close()  # pylint: disable=super-with-arguments
+
+
+def wrap_if_compressed(fp, close_fp=False):
+    # type: (Any, bool) -> Any
+    """
+    Wrap a file object in a CisoFile if it holds a CISO or ZISO container.
+
+    Parameters:
+     fp - The file object to check.
+     close_fp - Whether the CisoFile should close the file object when it is
+                closed.
+    Returns:
+     A CisoFile for the container, or the file object itself if it does not
+     hold a container.
+    """
+    fp.seek(0)
+    magic = fp.read(4)
+    fp.seek(0)
+    if magic in (FORMAT_CISO, FORMAT_ZISO):
+        return CisoFile(fp, close_fp)
+    return fp
@@ -25,6 +25,10 @@ import time
 from pycdlib import pycdlibexception
 from pycdlib import utils
 
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Optional  # NOQA pylint: disable=unused-import
+
 
 @functools.lru_cache(maxsize=256)
 def string_to_timestruct(input_string):
@@ -62,16 +66,17 @@ class DirectoryRecordDate:
     second, and the offset from GMT in 15 minute intervals.  There are two main
     ways to use this class: either to instantiate and then parse a string to
     fill in the fields (the parse() method), or to create a new entry with a
-    tm structure (the new() method).
+    tm structure (the new() method).  Since there can be millions of these on
+    an ISO, only the raw 7 bytes are stored, and the fields are decoded from
+    them on demand.
     """
     FMT = '=BBBBBBb'
 
-    __slots__ = ('_initialized', 'years_since_1900', 'month', 'day_of_month',
-                 'hour', 'minute', 'second', 'gmtoffset')
+    __slots__ = ('_raw',)
 
     def __init__(self):
         # type: () -> None
-        self._initialized = False
+        self._raw = None  # type: Optional[bytes]
 
     def parse(self, datestr):
         # type: (bytes) -> None
@@ -83,14 +88,13 @@ class DirectoryRecordDate:
         Returns:
          Nothing.
         """
-        if self._initialized:
+        if self._raw is not None:
             raise pycdlibexception.PyCdlibInternalError('Directory Record Date already initialized')
 
-        (self.years_since_1900, self.month, self.day_of_month, self.hour,
-         self.minute, self.second,
-         self.gmtoffset) = struct.unpack_from(self.FMT, datestr, 0)
+        if len(datestr) < 7:
+            raise pycdlibexception.PyCdlibInvalidISO('Directory Record Date is too short')
 
-        self._initialized = True
+        self._raw = bytes(datestr[:7])
 
     def new(self, tm):
         # type: (float) -> None
@@ -104,19 +108,72 @@ class DirectoryRecordDate:
         Returns:
          Nothing.
         """
-        if self._initialized:
+        if self._raw is not None:
             raise pycdlibexception.PyCdlibInternalError('Directory Record Date already initialized')
 
         # This algorithm was ported from cdrkit, genisoimage.c:iso9660_date()
         local = time.localtime(tm)
-        self.years_since_1900 = local.tm_year - 1900
-        self.month = local.tm_mon
-        self.day_of_month = local.tm_mday
-        self.hour = local.tm_hour
-        self.minute = local.tm_min
-        self.second = local.tm_sec
-        self.gmtoffset = utils.gmtoffset_from_tm(tm, local)
-        self._initialized = True
+        self._raw = struct.pack(self.FMT, local.tm_year - 1900, local.tm_mon,
+                                local.tm_mday, local.tm_hour, local.tm_min,
+                                local.tm_sec,
+                                utils.gmtoffset_from_tm(tm, local))
+
+    def _field(self, index):
+        # type: (int) -> int
+        """
+        An internal method to decode one field of the date.
+
+        Parameters:
+         index - The index of the field in FMT.
+        Returns:
+         The value of the field.
+        """
+        if self._raw is None:
+            raise pycdlibexception.PyCdlibInternalError('Directory Record Date not initialized')
+
+        return struct.unpack_from(self.FMT, self._raw, 0)[index]
+
+    @property
+    def years_since_1900(self):
+        # type: () -> int
+        """The number of years since 1900."""
+        return self._field(0)
+
+    @property
+    def month(self):
+        # type: () -> int
+        """The month, from 1 to 12."""
+        return self._field(1)
+
+    @property
+    def day_of_month(self):
+        # type: () -> int
+        """The day of the month, from 1 to 31."""
+        return self._field(2)
+
+    @property
+    def hour(self):
+        # type: () -> int
+        """The hour, from 0 to 23."""
+        return self._field(3)
+
+    @property
+    def minute(self):
+        # type: () -> int
+        """The minute, from 0 to 59."""
+        return self._field(4)
+
+    @property
+    def second(self):
+        # type: () -> int
+        """The second, from 0 to 59."""
+        return self._field(5)
+
+    @property
+    def gmtoffset(self):
+        # type: () -> int
+        """The offset from GMT, in 15 minute intervals."""
+        return self._field(6)
 
     def record(self):
         # type: () -> bytes
@@ -128,18 +185,32 @@ class DirectoryRecordDate:
         Returns:
          A string representing this Directory Record Date.
         """
-        if not self._initialized:
+        if self._raw is None:
             raise pycdlibexception.PyCdlibInternalError('Directory Record Date not initialized')
 
-        return struct.pack(self.FMT, self.years_since_1900, self.month,
-                           self.day_of_month, self.hour, self.minute,
-                           self.second, self.gmtoffset)
+        return self._raw
 
     def __ne__(self, other):
-        return self.years_since_1900 != other.years_since_1900 or \
-            self.month != other.month or self.day_of_month != other.day_of_month or \
-            self.hour != other.hour or self.minute != other.minute or \
-            self.second != other.second or self.gmtoffset != other.gmtoffset
+        return self._raw != other._raw  # pylint: disable=protected-access
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_directory_record_date(datestr):
+    # type: (bytes) -> DirectoryRecordDate
+    """
+    A cacheable function to parse a Directory Record date out of a string.
+    Directory Record Dates are never modified once they are parsed, and most
+    of the records on an ISO tend to share a handful of dates, so records
+    with the same date share a single object.
+
+    Parameters:
+     datestr - The 7 byte string to parse the date out of.
+    Returns:
+     A DirectoryRecordDate object representing the date.
+    """
+    date = DirectoryRecordDate()
+    date.parse(datestr)
+    return date
 
 
 class VolumeDescriptorDate:
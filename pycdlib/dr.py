@@ -19,6 +19,7 @@ The class to support ISO9660 Directory Records.
 """
 
 import bisect
+import functools
 import struct
 
 from pycdlib import dates
@@ -35,6 +36,54 @@ if False:  # pylint: disable=using-constant-test
     from pycdlib import path_table_record  # NOQA pylint: disable=unused-import
 
 
+@functools.lru_cache(maxsize=4096)
+def _intern_ident(ident):
+    # type: (bytes) -> bytes
+    """
+    A cacheable function to intern a file identifier.  Since the cache hands
+    back the first object it saw for each value, records with the same name
+    (in different directories, say) end up sharing a single bytes object.
+
+    Parameters:
+     ident - The file identifier to intern.
+    Returns:
+     The interned file identifier.
+    """
+    return ident
+
+
+@functools.lru_cache(maxsize=16)
+def _special_name(name, encoding):
+    # type: (str, str) -> bytes
+    """
+    A cacheable function to get the printable name of the root, dot, and
+    dotdot records in a particular encoding.
+
+    Parameters:
+     name - The name of the special record.
+     encoding - The encoding to use.
+    Returns:
+     The encoded name.
+    """
+    return name.encode(encoding)
+
+
+def _rr_name_key(rec):
+    # type: (DirectoryRecord) -> bytes
+    """
+    A function to get the key to sort the Rock Ridge children of a directory
+    by.
+
+    Parameters:
+     rec - The Directory Record to get the key for.
+    Returns:
+     The Rock Ridge name of the record.
+    """
+    if rec.rock_ridge is None:
+        raise pycdlibexception.PyCdlibInternalError('Expected all children to have Rock Ridge, but one did not')
+    return rec.rock_ridge.name()
+
+
 class XARecord:
     """
     A class that represents an ISO9660 Extended Attribute record as defined
@@ -155,7 +204,8 @@ class DirectoryRecord:
                  'index_in_parent', 'dr_len', 'xattr_len', 'file_flags',
                  'file_unit_size', 'interleave_gap_size', 'len_fi', 'isdir',
                  'orig_extent_loc', 'data_length', 'seqnum', 'is_root',
-                 'parent', 'rock_ridge', 'xa_record', 'file_ident')
+                 'parent', 'rock_ridge', 'xa_record', 'file_ident',
+                 '_record_cache', '_record_cache_rr')
 
     FILE_FLAG_EXISTENCE_BIT = 0
     FILE_FLAG_DIRECTORY_BIT = 1
@@ -174,14 +224,18 @@ class DirectoryRecord:
         self.extents_to_here = 1
         self.offset_to_here = 0
         self.data_continuation = None  # type: Optional[DirectoryRecord]
-        self.children = []  # type: List[DirectoryRecord]
-        self.rr_children = []  # type: List[DirectoryRecord]
+        # Most records are files, so they all share a single empty list; the
+        # real lists are only allocated when the first child is added.
+        self.children = utils.EMPTY_LIST  # type: List[DirectoryRecord]
+        self.rr_children = utils.EMPTY_LIST  # type: List[DirectoryRecord]
         self.index_in_parent = -1
         self.is_root = False
         self.isdir = False
         self.rock_ridge = None  # type: Optional[rockridge.RockRidge]
         self.xa_record = None  # type: Optional[XARecord]
         self.inode = None  # type: Optional[inode.Inode]
+        self._record_cache = None  # type: Optional[bytes]
+        self._record_cache_rr = b''
 
     def parse(self, vd, record, parent):
         # type: (headervd.PrimaryOrSupplementaryVD, bytes, Optional[DirectoryRecord]) -> str
@@ -233,8 +287,7 @@ class DirectoryRecord:
             raise pycdlibexception.PyCdlibInvalidISO('Little-endian and big-endian seqnum disagree')
         self.seqnum = seqnum_le
 
-        self.date = dates.DirectoryRecordDate()
-        self.date.parse(dr_date)
+        self.date = dates.parse_directory_record_date(dr_date)
 
         # OK, we've unpacked what we can from the beginning of the string.  Now
         # we have to use the len_fi to get the rest.
@@ -260,7 +313,7 @@ class DirectoryRecord:
             self.isdir = True
         else:
             record_offset = 33
-            self.file_ident = record[record_offset:record_offset + self.len_fi]
+            self.file_ident = _intern_ident(record[record_offset:record_offset + self.len_fi])
             record_offset += self.len_fi
             if self.file_flags & (1 << self.FILE_FLAG_DIRECTORY_BIT):
                 self.isdir = True
@@ -269,11 +322,11 @@ class DirectoryRecord:
                 record_offset += 1
 
         if self.is_root:
-            self._printable_name = '/'.encode(vd.encoding)
+            self._printable_name = _special_name('/', vd.encoding)
         elif self.file_ident == b'\x00':
-            self._printable_name = '.'.encode(vd.encoding)
+            self._printable_name = _special_name('.', vd.encoding)
         elif self.file_ident == b'\x01':
-            self._printable_name = '..'.encode(vd.encoding)
+            self._printable_name = _special_name('..', vd.encoding)
         else:
             self._printable_name = self.file_ident
 
@@ -284,7 +337,7 @@ class DirectoryRecord:
                 record_offset += len(self.xa_record.record())
 
             if len(record[record_offset:]) >= 2 and \
-               record[record_offset:record_offset + 2] in (b'SP', b'RR', b'CE', b'PX', b'ER', b'ES', b'PN', b'SL', b'NM', b'CL', b'PL', b'TF', b'SF', b'RE', b'AL'):
+               record[record_offset:record_offset + 2] in (b'SP', b'RR', b'CE', b'PX', b'ER', b'ES', b'PN', b'SL', b'NM', b'CL', b'PL', b'TF', b'SF', b'RE', b'AL', b'ZF'):
                 self.rock_ridge = rockridge.RockRidge()
 
                 is_first_dir_record_of_root = False
@@ -326,8 +379,9 @@ class DirectoryRecord:
         return ret
 
     def _rr_new(self, rr_version, rr_name, rr_symlink_target, rr_relocated_child,
-                rr_relocated, rr_relocated_parent, file_mode, date_seconds):
-        # type: (str, bytes, bytes, bool, bool, bool, int, float) -> None
+                rr_relocated, rr_relocated_parent, file_mode, date_seconds,
+                zisofs=None):
+        # type: (str, bytes, bytes, bool, bool, bool, int, float, Optional[Tuple[int, int]]) -> None
         """
         Internal method to add Rock Ridge to a Directory Record.
 
@@ -346,6 +400,9 @@ class DirectoryRecord:
          file_mode - The Unix file mode for this Rock Ridge entry.
          date_seconds - Time and date, in seconds since the epoch, to use for
                         this directory record.
+         zisofs - A tuple of the uncompressed size and the base 2 logarithm of
+                  the block size if the data is zisofs-compressed, or None (the
+                  default).
         Returns:
          Nothing.
         """
@@ -362,7 +419,8 @@ class DirectoryRecord:
                                           file_mode, rr_symlink_target,
                                           rr_version, rr_relocated_child,
                                           rr_relocated, rr_relocated_parent,
-                                          bytes_to_skip, self.dr_len, {}, date_seconds)
+                                          bytes_to_skip, self.dr_len, {}, date_seconds,
+                                          zisofs)
 
         # For files, we are done
         if not self.isdir:
@@ -495,11 +553,11 @@ class DirectoryRecord:
         self.dr_len += (self.dr_len % 2)
 
         if self.is_root:
-            self._printable_name = '/'.encode(vd.encoding)
+            self._printable_name = _special_name('/', vd.encoding)
         elif self.file_ident == b'\x00':
-            self._printable_name = '.'.encode(vd.encoding)
+            self._printable_name = _special_name('.', vd.encoding)
         elif self.file_ident == b'\x01':
-            self._printable_name = '..'.encode(vd.encoding)
+            self._printable_name = _special_name('..', vd.encoding)
         else:
             self._printable_name = self.file_ident
 
@@ -537,8 +595,8 @@ class DirectoryRecord:
                          0o0120555, date_seconds)
 
     def new_file(self, vd, length, isoname, parent, seqnum, rock_ridge, rr_name,
-                 xa, file_mode, date_seconds):
-        # type: (headervd.PrimaryOrSupplementaryVD, int, bytes, DirectoryRecord, int, str, bytes, bool, int, float) -> None
+                 xa, file_mode, date_seconds, zisofs=None):
+        # type: (headervd.PrimaryOrSupplementaryVD, int, bytes, DirectoryRecord, int, str, bytes, bool, int, float, Optional[Tuple[int, int]]) -> None
         """
         Create a new file Directory Record.
 
@@ -554,6 +612,9 @@ class DirectoryRecord:
          file_mode - The POSIX file mode for this entry.
          date_seconds - Time and date, in seconds since the epoch, to use for
                         this file.
+         zisofs - A tuple of the uncompressed size and the base 2 logarithm of
+                  the block size if the data is zisofs-compressed, or None (the
+                  default).
         Returns:
          Nothing.
         """
@@ -563,7 +624,7 @@ class DirectoryRecord:
         self._new(vd, isoname, parent, seqnum, False, length, xa, date_seconds)
         if rock_ridge:
             self._rr_new(rock_ridge, rr_name, b'', False, False, False,
-                         file_mode, date_seconds)
+                         file_mode, date_seconds, zisofs)
 
     def new_root(self, vd, seqnum, log_block_size, date_seconds):
         # type: (headervd.PrimaryOrSupplementaryVD, int, int, float) -> None
@@ -677,6 +738,7 @@ class DirectoryRecord:
                 # directories, so fix things up here.
                 self.isdir = False
                 self.file_flags = 0
+                self._record_cache = None
                 self.rock_ridge.add_to_file_links()
 
     def change_existence(self, is_hidden):
@@ -697,6 +759,7 @@ class DirectoryRecord:
             self.file_flags |= (1 << self.FILE_FLAG_EXISTENCE_BIT)
         else:
             self.file_flags &= ~(1 << self.FILE_FLAG_EXISTENCE_BIT)
+        self._record_cache = None
 
     def _recalculate_extents_and_offsets(self, index, logical_block_size):
         # type: (int, int) -> Tuple[int, int]
@@ -755,6 +818,9 @@ class DirectoryRecord:
         if not self.isdir:
             raise pycdlibexception.PyCdlibInvalidInput('Trying to add a child to a record that is not a directory')
 
+        if self.children is utils.EMPTY_LIST:
+            self.children = []
+
         # First ensure that this is not a duplicate.  For speed purposes, we
         # recognize that bisect_left will always choose an index to the *left*
         # of a duplicate child.  Thus, to check for duplicates we only need to
@@ -769,10 +835,13 @@ class DirectoryRecord:
 
                     self.children[index].data_continuation = child
                     self.children[index].file_flags |= (1 << self.FILE_FLAG_MULTI_EXTENT_BIT)
+                    self.children[index]._record_cache = None  # pylint: disable=protected-access
                     index += 1
         self.children.insert(index, child)
 
         if child.rock_ridge is not None and not child.is_dot() and not child.is_dotdot():
+            if self.rr_children is utils.EMPTY_LIST:
+                self.rr_children = []
             lo = 0
             hi = len(self.rr_children)
             while lo < hi:
@@ -801,21 +870,22 @@ class DirectoryRecord:
             overflowed = True
             # When we overflow our data length, we always add a full block.
             self.data_length += logical_block_size
+            self._record_cache = None
             # We also have to make sure to update the length of the dot child,
             # as that should always reflect the length.
-            self.children[0].data_length = self.data_length
+            self.children[0].set_data_length(self.data_length)
             # We also have to update all of the dotdot entries.  If this is
             # the root directory record (no parent), we first update the root
             # dotdot entry.  In all cases, we update the dotdot entry of all
             # children that are directories.
             if self.parent is None:
-                self.children[1].data_length = self.data_length
+                self.children[1].set_data_length(self.data_length)
 
             for c in self.children:
                 if not c.is_dir():
                     continue
                 if len(c.children) > 1:
-                    c.children[1].data_length = self.data_length
+                    c.children[1].set_data_length(self.data_length)
 
         return overflowed
 
@@ -839,6 +909,84 @@ class DirectoryRecord:
 
         return self._add_child(child, logical_block_size, allow_duplicate, True)
 
+    def add_children(self, children, logical_block_size):
+        # type: (List[DirectoryRecord], int) -> int
+        """
+        Add a batch of new children to this directory record.  The children are
+        merged with the existing ones with a single sort, and the extents and
+        offsets are recalculated once, instead of once per child as with
+        add_child().  As with add_child() on behalf of the PyCdlib object, a
+        file may have the same name as the entry before it, in which case it
+        is a continuation of that entry (as for a very large file).
+
+        Parameters:
+         children - The child directory record objects to add.
+         logical_block_size - The size of a logical block for this volume
+                              descriptor.
+        Returns:
+         The number of bytes that this directory grew by.
+        """
+        if not self.initialized:
+            raise pycdlibexception.PyCdlibInternalError('Directory Record not initialized')
+
+        if not self.isdir:
+            raise pycdlibexception.PyCdlibInvalidInput('Trying to add a child to a record that is not a directory')
+
+        if not children:
+            return 0
+
+        # The sort is stable, so the parts of a very large file stay in the
+        # order they were added in, and come after an existing entry of the
+        # same name.
+        merged = self.children + children
+        merged.sort()
+
+        allow_duplicates = self.rock_ridge is not None and self.file_identifier() == b'RR_MOVED'
+        continuations = []
+        for i in range(1, len(merged)):
+            prev = merged[i - 1]
+            child = merged[i]
+            if prev.file_ident != child.file_ident or prev.is_associated_file() or child.is_associated_file() or allow_duplicates:
+                continue
+            if child.is_dir() or prev.is_dir():
+                raise pycdlibexception.PyCdlibInvalidInput('Failed adding duplicate name to parent')
+            continuations.append((prev, child))
+
+        for prev, child in continuations:
+            prev.data_continuation = child
+            prev.file_flags |= (1 << self.FILE_FLAG_MULTI_EXTENT_BIT)
+            prev._record_cache = None  # pylint: disable=protected-access
+
+        self.children = merged
+
+        rr_children = [c for c in children if c.rock_ridge is not None and not c.is_dot() and not c.is_dotdot()]
+        if rr_children:
+            self.rr_children = sorted(self.rr_children + rr_children,
+                                      key=_rr_name_key)
+
+        num_extents, offset_unused = self._recalculate_extents_and_offsets(0,
+                                                                           logical_block_size)
+
+        num_bytes_to_add = num_extents * logical_block_size - self.data_length
+        if num_bytes_to_add <= 0:
+            return 0
+
+        # Just like add_child(), grow by whole blocks and update the dot child
+        # and the dotdot entries that reflect the length.
+        self.data_length += num_bytes_to_add
+        self._record_cache = None
+        self.children[0].set_data_length(self.data_length)
+        if self.parent is None:
+            self.children[1].set_data_length(self.data_length)
+
+        for c in self.children:
+            if not c.is_dir():
+                continue
+            if len(c.children) > 1:
+                c.children[1].set_data_length(self.data_length)
+
+        return num_bytes_to_add
+
     def track_child(self, child, logical_block_size, allow_duplicate=False):
         # type: (DirectoryRecord, int, bool) -> None
         """
@@ -914,21 +1062,22 @@ class DirectoryRecord:
         total_size = (num_extents - 1) * logical_block_size + dirrecord_offset
         if (self.data_length - total_size) > logical_block_size:
             self.data_length -= logical_block_size
+            self._record_cache = None
             # We also have to make sure to update the length of the dot child,
             # as that should always reflect the length.
-            self.children[0].data_length = self.data_length
+            self.children[0].set_data_length(self.data_length)
             # We also have to update all of the dotdot entries.  If this is
             # the root directory record (no parent), we first update the root
             # dotdot entry.  In all cases, we update the dotdot entry of all
             # children that are directories.
             if self.parent is None:
-                self.children[1].data_length = self.data_length
+                self.children[1].set_data_length(self.data_length)
 
             for c in self.children:
                 if not c.is_dir():
                     continue
                 if len(c.children) > 1:
-                    c.children[1].data_length = self.data_length
+                    c.children[1].set_data_length(self.data_length)
             underflow = True
 
         return underflow
@@ -1075,6 +1224,16 @@ class DirectoryRecord:
         if not self.initialized:
             raise pycdlibexception.PyCdlibInternalError('Directory Record not initialized')
 
+        rr_rec = b''
+        if self.rock_ridge is not None:
+            rr_rec = self.rock_ridge.record_dr_entries()
+
+        # The serialized form only changes when one of our fields is modified
+        # (which clears the cache), or when the Rock Ridge entries generate a
+        # new string.  In all other cases we can hand back the last result.
+        if self._record_cache is not None and rr_rec is self._record_cache_rr:
+            return self._record_cache
+
         padlen = struct.calcsize(self.FMT) + self.len_fi
         padstr = b'\x00' * (padlen % 2)
 
@@ -1083,9 +1242,6 @@ class DirectoryRecord:
         xa_rec = b''
         if self.xa_record is not None:
             xa_rec = self.xa_record.record()
-        rr_rec = b''
-        if self.rock_ridge is not None:
-            rr_rec = self.rock_ridge.record_dr_entries()
 
         outlist = [struct.pack(self.FMT, self.dr_len, self.xattr_len,
                                extent_loc, utils.swab_32bit(extent_loc),
@@ -1097,7 +1253,10 @@ class DirectoryRecord:
 
         outlist.append(b'\x00' * (len(outlist[0]) % 2))
 
-        return b''.join(outlist)
+        self._record_cache = b''.join(outlist)
+        self._record_cache_rr = rr_rec
+
+        return self._record_cache
 
     def is_associated_file(self):
         # type: () -> bool
@@ -1145,7 +1304,9 @@ class DirectoryRecord:
         if not self.initialized:
             raise pycdlibexception.PyCdlibInternalError('Directory Record not initialized')
 
-        self.new_extent_loc = current_extent
+        if current_extent != self.new_extent_loc:
+            self.new_extent_loc = current_extent
+            self._record_cache = None
         if self.ptr is not None:
             self.ptr.update_extent_location(current_extent)
 
@@ -1177,7 +1338,9 @@ class DirectoryRecord:
         """
         if not self.initialized:
             raise pycdlibexception.PyCdlibInternalError('Directory Record not initialized')
-        self.data_length = length
+        if length != self.data_length:
+            self.data_length = length
+            self._record_cache = None
 
     ############# START BACKWARDS COMPATIBILITY ###############################
     # We have a few downstream users that are using 'data_fp',
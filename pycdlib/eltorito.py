@@ -16,15 +16,17 @@
 
 """Classes to support El Torito."""
 
+import array
 import logging
 import struct
+import sys
 
 from pycdlib import pycdlibexception
 from pycdlib import utils
 
 # For mypy annotations
 if False:  # pylint: disable=using-constant-test
-    from typing import List, Union  # NOQA pylint: disable=unused-import
+    from typing import List, Optional, Union  # NOQA pylint: disable=unused-import
     # NOTE: these imports have to be here to avoid circular deps
     from pycdlib import dr  # NOQA pylint: disable=unused-import
     from pycdlib import headervd  # NOQA pylint: disable=unused-import
@@ -34,6 +36,74 @@ if False:  # pylint: disable=using-constant-test
 
 _logger = logging.getLogger('pycdlib')
 
+# The array typecode for an unsigned 32-bit integer on this platform.
+_UINT32_TYPECODE = 'I' if array.array('I').itemsize == 4 else 'L'
+
+
+class EltoritoBootInfoTableChecksum:
+    """
+    A class to calculate the checksum of a boot file for an El Torito Boot
+    Info Table.  The checksum is the 32-bit sum of all of the little-endian
+    32-bit words in the boot file, starting right after the Boot Info Table
+    itself.  Data can be fed in as it is read, so the checksum can be
+    calculated while the boot file is being copied elsewhere.
+    """
+    __slots__ = ('_skip', '_leftover', '_csum')
+
+    def __init__(self):
+        # type: () -> None
+        # The first 64 bytes (the header and the table) are not included.
+        self._skip = 64
+        self._leftover = b''
+        self._csum = 0
+
+    def update(self, data):
+        # type: (bytes) -> None
+        """
+        Add the next piece of the boot file to the checksum.
+
+        Parameters:
+         data - The next piece of data from the boot file.
+        Returns:
+         Nothing.
+        """
+        if self._skip > 0:
+            skip = min(self._skip, len(data))
+            self._skip -= skip
+            data = data[skip:]
+        if self._leftover:
+            data = self._leftover + data
+
+        usable = len(data) & ~3
+        if usable != len(data):
+            self._leftover = data[usable:]
+            data = data[:usable]
+        else:
+            self._leftover = b''
+
+        if data:
+            words = array.array(_UINT32_TYPECODE, data)
+            if sys.byteorder != 'little':
+                words.byteswap()
+            self._csum = (self._csum + sum(words)) & 0xffffffff
+
+    def digest(self):
+        # type: () -> int
+        """
+        Get the checksum of all of the data seen so far.  A trailing partial
+        word is treated as if it were padded with zeros.
+
+        Parameters:
+         None.
+        Returns:
+         An integer representing the 32-bit checksum.
+        """
+        if not self._leftover:
+            return self._csum
+
+        word, = struct.unpack('<L', self._leftover.ljust(4, b'\x00'))
+        return (self._csum + word) & 0xffffffff
+
 
 class EltoritoBootInfoTable:
     """
@@ -77,7 +147,7 @@ class EltoritoBootInfoTable:
         return True
 
     def new(self, vd, ino, orig_len, csum):
-        # type: (headervd.PrimaryOrSupplementaryVD, inode.Inode, int, int) -> None
+        # type: (headervd.PrimaryOrSupplementaryVD, inode.Inode, int, Optional[int]) -> None
         """
         Create a new boot info table.
 
@@ -85,7 +155,8 @@ class EltoritoBootInfoTable:
          vd - The volume descriptor to associate with this boot info table.
          ino - The Inode associated with this Boot Info Table.
          orig_len - The original length of the file before the boot info table was patched into it.
-         csum - The checksum for the boot file, starting at the byte after the boot info table.
+         csum - The checksum for the boot file, starting at the byte after the
+                boot info table, or None if it has not been calculated yet.
         Returns:
          Nothing.
         """
@@ -110,6 +181,9 @@ class EltoritoBootInfoTable:
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('This Eltorito Boot Info Table not initialized')
 
+        if self.csum is None:
+            raise pycdlibexception.PyCdlibInternalError('The Eltorito Boot Info Table checksum has not been calculated')
+
         return struct.pack('<LLLL', self.vd.extent_location(),
                            self.inode.extent_location(), self.orig_len,
                            self.csum) + b'\x00' * 40
@@ -163,21 +237,11 @@ class EltoritoValidationEntry:
         Returns:
          The checksum of the data.
         """
-        if isinstance(data, bytes):
-            myord = int
-        else:
-            myord = ord
-        csum = 0
-        for i, val in enumerate(data):
-            short = (myord(val) << (8 * (i % 2))) & 0xffff
-            # Because we are looping through bytes, and because we know the
-            # above conversion can shift us up by a maximum of 8 bits, we know
-            # that the sign bit is at offset 15.  If it is signed, OR with
-            # 0xffff0000 to make sure it is sign-extended.
-            adder = short
-            if short & (1 << 15):
-                adder |= 0xffff0000
-            csum += adder
+        # The checksum is the sum of the little-endian 16-bit words of the
+        # data.  Since only the low 16 bits of the sum matter, this is the same
+        # as adding up the even bytes plus 256 times the odd bytes.
+        view = memoryview(data)
+        csum = sum(view[0::2]) + (sum(view[1::2]) << 8)
         return (-csum) & 0xffff
 
     def parse(self, valstr):
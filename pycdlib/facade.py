@@ -23,10 +23,11 @@ from pycdlib import utils
 
 # For mypy annotations
 if False:  # pylint: disable=using-constant-test
-    from typing import BinaryIO, Generator, Optional, Tuple  # NOQA pylint: disable=unused-import
+    from typing import BinaryIO, Generator, Optional, Tuple, Union  # NOQA pylint: disable=unused-import
     # NOTE: these imports have to be here to avoid circular deps
     from pycdlib import pycdlib  # NOQA pylint: disable=unused-import,cyclic-import
     from pycdlib import pycdlibio  # NOQA pylint: disable=unused-import
+    from pycdlib import zisofs  # NOQA pylint: disable=unused-import
 
 
 def iso_path_to_rr_name(iso_path, interchange_level, is_dir):
@@ -240,7 +241,7 @@ class PyCdlibISO9660:
         return self.pycdlib_obj.walk(iso_path=iso_path)
 
     def open_file_from_iso(self, iso_path):
-        # type: (str) -> pycdlibio.PyCdlibIO
+        # type: (str) -> Union[pycdlibio.PyCdlibIO, zisofs.ZisofsIO]
         """
         Open a file for reading in a context manager.  This allows the user to
         operate on the file in user-defined chunks (utilizing the read() method
@@ -249,7 +250,8 @@ class PyCdlibISO9660:
         Parameters:
          iso_path - The absolute ISO path to the file on the ISO.
         Returns:
-         A PyCdlibIO object allowing access to the file.
+         A PyCdlibIO object allowing access to the file, or a ZisofsIO object
+         that decompresses it if the file is zisofs-compressed.
         """
         return self.pycdlib_obj.open_file_from_iso(iso_path=iso_path)
 
@@ -432,7 +434,7 @@ class PyCdlibJoliet:
         return self.pycdlib_obj.walk(joliet_path=joliet_path)
 
     def open_file_from_iso(self, joliet_path):
-        # type: (str) -> pycdlibio.PyCdlibIO
+        # type: (str) -> Union[pycdlibio.PyCdlibIO, zisofs.ZisofsIO]
         """
         Open a file for reading in a context manager.  This allows the user to
         operate on the file in user-defined chunks (utilizing the read() method
@@ -722,7 +724,7 @@ class PyCdlibRockRidge:
         return self.pycdlib_obj.walk(rr_path=rr_path)
 
     def open_file_from_iso(self, rr_path):
-        # type: (str) -> pycdlibio.PyCdlibIO
+        # type: (str) -> Union[pycdlibio.PyCdlibIO, zisofs.ZisofsIO]
         """
         Open a file for reading in a context manager.  This allows the user to
         operate on the file in user-defined chunks (utilizing the read() method
@@ -731,7 +733,8 @@ class PyCdlibRockRidge:
         Parameters:
          rr_path - The absolute Rock Ridge path to the file on the ISO.
         Returns:
-         A PyCdlibIO object allowing access to the file.
+         A PyCdlibIO object allowing access to the file, or a ZisofsIO object
+         that decompresses it if the file is zisofs-compressed.
         """
         return self.pycdlib_obj.open_file_from_iso(rr_path=rr_path)
 
@@ -918,7 +921,7 @@ class PyCdlibUDF:
         return self.pycdlib_obj.walk(udf_path=udf_path)
 
     def open_file_from_iso(self, udf_path):
-        # type: (str) -> pycdlibio.PyCdlibIO
+        # type: (str) -> Union[pycdlibio.PyCdlibIO, zisofs.ZisofsIO]
         """
         Open a file for reading in a context manager.  This allows the user to
         operate on the file in user-defined chunks (utilizing the read() method
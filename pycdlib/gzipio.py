@@ -0,0 +1,684 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""
+A read-only, seekable file object for gzip-compressed ISOs, using an index of
+checkpoints into the compressed stream.
+"""
+
+import bisect
+import gzip
+import io
+import os
+import struct
+import zlib
+
+from pycdlib import pycdlibexception
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Any, BinaryIO, List, Optional, Tuple  # NOQA pylint: disable=unused-import
+
+# The checkpoint is at the start of a gzip member.
+KIND_MEMBER = 0
+# The checkpoint is at a byte-aligned deflate block boundary (an empty stored
+# block, as written by a sync or full flush), and needs the window of the 32 KiB
+# of data before it.
+KIND_BLOCK = 1
+# The checkpoint is a snapshot of the state of the decompressor.  These cannot
+# be saved, and only exist in indices that were built in this process.
+KIND_STATE = 2
+
+_WINDOW_SIZE = 32768
+_CHUNK_SIZE = 65536
+_SYNC_MARKER = b'\x00\x00\xff\xff'
+
+_INDEX_MAGIC = b'PYCDGZIX'
+_INDEX_VERSION = 1
+_INDEX_HEADER_FMT = '<8sIQQQI'
+_INDEX_ENTRY_FMT = '<QQBI'
+
+
+class _Checkpoint:
+    """
+    An internal class to hold a single checkpoint of a GzipIndex.  The window
+    is kept compressed, since most of the checkpoints are never used.
+    """
+    __slots__ = ('uoffset', 'coffset', 'kind', 'window', 'state')
+
+    def __init__(self, uoffset, coffset, kind, window, state=None):
+        # type: (int, int, int, bytes, Optional[Tuple[Any, bool, bytes]]) -> None
+        self.uoffset = uoffset
+        self.coffset = coffset
+        self.kind = kind
+        self.window = window
+        self.state = state
+
+
+class GzipIndex:
+    """
+    A class to hold an index of checkpoints into a gzip-compressed file, sorted
+    by their offset in the uncompressed data.  Decompression can be started at
+    any checkpoint, so reading from an arbitrary offset only needs to
+    decompress the data from the nearest checkpoint before it.
+    """
+    __slots__ = ('size', 'compressed_size', 'spacing', 'checkpoints', '_offsets')
+
+    def __init__(self, size, compressed_size, spacing, checkpoints):
+        # type: (int, int, int, List[_Checkpoint]) -> None
+        self.size = size
+        self.compressed_size = compressed_size
+        self.spacing = spacing
+        self.checkpoints = checkpoints
+        self._offsets = [cp.uoffset for cp in checkpoints]
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.checkpoints)
+
+    def find(self, offset):
+        # type: (int) -> _Checkpoint
+        """
+        Find the last checkpoint at or before an offset in the uncompressed
+        data.
+
+        Parameters:
+         offset - The offset in the uncompressed data.
+        Returns:
+         The checkpoint.
+        """
+        return self.checkpoints[max(bisect.bisect_right(self._offsets, offset) - 1, 0)]
+
+    def save(self, fp):
+        # type: (BinaryIO) -> None
+        """
+        Write this index to a file object.  Checkpoints that are snapshots of
+        the decompressor state are left out, since they cannot be restored in
+        another process.
+
+        Parameters:
+         fp - The file object to write to.
+        Returns:
+         Nothing.
+        """
+        saved = [cp for cp in self.checkpoints if cp.kind != KIND_STATE]
+        fp.write(struct.pack(_INDEX_HEADER_FMT, _INDEX_MAGIC, _INDEX_VERSION,
+                             self.size, self.compressed_size, self.spacing,
+                             len(saved)))
+        for cp in saved:
+            fp.write(struct.pack(_INDEX_ENTRY_FMT, cp.uoffset, cp.coffset,
+                                 cp.kind, len(cp.window)))
+            fp.write(cp.window)
+
+
+def load_index(fp):
+    # type: (BinaryIO) -> GzipIndex
+    """
+    Read an index that was written by GzipIndex.save().
+
+    Parameters:
+     fp - The file object to read from.
+    Returns:
+     The GzipIndex.
+    """
+    header_len = struct.calcsize(_INDEX_HEADER_FMT)
+    entry_len = struct.calcsize(_INDEX_ENTRY_FMT)
+
+    data = fp.read(header_len)
+    if len(data) != header_len:
+        raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip index')
+    (magic, version, size, compressed_size, spacing,
+     count) = struct.unpack(_INDEX_HEADER_FMT, data)
+    if magic != _INDEX_MAGIC:
+        raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip index')
+    if version != _INDEX_VERSION:
+        raise pycdlibexception.PyCdlibInvalidInput('Unsupported gzip index version %d' % (version))
+
+    checkpoints = []  # type: List[_Checkpoint]
+    for i_unused in range(count):
+        data = fp.read(entry_len)
+        if len(data) != entry_len:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip index')
+        uoffset, coffset, kind, window_len = struct.unpack(_INDEX_ENTRY_FMT, data)
+        if kind not in (KIND_MEMBER, KIND_BLOCK):
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip index')
+        window = fp.read(window_len)
+        if len(window) != window_len:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip index')
+        checkpoints.append(_Checkpoint(uoffset, coffset, kind, window))
+
+    if not checkpoints or checkpoints[0].uoffset != 0:
+        raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip index')
+
+    return GzipIndex(size, compressed_size, spacing, checkpoints)
+
+
+class _Decoder:
+    """
+    An internal class to decompress a gzip file sequentially from a
+    checkpoint, handling the ends of gzip members.
+    """
+    __slots__ = ('_fp', '_zobj', '_raw', '_cpos', '_tail', '_tail_marker',
+                 'upos', 'eof', 'split_markers', 'at_boundary', 'member_start')
+
+    def __init__(self, fp, cpos, upos, zobj, raw, tail=b''):
+        # type: (BinaryIO, int, int, Any, bool, bytes) -> None
+        self._fp = fp
+        self._zobj = zobj
+        self._raw = raw
+        self._cpos = cpos
+        self._tail = tail
+        self._tail_marker = False
+        self.upos = upos
+        self.eof = False
+        # When split_markers is True, input is fed so that each sync marker
+        # ends a piece; at_boundary is then True when the input up to the end
+        # of a marker has been completely decompressed.
+        self.split_markers = False
+        self.at_boundary = False
+        self.member_start = False
+
+    @property
+    def cpos(self):
+        # type: () -> int
+        """The offset in the compressed file of the next byte to be fed."""
+        return self._cpos
+
+    @property
+    def input_pos(self):
+        # type: () -> int
+        """The offset in the compressed file of the next byte to be consumed."""
+        return self._cpos - len(self._tail)
+
+    def snapshot(self):
+        # type: () -> Tuple[Any, bool, bytes]
+        """
+        Take a snapshot of the decompressor, to restart from later.
+
+        Parameters:
+         None.
+        Returns:
+         A tuple of a copy of the decompressor, whether it is decoding raw
+         deflate data, and the input that it has not consumed yet.
+        """
+        return (self._zobj.copy(), self._raw, self._tail)
+
+    def _read_input(self, size):
+        # type: (int) -> bytes
+        """
+        An internal method to read more compressed data.
+
+        Parameters:
+         size - The maximum number of bytes to read.
+        Returns:
+         The data, which is empty at the end of the file.
+        """
+        self._fp.seek(self._cpos)
+        data = self._fp.read(size)
+        self._cpos += len(data)
+        return data
+
+    def _next_member(self, rest):
+        # type: (bytes) -> None
+        """
+        An internal method to move on to the next gzip member once the current
+        one has ended.
+
+        Parameters:
+         rest - The input that followed the end of the deflate data.
+        Returns:
+         Nothing.
+        """
+        if self._raw:
+            # Started from a block boundary, so the trailer has not been
+            # consumed yet.
+            while len(rest) < 8:
+                more = self._read_input(_CHUNK_SIZE)
+                if not more:
+                    raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip data (truncated member trailer)')
+                rest += more
+            rest = rest[8:]
+
+        if not rest:
+            rest = self._read_input(_CHUNK_SIZE)
+        if not rest.lstrip(b'\x00'):
+            # Like gzip(1), ignore trailing zeros.
+            while rest and not rest.lstrip(b'\x00'):
+                rest = self._read_input(_CHUNK_SIZE)
+            if not rest:
+                self.eof = True
+                self._tail = b''
+                return
+
+        self._zobj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._raw = False
+        self._tail = rest
+        self.member_start = True
+
+    def read(self, size):
+        # type: (int) -> bytes
+        """
+        Decompress the next data.
+
+        Parameters:
+         size - The maximum number of bytes to decompress.
+        Returns:
+         The data, which is only short of the size at the end of the file (or,
+         when splitting at sync markers, at a boundary).
+        """
+        chunks = []  # type: List[bytes]
+        remaining = size
+        self.at_boundary = False
+        self.member_start = False
+        while remaining > 0 and not self.eof:
+            if self._tail:
+                data = self._tail
+                ends_marker = self._tail_marker
+            else:
+                start = self._cpos
+                data = self._read_input(_CHUNK_SIZE)
+                if not data:
+                    raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip data (truncated)')
+                ends_marker = False
+                if self.split_markers:
+                    idx = data.find(_SYNC_MARKER)
+                    if idx != -1:
+                        data = data[:idx + len(_SYNC_MARKER)]
+                        self._cpos = start + len(data)
+                        ends_marker = True
+
+            try:
+                out = self._zobj.decompress(data, remaining)
+            except zlib.error as e:
+                raise pycdlibexception.PyCdlibInvalidInput('Invalid gzip data (%s)' % (e))
+            self._tail = self._zobj.unconsumed_tail
+            self._tail_marker = ends_marker
+            chunks.append(out)
+            remaining -= len(out)
+            self.upos += len(out)
+
+            if self._zobj.eof:
+                self._next_member(self._zobj.unused_data)
+                if self.member_start:
+                    break
+            elif ends_marker and not self._tail:
+                self.at_boundary = True
+                break
+
+        return b''.join(chunks)
+
+    def skip(self, size):
+        # type: (int) -> None
+        """
+        Decompress and throw away data.
+
+        Parameters:
+         size - The number of bytes to skip.
+        Returns:
+         Nothing.
+        """
+        while size > 0 and not self.eof:
+            size -= len(self.read(min(size, _CHUNK_SIZE * 4)))
+
+
+def _decoder_at(fp, cp):
+    # type: (BinaryIO, _Checkpoint) -> _Decoder
+    """
+    An internal function to start decompressing at a checkpoint.
+
+    Parameters:
+     fp - The file object of the compressed file.
+     cp - The checkpoint to start at.
+    Returns:
+     The _Decoder.
+    """
+    if cp.kind == KIND_STATE and cp.state is not None:
+        zobj, raw, tail = cp.state
+        return _Decoder(fp, cp.coffset, cp.uoffset, zobj.copy(), raw, tail)
+    if cp.kind == KIND_BLOCK:
+        zobj = zlib.decompressobj(-zlib.MAX_WBITS, zdict=zlib.decompress(cp.window))
+        return _Decoder(fp, cp.coffset, cp.uoffset, zobj, True)
+    return _Decoder(fp, cp.coffset, cp.uoffset,
+                    zlib.decompressobj(16 + zlib.MAX_WBITS), False)
+
+
+def _check_boundary(fp, decoder, window):
+    # type: (BinaryIO, _Decoder, bytes) -> bool
+    """
+    An internal function to check that decompression can be restarted at the
+    current position of a decoder with only the window.  This is true if the
+    position is at a block boundary, which a sync marker in the compressed
+    data almost always is.  Since a deflate stream can refer back at most 32
+    KiB, it is enough to check that the next 32 KiB of data come out the same.
+
+    Parameters:
+     fp - The file object of the compressed file.
+     decoder - The decoder that is stopped at a possible boundary.
+     window - The up to 32 KiB of data before the position.
+    Returns:
+     True if decompression can be restarted here, False otherwise.
+    """
+    zobj, raw, tail = decoder.snapshot()
+    if tail:
+        return False
+    expected = _Decoder(fp, decoder.cpos, decoder.upos, zobj, raw)
+    trial = _Decoder(fp, decoder.cpos, decoder.upos,
+                     zlib.decompressobj(-zlib.MAX_WBITS, zdict=window), True)
+    want = b''
+    got = b''
+    try:
+        while len(want) < _WINDOW_SIZE and not expected.eof:
+            want += expected.read(_WINDOW_SIZE - len(want))
+        while len(got) < _WINDOW_SIZE and not trial.eof:
+            got += trial.read(_WINDOW_SIZE - len(got))
+    except pycdlibexception.PyCdlibInvalidInput:
+        return False
+    return want == got
+
+
+def build_index(fp, spacing=1024 * 1024):
+    # type: (BinaryIO, int) -> GzipIndex
+    """
+    Build an index of a gzip-compressed file by decompressing it once.  A
+    checkpoint is added about every spacing bytes of uncompressed data.  Where
+    possible, checkpoints are placed at the starts of gzip members and at the
+    block boundaries left by sync and full flushes (as written by pigz, bgzip,
+    or compress_fp()), since those can be saved with GzipIndex.save() and
+    loaded in another process.  Python's zlib module cannot restart
+    decompression in the middle of an arbitrary deflate stream, so everywhere
+    else the checkpoints are snapshots of the decompressor that only live as
+    long as the index.
+
+    Parameters:
+     fp - The file object of the compressed file.
+     spacing - The approximate number of uncompressed bytes between
+               checkpoints.
+    Returns:
+     The GzipIndex.
+    """
+    if spacing < 1:
+        raise pycdlibexception.PyCdlibInvalidInput('The spacing must be a positive number')
+
+    fp.seek(0)
+    if fp.read(2) != b'\x1f\x8b':
+        raise pycdlibexception.PyCdlibInvalidInput('The file is not gzip-compressed')
+
+    checkpoints = [_Checkpoint(0, 0, KIND_MEMBER, b'')]
+    last = 0
+    last_saved = 0
+    window = b''
+    decoder = _decoder_at(fp, checkpoints[0])
+    decoder.split_markers = True
+    while not decoder.eof:
+        data = decoder.read(_CHUNK_SIZE * 4)
+        window = (window + data)[-_WINDOW_SIZE:]
+        if decoder.eof:
+            break
+
+        upos = decoder.upos
+        if decoder.member_start:
+            if upos - last_saved >= spacing:
+                checkpoints.append(_Checkpoint(upos, decoder.input_pos,
+                                               KIND_MEMBER, b''))
+                last = last_saved = upos
+            continue
+
+        if decoder.at_boundary and upos - last_saved >= spacing:
+            if _check_boundary(fp, decoder, window):
+                checkpoints.append(_Checkpoint(upos, decoder.cpos, KIND_BLOCK,
+                                               zlib.compress(window)))
+                last = last_saved = upos
+                continue
+
+        if upos - last >= spacing:
+            checkpoints.append(_Checkpoint(upos, decoder.cpos, KIND_STATE, b'',
+                                           decoder.snapshot()))
+            last = upos
+
+    fp.seek(0, os.SEEK_END)
+    return GzipIndex(decoder.upos, fp.tell(), spacing, checkpoints)
+
+
+def compress_fp(infp, outfp, spacing=1024 * 1024, level=6):
+    # type: (BinaryIO, BinaryIO, int, int) -> None
+    """
+    Compress a file into a standard gzip file, with a full flush about every
+    spacing bytes so that an index of it can be saved and reloaded.  The
+    result can be decompressed by any gzip implementation.
+
+    Parameters:
+     infp - The file object to compress, read from its current position.
+     outfp - The file object to write the compressed data to.
+     spacing - The number of uncompressed bytes between flushes.
+     level - The compression level, from 1 to 9.
+    Returns:
+     Nothing.
+    """
+    if spacing < 1:
+        raise pycdlibexception.PyCdlibInvalidInput('The spacing must be a positive number')
+
+    with gzip.GzipFile(fileobj=outfp, mode='wb', compresslevel=level, mtime=0) as gz:
+        while True:
+            data = infp.read(spacing)
+            if not data:
+                break
+            gz.write(data)
+            if len(data) == spacing:
+                gz.flush(zlib.Z_FULL_FLUSH)
+
+
+class SeekableGzipFile(io.RawIOBase):
+    """
+    A read-only, seekable file object for a gzip-compressed file, suitable for
+    passing to PyCdlib.open_fp().  Reads decompress from the nearest
+    checkpoint of a GzipIndex before the requested offset, and sequential
+    reads carry on from where the previous one stopped.
+    """
+    __slots__ = ('_fp', '_index', '_decoder', '_pos', '_open')
+
+    def __init__(self, fp, index=None, spacing=1024 * 1024):
+        # type: (BinaryIO, Optional[GzipIndex], int) -> None
+        """
+        Open a gzip-compressed file.
+
+        Parameters:
+         fp - The file object of the compressed file.
+         index - The GzipIndex of the file, as returned by build_index() or
+                 load_index().  If None (the default), the index is built by
+                 decompressing the file once.
+         spacing - The approximate number of uncompressed bytes between
+                   checkpoints, if the index has to be built.
+        Returns:
+         Nothing.
+        """
+        super(SeekableGzipFile, self).__init__()  # pylint: disable=super-with-arguments
+        if index is None:
+            index = build_index(fp, spacing)
+        else:
+            fp.seek(0, os.SEEK_END)
+            if fp.tell() != index.compressed_size:
+                raise pycdlibexception.PyCdlibInvalidInput('The gzip index does not match the file')
+
+        self._fp = fp
+        self._index = index
+        self._decoder = None  # type: Optional[_Decoder]
+        self._pos = 0
+        self._open = True
+
+    @property
+    def index(self):
+        # type: () -> GzipIndex
+        """The index of checkpoints into the compressed file."""
+        return self._index
+
+    @property
+    def size(self):
+        # type: () -> int
+        """The size of the uncompressed data."""
+        return self._index.size
+
+    def _check_open(self):
+        # type: () -> None
+        """
+        An internal method to make sure that the file is still open.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if not self._open:
+            raise pycdlibexception.PyCdlibInvalidInput('I/O operation on closed file.')
+
+    def read(self, size=-1):
+        # type: (Optional[int]) -> bytes
+        """
+        Read and return up to size bytes.
+
+        Parameters:
+         size - The number of bytes to read, or -1 (or None) to read until the
+                end of the file.
+        Returns:
+         The data that was read.
+        """
+        self._check_open()
+        end = self._index.size
+        if size is not None and size >= 0:
+            end = min(end, self._pos + size)
+        if end <= self._pos:
+            return b''
+
+        decoder = self._decoder
+        cp = self._index.find(self._pos)
+        if decoder is None or decoder.upos > self._pos or cp.uoffset > decoder.upos:
+            decoder = _decoder_at(self._fp, cp)
+            self._decoder = decoder
+        decoder.skip(self._pos - decoder.upos)
+
+        chunks = []  # type: List[bytes]
+        remaining = end - self._pos
+        while remaining > 0 and not decoder.eof:
+            data = decoder.read(remaining)
+            chunks.append(data)
+            remaining -= len(data)
+
+        data = b''.join(chunks)
+        self._pos += len(data)
+        return data
+
+    def readall(self):
+        # type: () -> bytes
+        """
+        Read and return the rest of the file.
+
+        Parameters:
+         None.
+        Returns:
+         The rest of the data in the file.
+        """
+        return self.read(-1)
+
+    def readinto(self, b):
+        # type: (Any) -> int
+        """
+        Read bytes into a pre-allocated, writable bytes-like object.
+
+        Parameters:
+         b - The buffer to read into.
+        Returns:
+         The number of bytes read.
+        """
+        view = memoryview(b).cast('B')
+        data = self.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> int
+        """
+        Change the stream position.
+
+        Parameters:
+         offset - The offset to seek to.
+         whence - Where the offset is relative to.
+        Returns:
+         The new position.
+        """
+        self._check_open()
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = self._index.size + offset
+        else:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid value for whence (options are 0, 1, and 2)')
+
+        if pos < 0:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid offset value (cannot seek before start of file)')
+        self._pos = pos
+        return pos
+
+    def tell(self):
+        # type: () -> int
+        """
+        Get the current stream position.
+
+        Parameters:
+         None.
+        Returns:
+         The current position.
+        """
+        self._check_open()
+        return self._pos
+
+    def readable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is readable.
+
+        Parameters:
+         None.
+        Returns:
+         True.
+        """
+        return True
+
+    def seekable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is seekable.
+
+        Parameters:
+         None.
+        Returns:
+         True.
+        """
+        return True
+
+    def close(self):
+        # type: () -> None
+        """
+        Close the file.  The underlying compressed file object is not closed.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        self._open = False
+        self._decoder = None
+        super(SeekableGzipFile, self).close()  # pylint: disable=super-with-arguments
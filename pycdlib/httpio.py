@@ -0,0 +1,458 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""
+A read-only file object for ISOs that are served over HTTP, using range
+requests.
+"""
+
+import http.client
+import io
+import os
+import re
+import urllib.parse
+
+from pycdlib import blockcache
+from pycdlib import pycdlibexception
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    import ssl  # NOQA pylint: disable=unused-import
+    from typing import Any, Dict, Optional, Tuple  # NOQA pylint: disable=unused-import
+
+_CONTENT_RANGE_RE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+_MAX_REDIRECTS = 5
+
+
+class _RangeReader:
+    """
+    An internal class that reads ranges of a remote file with HTTP range
+    requests over a persistent connection.  It looks enough like a file object
+    (seek, tell, and read) to sit underneath a BlockCache.
+    """
+    __slots__ = ('_url', '_scheme', '_netloc', '_path', '_headers',
+                 '_timeout', '_context', '_conn', '_pos', 'size', 'requests',
+                 'bytes_fetched', 'connections')
+
+    def __init__(self, url, headers, timeout, context):
+        # type: (str, Dict[str, str], float, Optional[ssl.SSLContext]) -> None
+        self._headers = headers
+        self._timeout = timeout
+        self._context = context
+        self._conn = None  # type: Optional[http.client.HTTPConnection]
+        self._pos = 0
+        self.requests = 0
+        self.bytes_fetched = 0
+        self.connections = 0
+        self._url = ''
+        self._scheme = ''
+        self._netloc = ''
+        self._path = ''
+        self._set_url(url)
+
+        # Fetching the first byte both checks that the server supports range
+        # requests and tells us the size of the file.
+        status, headers_unused, content_range, body_unused = self._get_range(0, 0)
+        if status == 416:
+            # An empty file.
+            self.size = 0
+        else:
+            self.size = content_range[2]
+
+    def _set_url(self, url):
+        # type: (str) -> None
+        """
+        An internal method to set the URL to fetch from.
+
+        Parameters:
+         url - The URL.
+        Returns:
+         Nothing.
+        """
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ('http', 'https'):
+            raise pycdlibexception.PyCdlibInvalidInput('Only http and https URLs are supported')
+
+        if (parsed.scheme, parsed.netloc) != (self._scheme, self._netloc):
+            self.close()
+        self._url = url
+        self._scheme = parsed.scheme
+        self._netloc = parsed.netloc
+        self._path = parsed.path or '/'
+        if parsed.query:
+            self._path += '?' + parsed.query
+
+    def _connection(self):
+        # type: () -> http.client.HTTPConnection
+        """
+        An internal method to get the persistent connection to the server,
+        opening it if needed.
+
+        Parameters:
+         None.
+        Returns:
+         The connection.
+        """
+        if self._conn is None:
+            if self._scheme == 'https':
+                self._conn = http.client.HTTPSConnection(self._netloc,
+                                                         timeout=self._timeout,
+                                                         context=self._context)
+            else:
+                self._conn = http.client.HTTPConnection(self._netloc,
+                                                        timeout=self._timeout)
+            self.connections += 1
+        return self._conn
+
+    def _get_range(self, first, last):
+        # type: (int, int) -> Tuple[int, http.client.HTTPMessage, Tuple[int, int, int], bytes]
+        """
+        An internal method to fetch a range of the file.  Redirects are
+        followed, and a request that fails because the server closed the
+        persistent connection is retried once on a new connection.
+
+        Parameters:
+         first - The offset of the first byte to fetch.
+         last - The offset of the last byte to fetch (inclusive).
+        Returns:
+         A tuple of the HTTP status, the response headers, the parsed
+         Content-Range (first, last, total), and the body.
+        """
+        headers = dict(self._headers)
+        headers['Range'] = 'bytes=%d-%d' % (first, last)
+
+        redirects = 0
+        retried = False
+        while True:
+            conn = self._connection()
+            try:
+                conn.request('GET', self._path, headers=headers)
+                resp = conn.getresponse()
+                body = b''
+                if resp.status in (206, 416):
+                    body = resp.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if retried:
+                    raise
+                retried = True
+                continue
+
+            self.requests += 1
+            self.bytes_fetched += len(body)
+            if resp.will_close or resp.status not in (206, 416):
+                # Any other response is not read, since a server that ignores
+                # the Range header sends the whole file; that leaves the
+                # connection unusable, so drop it.
+                resp.close()
+                self.close()
+
+            if resp.status in (301, 302, 303, 307, 308):
+                location = resp.getheader('Location')
+                if location is None or redirects >= _MAX_REDIRECTS:
+                    raise pycdlibexception.PyCdlibInvalidInput('Too many redirects fetching %s' % (self._url))
+                redirects += 1
+                self._set_url(urllib.parse.urljoin(self._url, location))
+                continue
+
+            break
+
+        if resp.status == 416:
+            return resp.status, resp.msg, (0, -1, 0), b''
+
+        if resp.status == 200:
+            raise pycdlibexception.PyCdlibInvalidInput('The server for %s does not support range requests' % (self._url))
+
+        if resp.status != 206:
+            raise pycdlibexception.PyCdlibInvalidInput('HTTP request for %s failed with status %d' % (self._url, resp.status))
+
+        match = _CONTENT_RANGE_RE.match(resp.getheader('Content-Range', ''))
+        if match is None or match.group(3) == '*':
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid Content-Range in response from %s' % (self._url))
+        content_range = (int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        if content_range[0] != first or len(body) != content_range[1] - content_range[0] + 1:
+            raise pycdlibexception.PyCdlibInvalidInput('Unexpected range in response from %s' % (self._url))
+
+        return resp.status, resp.msg, content_range, body
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> int
+        """
+        Seek to a new position.
+
+        Parameters:
+         offset - The offset to seek to.
+         whence - Where the offset is relative to.
+        Returns:
+         The new position.
+        """
+        if whence == os.SEEK_SET:
+            self._pos = offset
+        elif whence == os.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self.size + offset
+        return self._pos
+
+    def tell(self):
+        # type: () -> int
+        """
+        Get the current position.
+
+        Parameters:
+         None.
+        Returns:
+         The current position.
+        """
+        return self._pos
+
+    def read(self, size=-1):
+        # type: (int) -> bytes
+        """
+        Read data at the current position with a single range request.
+
+        Parameters:
+         size - The number of bytes to read, or -1 to read until the end.
+        Returns:
+         The data that was read.
+        """
+        end = self.size
+        if size is not None and size >= 0:
+            end = min(end, self._pos + size)
+        if end <= self._pos:
+            return b''
+
+        status_unused, headers_unused, content_range_unused, body = self._get_range(self._pos, end - 1)
+        self._pos += len(body)
+        return body
+
+    def close(self):
+        # type: () -> None
+        """
+        Close the persistent connection, if it is open.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class HTTPRangeFile(io.RawIOBase):
+    """
+    A read-only, seekable file object for a file served over HTTP or HTTPS,
+    suitable for passing to PyCdlib.open_fp().  Data is fetched in aligned
+    blocks with Range requests over a persistent connection and kept in a
+    blockcache.BlockCache; a read that needs several missing blocks in a row
+    fetches them with a single request.  The server must support range
+    requests.
+    """
+    __slots__ = ('name', '_reader', '_fp', '_open')
+
+    def __init__(self, url, cache=None, headers=None, timeout=30.0,
+                 context=None):
+        # type: (str, Optional[blockcache.BlockCache], Optional[Dict[str, str]], float, Optional[ssl.SSLContext]) -> None
+        """
+        Open a remote file.
+
+        Parameters:
+         url - The http or https URL of the file.
+         cache - The blockcache.BlockCache to keep fetched blocks in.  If None
+                 (the default), a private cache of 64 MiB in 64 KiB blocks is
+                 used.
+         headers - Extra headers to send with each request (for instance,
+                   for authorization).
+         timeout - The timeout for network operations, in seconds.
+         context - The ssl.SSLContext to use for https URLs.
+        Returns:
+         Nothing.
+        """
+        super(HTTPRangeFile, self).__init__()  # pylint: disable=super-with-arguments
+        if cache is None:
+            cache = blockcache.BlockCache(max_bytes=64 * 1024 * 1024,
+                                          block_size=65536, readahead=1,
+                                          bypass_size=4 * 1024 * 1024)
+        if headers is None:
+            headers = {}
+
+        self.name = url
+        # The reader is not a BinaryIO, but has the seek, tell and read methods
+        # that the cache uses.
+        reader = _RangeReader(url, headers, timeout, context)  # type: Any
+        self._reader = reader
+        # Key the cached blocks by URL, so that files opened on the same URL
+        # can share a cache.
+        self._fp = cache.wrap(reader, ('url', url, reader.size))
+        self._open = True
+
+    @property
+    def size(self):
+        # type: () -> int
+        """The size of the remote file."""
+        return self._reader.size
+
+    @property
+    def requests(self):
+        # type: () -> int
+        """The number of HTTP requests made so far."""
+        return self._reader.requests
+
+    @property
+    def bytes_fetched(self):
+        # type: () -> int
+        """The number of bytes of response bodies received so far."""
+        return self._reader.bytes_fetched
+
+    @property
+    def connections(self):
+        # type: () -> int
+        """The number of connections opened so far."""
+        return self._reader.connections
+
+    @property
+    def cache(self):
+        # type: () -> blockcache.BlockCache
+        """The block cache that fetched data is kept in."""
+        return self._fp.cache
+
+    def _check_open(self):
+        # type: () -> None
+        """
+        An internal method to make sure that the file is still open.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if not self._open:
+            raise pycdlibexception.PyCdlibInvalidInput('I/O operation on closed file.')
+
+    def read(self, size=-1):
+        # type: (Optional[int]) -> bytes
+        """
+        Read and return up to size bytes.
+
+        Parameters:
+         size - The number of bytes to read, or -1 (or None) to read until the
+                end of the file.
+        Returns:
+         The data that was read.
+        """
+        self._check_open()
+        if size is None:
+            size = -1
+        return self._fp.read(size)
+
+    def readall(self):
+        # type: () -> bytes
+        """
+        Read and return the rest of the file.
+
+        Parameters:
+         None.
+        Returns:
+         The rest of the data in the file.
+        """
+        return self.read(-1)
+
+    def readinto(self, b):
+        # type: (Any) -> int
+        """
+        Read bytes into a pre-allocated, writable bytes-like object.
+
+        Parameters:
+         b - The buffer to read into.
+        Returns:
+         The number of bytes read.
+        """
+        self._check_open()
+        return self._fp.readinto(b)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> int
+        """
+        Change the stream position.
+
+        Parameters:
+         offset - The offset to seek to.
+         whence - Where the offset is relative to.
+        Returns:
+         The new position.
+        """
+        self._check_open()
+        if whence not in (os.SEEK_SET, os.SEEK_CUR, os.SEEK_END):
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid value for whence (options are 0, 1, and 2)')
+        try:
+            return self._fp.seek(offset, whence)
+        except OSError:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid offset value (cannot seek before start of file)')
+
+    def tell(self):
+        # type: () -> int
+        """
+        Get the current stream position.
+
+        Parameters:
+         None.
+        Returns:
+         The current position.
+        """
+        self._check_open()
+        return self._fp.tell()
+
+    def readable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is readable.
+
+        Parameters:
+         None.
+        Returns:
+         True.
+        """
+        return True
+
+    def seekable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is seekable.
+
+        Parameters:
+         None.
+        Returns:
+         True.
+        """
+        return True
+
+    def close(self):
+        # type: () -> None
+        """
+        Close the file and its connection to the server.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if self._open:
+            self._reader.close()
+            self._open = False
+        super(HTTPRangeFile, self).close()  # pylint: disable=super-with-arguments
@@ -17,35 +17,146 @@
 """PyCdlib Inode class."""
 
 from pycdlib import pycdlibexception
+from pycdlib import utils
 
 # For mypy annotations
 if False:  # pylint: disable=using-constant-test
-    from typing import Any, BinaryIO, IO, List, Optional, Tuple, Union  # NOQA pylint: disable=unused-import
+    from typing import Any, BinaryIO, Generator, IO, List, Optional, Tuple, Union  # NOQA pylint: disable=unused-import
     # NOTE: this import has to be here to avoid circular deps
     from pycdlib import dr  # NOQA pylint: disable=unused-import,cyclic-import
     from pycdlib import eltorito  # NOQA pylint: disable=unused-import,cyclic-import
     from pycdlib import udf  # NOQA pylint: disable=unused-import,cyclic-import
 
 
+class LinkedRecords:
+    """
+    A class to hold the list of (record, is_pvd) pairs that are linked to an
+    Inode.  It behaves like a list of tuples, but since nearly every Inode
+    has exactly one linked record, the first record is stored directly and
+    the is_pvd flags are packed into an integer; nothing else is allocated
+    until a second record is linked.
+
+    Inode.linked_records used to be a plain list.  A LinkedRecords supports
+    len(), iteration, indexing, append(), and del of an index; code that needs
+    any other list operation has to convert it with list() first.
+    """
+    __slots__ = ('_first', '_rest', '_pvd_mask')
+
+    def __init__(self, links=()):
+        # type: (Any) -> None
+        self._first = None  # type: Optional[Union[eltorito.EltoritoEntry, udf.UDFFileEntry, dr.DirectoryRecord]]
+        self._rest = utils.EMPTY_LIST  # type: List[Union[eltorito.EltoritoEntry, udf.UDFFileEntry, dr.DirectoryRecord]]
+        self._pvd_mask = 0
+        self._assign(links)
+
+    def _assign(self, links):
+        # type: (Any) -> None
+        """
+        An internal method to replace the linked records.
+
+        Parameters:
+         links - An iterable of (record, is_pvd) tuples.
+        Returns:
+         Nothing.
+        """
+        self._first = None
+        self._rest = utils.EMPTY_LIST
+        self._pvd_mask = 0
+        for link in links:
+            self.append(link)
+
+    def append(self, link):
+        # type: (Tuple[Union[eltorito.EltoritoEntry, udf.UDFFileEntry, dr.DirectoryRecord], bool]) -> None
+        """
+        Link another record.
+
+        Parameters:
+         link - A tuple of the record and whether it is a record on the PVD.
+        Returns:
+         Nothing.
+        """
+        rec, is_pvd = link
+        index = len(self)
+        if index == 0:
+            self._first = rec
+        else:
+            if self._rest is utils.EMPTY_LIST:
+                self._rest = []
+            self._rest.append(rec)
+        if is_pvd:
+            self._pvd_mask |= 1 << index
+
+    def _index(self, index):
+        # type: (int) -> int
+        """
+        An internal method to check and normalize an index.
+
+        Parameters:
+         index - The index to check.
+        Returns:
+         The non-negative index.
+        """
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError('linked record index out of range')
+        return index
+
+    def __len__(self):
+        # type: () -> int
+        if self._first is None:
+            return 0
+        return 1 + len(self._rest)
+
+    def __getitem__(self, index):
+        # type: (int) -> Tuple[Union[eltorito.EltoritoEntry, udf.UDFFileEntry, dr.DirectoryRecord], bool]
+        index = self._index(index)
+        if index == 0:
+            rec = self._first
+        else:
+            rec = self._rest[index - 1]
+        return rec, bool((self._pvd_mask >> index) & 1)  # type: ignore
+
+    def __iter__(self):
+        # type: () -> Generator[Tuple[Union[eltorito.EltoritoEntry, udf.UDFFileEntry, dr.DirectoryRecord], bool], None, None]
+        if self._first is None:
+            return
+        mask = self._pvd_mask
+        yield self._first, bool(mask & 1)
+        for rec in self._rest:
+            mask >>= 1
+            yield rec, bool(mask & 1)
+
+    def __delitem__(self, index):
+        # type: (int) -> None
+        index = self._index(index)
+        links = list(self)
+        del links[index]
+        self._assign(links)
+
+
 class Inode:
     """
     A class that represents an inode, the pointer to a piece of data
-    (not metadata) on an ISO.
+    (not metadata) on an ISO.  The records that point at the data are in
+    linked_records, a LinkedRecords of (record, is_pvd) tuples.
     """
     __slots__ = ('_initialized', 'new_extent_loc', 'orig_extent_loc',
                  'linked_records', 'data_length', 'manage_fp', 'data_fp',
                  'original_data_location', 'fp_offset', 'boot_info_table',
-                 'num_udf')
+                 'num_udf', 'sort_weight')
 
     DATA_ON_ORIGINAL_ISO = 1
     DATA_IN_EXTERNAL_FP = 2
 
     def __init__(self):
         # type: () -> None
-        self.linked_records = []  # type: List[Tuple[Union[eltorito.EltoritoEntry, udf.UDFFileEntry, dr.DirectoryRecord], bool]]
+        self.linked_records = LinkedRecords()
         self._initialized = False
         self.data_length = 0
         self.num_udf = 0
+        self.sort_weight = 0
         self.boot_info_table = None  # type: Optional[eltorito.EltoritoBootInfoTable]
         self.new_extent_loc = -1
 
@@ -0,0 +1,400 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Classes to account for the I/O that PyCdlib does on the ISO."""
+
+import logging
+import os
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Any, BinaryIO, Dict, Optional, Union  # NOQA pylint: disable=unused-import
+
+_logger = logging.getLogger('pycdlib')
+
+
+def _bucket(value):
+    # type: (int) -> int
+    """
+    An internal function to find the histogram bucket for a value.  The
+    buckets are powers of two; each value is counted in the bucket of the
+    largest power of two that is less than or equal to it (and 0 is counted
+    in bucket 0).
+
+    Parameters:
+     value - The value to find the bucket for.
+    Returns:
+     The bucket for the value.
+    """
+    if value <= 0:
+        return 0
+    return 1 << (value.bit_length() - 1)
+
+
+class IOCounters:
+    """
+    A class to hold counters for the I/O done on a single file object (or the
+    difference in those counters across an operation).  The histograms map
+    power-of-two buckets to the number of requests that fell into them.
+    """
+    __slots__ = ('seeks', 'reads', 'writes', 'bytes_read', 'bytes_written',
+                 'read_sizes', 'write_sizes', 'seek_distances')
+
+    def __init__(self):
+        # type: () -> None
+        self.seeks = 0
+        self.reads = 0
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.read_sizes = {}  # type: Dict[int, int]
+        self.write_sizes = {}  # type: Dict[int, int]
+        self.seek_distances = {}  # type: Dict[int, int]
+
+    def copy(self):
+        # type: () -> IOCounters
+        """
+        Make a copy of these counters.
+
+        Parameters:
+         None.
+        Returns:
+         A new IOCounters object with the same values.
+        """
+        new = IOCounters()
+        new.add(self)
+        return new
+
+    def add(self, other, sign=1):
+        # type: (IOCounters, int) -> None
+        """
+        Add (or subtract) another set of counters to these ones.
+
+        Parameters:
+         other - The counters to add.
+         sign - 1 to add the other counters, -1 to subtract them.
+        Returns:
+         Nothing.
+        """
+        self.seeks += sign * other.seeks
+        self.reads += sign * other.reads
+        self.writes += sign * other.writes
+        self.bytes_read += sign * other.bytes_read
+        self.bytes_written += sign * other.bytes_written
+        for mine, theirs in ((self.read_sizes, other.read_sizes),
+                             (self.write_sizes, other.write_sizes),
+                             (self.seek_distances, other.seek_distances)):
+            for bucket, count in theirs.items():
+                newcount = mine.get(bucket, 0) + sign * count
+                if newcount:
+                    mine[bucket] = newcount
+                else:
+                    mine.pop(bucket, None)
+
+    def as_dict(self):
+        # type: () -> Dict[str, Any]
+        """
+        Get these counters as plain dictionaries, suitable for serializing.
+
+        Parameters:
+         None.
+        Returns:
+         A dictionary of the counters.
+        """
+        return {
+            'seeks': self.seeks,
+            'reads': self.reads,
+            'writes': self.writes,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'read_sizes': dict(sorted(self.read_sizes.items())),
+            'write_sizes': dict(sorted(self.write_sizes.items())),
+            'seek_distances': dict(sorted(self.seek_distances.items())),
+        }
+
+    def __repr__(self):
+        # type: () -> str
+        return 'IOCounters(seeks=%d, reads=%d, writes=%d, bytes_read=%d, bytes_written=%d)' % (self.seeks,
+                                                                                               self.reads,
+                                                                                               self.writes,
+                                                                                               self.bytes_read,
+                                                                                               self.bytes_written)
+
+
+class AccountingFile:
+    """
+    A class that wraps a file object and counts the I/O done through it.  All
+    attributes other than read, readinto, write, seek, and tell are passed
+    straight through to the wrapped file object.
+    """
+    __slots__ = ('_fp', '_counters', '_pos')
+
+    def __init__(self, fp, counters):
+        # type: (BinaryIO, IOCounters) -> None
+        self._fp = fp
+        self._counters = counters
+        self._pos = fp.tell()
+
+    @property
+    def wrapped(self):
+        # type: () -> BinaryIO
+        """The file object being wrapped."""
+        return self._fp
+
+    def read(self, size=-1):
+        # type: (int) -> bytes
+        """
+        Read data from the wrapped file object.
+
+        Parameters:
+         size - The number of bytes to read, or -1 to read until the end.
+        Returns:
+         The data that was read.
+        """
+        data = self._fp.read(size)
+        length = len(data)
+        counters = self._counters
+        counters.reads += 1
+        counters.bytes_read += length
+        bucket = _bucket(length)
+        counters.read_sizes[bucket] = counters.read_sizes.get(bucket, 0) + 1
+        self._pos += length
+        return data
+
+    def readinto(self, buf):
+        # type: (Any) -> int
+        """
+        Read data from the wrapped file object into a buffer.
+
+        Parameters:
+         buf - The buffer to read into.
+        Returns:
+         The number of bytes read.
+        """
+        length = self._fp.readinto(buf)  # type: ignore
+        if length is None:
+            length = 0
+        counters = self._counters
+        counters.reads += 1
+        counters.bytes_read += length
+        bucket = _bucket(length)
+        counters.read_sizes[bucket] = counters.read_sizes.get(bucket, 0) + 1
+        self._pos += length
+        return length
+
+    def write(self, data):
+        # type: (bytes) -> int
+        """
+        Write data to the wrapped file object.
+
+        Parameters:
+         data - The data to write.
+        Returns:
+         The number of bytes written.
+        """
+        ret = self._fp.write(data)
+        length = len(data)
+        counters = self._counters
+        counters.writes += 1
+        counters.bytes_written += length
+        bucket = _bucket(length)
+        counters.write_sizes[bucket] = counters.write_sizes.get(bucket, 0) + 1
+        self._pos += length
+        return ret
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> int
+        """
+        Seek the wrapped file object.
+
+        Parameters:
+         offset - The offset to seek to.
+         whence - Where the offset is relative to.
+        Returns:
+         The new position in the file.
+        """
+        newpos = self._fp.seek(offset, whence)
+        if newpos is None:
+            newpos = self._fp.tell()
+        counters = self._counters
+        counters.seeks += 1
+        bucket = _bucket(abs(newpos - self._pos))
+        counters.seek_distances[bucket] = counters.seek_distances.get(bucket, 0) + 1
+        self._pos = newpos
+        return newpos
+
+    def tell(self):
+        # type: () -> int
+        """
+        Get the current position in the wrapped file object.
+
+        Parameters:
+         None.
+        Returns:
+         The current position.
+        """
+        return self._fp.tell()
+
+    def __getattr__(self, name):
+        # type: (str) -> Any
+        return getattr(self._fp, name)
+
+
+class _IOOperation:
+    """
+    A class to account for the I/O done during a single run of an operation.
+    This is used as a context manager.
+    """
+    __slots__ = ('_stats', 'name', '_start')
+
+    def __init__(self, stats, name):
+        # type: (IOStats, str) -> None
+        self._stats = stats
+        self.name = name
+        self._start = IOCounters()
+
+    def __enter__(self):
+        # type: () -> _IOOperation
+        self._start = self._stats.total()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # type: (Optional[type], Optional[BaseException], object) -> None
+        delta = self._stats.total()
+        delta.add(self._start, -1)
+
+        opstats = self._stats.operations.get(self.name)
+        if opstats is None:
+            opstats = IOCounters()
+            self._stats.operations[self.name] = opstats
+        opstats.add(delta)
+
+        if self._stats.log_operations:
+            _logger.info('I/O for %s: %d seeks, %d reads (%d bytes), %d writes (%d bytes)',
+                         self.name, delta.seeks, delta.reads, delta.bytes_read,
+                         delta.writes, delta.bytes_written)
+
+
+class IOStats:
+    """
+    A class to collect I/O statistics for a PyCdlib object.  Pass an instance
+    to the PyCdlib constructor to enable collection.  The I/O done on the ISO
+    being read is counted in the input counters, and the I/O done on the
+    file object passed to write_fp() is counted in the output counters.  The
+    I/O done during each open, lookup, extract, and write is also broken out
+    per operation, and can optionally be logged to the 'pycdlib' logger.
+    """
+    __slots__ = ('input', 'output', 'operations', 'log_operations')
+
+    def __init__(self, log_operations=False):
+        # type: (bool) -> None
+        """
+        Create a new I/O statistics object.
+
+        Parameters:
+         log_operations - Whether to log the I/O done by each operation at the
+                          INFO level.
+        Returns:
+         Nothing.
+        """
+        self.input = IOCounters()
+        self.output = IOCounters()
+        self.operations = {}  # type: Dict[str, IOCounters]
+        self.log_operations = log_operations
+
+    def wrap_input(self, fp):
+        # type: (BinaryIO) -> AccountingFile
+        """
+        Wrap a file object so that the I/O done on it is counted as input.
+
+        Parameters:
+         fp - The file object to wrap.
+        Returns:
+         The wrapped file object.
+        """
+        return AccountingFile(fp, self.input)
+
+    def wrap_output(self, fp):
+        # type: (BinaryIO) -> AccountingFile
+        """
+        Wrap a file object so that the I/O done on it is counted as output.
+
+        Parameters:
+         fp - The file object to wrap.
+        Returns:
+         The wrapped file object.
+        """
+        return AccountingFile(fp, self.output)
+
+    def operation(self, name):
+        # type: (str) -> _IOOperation
+        """
+        Create a context manager that accounts for the I/O done during a run
+        of the named operation.
+
+        Parameters:
+         name - The name of the operation.
+        Returns:
+         A context manager for the operation.
+        """
+        return _IOOperation(self, name)
+
+    def total(self):
+        # type: () -> IOCounters
+        """
+        Get the sum of the input and output counters.
+
+        Parameters:
+         None.
+        Returns:
+         A new IOCounters object with the sum.
+        """
+        ret = self.input.copy()
+        ret.add(self.output)
+        return ret
+
+    def reset(self):
+        # type: () -> None
+        """
+        Throw away all of the statistics collected so far.  Note that this
+        resets the counters in place, so file objects that are already
+        wrapped keep counting into them.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        for counters in (self.input, self.output):
+            counters.add(counters.copy(), -1)
+        self.operations = {}
+
+    def as_dict(self):
+        # type: () -> Dict[str, Any]
+        """
+        Get the statistics collected so far as plain dictionaries, suitable
+        for serializing.
+
+        Parameters:
+         None.
+        Returns:
+         A dictionary with the input, output, and per-operation counters.
+        """
+        return {
+            'input': self.input.as_dict(),
+            'output': self.output.as_dict(),
+            'operations': {name: counters.as_dict() for name, counters in self.operations.items()},
+        }
@@ -0,0 +1,495 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""
+Support for comparing the metadata of two ISOs.
+"""
+
+import collections
+import hashlib
+
+from pycdlib import dr
+from pycdlib import pycdlibexception
+from pycdlib import tarstream
+from pycdlib import udf as udfmod
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Any, Deque, Dict, List, Optional, Tuple, Union  # NOQA pylint: disable=unused-import
+    # NOTE: these imports have to be here to avoid circular deps
+    from pycdlib import pycdlib  # NOQA pylint: disable=unused-import
+
+_PATH_TYPES = ('iso_path', 'rr_path', 'joliet_path', 'udf_path')
+
+
+class Change:
+    """
+    A class that represents one difference between two ISOs.  The kind is one
+    of ADDED, REMOVED, or MODIFIED.  The namespace is the path type the
+    change was found in ('iso_path', 'rr_path', 'joliet_path', 'udf_path',
+    or 'eltorito' for the El Torito boot catalog), and the path is the path
+    in that namespace (or the name of the boot catalog entry).  The fields are
+    a dictionary mapping the name of each field that differs to a tuple of
+    the old and new values; for added and removed entries, it holds all of
+    the fields of the entry, with None on the side where it does not exist.
+    """
+    __slots__ = ('kind', 'namespace', 'path', 'fields')
+
+    ADDED = 'added'
+    REMOVED = 'removed'
+    MODIFIED = 'modified'
+
+    def __init__(self, kind, namespace, path, fields):
+        # type: (str, str, str, Dict[str, Tuple[Any, Any]]) -> None
+        self.kind = kind
+        self.namespace = namespace
+        self.path = path
+        self.fields = fields
+
+    def __repr__(self):
+        # type: () -> str
+        return 'Change(%s %s:%s %r)' % (self.kind, self.namespace, self.path,
+                                        self.fields)
+
+
+def _has_path_type(iso, path_type):
+    # type: (pycdlib.PyCdlib, str) -> bool
+    """
+    An internal function to determine whether an ISO has a namespace.
+
+    Parameters:
+     iso - The PyCdlib object to check.
+     path_type - The path type to check for.
+    Returns:
+     True if the ISO has the namespace, False otherwise.
+    """
+    if path_type == 'rr_path':
+        return iso.has_rock_ridge()
+    if path_type == 'joliet_path':
+        return iso.has_joliet()
+    if path_type == 'udf_path':
+        return iso.has_udf()
+    return True
+
+
+def _root(iso, path_type):
+    # type: (pycdlib.PyCdlib, str) -> Union[dr.DirectoryRecord, udfmod.UDFFileEntry]
+    """
+    An internal function to get the root record of a namespace.
+
+    Parameters:
+     iso - The PyCdlib object.
+     path_type - The path type to get the root of.
+    Returns:
+     The root Directory Record or UDF File Entry.
+    """
+    if path_type == 'udf_path':
+        return iso.udf_root  # type: ignore
+    if path_type == 'joliet_path':
+        return iso.joliet_vd.root_directory_record()  # type: ignore
+    return iso.pvd.root_directory_record()
+
+
+def _children(rec, path_type):
+    # type: (Union[dr.DirectoryRecord, udfmod.UDFFileEntry], str) -> List[Union[dr.DirectoryRecord, udfmod.UDFFileEntry]]
+    """
+    An internal function to get the children of a directory straight from the
+    parsed tree.  Rock Ridge relocated directories are shown in their original
+    places, and the extra records of multi-extent files are dropped.
+
+    Parameters:
+     rec - The directory record to get the children of.
+     path_type - The path type being walked.
+    Returns:
+     The list of children.
+    """
+    if isinstance(rec, udfmod.UDFFileEntry):
+        return [fi_desc.file_entry for fi_desc in rec.fi_descs
+                if fi_desc.file_entry is not None and not fi_desc.isparent]
+
+    children = []  # type: List[Union[dr.DirectoryRecord, udfmod.UDFFileEntry]]
+    last = b''
+    for child in rec.children:
+        if child is None or child.is_dot() or child.is_dotdot():
+            continue
+        fi = child.file_identifier()
+        if fi == last:
+            continue
+        last = fi
+
+        if path_type == 'rr_path' and child.rock_ridge is not None:
+            if child.rock_ridge.relocated_record():
+                continue
+            if child.rock_ridge.child_link_record_exists() and \
+               child.rock_ridge.cl_to_moved_dr is not None:
+                child = child.rock_ridge.cl_to_moved_dr
+        children.append(child)
+
+    return children
+
+
+def _zisofs_record(rec, path_type):
+    # type: (Union[dr.DirectoryRecord, udfmod.UDFFileEntry], str) -> Any
+    """
+    An internal function to get the zisofs record of a file, if its data is
+    seen decompressed in this namespace.
+
+    Parameters:
+     rec - The file record.
+     path_type - The path type being walked.
+    Returns:
+     The Rock Ridge ZF record, or None.
+    """
+    if isinstance(rec, dr.DirectoryRecord) and path_type in ('rr_path', 'iso_path') and rec.rock_ridge is not None:
+        return rec.rock_ridge.zisofs_record()
+    return None
+
+
+def _file_size(rec, path_type):
+    # type: (Union[dr.DirectoryRecord, udfmod.UDFFileEntry], str) -> int
+    """
+    An internal function to get the size of a file, including all of the
+    extents of a multi-extent file.
+
+    Parameters:
+     rec - The file record.
+     path_type - The path type being walked.
+    Returns:
+     The size of the file.
+    """
+    zf = _zisofs_record(rec, path_type)
+    if zf is not None:
+        return zf.uncompressed_size
+    if isinstance(rec, udfmod.UDFFileEntry):
+        return rec.get_data_length()
+
+    length = 0
+    cur = rec  # type: Optional[dr.DirectoryRecord]
+    while cur is not None:
+        length += cur.get_data_length()
+        cur = cur.data_continuation
+    return length
+
+
+def _metadata(iso, rec, path_type, mtimes):
+    # type: (pycdlib.PyCdlib, Union[dr.DirectoryRecord, udfmod.UDFFileEntry], str, Dict[bytes, int]) -> Dict[str, Any]
+    """
+    An internal function to collect the metadata of a record that is compared.
+
+    Parameters:
+     iso - The PyCdlib object the record is on.
+     rec - The record.
+     path_type - The path type being walked.
+     mtimes - A cache of Directory Record dates already converted to seconds
+              since the epoch; most records on an ISO share a handful of
+              dates.
+    Returns:
+     A dictionary of the metadata.
+    """
+    meta = {}  # type: Dict[str, Any]
+    if rec.is_symlink():
+        meta['type'] = 'symlink'
+        meta['target'] = tarstream.symlink_target(iso, rec)
+    elif rec.is_dir():
+        meta['type'] = 'dir'
+    else:
+        meta['type'] = 'file'
+        meta['size'] = _file_size(rec, path_type)
+
+    if isinstance(rec, udfmod.UDFFileEntry):
+        meta['mode'] = tarstream.udf_mode(rec.perms)
+        meta['uid'] = rec.uid
+        meta['gid'] = rec.gid
+        meta['mtime'] = tarstream.udf_mtime(rec)
+        return meta
+
+    raw_date = rec.date.record()
+    mtime = mtimes.get(raw_date)
+    if mtime is None:
+        mtime = tarstream.dr_mtime(rec)
+        mtimes[raw_date] = mtime
+    meta['mtime'] = mtime
+    if path_type == 'rr_path' and rec.rock_ridge is not None:
+        px = rec.rock_ridge.dr_entries.px_record
+        if px is None:
+            px = rec.rock_ridge.ce_entries.px_record
+        if px is not None:
+            meta['mode'] = px.posix_file_mode & 0o7777
+            meta['uid'] = px.posix_user_id
+            meta['gid'] = px.posix_group_id
+    return meta
+
+
+def _walk(iso, path_type):
+    # type: (pycdlib.PyCdlib, str) -> Dict[str, Tuple[Dict[str, Any], Any]]
+    """
+    An internal function to walk a namespace of an ISO.
+
+    Parameters:
+     iso - The PyCdlib object to walk.
+     path_type - The path type to walk.
+    Returns:
+     A dictionary mapping each path to a tuple of its metadata and its
+     record.
+    """
+    entries = {}  # type: Dict[str, Tuple[Dict[str, Any], Any]]
+    mtimes = {}  # type: Dict[bytes, int]
+    dirs = collections.deque([(_root(iso, path_type), '')])  # type: Deque[Tuple[Any, str]]
+    while dirs:
+        (rec, path) = dirs.popleft()
+        for child in _children(rec, path_type):
+            child_path = path + '/' + tarstream.child_name(child, path_type)
+            meta = _metadata(iso, child, path_type, mtimes)
+            entries[child_path] = (meta, child)
+            if meta['type'] == 'dir':
+                dirs.append((child, child_path))
+    return entries
+
+
+class _Hasher:
+    """
+    An internal class to compute the hashes of file data on one ISO.  Files
+    are queued up first, and then all hashed in the order of their data on
+    the ISO, so the ISO is read in a single forward pass.  Data shared by
+    several names (hard links, or the same file in several namespaces) is
+    only hashed once.
+    """
+    __slots__ = ('_iso', '_blocksize', '_catalog_records', '_queue',
+                 '_digests')
+
+    def __init__(self, iso, blocksize):
+        # type: (pycdlib.PyCdlib, int) -> None
+        self._iso = iso
+        self._blocksize = blocksize
+        self._catalog_records = []  # type: List[Any]
+        if iso.eltorito_boot_catalog is not None:
+            self._catalog_records = iso.eltorito_boot_catalog.dirrecords
+        self._queue = {}  # type: Dict[Tuple[int, bool], Tuple[Any, str]]
+        self._digests = {}  # type: Dict[Tuple[int, bool], bytes]
+
+    def _key(self, rec, path_type):
+        # type: (Any, str) -> Tuple[int, bool]
+        """
+        Internal method to get the key identifying the data of a file.
+
+        Parameters:
+         rec - The file record.
+         path_type - The path type the record was found in.
+        Returns:
+         The key.
+        """
+        ino = rec.inode if rec.inode is not None else rec
+        return (id(ino), _zisofs_record(rec, path_type) is not None)
+
+    def add(self, rec, path_type):
+        # type: (Any, str) -> None
+        """
+        Queue up a file to be hashed.
+
+        Parameters:
+         rec - The file record.
+         path_type - The path type the record was found in.
+        Returns:
+         Nothing.
+        """
+        self._queue.setdefault(self._key(rec, path_type), (rec, path_type))
+
+    def run(self):
+        # type: () -> None
+        """
+        Hash all of the queued files.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        keys = list(self._queue.keys())
+        order = sorted(range(len(keys)),
+                       key=lambda i: tarstream.extent_key(self._queue[keys[i]][0], i))
+        for i in order:
+            (rec, path_type) = self._queue[keys[i]]
+            (sources, length) = tarstream.file_sources(self._iso, rec, path_type,
+                                                       self._catalog_records)
+            reader = tarstream.RecordReader(sources, length)
+            sha = hashlib.sha256()
+            while length > 0:
+                data = reader.read(min(self._blocksize, length))
+                sha.update(data)
+                length -= len(data)
+            self._digests[keys[i]] = sha.digest()
+        self._queue = {}
+
+    def digest(self, rec, path_type):
+        # type: (Any, str) -> bytes
+        """
+        Get the hash of a file that was queued up and hashed.
+
+        Parameters:
+         rec - The file record.
+         path_type - The path type the record was found in.
+        Returns:
+         The SHA-256 digest of the data of the file.
+        """
+        return self._digests[self._key(rec, path_type)]
+
+
+def _eltorito_entries(iso):
+    # type: (pycdlib.PyCdlib) -> Dict[str, Dict[str, Any]]
+    """
+    An internal function to collect the El Torito boot catalog entries of an
+    ISO.
+
+    Parameters:
+     iso - The PyCdlib object.
+    Returns:
+     A dictionary mapping the name of each boot catalog entry to its fields.
+    """
+    entries = {}  # type: Dict[str, Dict[str, Any]]
+    catalog = iso.eltorito_boot_catalog
+    if catalog is None:
+        return entries
+
+    def _entry_fields(entry):
+        # type: (Any) -> Dict[str, Any]
+        fields = {
+            'boot_indicator': entry.boot_indicator,
+            'boot_media_type': entry.boot_media_type,
+            'load_segment': entry.load_segment,
+            'system_type': entry.system_type,
+            'sector_count': entry.sector_count,
+            'boot_size': entry.inode.get_data_length() if entry.inode is not None else 0,
+            'boot_info_table': entry.inode is not None and entry.inode.boot_info_table is not None,
+        }  # type: Dict[str, Any]
+        return fields
+
+    entries['validation'] = {'platform_id': catalog.validation_entry.platform_id}
+    entries['initial'] = _entry_fields(catalog.initial_entry)
+    for (sec_num, sec) in enumerate(catalog.sections):
+        for (entry_num, entry) in enumerate(sec.section_entries):
+            fields = _entry_fields(entry)
+            fields['platform_id'] = sec.platform_id
+            fields['selection_criteria_type'] = entry.selection_criteria_type
+            fields['selection_criteria'] = entry.selection_criteria
+            entries['section%d/entry%d' % (sec_num, entry_num)] = fields
+    return entries
+
+
+def _diff_dicts(namespace, old, new):
+    # type: (str, Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]) -> List[Change]
+    """
+    An internal function to compare two dictionaries of named metadata.
+
+    Parameters:
+     namespace - The namespace being compared.
+     old - The metadata from the old ISO.
+     new - The metadata from the new ISO.
+    Returns:
+     The list of changes, sorted by path.
+    """
+    changes = []
+    for path in sorted(set(old) | set(new)):
+        if path not in new:
+            changes.append(Change(Change.REMOVED, namespace, path,
+                                  {k: (v, None) for k, v in old[path].items()}))
+        elif path not in old:
+            changes.append(Change(Change.ADDED, namespace, path,
+                                  {k: (None, v) for k, v in new[path].items()}))
+        else:
+            fields = {}
+            old_meta = old[path]
+            new_meta = new[path]
+            for key in sorted(set(old_meta) | set(new_meta)):
+                if old_meta.get(key) != new_meta.get(key):
+                    fields[key] = (old_meta.get(key), new_meta.get(key))
+            if fields:
+                changes.append(Change(Change.MODIFIED, namespace, path, fields))
+    return changes
+
+
+def diff_isos(old_iso, new_iso, path_types=None, check_data=False,
+              blocksize=1024 * 1024):
+    # type: (pycdlib.PyCdlib, pycdlib.PyCdlib, Optional[List[str]], bool, int) -> List[Change]
+    """
+    Compare the metadata of two ISOs.  Each namespace is walked straight from
+    the already parsed directory tree, and the entries are compared by path:
+    type, size, mode, owner, modification time, and symlink target (only the
+    fields a namespace can represent are compared).  The El Torito boot
+    catalog entries are compared too.  File data is not read unless
+    check_data is True, in which case the files that exist in both ISOs with
+    the same size are hashed (in the order of their data on each ISO) and
+    compared as the 'sha256' field.
+
+    Parameters:
+     old_iso - The PyCdlib object for the old ISO.
+     new_iso - The PyCdlib object for the new ISO.
+     path_types - The list of namespaces to compare; any of 'iso_path',
+                  'rr_path', 'joliet_path', and 'udf_path'.  If None (the
+                  default), all namespaces present on either ISO are
+                  compared.
+     check_data - Whether to compare the data of same-sized files.
+     blocksize - The size of reads from the ISOs when hashing data.
+    Returns:
+     A list of Change objects, grouped by namespace and sorted by path.
+    """
+    if path_types is None:
+        path_types = [p for p in _PATH_TYPES
+                      if _has_path_type(old_iso, p) or _has_path_type(new_iso, p)]
+    for path_type in path_types:
+        if path_type not in _PATH_TYPES:
+            raise pycdlibexception.PyCdlibInvalidInput("The path type must be one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path'")
+
+    walks = []
+    for path_type in path_types:
+        old = {}  # type: Dict[str, Tuple[Dict[str, Any], Any]]
+        if _has_path_type(old_iso, path_type):
+            old = _walk(old_iso, path_type)
+        new = {}  # type: Dict[str, Tuple[Dict[str, Any], Any]]
+        if _has_path_type(new_iso, path_type):
+            new = _walk(new_iso, path_type)
+        walks.append((path_type, old, new))
+
+    if check_data:
+        old_hasher = _Hasher(old_iso, blocksize)
+        new_hasher = _Hasher(new_iso, blocksize)
+        same_size = []
+        for (path_type, old, new) in walks:
+            for (path, (old_meta, old_rec)) in old.items():
+                if path not in new or old_meta['type'] != 'file':
+                    continue
+                (new_meta, new_rec) = new[path]
+                if new_meta['type'] == 'file' and new_meta['size'] == old_meta['size']:
+                    old_hasher.add(old_rec, path_type)
+                    new_hasher.add(new_rec, path_type)
+                    same_size.append((path_type, path))
+        old_hasher.run()
+        new_hasher.run()
+        for (path_type, path) in same_size:
+            old = walks[path_types.index(path_type)][1]
+            new = walks[path_types.index(path_type)][2]
+            old[path][0]['sha256'] = old_hasher.digest(old[path][1], path_type).hex()
+            new[path][0]['sha256'] = new_hasher.digest(new[path][1], path_type).hex()
+
+    changes = []
+    for (path_type, old, new) in walks:
+        changes.extend(_diff_dicts(path_type,
+                                   {k: v[0] for k, v in old.items()},
+                                   {k: v[0] for k, v in new.items()}))
+
+    changes.extend(_diff_dicts('eltorito', _eltorito_entries(old_iso),
+                               _eltorito_entries(new_iso)))
+
+    return changes
@@ -20,6 +20,11 @@ import random
 import struct
 import uuid
 
+try:
+    import zlib
+except ImportError:
+    zlib = None  # type: ignore
+
 from pycdlib import pycdlibexception
 
 # For mypy annotations
@@ -95,10 +100,12 @@ crc32_table = (0, 0x77073096, 0xEE0E612C, 0x990951BA,
                0xB40BBE37, 0xC30C8EA1, 0x5A05DF1B, 0x2D02EF8D)
 
 
-def crc32(data):
+def _crc32_table_lookup(data):
     # type: (bytes) -> int
     """
-    Calculate the CRC32 over a range of bytes.
+    Calculate the CRC32 over a range of bytes, one byte at a time using the
+    table above.  This is the reference implementation, used when the zlib
+    module is not available.
 
     Parameters:
      data - The array of bytes to calculate the CRC32 over.
@@ -112,6 +119,22 @@ def crc32(data):
     return crc ^ 0xffffffff
 
 
+def crc32(data):
+    # type: (bytes) -> int
+    """
+    Calculate the CRC32 over a range of bytes.
+
+    Parameters:
+     data - The array of bytes to calculate the CRC32 over.
+    Returns:
+     The CRC32 of the data.
+    """
+    if zlib is None:
+        return _crc32_table_lookup(data)
+
+    return zlib.crc32(data) & 0xffffffff
+
+
 class APMPartHeader:
     """A class that represents an APM (Apple Partition Map) Partition Header."""
     __slots__ = ('_initialized', 'map_count', 'start_block', 'block_count',
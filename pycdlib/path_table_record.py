@@ -23,18 +23,21 @@ from pycdlib import utils
 
 # For mypy annotations
 if False:  # pylint: disable=using-constant-test
-    from typing import Type  # NOQA pylint: disable=unused-import
+    from typing import Dict, List, Optional, Tuple, Type  # NOQA pylint: disable=unused-import
 
 
 class PathTableRecord:
     """A class that represents a single ISO9660 Path Table Record."""
     __slots__ = ('_initialized', 'len_di', 'xattr_length', 'extent_location',
-                 'parent_directory_num', 'directory_identifier', 'dirrecord')
+                 'parent_directory_num', 'directory_identifier', 'dirrecord',
+                 '_le_record_cache', '_be_record_cache')
 
     FMT = '<BBLH'
 
     def __init__(self):
         # type: () -> None
+        self._le_record_cache = None  # type: Optional[bytes]
+        self._be_record_cache = None  # type: Optional[bytes]
         self._initialized = False
 
     def parse(self, data):
@@ -89,7 +92,10 @@ class PathTableRecord:
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('Path Table Record not initialized')
 
-        return self._record(self.extent_location, self.parent_directory_num)
+        if self._le_record_cache is None:
+            self._le_record_cache = self._record(self.extent_location,
+                                                 self.parent_directory_num)
+        return self._le_record_cache
 
     def record_big_endian(self):
         # type: () -> bytes
@@ -105,8 +111,10 @@ class PathTableRecord:
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('Path Table Record not initialized')
 
-        return self._record(utils.swab_32bit(self.extent_location),
-                            utils.swab_16bit(self.parent_directory_num))
+        if self._be_record_cache is None:
+            self._be_record_cache = self._record(utils.swab_32bit(self.extent_location),
+                                                 utils.swab_16bit(self.parent_directory_num))
+        return self._be_record_cache
 
     @classmethod
     def record_length(cls, len_di):
@@ -135,6 +143,7 @@ class PathTableRecord:
         """
         self.len_di = len(name)
         self.xattr_length = 0  # FIXME: we don't support xattr for now
+        self.extent_location = 0  # This will get set during reshuffle_extents
         self.parent_directory_num = parent_dir_num
         self.directory_identifier = name
         self._initialized = True
@@ -183,7 +192,10 @@ class PathTableRecord:
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('Path Table Record not initialized')
 
-        self.extent_location = extent_loc
+        if extent_loc != self.extent_location:
+            self.extent_location = extent_loc
+            self._le_record_cache = None
+            self._be_record_cache = None
 
     def update_parent_directory_number(self, parent_dir_num):
         # type: (int) -> None
@@ -197,7 +209,11 @@ class PathTableRecord:
         """
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('Path Table Record not initialized')
-        self.parent_directory_num = parent_dir_num
+
+        if parent_dir_num != self.parent_directory_num:
+            self.parent_directory_num = parent_dir_num
+            self._le_record_cache = None
+            self._be_record_cache = None
 
     def equal_to_be(self, be_record):
         # type: (PathTableRecord) -> bool
@@ -222,3 +238,88 @@ class PathTableRecord:
            be_record.directory_identifier != self.directory_identifier:
             return False
         return True
+
+
+class PathTableIndex:
+    """
+    A class to look up directories in a parsed path table.  Directories are
+    indexed both by their (parent directory number, name) pair and by their
+    extent, so any directory can be found without reading the directory
+    extents of its ancestors.  Directory numbers are the 1-based position of
+    the record in the path table, as in Ecma-119 section 9.4.
+    """
+    __slots__ = ('ptrs', '_by_name', '_by_extent')
+
+    def __init__(self, ptrs):
+        # type: (List[PathTableRecord]) -> None
+        self.ptrs = ptrs
+        self._by_name = {}  # type: Dict[Tuple[int, bytes], int]
+        self._by_extent = {}  # type: Dict[int, int]
+        for index, ptr in enumerate(ptrs):
+            num = index + 1
+            # The root is its own parent, so it is kept out of the name index.
+            if index != 0:
+                self._by_name[(ptr.parent_directory_num, ptr.directory_identifier)] = num
+            self._by_extent.setdefault(ptr.extent_location, num)
+
+    def record(self, num):
+        # type: (int) -> PathTableRecord
+        """
+        Get the Path Table Record for a directory number.
+
+        Parameters:
+         num - The directory number.
+        Returns:
+         The Path Table Record.
+        """
+        if num < 1 or num > len(self.ptrs):
+            raise pycdlibexception.PyCdlibInvalidISO('Invalid directory number %d' % (num))
+        return self.ptrs[num - 1]
+
+    def child(self, parent_num, name):
+        # type: (int, bytes) -> Optional[int]
+        """
+        Find a subdirectory by name.
+
+        Parameters:
+         parent_num - The directory number of the parent directory.
+         name - The name of the subdirectory.
+        Returns:
+         The directory number of the subdirectory, or None if it is not in the
+         path table.
+        """
+        return self._by_name.get((parent_num, name))
+
+    def num_for_extent(self, extent):
+        # type: (int) -> Optional[int]
+        """
+        Find the directory number of the directory at an extent.
+
+        Parameters:
+         extent - The extent of the directory.
+        Returns:
+         The directory number, or None if no directory starts at the extent.
+        """
+        return self._by_extent.get(extent)
+
+    def resolve(self, names, parent_num=1):
+        # type: (List[bytes], int) -> Tuple[int, int]
+        """
+        Follow as many leading path components as possible through the path
+        table.
+
+        Parameters:
+         names - The path components, in the encoding of the path table.
+         parent_num - The directory number to start from (the root by default).
+        Returns:
+         A tuple of the directory number that was reached and the number of
+         components that were followed to get there.
+        """
+        num = parent_num
+        for index, name in enumerate(names):
+            child_num = self._by_name.get((num, name))
+            if child_num is None:
+                return num, index
+            num = child_num
+
+        return num, len(names)
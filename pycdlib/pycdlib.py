@@ -23,9 +23,13 @@ import inspect
 import io
 import os
 import struct
+import stat
 import sys
+import tarfile
+import tempfile
 import time
 
+from pycdlib import ciso
 from pycdlib import dr
 from pycdlib import eltorito
 from pycdlib import facade
@@ -35,12 +39,16 @@ from pycdlib import isohybrid
 from pycdlib import path_table_record
 from pycdlib import pycdlibexception
 from pycdlib import pycdlibio
+from pycdlib import stats as statsmod
 from pycdlib import udf as udfmod
 from pycdlib import utils
+from pycdlib import zisofs as zisofsmod
 
 # For mypy annotations
 if False:  # pylint: disable=using-constant-test
     from typing import Any, BinaryIO, Callable, Deque, Dict, Generator, IO, List, Optional, Tuple, Union  # NOQA pylint: disable=unused-import
+    from pycdlib import blockcache  # NOQA pylint: disable=unused-import
+    from pycdlib import iostats  # NOQA pylint: disable=unused-import
 
 # There are a number of specific ways that numerical data is stored in the
 # ISO9660/Ecma-119 standard.  In the text these are reference by the section
@@ -368,7 +376,7 @@ def _reassign_vd_dirrecord_extents(vd, current_extent):
                 if dir_record_rock_ridge.ce_block.extent_location() < 0:
                     dir_record_rock_ridge.ce_block.set_extent_location(current_extent)
                     current_extent += 1
-                dir_record_rock_ridge.dr_entries.ce_record.update_extent(dir_record_rock_ridge.ce_block.extent_location())
+                dir_record_rock_ridge.update_ce_extent(dir_record_rock_ridge.ce_block.extent_location())
             if dir_record_rock_ridge.cl_to_moved_dr is not None:
                 child_link_recs.append(dir_record)
 
@@ -402,6 +410,273 @@ def _check_path_depth(iso_path):
         raise pycdlibexception.PyCdlibInvalidInput('Directory levels too deep (maximum is 7)')
 
 
+class _ISO9660NameAllocator:
+    """
+    An internal class to pick unique ISO9660 names for entries that are being
+    added with arbitrary (Unix-style) names.  Names are mangled to conform to
+    the interchange level, and a name that is already in use in a directory is
+    shortened to a prefix plus a 3-digit number, the same way that
+    genisoimage does it (with more digits if those run out).  The names
+    already on the ISO are loaded the first time that a directory is used.
+    """
+    __slots__ = ('_iso', '_interchange_level', '_used', '_existing_dirs',
+                 '_next')
+
+    def __init__(self, iso, interchange_level):
+        # type: (PyCdlib, int) -> None
+        self._iso = iso
+        self._interchange_level = interchange_level
+        self._used = {}  # type: Dict[str, Dict[str, bool]]
+        self._existing_dirs = {}  # type: Dict[str, Dict[str, bool]]
+        self._next = {}  # type: Dict[Tuple[str, str, int, str], int]
+
+    def _names_in(self, parent):
+        # type: (str) -> Dict[str, bool]
+        """
+        An internal method to get the names in use in a directory.
+
+        Parameters:
+         parent - The ISO9660 path of the directory.
+        Returns:
+         A dictionary with the names in use as keys.
+        """
+        if parent not in self._used:
+            used = {}  # type: Dict[str, bool]
+            existing = {}  # type: Dict[str, bool]
+            for child in self._iso.list_children(iso_path=parent):
+                if child is None or child.is_dot() or child.is_dotdot():
+                    continue
+                name = child.file_identifier().decode('utf-8')
+                used[name] = True
+                if child.is_dir():
+                    existing[name] = True
+            self._used[parent] = used
+            self._existing_dirs[parent] = existing
+        return self._used[parent]
+
+    def _uniquify(self, parent, name, basename, ext, is_dir):
+        # type: (str, str, str, str, bool) -> str
+        """
+        An internal method to pick a replacement for a mangled name that is
+        already in use in a directory.  Like genisoimage, this first tries the
+        first 5 characters of the name followed by a 3-digit number; once those
+        run out, characters of the prefix are traded for more digits, so that
+        the name still fits in 8 characters.
+
+        Parameters:
+         parent - The ISO9660 path of the directory the entry goes in.
+         name - The Unix-style name of the entry.
+         basename - The mangled name of the entry, without the extension.
+         ext - The mangled extension of the entry.
+         is_dir - Whether the entry is a directory.
+        Returns:
+         The unique mangled name.
+        """
+        used = self._used[parent]
+        for numdigits in range(3, 9):
+            prefix = basename[:8 - numdigits]
+            # Names are never freed, so the numbers that were found to be in
+            # use don't need to be tried again.
+            key = (parent, prefix, numdigits, ext)
+            currnum = self._next.get(key, 0)
+            while currnum < 10 ** numdigits:
+                if is_dir or ext == '':
+                    tmp = '%s%0*d' % (prefix, numdigits, currnum)
+                else:
+                    tmp = '%s%0*d.%s' % (prefix, numdigits, currnum, ext)
+                currnum += 1
+                if tmp not in used:
+                    self._next[key] = currnum
+                    return tmp
+            self._next[key] = currnum
+
+        raise pycdlibexception.PyCdlibInvalidInput('Could not find a unique ISO9660 name for %s' % (name))
+
+    def allocate(self, parent, name, is_dir):
+        # type: (str, str, bool) -> Tuple[str, bool]
+        """
+        Pick a unique ISO9660 name for a new entry.
+
+        Parameters:
+         parent - The ISO9660 path of the directory the entry goes in.
+         name - The Unix-style name of the entry.
+         is_dir - Whether the entry is a directory.
+        Returns:
+         A tuple of the ISO9660 path for the entry and whether it is a
+         directory that was already on the ISO (which the caller should reuse
+         instead of adding).
+        """
+        used = self._names_in(parent)
+
+        ext = ''
+        if is_dir:
+            basename = utils.mangle_dir_for_iso9660(name, self._interchange_level)
+            mangled = basename
+        else:
+            (basename, ext) = utils.mangle_file_for_iso9660(name, self._interchange_level)
+            if ext == '':
+                # Only possible at interchange level 4, where a name without
+                # an extension doesn't get a separator.
+                mangled = basename
+            else:
+                mangled = '.'.join([basename, ext])
+
+        if is_dir and mangled in self._existing_dirs[parent]:
+            return (parent.rstrip('/') + '/' + mangled, True)
+
+        if mangled in used:
+            mangled = self._uniquify(parent, name, basename, ext, is_dir)
+
+        used[mangled] = True
+        return (parent.rstrip('/') + '/' + mangled, False)
+
+    def new_directory(self, path):
+        # type: (str) -> None
+        """
+        Record that an empty directory was just added to the ISO, so that the
+        names in it don't have to be loaded from the ISO.
+
+        Parameters:
+         path - The ISO9660 path of the new directory.
+        Returns:
+         Nothing.
+        """
+        self._used[path] = {}
+        self._existing_dirs[path] = {}
+
+
+def _truncate_utf8(name, maxlen):
+    # type: (str, int) -> str
+    """
+    An internal function to truncate a name so that its UTF-8 encoding is no
+    longer than the given number of bytes, without splitting a character.
+
+    Parameters:
+     name - The name to truncate.
+     maxlen - The maximum length in bytes.
+    Returns:
+     The truncated name.
+    """
+    return name.encode('utf-8')[:maxlen].decode('utf-8', 'ignore')
+
+
+class _JolietNameAllocator:
+    """
+    An internal class to pick unique Joliet names for entries that are being
+    added with arbitrary (Unix-style) names.  Names are truncated to the
+    Joliet maximum of 64 bytes, and a name that is already in use in a
+    directory gets a 3-digit (or longer) number inserted before its
+    extension.  The names already on the ISO are loaded the first time that a
+    directory is used.
+    """
+    __slots__ = ('_iso', '_used', '_existing_dirs', '_next')
+
+    def __init__(self, iso):
+        # type: (PyCdlib) -> None
+        self._iso = iso
+        self._used = {}  # type: Dict[str, Dict[str, bool]]
+        self._existing_dirs = {}  # type: Dict[str, Dict[str, bool]]
+        self._next = {}  # type: Dict[Tuple[str, str, str], int]
+
+    def _names_in(self, parent):
+        # type: (str) -> Dict[str, bool]
+        """
+        An internal method to get the names in use in a directory.
+
+        Parameters:
+         parent - The Joliet path of the directory.
+        Returns:
+         A dictionary with the names in use as keys.
+        """
+        if parent not in self._used:
+            used = {}  # type: Dict[str, bool]
+            existing = {}  # type: Dict[str, bool]
+            for child in self._iso.list_children(joliet_path=parent):
+                if child is None or child.is_dot() or child.is_dotdot():
+                    continue
+                name = child.file_identifier().decode('utf-16_be')
+                used[name] = True
+                if child.is_dir():
+                    existing[name] = True
+            self._used[parent] = used
+            self._existing_dirs[parent] = existing
+        return self._used[parent]
+
+    def allocate(self, parent, name, merge_dir):
+        # type: (str, str, bool) -> str
+        """
+        Pick a unique Joliet name for a new entry.
+
+        Parameters:
+         parent - The Joliet path of the directory the entry goes in.
+         name - The Unix-style name of the entry.
+         merge_dir - Whether the entry is a directory that was already on the
+                     ISO, in which case a directory of the same name is reused.
+        Returns:
+         The Joliet path for the entry.
+        """
+        used = self._names_in(parent)
+
+        joliet_name = _truncate_utf8(name, 64)
+        if merge_dir and joliet_name in self._existing_dirs[parent]:
+            return parent.rstrip('/') + '/' + joliet_name
+
+        if joliet_name in used:
+            (stem, dot, ext) = name.rpartition('.')
+            if not stem or len(ext) > 8:
+                stem = name
+                dot = ''
+                ext = ''
+            tail = _truncate_utf8(dot + ext, 16)
+            key = (parent, stem, tail)
+            currnum = self._next.get(key, 0)
+            while True:
+                digits = '%.03d' % (currnum)
+                currnum += 1
+                joliet_name = _truncate_utf8(stem, 64 - len(digits) - len(tail.encode('utf-8'))) + digits + tail
+                if joliet_name not in used:
+                    break
+            self._next[key] = currnum
+
+        used[joliet_name] = True
+        return parent.rstrip('/') + '/' + joliet_name
+
+    def new_directory(self, path):
+        # type: (str) -> None
+        """
+        Record that an empty directory was just added to the ISO, so that the
+        names in it don't have to be loaded from the ISO.
+
+        Parameters:
+         path - The Joliet path of the new directory.
+        Returns:
+         Nothing.
+        """
+        self._used[path] = {}
+        self._existing_dirs[path] = {}
+
+
+def _tar_member_path(name):
+    # type: (str) -> str
+    """
+    An internal function to normalize the name of a tar archive member into a
+    relative path with no leading or trailing slashes.
+
+    Parameters:
+     name - The name of the member.
+    Returns:
+     The normalized relative path ('' for the top of the archive).
+    """
+    comps = []  # type: List[str]
+    for comp in name.split('/'):
+        if comp in ('', '.'):
+            continue
+        if comp == '..':
+            raise pycdlibexception.PyCdlibInvalidInput('Tar archive member %s is outside of the archive' % (name))
+        comps.append(comp)
+    return '/'.join(comps)
+
+
 def _yield_children(rec, rr):
     # type: (dr.DirectoryRecord, bool) -> Generator
     """
@@ -542,7 +817,9 @@ class PyCdlib:
                  'udf_logical_volume_integrity', 'udf_boots',
                  'udf_logical_volume_integrity_terminator', 'udf_root',
                  'udf_file_set', 'udf_file_set_terminator',
-                 'logical_block_size')
+                 'logical_block_size', '_stats', '_io_stats', '_block_cache',
+                 '_data_alignment', '_data_alignment_min_size',
+                 '_data_alignment_pad', '_pending_children')
 
     def _initialize(self):
         # type: () -> None
@@ -596,6 +873,10 @@ class PyCdlib:
         # the block size from the PVD or the detected block size during an open.
         self.logical_block_size = 2048
         self.interchange_level = 1  # type: int
+        self._data_alignment = 0
+        self._data_alignment_min_size = 0
+        self._data_alignment_pad = 0
+        self._pending_children = None  # type: Optional[Dict[int, Tuple[dr.DirectoryRecord, List[dr.DirectoryRecord]]]]
 
     def _parse_volume_descriptors(self):
         # type: () -> None
@@ -692,6 +973,56 @@ class PyCdlib:
         if not self.vdsts:
             raise pycdlibexception.PyCdlibInvalidISO('Valid ISO9660 filesystems must have at least one Volume Descriptor Set Terminator')
 
+    def _phase(self, name):
+        # type: (str) -> Union[statsmod.Phase, statsmod._NullPhase]
+        """
+        An internal method to get a context manager that times a phase of work
+        if statistics collection is enabled.
+
+        Parameters:
+         name - The name of the phase.
+        Returns:
+         A context manager for the phase.
+        """
+        if self._stats is None:
+            return statsmod.NULL_PHASE
+        return self._stats.phase(name)
+
+    def _io_operation(self, name):
+        # type: (str) -> Union[iostats._IOOperation, statsmod._NullPhase]
+        """
+        An internal method to get a context manager that accounts for the I/O
+        done by an operation if I/O statistics collection is enabled.
+
+        Parameters:
+         name - The name of the operation.
+        Returns:
+         A context manager for the operation.
+        """
+        if self._io_stats is None:
+            return statsmod.NULL_PHASE
+        return self._io_stats.operation(name)
+
+    def _wrap_input(self, fp):
+        # type: (IO[Any]) -> IO[Any]
+        """
+        An internal method to wrap the file object of the ISO being read for
+        I/O accounting and block caching, if they are enabled.  The block
+        cache is the outer layer, so only the reads that miss it are counted.
+
+        Parameters:
+         fp - The file object to wrap.
+        Returns:
+         The wrapped file object.
+        """
+        # The wrappers are file-like objects rather than real IO subclasses.
+        wrapped = fp  # type: Any
+        if self._io_stats is not None:
+            wrapped = self._io_stats.wrap_input(wrapped)
+        if self._block_cache is not None:
+            wrapped = self._block_cache.wrap(wrapped)
+        return wrapped
+
     def _seek_to_extent(self, extent):
         # type: (int) -> None
         """
@@ -1018,6 +1349,8 @@ class PyCdlib:
         parent_links = []
         child_links = []
         lastbyte = 0
+        num_records = 0
+        num_bytes = 0
         dirs = collections.deque([root_dir_record])
         while dirs:
             dir_record = dirs.popleft()
@@ -1027,6 +1360,7 @@ class PyCdlib:
             offset = 0
             last_record = None  # type: Optional[dr.DirectoryRecord]
             data = cdfp.read(length)
+            num_bytes += len(data)
             while offset < length:
                 if offset > (len(data) - 1):
                     # The data we read off of the ISO was shorter than what we
@@ -1051,6 +1385,7 @@ class PyCdlib:
                 rr = new_record.parse(vd, data[offset:offset + lenbyte],
                                       dir_record)
                 offset += lenbyte
+                num_records += 1
 
                 self._set_rock_ridge(rr)
 
@@ -1121,6 +1456,7 @@ class PyCdlib:
                     self._seek_to_extent(ce_record.bl_cont_area)
                     cdfp.seek(ce_record.offset_cont_area, os.SEEK_CUR)
                     con_block = cdfp.read(ce_record.len_cont_area)
+                    num_bytes += len(con_block)
                     new_record.rock_ridge.parse(con_block, False,
                                                 new_record.rock_ridge.bytes_to_skip,
                                                 True, new_record.file_identifier())
@@ -1185,6 +1521,9 @@ class PyCdlib:
                 if cl.rock_ridge.cl_to_moved_dr.rock_ridge is not None:
                     cl.rock_ridge.cl_to_moved_dr.rock_ridge.moved_to_cl_dr = cl
 
+        if self._stats is not None:
+            self._stats.count(num_records, num_bytes)
+
         return interchange_level, lastbyte
 
     def _parse_path_table(self, ptr_size, extent):
@@ -1430,31 +1769,91 @@ class PyCdlib:
         return current_extent, part_start
 
     def _set_inode(self, ino, current_extent, part_start):
-        # type: (inode.Inode, int, int) -> int
+        # type: (inode.Inode, int, int) -> Tuple[int, int]
         """
         An internal function to set the location of an inode and update the
-        metadata of all records attached to it.
+        metadata of all records attached to it.  If data alignment is enabled
+        (see set_data_alignment()) and the inode is large enough, the inode is
+        moved forward to the next aligned extent.
 
         Parameters:
          ino - The inode to update.
          current_extent - The extent to set the inode to.
          part_start - The start of the partition that the inode is on.
         Returns:
-         The new extent location.
+         A tuple of the new extent location and the number of extents skipped
+         to align the inode.
         """
-        if len(self.udf_anchors) > 2 and current_extent == self.pvd.space_size - 256:
-            current_extent += 1
+        align = 1
+        if self._data_alignment > self.logical_block_size and ino.get_data_length() >= self._data_alignment_min_size:
+            align = self._data_alignment // self.logical_block_size
+
+        start = current_extent
+        skipped_anchor = 0
+        while True:
+            if len(self.udf_anchors) > 2 and current_extent == self.pvd.space_size - 256:
+                current_extent += 1
+                skipped_anchor = 1
+            if current_extent % align == 0:
+                break
+            current_extent = utils.ceiling_div(current_extent, align) * align
 
         ino.set_extent_location(current_extent)
         for rec, pvd_unused in ino.linked_records:
             rec.set_data_location(current_extent,
                                   current_extent - part_start)
 
+        pad = current_extent - start - skipped_anchor
         current_extent += utils.ceiling_div(ino.get_data_length(),
                                             self.logical_block_size)
-        return current_extent
+        return current_extent, pad
+
+    def _resize_for_alignment(self, num_extents):
+        # type: (int) -> None
+        """
+        An internal method to grow (or shrink) the ISO and the UDF partition
+        by the given number of extents of alignment padding.
+
+        Parameters:
+         num_extents - The number of extents to add (negative to remove).
+        Returns:
+         Nothing.
+        """
+        num_bytes = abs(num_extents) * self.logical_block_size
+        vds = list(self.pvds)
+        if self.joliet_vd is not None:
+            vds.append(self.joliet_vd)
+        for vd in vds:
+            if num_extents > 0:
+                vd.add_to_space_size(num_bytes)
+            else:
+                vd.remove_from_space_size(num_bytes)
+
+        if self.enhanced_vd is not None:
+            self.enhanced_vd.copy_sizes(self.pvd)
+
+        if self.udf_root is not None:
+            self.udf_main_descs.partitions[0].part_length += num_extents
+            self.udf_reserve_descs.partitions[0].part_length += num_extents
+            if self.udf_logical_volume_integrity is not None:
+                self.udf_logical_volume_integrity.size_tables[0] += num_extents
 
     def _reshuffle_extents(self):
+        # type: () -> None
+        """
+        An internal method to assign extents to everything on the ISO; see
+        _assign_extents() for the details.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        with self._phase('reshuffle_extents') as phase:
+            self._assign_extents()
+            phase.count(len(self.inodes))
+
+    def _assign_extents(self):
         # type: () -> None
         """
         An internal method that is one of the keys of PyCdlib's ability to keep
@@ -1552,7 +1951,7 @@ class PyCdlib:
         # entries but before the file contents.
         rr = self.pvd.root_directory_record().children[0].rock_ridge
         if rr is not None and rr.dr_entries.ce_record is not None:
-            rr.dr_entries.ce_record.update_extent(current_extent)
+            rr.update_ce_extent(current_extent)
             current_extent += 1
 
         if len(self.udf_anchors) > 2:
@@ -1561,6 +1960,7 @@ class PyCdlib:
                                                     self.udf_reserve_descs.pvds[0].extent_location())
 
         linked_inodes = set()
+        data_pad = 0
         if self.eltorito_boot_catalog is not None:
             self.eltorito_boot_catalog.update_catalog_extent(current_extent)
             for rec in self.eltorito_boot_catalog.dirrecords:
@@ -1639,17 +2039,24 @@ class PyCdlib:
                     elif enc.platform_id == 0:
                         self.isohybrid_mbr.update_rba(current_extent)
 
-                current_extent = self._set_inode(enc.entry.inode, current_extent,
-                                                 part_start)
+                current_extent, pad = self._set_inode(enc.entry.inode,
+                                                      current_extent, part_start)
+                data_pad += pad
                 linked_inodes.add(id(enc.entry.inode))
 
-        for ino in pvd_files + joliet_files + udf_files:
+        # File data goes in the order the directories were walked, except that
+        # files with a higher sort weight come first.  The sort is stable, so
+        # files of equal weight (by default, all of them) keep their order.
+        all_files = pvd_files + joliet_files + udf_files
+        all_files.sort(key=lambda ino: -ino.sort_weight)
+        for ino in all_files:
             if id(ino) in linked_inodes:
                 # We've already assigned an extent because it was linked to an
                 # earlier entry.
                 continue
 
-            current_extent = self._set_inode(ino, current_extent, part_start)
+            current_extent, pad = self._set_inode(ino, current_extent, part_start)
+            data_pad += pad
 
             linked_inodes.add(id(ino))
 
@@ -1657,6 +2064,17 @@ class PyCdlib:
             loc = self.pvd.root_directory_record().extent_location()
             self.enhanced_vd.root_directory_record().set_data_location(loc, loc)
 
+        if data_pad != self._data_alignment_pad:
+            # The gaps left to align file data take up space on the ISO (and
+            # in the UDF partition), so account for the change in their size.
+            self._resize_for_alignment(data_pad - self._data_alignment_pad)
+            self._data_alignment_pad = data_pad
+            if len(self.udf_anchors) > 2:
+                # The UDF anchor near the end of the ISO moved along with the
+                # space size, so lay everything out again around it.
+                self._assign_extents()
+                return
+
         if self.udf_anchors:
             self.udf_anchors[-1].set_extent_location(current_extent,
                                                      self.udf_main_descs.pvds[0].extent_location(),
@@ -1681,6 +2099,15 @@ class PyCdlib:
         if child.parent is None:
             raise pycdlibexception.PyCdlibInternalError('Trying to add child without a parent')
 
+        if self._pending_children is not None and not child.is_dir():
+            # New files are being collected so that they can be added to each
+            # directory at once; see _add_pending_children().
+            key = id(child.parent)
+            if key not in self._pending_children:
+                self._pending_children[key] = (child.parent, [])
+            self._pending_children[key][1].append(child)
+            return 0
+
         try_long_entry = False
         try:
             ret = child.parent.add_child(child, self.logical_block_size)
@@ -1704,6 +2131,31 @@ class PyCdlib:
 
         return 0
 
+    def _add_pending_children(self):
+        # type: () -> int
+        """
+        An internal method to add the files that were collected by
+        _add_child_to_dr() to their directory records, with one sort per
+        directory.
+
+        Parameters:
+         None.
+        Returns:
+         The number of bytes to add for the directory records (this may be
+         zero).
+        """
+        if not self._pending_children:
+            return 0
+
+        pending = self._pending_children
+        self._pending_children = {}
+        num_bytes_to_add = 0
+        for parent, children in pending.values():
+            num_bytes_to_add += parent.add_children(children,
+                                                    self.logical_block_size)
+
+        return num_bytes_to_add
+
     def _remove_child_from_dr(self, child, index):
         # type: (dr.DirectoryRecord, int) -> int
         """
@@ -1833,26 +2285,16 @@ class PyCdlib:
         Returns:
          An integer representing the 32-bit checksum for the boot info table.
         """
-        # Read the boot file so we can calculate the checksum over it.
-        num_sectors = utils.ceiling_div(data_len, self.logical_block_size)
-        csum = 0
-        curr_sector = 0
-        while curr_sector < num_sectors:
-            block = data_fp.read(self.logical_block_size)
-            block = block.ljust(2048, b'\x00')
-            i = 0
-            if curr_sector == 0:
-                # The first 64 bytes are not included in the checksum.
-                i = 64
-            while i < len(block):
-                tmp, = struct.unpack_from('<L', block[:i + 4], i)
-                csum += tmp
-                csum = csum & 0xffffffff
-                i += 4
-
-            curr_sector += 1
-
-        return csum
+        csum = eltorito.EltoritoBootInfoTableChecksum()
+        left = data_len
+        while left > 0:
+            data = data_fp.read(min(left, 65536))
+            if not data:
+                break
+            csum.update(data)
+            left -= len(data)
+
+        return csum.digest()
 
     def _check_for_eltorito_boot_info_table(self, ino):
         # type: (inode.Inode) -> None
@@ -2073,6 +2515,8 @@ class PyCdlib:
                                                 abs_file_entry_extent,
                                                 self.udf_file_set.root_dir_icb.log_block_num,
                                                 None)
+        num_records = 1
+        num_bytes = len(icbdata)
 
         udf_file_entries = collections.deque([self.udf_root])
         while udf_file_entries:
@@ -2086,6 +2530,7 @@ class PyCdlib:
                 self._seek_to_extent(abs_file_ident_extent)
                 self._cdfp.seek(desc.offset, 1)
                 data = self._cdfp.read(desc.extent_length)
+                num_bytes += len(data)
                 offset = 0
                 while offset < len(data):
                     current_extent = (abs_file_ident_extent * self.logical_block_size + offset) // self.logical_block_size
@@ -2095,6 +2540,7 @@ class PyCdlib:
                                                                         part_start,
                                                                         udf_file_entry)
                     offset += bytes_forward
+                    num_records += 1
 
                     if file_ident.is_parent():
                         # For a parent, no further work to do.
@@ -2104,6 +2550,8 @@ class PyCdlib:
                     abs_file_entry_extent = part_start + file_ident.icb.log_block_num
                     self._seek_to_extent(abs_file_entry_extent)
                     icbdata = self._cdfp.read(file_ident.icb.extent_length)
+                    num_records += 1
+                    num_bytes += len(icbdata)
                     next_entry = udfmod.parse_file_entry(icbdata,
                                                          abs_file_entry_extent,
                                                          file_ident.icb.log_block_num,
@@ -2149,6 +2597,9 @@ class PyCdlib:
                             ino.linked_records.append((next_entry, False))
                             next_entry.inode = ino
 
+        if self._stats is not None:
+            self._stats.count(num_records, num_bytes)
+
     def _open_fp(self, fp):
         # type: (IO) -> None
         """
@@ -2171,57 +2622,70 @@ class PyCdlib:
         if sys.platform == 'win32' and hasattr(fp, 'name') and fp.name.startswith("\\\\.\\"):
             fp = utils.Win32RawDevice(fp.name)
 
-        self._cdfp = fp
+        self._cdfp = self._wrap_input(fp)
 
         # Get the Primary Volume Descriptor (pvd), the set of Supplementary
         # Volume Descriptors (svds), the set of Volume Partition
         # Descriptors (vpds), the set of Boot Records (brs), and the set of
         # Volume Descriptor Set Terminators (vdsts)
-        self._parse_volume_descriptors()
+        with self._phase('parse_volume_descriptors') as phase:
+            self._parse_volume_descriptors()
+            num_vds = len(self.pvds) + len(self.svds) + len(self.brs) + len(self.vdsts)
+            phase.count(num_vds, num_vds * 2048)
 
         self.logical_block_size = self.pvd.logical_block_size()
 
-        old = self._cdfp.tell()
-        self._cdfp.seek(0)
-        tmp_isohybrid = isohybrid.IsoHybrid()
-        if tmp_isohybrid.parse(self._cdfp.read(16 * 2048)):
-            if tmp_isohybrid.efi:
-                # If we have an EFI partition, we now need to go find the backup
-                # LBA and parse that.  The backup_lba attribute tells us the
-                # location of the GPT Header, which is *after* the backup
-                # partition information, so we first parse that, then go find
-                # out how many more partitions we need to parse.
-                self._cdfp.seek(tmp_isohybrid.primary_gpt.header.backup_lba * 512)
-                tmp_isohybrid.parse_secondary_gpt_header(self._cdfp.read(512))
-
-                self._cdfp.seek((tmp_isohybrid.secondary_gpt.header.current_lba * 512) - (tmp_isohybrid.secondary_gpt.header.num_parts * 128))
-                tmp_isohybrid.parse_secondary_gpt_partitions(self._cdfp.read(tmp_isohybrid.secondary_gpt.header.num_parts * 128))
-
-            # We only save the object if it turns out to be a valid IsoHybrid.
-            self.isohybrid_mbr = tmp_isohybrid
-        self._cdfp.seek(old)
+        with self._phase('parse_isohybrid') as phase:
+            old = self._cdfp.tell()
+            self._cdfp.seek(0)
+            tmp_isohybrid = isohybrid.IsoHybrid()
+            if tmp_isohybrid.parse(self._cdfp.read(16 * 2048)):
+                if tmp_isohybrid.efi:
+                    # If we have an EFI partition, we now need to go find the
+                    # backup LBA and parse that.  The backup_lba attribute tells
+                    # us the location of the GPT Header, which is *after* the
+                    # backup partition information, so we first parse that,
+                    # then go find out how many more partitions we need to
+                    # parse.
+                    self._cdfp.seek(tmp_isohybrid.primary_gpt.header.backup_lba * 512)
+                    tmp_isohybrid.parse_secondary_gpt_header(self._cdfp.read(512))
+
+                    self._cdfp.seek((tmp_isohybrid.secondary_gpt.header.current_lba * 512) - (tmp_isohybrid.secondary_gpt.header.num_parts * 128))
+                    tmp_isohybrid.parse_secondary_gpt_partitions(self._cdfp.read(tmp_isohybrid.secondary_gpt.header.num_parts * 128))
+
+                # We only save the object if it turns out to be a valid
+                # IsoHybrid.
+                self.isohybrid_mbr = tmp_isohybrid
+                phase.count(1)
+            self._cdfp.seek(old)
+            phase.count(0, 16 * 2048)
 
         if self.pvd.application_use[141:149] == b'CD-XA001':
             self.xa = True
 
-        for br in self.brs:
-            self._check_and_parse_eltorito(br)
+        with self._phase('parse_eltorito') as phase:
+            for br in self.brs:
+                self._check_and_parse_eltorito(br)
+            if self.eltorito_boot_catalog is not None:
+                phase.count(1, self.logical_block_size)
 
         # Now that we have the PVD, parse the Path Tables according to Ecma-119
         # section 9.4.  We want to ensure that the big endian versions agree
         # with the little endian ones (to make sure it is a valid ISO).
+        with self._phase('parse_path_tables') as phase:
+            # Little Endian first.
+            le_ptrs, extent_to_ptr = self._parse_path_table(self.pvd.path_table_size(),
+                                                            self.pvd.path_table_location_le)
 
-        # Little Endian first.
-        le_ptrs, extent_to_ptr = self._parse_path_table(self.pvd.path_table_size(),
-                                                        self.pvd.path_table_location_le)
+            # Big Endian next.
+            tmp_be_ptrs, e_unused = self._parse_path_table(self.pvd.path_table_size(),
+                                                           self.pvd.path_table_location_be)
 
-        # Big Endian next.
-        tmp_be_ptrs, e_unused = self._parse_path_table(self.pvd.path_table_size(),
-                                                       self.pvd.path_table_location_be)
+            for index, ptr in enumerate(le_ptrs):
+                if not ptr.equal_to_be(tmp_be_ptrs[index]):
+                    raise pycdlibexception.PyCdlibInvalidISO('Little-endian and big-endian path table records do not agree')
 
-        for index, ptr in enumerate(le_ptrs):
-            if not ptr.equal_to_be(tmp_be_ptrs[index]):
-                raise pycdlibexception.PyCdlibInvalidISO('Little-endian and big-endian path table records do not agree')
+            phase.count(len(le_ptrs) * 2, self.pvd.path_table_size() * 2)
 
         self.interchange_level = 1
         for svd in self.svds:
@@ -2232,8 +2696,9 @@ class PyCdlib:
         extent_to_inode = {}  # type: Dict[int, inode.Inode]
 
         # Parse all of the files starting from the PVD root directory record.
-        ic_level, lastbyte = self._walk_directories(self.pvd, extent_to_ptr,
-                                                    extent_to_inode, le_ptrs)
+        with self._phase('walk_directories'):
+            ic_level, lastbyte = self._walk_directories(self.pvd, extent_to_ptr,
+                                                        extent_to_inode, le_ptrs)
 
         if self.eltorito_boot_catalog is not None:
             if not self.eltorito_boot_catalog.dirrecords:
@@ -2265,14 +2730,18 @@ class PyCdlib:
         # entry, we'll have to do some additional work to give it a real name
         # and link it to the appropriate parent.
         if self.eltorito_boot_catalog is not None:
-            self._link_eltorito(extent_to_inode)
-
-            # Now that everything has a dirrecord, see if we have a boot
-            # info table.
-            self._check_for_eltorito_boot_info_table(self.eltorito_boot_catalog.initial_entry.inode)
-            for sec in self.eltorito_boot_catalog.sections:
-                for entry in sec.section_entries:
-                    self._check_for_eltorito_boot_info_table(entry.inode)
+            with self._phase('link_eltorito') as phase:
+                self._link_eltorito(extent_to_inode)
+
+                # Now that everything has a dirrecord, see if we have a boot
+                # info table.
+                self._check_for_eltorito_boot_info_table(self.eltorito_boot_catalog.initial_entry.inode)
+                num_entries = 1
+                for sec in self.eltorito_boot_catalog.sections:
+                    for entry in sec.section_entries:
+                        self._check_for_eltorito_boot_info_table(entry.inode)
+                        num_entries += 1
+                phase.count(num_entries)
 
         # The PVD is finished.  Now look to see if we need to parse the SVD.
         for svd in self.svds:
@@ -2282,18 +2751,22 @@ class PyCdlib:
 
                 self.joliet_vd = svd
 
-                le_ptrs, joliet_extent_to_ptr = self._parse_path_table(svd.path_table_size(),
-                                                                       svd.path_table_location_le)
+                with self._phase('parse_path_tables') as phase:
+                    le_ptrs, joliet_extent_to_ptr = self._parse_path_table(svd.path_table_size(),
+                                                                           svd.path_table_location_le)
+
+                    tmp_be_ptrs, j_unused = self._parse_path_table(svd.path_table_size(),
+                                                                   svd.path_table_location_be)
 
-                tmp_be_ptrs, j_unused = self._parse_path_table(svd.path_table_size(),
-                                                               svd.path_table_location_be)
+                    for index, ptr in enumerate(le_ptrs):
+                        if not ptr.equal_to_be(tmp_be_ptrs[index]):
+                            raise pycdlibexception.PyCdlibInvalidISO('Joliet little-endian and big-endian path table records do not agree')
 
-                for index, ptr in enumerate(le_ptrs):
-                    if not ptr.equal_to_be(tmp_be_ptrs[index]):
-                        raise pycdlibexception.PyCdlibInvalidISO('Joliet little-endian and big-endian path table records do not agree')
+                    phase.count(len(le_ptrs) * 2, svd.path_table_size() * 2)
 
-                self._walk_directories(svd, joliet_extent_to_ptr,
-                                       extent_to_inode, le_ptrs)
+                with self._phase('walk_joliet_directories'):
+                    self._walk_directories(svd, joliet_extent_to_ptr,
+                                           extent_to_inode, le_ptrs)
             elif svd.version == 2 and svd.file_structure_version == 2:
                 if self.enhanced_vd is not None:
                     raise pycdlibexception.PyCdlibInvalidISO('Only a single enhanced VD is supported')
@@ -2316,8 +2789,10 @@ class PyCdlib:
         # UDF NSR, and UDF TEA, in which case we parse the UDF descriptors and
         # walk the filesystem.
         if self._has_udf:
-            self._parse_udf_descriptors()
-            self._walk_udf_directories(extent_to_inode)
+            with self._phase('parse_udf_descriptors'):
+                self._parse_udf_descriptors()
+            with self._phase('walk_udf_directories'):
+                self._walk_udf_directories(extent_to_inode)
 
         # Now we look for the 'version' volume descriptor, common on ISOs made
         # with genisoimage or mkisofs.  This volume descriptor doesn't have any
@@ -2337,6 +2812,51 @@ class PyCdlib:
 
         self._initialized = True
 
+    def _update_linked_records_length(self, ino, length):
+        # type: (inode.Inode, int) -> List[Tuple[int, bytes]]
+        """
+        An internal method to set a new data length on all of the records
+        linked to an inode, and to figure out where each of those records lives
+        on the ISO.  This assumes that the number of extents used by the data
+        is not changing, so that no other metadata has to move.
+
+        Parameters:
+         ino - The inode whose linked records should be updated.
+         length - The new length of the data.
+        Returns:
+         A list of tuples, where the first element is the absolute byte offset
+         of a record on the ISO and the second element is the new record.
+        """
+        patches = []
+        for record, is_pvd_unused in ino.linked_records:
+            if isinstance(record, dr.DirectoryRecord):
+                # This is a little tricky because of what things mean.  First
+                # of all, record.extents_to_here represents the total number of
+                # extents up to this child in the parent.  Thus, to get the
+                # absolute extent offset, we start with the parent's extent
+                # location, add on the number of extents to here, and remove 1
+                # (since our offset will be zero-based).  Second,
+                # record.offset_to_here is the *last* byte that the child uses,
+                # so to get the start of it we subtract off the length of the
+                # child.  Then we can multiply the extent location by the
+                # logical block size, add on the offset, and get to the absolute
+                # location in the file.
+                if record.parent is None:
+                    raise pycdlibexception.PyCdlibInternalError('Modifying file with empty parent')
+                abs_extent_loc = record.parent.extent_location() + record.extents_to_here - 1
+                offset = record.offset_to_here - record.dr_len
+                abs_offset = abs_extent_loc * self.logical_block_size + offset
+            elif isinstance(record, udfmod.UDFFileEntry):
+                abs_offset = record.extent_location() * self.logical_block_size
+            else:
+                # This should never happen
+                raise pycdlibexception.PyCdlibInternalError('Invalid record type')
+
+            record.set_data_length(length)
+            patches.append((abs_offset, record.record()))
+
+        return patches
+
     def _get_and_write_fp(self, iso_path, outfp, blocksize):
         # type: (bytes, BinaryIO, int) -> None
         """
@@ -2472,6 +2992,13 @@ class PyCdlib:
         if found_record.inode is None:
             raise pycdlibexception.PyCdlibInvalidInput('Cannot write out a file without data')
 
+        if found_record.rock_ridge is not None:
+            zf = found_record.rock_ridge.zisofs_record()
+            if zf is not None:
+                with zisofsmod.ZisofsIO(pycdlibio.PyCdlibIO(found_record.inode, self.logical_block_size), zf) as zfp:
+                    utils.copy_data(zf.uncompressed_size, blocksize, zfp, outfp)
+                return
+
         while found_record.get_data_length() > 0:
             with inode.InodeOpenData(found_record.inode, self.logical_block_size) as (data_fp, data_len):
                 # Copy the data into the output file descriptor.  If a boot info
@@ -2479,11 +3006,19 @@ class PyCdlib:
                 # file.  Note that we never return more bytes than the length
                 # of the file, so the boot info table may get truncated.
                 if found_record.inode.boot_info_table is not None:
+                    bi_table = found_record.inode.boot_info_table
+                    if bi_table.csum is None:
+                        # The checksum is normally calculated while the ISO
+                        # is being written out; if that hasn't happened yet,
+                        # calculate it now and rewind.
+                        orig = data_fp.tell()
+                        bi_table.csum = self._calculate_eltorito_boot_info_table_csum(data_fp, data_len)
+                        data_fp.seek(orig)
                     header_len = min(data_len, 8)
                     outfp.write(data_fp.read(header_len))
                     data_len -= header_len
                     if data_len > 0:
-                        bi_rec = found_record.inode.boot_info_table.record()
+                        bi_rec = bi_table.record()
                         table_len = min(data_len, len(bi_rec))
                         outfp.write(bi_rec[:table_len])
                         data_len -= table_len
@@ -2563,8 +3098,16 @@ class PyCdlib:
         """
         outfp.seek(ino.extent_location() * self.logical_block_size)
         start_offset = outfp.tell()
+        # If this file is being used as a bootfile with a boot info table,
+        # calculate the checksum from the data as it is copied so that the
+        # boot file doesn't have to be read twice.
+        csum = None
+        data_cb = None
+        if ino.boot_info_table is not None:
+            csum = eltorito.EltoritoBootInfoTableChecksum()
+            data_cb = csum.update
         with inode.InodeOpenData(ino, self.logical_block_size) as (data_fp, data_len):
-            for len_copied in utils.copy_data_yield(data_len, blocksize, data_fp, outfp):  # pylint: disable=use-yield-from
+            for len_copied in utils.copy_data_yield(data_len, blocksize, data_fp, outfp, data_cb):  # pylint: disable=use-yield-from
                 yield len_copied
             yield utils.zero_pad(outfp, data_len, self.logical_block_size)
 
@@ -2575,50 +3118,189 @@ class PyCdlib:
 
         # If this file is being used as a bootfile, and a boot info table is
         # present, patch the boot info table into offset 8 here.
-        if ino.boot_info_table is not None:
+        if ino.boot_info_table is not None and csum is not None:
+            ino.boot_info_table.csum = csum.digest()
             old = outfp.tell()
             outfp.seek(start_offset + 8)
             rec = ino.boot_info_table.record()
             self._outfp_write_with_check(outfp, rec, enable_overwrite_check=False)
             outfp.seek(old)
 
+    def _data_runs(self):
+        # type: () -> List[List[inode.Inode]]
+        """
+        Internal method to group the Inodes with data into runs, in the order
+        of their extents in the new layout.  A run is a sequence of Inodes whose
+        data is on the original ISO, and is laid out back-to-back both there
+        and in the new layout, so that the whole run can be copied with one
+        sequential transfer.  Inodes that do not qualify (such as data from
+        external files, or boot files with a boot info table to patch) end up
+        in runs of their own.
+
+        Parameters:
+         None.
+        Returns:
+         A list of runs, each of which is a list of Inodes.
+        """
+        runs = []  # type: List[List[inode.Inode]]
+        prev = None  # type: Optional[inode.Inode]
+        for ino in sorted((i for i in self.inodes if i.get_data_length() > 0),
+                          key=lambda i: i.extent_location()):
+            joinable = ino.original_data_location == ino.DATA_ON_ORIGINAL_ISO and \
+                not ino.manage_fp and ino.boot_info_table is None
+            if prev is not None and joinable and ino.data_fp is prev.data_fp:
+                num_extents = utils.ceiling_div(prev.get_data_length(),
+                                                self.logical_block_size)
+                if ino.extent_location() == prev.extent_location() + num_extents and \
+                   ino.orig_extent_loc == prev.orig_extent_loc + num_extents:
+                    runs[-1].append(ino)
+                    prev = ino
+                    continue
+
+            runs.append([ino])
+            prev = ino if joinable else None
+
+        return runs
+
+    def _output_data_run(self, outfp, blocksize, run):
+        # type: (BinaryIO, int, List[inode.Inode]) -> Generator
+        """
+        Internal method to write out a run of Inodes (as found by _data_runs())
+        with a single sequential copy from the original ISO.  The padding after
+        each file is zeroed in the copied data, so the output is the same as if
+        the files were written one at a time.
+
+        Parameters:
+         outfp - The file object to write the data to.
+         blocksize - The blocksize to use when copying the data.
+         run - The list of Inodes to write.
+        Yields:
+         The number of bytes written by each step.
+        Returns:
+         Nothing.
+        """
+        log_block_size = self.logical_block_size
+        first = run[0]
+        start = first.extent_location() * log_block_size
+
+        # The ranges (relative to the start of the run) of the padding after
+        # each file; the original ISO may have anything there.
+        pads = []  # type: List[Tuple[int, int]]
+        for ino in run:
+            offset = ino.extent_location() * log_block_size - start
+            length = ino.get_data_length()
+            pads.append((offset + length,
+                         offset + utils.ceiling_div(length, log_block_size) * log_block_size))
+        total = pads[-1][1]
+
+        with inode.InodeOpenData(first, log_block_size) as (infp, unused_data_len):
+            outfp.seek(start)
+            pad_index = 0
+            done = 0
+            while done < total:
+                readsize = min(blocksize, total - done)
+                data = bytearray(infp.read(readsize))
+                if len(data) < readsize:
+                    # The original ISO is shorter than it claims to be; treat
+                    # the missing data as zeros.
+                    data.extend(b'\x00' * (readsize - len(data)))
+
+                end = done + readsize
+                while pad_index < len(pads) and pads[pad_index][0] < end:
+                    (pad_start, pad_end) = pads[pad_index]
+                    lo = max(pad_start, done)
+                    hi = min(pad_end, end)
+                    if hi > lo:
+                        data[lo - done:hi - done] = b'\x00' * (hi - lo)
+                    if pad_end > end:
+                        break
+                    pad_index += 1
+
+                outfp.write(data)
+                done = end
+                yield readsize
+
+        if self._track_writes:
+            bisect.insort_left(self._write_check_list,
+                               self._WriteRange(start, start + total - 1))
+
     class _Progress:
         """
-        An inner class to deal with progress.
+        An inner class to deal with progress.  Progress is aggregated
+        internally, and only delivered to the user callback once at least
+        min_bytes have been done and at least min_interval seconds have passed
+        since the last delivery.  The first and last calls are always
+        delivered.
         """
-        __slots__ = ('done', 'total', 'progress_cb', 'progress_opaque', '_call')
+        __slots__ = ('done', 'calls', 'total', 'progress_cb', 'progress_opaque',
+                     'phase', '_nargs', '_min_bytes', '_min_interval',
+                     '_start_time', '_last_done', '_last_time')
 
-        def __init__(self, total, progress_cb, progress_opaque):
-            # type: (int, Optional[Callable[[int, int, Any], None]], Optional[Any]) -> None
+        def __init__(self, total, progress_cb, progress_opaque, min_bytes=0,
+                     min_interval=0.0):
+            # type: (int, Optional[Callable[..., None]], Optional[Any], int, float) -> None
             self.done = 0
+            self.calls = 0
             self.total = total
             self.progress_cb = progress_cb
             self.progress_opaque = progress_opaque
+            self.phase = ''
+            self._nargs = 0
             if self.progress_cb is not None:
-                arglen = len(inspect.getfullargspec(self.progress_cb).args)
-
-                if arglen == 2:
-                    self._call = lambda done, total, opaque: self.progress_cb(done, total)  # type: ignore
-                elif arglen == 3:
-                    self._call = lambda done, total, opaque: self.progress_cb(done, total, opaque)  # type: ignore # pylint: disable=unnecessary-lambda
-                else:
-                    raise pycdlibexception.PyCdlibInvalidInput('The progress callback must take 2 or 3 arguments')
+                self._nargs = len(inspect.getfullargspec(self.progress_cb).args)
+                if self._nargs not in (2, 3, 4):
+                    raise pycdlibexception.PyCdlibInvalidInput('The progress callback must take 2, 3, or 4 arguments')
+            if min_bytes < 0 or min_interval < 0:
+                raise pycdlibexception.PyCdlibInvalidInput('The progress granularity must be non-negative')
+            self._min_bytes = min_bytes
+            self._min_interval = min_interval
+            self._start_time = time.monotonic()
+            self._last_done = 0
+            self._last_time = self._start_time
+
+        def _deliver(self):
+            # type: () -> None
+            """Call progress_cb with the current progress."""
+            now = time.monotonic()
+            self._last_done = self.done
+            self._last_time = now
+            if self._nargs == 2:
+                self.progress_cb(self.done, self.total)  # type: ignore
+            elif self._nargs == 3:
+                self.progress_cb(self.done, self.total, self.progress_opaque)  # type: ignore
             else:
-                self._call = lambda done, total, opaque: None
+                info = statsmod.WriteProgress(self.phase, self.done, self.total,
+                                              now - self._start_time)
+                self.progress_cb(self.done, self.total, self.progress_opaque, info)  # type: ignore
+
+        def start(self):
+            # type: () -> None
+            """If the progress_cb is not None, call progress_cb with no progress."""
+            self.calls += 1
+            if self._nargs:
+                self._deliver()
 
         def call(self, length):
             # type: (int) -> None
-            """Add the length to done, then call progress_cb if it is not None."""
+            """Add the length to done, then call progress_cb if it is due."""
             self.done = min(self.done + length, self.total)
-            self._call(self.done, self.total, self.progress_opaque)
+            self.calls += 1
+            if not self._nargs:
+                return
+            if self.done - self._last_done < self._min_bytes:
+                return
+            if self._min_interval > 0 and time.monotonic() - self._last_time < self._min_interval:
+                return
+            self._deliver()
 
         def finish(self):
             # type: () -> None
             """If the progress_cb is not None, call progress_cb with the final total."""
-            # In almost all cases, this will cause self.done to wildly
-            # overflow the total size.  However, with the hard cap in
-            # call, this works just fine.
-            self.call(self.total)
+            self.done = self.total
+            self.phase = 'finished'
+            self.calls += 1
+            if self._nargs:
+                self._deliver()
 
     def _write_directory_records(self, vd, outfp, progress):
         # type: (headervd.PrimaryOrSupplementaryVD, BinaryIO, PyCdlib._Progress) -> None
@@ -2740,8 +3422,9 @@ class PyCdlib:
             self._outfp_write_with_check(outfp, rec)
             progress.call(len(rec))
 
-    def _write_fp(self, outfp, blocksize, progress_cb, progress_opaque):
-        # type: (BinaryIO, int, Optional[Callable[[int, int, Any], None]], Optional[Any]) -> None
+    def _write_fp(self, outfp, blocksize, progress_cb, progress_opaque,
+                  progress_bytes=0, progress_interval=0.0):
+        # type: (BinaryIO, int, Optional[Callable[..., None]], Optional[Any], int, float) -> None
         """
         Write a properly formatted ISO out to the file object passed in.  This
         also goes by the name of 'mastering'.
@@ -2753,6 +3436,9 @@ class PyCdlib:
                        work.  The callback function must have a signature of:
                        def func(done, total, progress_data).
          progress_opaque - User data to be passed to the progress callback.
+         progress_bytes - The minimum number of bytes between progress calls.
+         progress_interval - The minimum number of seconds between progress
+                             calls.
         Returns:
          Nothing.
         """
@@ -2762,12 +3448,96 @@ class PyCdlib:
         if self._needs_reshuffle:
             self._reshuffle_extents()
 
+        if self._io_stats is not None:
+            # The accounting wrapper is file-like, not a BinaryIO subclass.
+            outfp = self._io_stats.wrap_output(outfp)  # type: ignore
+
         self._write_check_list = []
         outfp.seek(0)
 
-        progress = self._Progress(self.pvd.space_size * self.logical_block_size, progress_cb, progress_opaque)
-        progress.call(0)
+        progress = self._Progress(self.pvd.space_size * self.logical_block_size,
+                                  progress_cb, progress_opaque, progress_bytes,
+                                  progress_interval)
+        progress.phase = 'descriptors'
+        progress.start()
+
+        with self._phase('write_descriptors') as phase:
+            calls = progress.calls
+            done = progress.done
+            self._write_descriptors(outfp, progress)
+            phase.count(progress.calls - calls, progress.done - done)
 
+        progress.phase = 'directory_records'
+        with self._phase('write_directory_records') as phase:
+            calls = progress.calls
+            done = progress.done
+
+            # Now write out the ISO9660 directory records.
+            self._write_directory_records(self.pvd, outfp, progress)
+
+            # Now write out the Joliet directory records, if they exist.
+            if self.joliet_vd is not None:
+                self._write_directory_records(self.joliet_vd, outfp, progress)
+
+            phase.count(progress.calls - calls, progress.done - done)
+
+        # Now write out the UDF directory records, if they exist.
+        if self.udf_root is not None:
+            progress.phase = 'udf_entries'
+            with self._phase('write_udf_entries') as phase:
+                calls = progress.calls
+                done = progress.done
+                self._write_udf_entries(outfp, progress)
+                phase.count(progress.calls - calls, progress.done - done)
+
+        # Now write out the actual files.  In many cases we haven't yet read the
+        # file out of the original, so do that here.
+        progress.phase = 'file_data'
+        with self._phase('write_file_data') as phase:
+            num_files = 0
+            num_bytes = 0
+            for run in self._data_runs():
+                if len(run) == 1:
+                    copier = self._output_file_data(outfp, blocksize, run[0])
+                else:
+                    copier = self._output_data_run(outfp, blocksize, run)
+                for len_copied in copier:
+                    progress.call(len_copied)
+                    num_bytes += len_copied
+                num_files += len(run)
+            phase.count(num_files, num_bytes)
+
+        # Pad out to the total size of the disk, in case that the last thing
+        # written is shorter than a full logical block size.  Not all file-like
+        # objects support truncate() to grow a file, so do it the old-fashioned
+        # way by seeking to end - 1 and writing a padding '\x00' byte.
+        outfp.seek(0, os.SEEK_END)
+        total_size = self.pvd.space_size * self.logical_block_size
+        if outfp.tell() != total_size:
+            outfp.seek(total_size - 1)
+            outfp.write(b'\x00')
+
+        if self.isohybrid_mbr is not None:
+            outfp.seek(0, 2)
+            outfp.write(self.isohybrid_mbr.record_padding(self.pvd.space_size * self.logical_block_size))
+            if self.isohybrid_mbr.efi:
+                outfp.seek((self.isohybrid_mbr.secondary_gpt.header.current_lba * 512) - (self.isohybrid_mbr.secondary_gpt.header.num_parts * 128))
+                outfp.write(self.isohybrid_mbr.secondary_gpt.record())
+
+        progress.finish()
+
+    def _write_descriptors(self, outfp, progress):
+        # type: (BinaryIO, PyCdlib._Progress) -> None
+        """
+        An internal method to write out the isohybrid MBR, the Volume
+        Descriptors, the UDF descriptors, and the El Torito Boot Catalog.
+
+        Parameters:
+         outfp - The file object to write data to.
+         progress - The _Progress object to use for outputting progress.
+        Returns:
+         Nothing.
+        """
         if self.isohybrid_mbr is not None:
             self._outfp_write_with_check(outfp,
                                          self.isohybrid_mbr.record(self.pvd.space_size * self.logical_block_size))
@@ -2870,78 +3640,55 @@ class PyCdlib:
             self._outfp_write_with_check(outfp, rec)
             progress.call(len(rec))
 
-        # Now write out the ISO9660 directory records.
-        self._write_directory_records(self.pvd, outfp, progress)
+    def _write_udf_entries(self, outfp, progress):
+        # type: (BinaryIO, PyCdlib._Progress) -> None
+        """
+        An internal method to write out the UDF File Set, File Entries, and
+        File Identifier Descriptors.
 
-        # Now write out the Joliet directory records, if they exist.
-        if self.joliet_vd is not None:
-            self._write_directory_records(self.joliet_vd, outfp, progress)
+        Parameters:
+         outfp - The file object to write data to.
+         progress - The _Progress object to use for outputting progress.
+        Returns:
+         Nothing.
+        """
+        # Write out the UDF File Sets.
+        outfp.seek(self.udf_file_set.extent_location() * self.logical_block_size)
+        rec = self.udf_file_set.record()
+        self._outfp_write_with_check(outfp, rec)
+        progress.call(len(rec))
 
-        # Now write out the UDF directory records, if they exist.
-        if self.udf_root is not None:
-            # Write out the UDF File Sets.
-            outfp.seek(self.udf_file_set.extent_location() * self.logical_block_size)
-            rec = self.udf_file_set.record()
+        if self.udf_file_set_terminator is not None:
+            outfp.seek(self.udf_file_set_terminator.extent_location() * self.logical_block_size)
+            rec = self.udf_file_set_terminator.record()
             self._outfp_write_with_check(outfp, rec)
             progress.call(len(rec))
 
-            if self.udf_file_set_terminator is not None:
-                outfp.seek(self.udf_file_set_terminator.extent_location() * self.logical_block_size)
-                rec = self.udf_file_set_terminator.record()
-                self._outfp_write_with_check(outfp, rec)
-                progress.call(len(rec))
-
-            written_file_entry_inodes = set()
-            udf_file_entries = collections.deque([(self.udf_root, True)])  # type: Deque[Tuple[Optional[udfmod.UDFFileEntry], bool]]
-            while udf_file_entries:
-                udf_file_entry, isdir = udf_file_entries.popleft()
+        written_file_entry_inodes = set()
+        udf_file_entries = collections.deque([(self.udf_root, True)])  # type: Deque[Tuple[Optional[udfmod.UDFFileEntry], bool]]
+        while udf_file_entries:
+            udf_file_entry, isdir = udf_file_entries.popleft()
 
-                if udf_file_entry is None:
-                    continue
+            if udf_file_entry is None:
+                continue
 
-                if udf_file_entry.inode is None or not id(udf_file_entry.inode) in written_file_entry_inodes:
-                    outfp.seek(udf_file_entry.extent_location() * self.logical_block_size)
-                    rec = udf_file_entry.record()
+            if udf_file_entry.inode is None or not id(udf_file_entry.inode) in written_file_entry_inodes:
+                outfp.seek(udf_file_entry.extent_location() * self.logical_block_size)
+                rec = udf_file_entry.record()
+                self._outfp_write_with_check(outfp, rec)
+                progress.call(len(rec))
+                written_file_entry_inodes.add(id(udf_file_entry.inode))
+
+            if isdir:
+                outfp.seek(udf_file_entry.fi_descs[0].extent_location() * self.logical_block_size)
+                # FIXME: for larger directories, we'll actually need to
+                # iterate over the alloc_descs and write them
+                for fi_desc in udf_file_entry.fi_descs:
+                    rec = fi_desc.record()
                     self._outfp_write_with_check(outfp, rec)
                     progress.call(len(rec))
-                    written_file_entry_inodes.add(id(udf_file_entry.inode))
-
-                if isdir:
-                    outfp.seek(udf_file_entry.fi_descs[0].extent_location() * self.logical_block_size)
-                    # FIXME: for larger directories, we'll actually need to
-                    # iterate over the alloc_descs and write them
-                    for fi_desc in udf_file_entry.fi_descs:
-                        rec = fi_desc.record()
-                        self._outfp_write_with_check(outfp, rec)
-                        progress.call(len(rec))
-                        if not fi_desc.is_parent():
-                            udf_file_entries.append((fi_desc.file_entry, fi_desc.is_dir()))
-
-        # Now write out the actual files.  In many cases we haven't yet read the
-        # file out of the original, so do that here.
-        for ino in self.inodes:
-            if ino.get_data_length() > 0:
-                for len_copied in self._output_file_data(outfp, blocksize, ino):
-                    progress.call(len_copied)
-
-        # Pad out to the total size of the disk, in case that the last thing
-        # written is shorter than a full logical block size.  Not all file-like
-        # objects support truncate() to grow a file, so do it the old-fashioned
-        # way by seeking to end - 1 and writing a padding '\x00' byte.
-        outfp.seek(0, os.SEEK_END)
-        total_size = self.pvd.space_size * self.logical_block_size
-        if outfp.tell() != total_size:
-            outfp.seek(total_size - 1)
-            outfp.write(b'\x00')
-
-        if self.isohybrid_mbr is not None:
-            outfp.seek(0, 2)
-            outfp.write(self.isohybrid_mbr.record_padding(self.pvd.space_size * self.logical_block_size))
-            if self.isohybrid_mbr.efi:
-                outfp.seek((self.isohybrid_mbr.secondary_gpt.header.current_lba * 512) - (self.isohybrid_mbr.secondary_gpt.header.num_parts * 128))
-                outfp.write(self.isohybrid_mbr.secondary_gpt.record())
-
-        progress.finish()
+                    if not fi_desc.is_parent():
+                        udf_file_entries.append((fi_desc.file_entry, fi_desc.is_dir()))
 
     def _update_rr_ce_entry(self, rec):
         # type: (dr.DirectoryRecord) -> int
@@ -2958,7 +3705,7 @@ class PyCdlib:
             celen = rec.rock_ridge.dr_entries.ce_record.len_cont_area
             added_block, block, offset = self.pvd.add_rr_ce_entry(celen)
             rec.rock_ridge.update_ce_block(block)
-            rec.rock_ridge.dr_entries.ce_record.update_offset(offset)
+            rec.rock_ridge.update_ce_offset(offset)
             if added_block:
                 return self.logical_block_size
 
@@ -3037,8 +3784,8 @@ class PyCdlib:
             self._needs_reshuffle = True
 
     def _add_hard_link_to_inode(self, data_ino, length, file_mode,
-                                boot_catalog_old, **kwargs):
-        # type: (Optional[inode.Inode], int, int, bool, Optional[str]) -> int
+                                boot_catalog_old, zisofs=None, **kwargs):
+        # type: (Optional[inode.Inode], int, int, bool, Optional[Tuple[int, int]], Optional[str]) -> int
         """
         Add a hard link to the ISO.  Hard links are alternate names for the
         same file contents that don't take up any additional space on the ISO.
@@ -3053,6 +3800,10 @@ class PyCdlib:
          length - The length of the old record to link against.
          file_mode - The file mode of the old record to link against.
          boot_catalog_old - Whether this is a link to an old boot catalog.
+         zisofs - A tuple of the uncompressed size and the base 2 logarithm of
+                  the block size if the data is zisofs-compressed, or None.
+                  This only applies to a new path on the ISO9660 filesystem of
+                  a Rock Ridge ISO.
          iso_new_path - The new path on the ISO9660 filesystem to link to.
          joliet_new_path - The new path on the Joliet filesystem to link to.
          rr_name - The Rock Ridge name to use for the new file if this is a
@@ -3102,6 +3853,8 @@ class PyCdlib:
                 vd = self.pvd
                 rr = self.rock_ridge
                 xa = self.xa
+                if not rr:
+                    zisofs = None
             else:
                 # Above we checked to make sure we got exactly one new path, so
                 # we know for certain that this is Joliet.
@@ -3115,11 +3868,12 @@ class PyCdlib:
                 vd = self.joliet_vd
                 rr = ''
                 xa = False
+                zisofs = None
 
             new_rec = dr.DirectoryRecord()
             new_rec.new_file(vd, length, new_name, new_parent,
                              vd.sequence_number(), rr, rr_name, xa, file_mode,
-                             time.time())
+                             time.time(), zisofs)
 
             num_bytes_to_add += self._add_child_to_dr(new_rec)
             num_bytes_to_add += self._update_rr_ce_entry(new_rec)
@@ -3163,8 +3917,9 @@ class PyCdlib:
         return num_bytes_to_add
 
     def _add_fp(self, fp, length, manage_fp, iso_path, rr_name,
-                joliet_path, udf_path, file_mode, eltorito_catalog):
-        # type: (Optional[Union[BinaryIO, str]], int, bool, Optional[str], Optional[str], Optional[str], Optional[str], Optional[int], bool) -> int
+                joliet_path, udf_path, file_mode, eltorito_catalog,
+                zisofs=None, fp_offset=0):
+        # type: (Optional[Union[BinaryIO, str]], int, bool, Optional[str], Optional[str], Optional[str], Optional[str], Optional[int], bool, Optional[Tuple[int, int]], int) -> int
         """
         An internal method to add a file to the ISO.  If the ISO contains Rock
         Ridge, then a Rock Ridge name must be provided.  If the ISO contains
@@ -3189,6 +3944,11 @@ class PyCdlib:
                      default), the permissions from the original file are used.
          eltorito_catalog - Whether this entry represents an El Torito Boot
                             Catalog.
+         zisofs - A tuple of the uncompressed size and the base 2 logarithm of
+                  the block size if the data in fp is zisofs-compressed, or
+                  None (the default).
+         fp_offset - The offset in fp at which the data for the new file
+                     starts.
         Returns:
          The number of bytes to add to the descriptors.
         """
@@ -3223,7 +3983,7 @@ class PyCdlib:
             raise pycdlibexception.PyCdlibInvalidInput('File sizes for interchange level < 3 must be less than 4GiB')
 
         left = length
-        offset = 0
+        offset = fp_offset
         done = False
         num_bytes_to_add = 0
         while not done:
@@ -3241,6 +4001,7 @@ class PyCdlib:
                 num_bytes_to_add += self._add_hard_link_to_inode(ino, thislen,
                                                                  fmode,
                                                                  eltorito_catalog,
+                                                                 zisofs,
                                                                  iso_new_path=iso_path,
                                                                  rr_name=rr_name)
 
@@ -3727,9 +4488,13 @@ class PyCdlib:
 
     ########################### PUBLIC API #####################################
 
-    def __init__(self, always_consistent=False):
-        # type: (bool) -> None
+    def __init__(self, always_consistent=False, stats=None, io_stats=None,
+                 block_cache=None):
+        # type: (bool, Optional[statsmod.PyCdlibStats], Optional[iostats.IOStats], Optional[blockcache.BlockCache]) -> None
         self._always_consistent = always_consistent
+        self._stats = stats
+        self._io_stats = io_stats
+        self._block_cache = block_cache
         track_writes = os.getenv('PYCDLIB_TRACK_WRITES')
         self._track_writes = False
         if track_writes is not None:
@@ -4049,7 +4814,9 @@ class PyCdlib:
     def open(self, filename, mode='rb'):
         # type: (str, str) -> None
         """
-        Open up an existing ISO for inspection and modification.
+        Open up an existing ISO for inspection and modification.  If the file
+        is a CISO or ZISO block-compressed container, the ISO inside of it is
+        opened (read-only).
 
         Parameters:
          filename - The filename containing the ISO to open up.
@@ -4063,7 +4830,11 @@ class PyCdlib:
         fp = open(filename, mode)  # pylint: disable=consider-using-with,unspecified-encoding
         self._managing_fp = True
         try:
-            self._open_fp(fp)
+            fp = ciso.wrap_if_compressed(fp, close_fp=True)
+            if isinstance(fp, ciso.CisoFile) and '+' in mode:
+                raise pycdlibexception.PyCdlibInvalidInput('Compressed ISO containers can only be opened read-only')
+            with self._io_operation('open'):
+                self._open_fp(fp)
         except Exception:
             fp.close()
             raise
@@ -4085,7 +4856,8 @@ class PyCdlib:
         if self._initialized:
             raise pycdlibexception.PyCdlibInvalidInput('This object already has an ISO; either close it or create a new object')
 
-        self._open_fp(fp)
+        with self._io_operation('open'):
+            self._open_fp(fp)
 
     def get_file_from_iso(self, local_path, **kwargs):
         # type: (str, Union[str, int]) -> None
@@ -4150,7 +4922,7 @@ class PyCdlib:
         if num_paths != 1:
             raise pycdlibexception.PyCdlibInvalidInput("Exactly one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path' must be passed")
 
-        with open(local_path, 'wb') as fp:
+        with open(local_path, 'wb') as fp, self._io_operation('extract'):
             if udf_path is not None:
                 self._udf_get_file_from_iso_fp(fp, blocksize, udf_path)
             else:
@@ -4220,11 +4992,12 @@ class PyCdlib:
         if num_paths != 1:
             raise pycdlibexception.PyCdlibInvalidInput("Exactly one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path' must be passed")
 
-        if udf_path is not None:
-            self._udf_get_file_from_iso_fp(outfp, blocksize, udf_path)
-        else:
-            self._get_file_from_iso_fp(outfp, blocksize, iso_path, rr_path,
-                                       joliet_path)
+        with self._io_operation('extract'):
+            if udf_path is not None:
+                self._udf_get_file_from_iso_fp(outfp, blocksize, udf_path)
+            else:
+                self._get_file_from_iso_fp(outfp, blocksize, iso_path, rr_path,
+                                           joliet_path)
 
     def get_and_write(self, iso_path, local_path, blocksize=8192):
         # type: (str, str, int) -> None
@@ -4275,8 +5048,8 @@ class PyCdlib:
         self._get_and_write_fp(utils.normpath(iso_path), outfp, blocksize)
 
     def write(self, filename, blocksize=32768, progress_cb=None,
-              progress_opaque=None):
-        # type: (str, int, Optional[Callable[[int, int, Any], None]], Optional[Any]) -> None
+              progress_opaque=None, progress_bytes=0, progress_interval=0.0):
+        # type: (str, int, Optional[Callable[..., None]], Optional[Any], int, float) -> None
         """
         Write a properly formatted ISO out to the filename passed in.  This
         also goes by the name of 'mastering'.
@@ -4286,9 +5059,20 @@ class PyCdlib:
          blocksize - The blocksize to use when copying data; the default is 32768.
          progress_cb - If not None, a function to call as the write call does its
                        work.  The callback function must have a signature of:
-                       def func(done, total, opaque).
+                       def func(done, total), def func(done, total, opaque),
+                       or def func(done, total, opaque, info), where info is
+                       a pycdlib.stats.WriteProgress object with the current
+                       phase, throughput, and estimated time remaining.  The
+                       callback is always called once at the start and once
+                       at the end with done equal to total.
          progress_opaque - User data to be passed to the progress callback; the
                            default is None.
+         progress_bytes - The minimum number of bytes that must be written
+                          between calls to the progress callback; the default
+                          is 0, which calls it for every piece of work.
+         progress_interval - The minimum number of seconds that must pass
+                             between calls to the progress callback; the
+                             default is 0.0, which does not limit the rate.
         Returns:
          Nothing.
         """
@@ -4296,11 +5080,13 @@ class PyCdlib:
             raise pycdlibexception.PyCdlibInvalidInput('This object is not initialized; call either open() or new() to create an ISO')
 
         with open(filename, 'wb') as fp:
-            self._write_fp(fp, blocksize, progress_cb, progress_opaque)
+            with self._io_operation('write'):
+                self._write_fp(fp, blocksize, progress_cb, progress_opaque,
+                               progress_bytes, progress_interval)
 
     def write_fp(self, outfp, blocksize=32768, progress_cb=None,
-                 progress_opaque=None):
-        # type: (BinaryIO, int, Optional[Callable[[int, int, Any], None]], Optional[Any]) -> None
+                 progress_opaque=None, progress_bytes=0, progress_interval=0.0):
+        # type: (BinaryIO, int, Optional[Callable[..., None]], Optional[Any], int, float) -> None
         """
         Write a properly formatted ISO out to the file object passed in.  This
         also goes by the name of 'mastering'.
@@ -4310,20 +5096,33 @@ class PyCdlib:
          blocksize - The blocksize to use when copying data; the default is 32768.
          progress_cb - If not None, a function to call as the write call does its
                        work.  The callback function must have a signature of:
-                       def func(done, total, opaque).
+                       def func(done, total), def func(done, total, opaque),
+                       or def func(done, total, opaque, info), where info is
+                       a pycdlib.stats.WriteProgress object with the current
+                       phase, throughput, and estimated time remaining.  The
+                       callback is always called once at the start and once
+                       at the end with done equal to total.
          progress_opaque - User data to be passed to the progress callback; the
                            default is None.
+         progress_bytes - The minimum number of bytes that must be written
+                          between calls to the progress callback; the default
+                          is 0, which calls it for every piece of work.
+         progress_interval - The minimum number of seconds that must pass
+                             between calls to the progress callback; the
+                             default is 0.0, which does not limit the rate.
         Returns:
          Nothing.
         """
         if not self._initialized:
             raise pycdlibexception.PyCdlibInvalidInput('This object is not initialized; call either open() or new() to create an ISO')
 
-        self._write_fp(outfp, blocksize, progress_cb, progress_opaque)
+        with self._io_operation('write'):
+            self._write_fp(outfp, blocksize, progress_cb, progress_opaque,
+                           progress_bytes, progress_interval)
 
     def add_fp(self, fp, length, iso_path=None, rr_name=None, joliet_path=None,
-               file_mode=None, udf_path=None):
-        # type: (BinaryIO, int, Optional[str], Optional[str], Optional[str], Optional[int], Optional[str]) -> None
+               file_mode=None, udf_path=None, zisofs=False):
+        # type: (BinaryIO, int, Optional[str], Optional[str], Optional[str], Optional[int], Optional[str], bool) -> None
         """
         Add a file to the ISO.  If the ISO is a Rock Ridge one, then a Rock
         Ridge name must also be provided.  If the ISO is a Joliet one, then a
@@ -4343,6 +5142,12 @@ class PyCdlib:
                      applies if this is a Rock Ridge ISO.  If this is None (the
                      default), the permissions from the original file are used.
          udf_path - The UDF name of the file destination on the ISO.
+         zisofs - Whether to store the data zisofs-compressed, with a Rock Ridge
+                  ZF entry so that readers (such as Linux) transparently
+                  decompress it.  This is only allowed on Rock Ridge ISOs, and
+                  only for an ISO9660 path, since Joliet and UDF have no way to
+                  mark the data as compressed.  The data is compressed right
+                  away into a temporary file, so 'fp' need not remain open.
         Returns:
          Nothing.
         """
@@ -4352,8 +5157,30 @@ class PyCdlib:
         if not utils.file_object_supports_binary(fp):
             raise pycdlibexception.PyCdlibInvalidInput('The fp argument must be in binary mode')
 
-        num_bytes_to_add = self._add_fp(fp, length, False, iso_path, rr_name,
-                                        joliet_path, udf_path, file_mode, False)
+        if zisofs:
+            if not self.rock_ridge:
+                raise pycdlibexception.PyCdlibInvalidInput('zisofs compression can only be used on Rock Ridge ISOs')
+            if iso_path is None or joliet_path is not None or udf_path is not None:
+                raise pycdlibexception.PyCdlibInvalidInput('zisofs compression can only be used with an iso_path')
+            if length > zisofsmod.MAX_SIZE:
+                raise pycdlibexception.PyCdlibInvalidInput('zisofs can only compress files smaller than 4GiB')
+
+            compfp = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)  # pylint: disable=consider-using-with
+            fp.seek(0)
+            complen = zisofsmod.compress_fp(fp, length, compfp)
+            if file_mode is None:
+                # The temporary file has no useful mode, so take it from the
+                # original file if we can.
+                try:
+                    file_mode = os.fstat(fp.fileno()).st_mode
+                except (AttributeError, OSError, io.UnsupportedOperation):
+                    file_mode = 0o0100444
+            num_bytes_to_add = self._add_fp(compfp, complen, False, iso_path,  # type: ignore
+                                            rr_name, None, None, file_mode,
+                                            False, (length, zisofsmod.DEFAULT_LOG2_BLOCK_SIZE))
+        else:
+            num_bytes_to_add = self._add_fp(fp, length, False, iso_path, rr_name,
+                                            joliet_path, udf_path, file_mode, False)
 
         self._finish_add(0, num_bytes_to_add)
 
@@ -4387,6 +5214,329 @@ class PyCdlib:
 
         self._finish_add(0, num_bytes_to_add)
 
+    def _add_tar_directory(self, relpath, mode, dirs, allocator,
+                           joliet_allocator):
+        # type: (str, Optional[int], Dict[str, Tuple[str, str]], _ISO9660NameAllocator, Optional[_JolietNameAllocator]) -> Tuple[str, str]
+        """
+        An internal method to make sure that a directory from a tar archive
+        exists on the ISO, adding it (and any missing parents) if needed.
+
+        Parameters:
+         relpath - The path of the directory in the archive.
+         mode - The POSIX permissions of the directory, or None for the
+                default.
+         dirs - A map from archive directory paths to the ISO9660 and Joliet
+                paths of the directories added so far.
+         allocator - The _ISO9660NameAllocator to pick ISO9660 names with.
+         joliet_allocator - The _JolietNameAllocator to pick Joliet names
+                            with, or None if this is not a Joliet ISO.
+        Returns:
+         A tuple of the ISO9660 and Joliet paths of the directory (the latter
+         is empty if this is not a Joliet ISO).
+        """
+        if relpath in dirs:
+            return dirs[relpath]
+
+        (parent_rel, sep_unused, name) = relpath.rpartition('/')
+        (parent_iso, parent_joliet) = self._add_tar_directory(parent_rel, None,
+                                                              dirs, allocator,
+                                                              joliet_allocator)
+        (iso_path, existing) = allocator.allocate(parent_iso, name, True)
+        joliet_path = ''
+        if joliet_allocator is not None:
+            joliet_path = joliet_allocator.allocate(parent_joliet, name,
+                                                    existing)
+        if not existing:
+            file_mode = None
+            if self.rock_ridge and mode is not None:
+                file_mode = stat.S_IFDIR | mode
+            self.add_directory(iso_path,
+                               rr_name=name if self.rock_ridge else None,
+                               joliet_path=joliet_path if joliet_allocator is not None else None,
+                               file_mode=file_mode,
+                               udf_path='/' + relpath if self.udf_root is not None else None)
+
+        dirs[relpath] = (iso_path, joliet_path)
+        return dirs[relpath]
+
+    def add_from_tar(self, tar):
+        # type: (Union[str, tarfile.TarFile]) -> None
+        """
+        Add the contents of an uncompressed tar archive to the root of the ISO,
+        without extracting it.  The archive is scanned once, and the new files
+        refer to the data of the archive members in place, so that the data is
+        copied straight out of the archive when the ISO is written.  Names are
+        mangled to fit the ISO9660 interchange level (and made unique), while
+        the original names are used for Rock Ridge, Joliet (truncated to 64
+        bytes, and made unique), and UDF.  Directories, regular files,
+        symlinks, and hard links are added, with their modes if this is a Rock
+        Ridge ISO; symlinks are skipped unless the ISO has Rock Ridge or UDF,
+        and other kinds of members (such as devices) are skipped.  Directories
+        that already exist on the ISO are merged with those of the same name in
+        the archive.
+
+        Parameters:
+         tar - The filename of the tar archive, or a tarfile.TarFile opened for
+               reading on an uncompressed, seekable file.  If a TarFile is
+               passed, the caller must ensure that its file remains open for
+               the lifetime of the PyCdlib object, just as with add_fp().
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This object is not initialized; call either open() or new() to create an ISO')
+
+        if isinstance(tar, str):
+            # Open the archive by name for each read, just like add_file().
+            data_fp = tar  # type: Union[str, BinaryIO]
+            manage_fp = True
+            tarobj = tarfile.open(tar, 'r:')  # pylint: disable=consider-using-with
+        else:
+            # The data offsets of the members are offsets into the file object
+            # the archive was opened on, so that has to be the raw archive.
+            # Compressed archives are read through a decompressing object from
+            # the compression module, and streams through a tarfile internal
+            # object; neither can be used.
+            fileobj = tar.fileobj  # type: Any
+            if fileobj is None or type(fileobj).__module__ in ('gzip', 'bz2', 'lzma', 'tarfile') or \
+               type(fileobj).__module__.startswith('compression'):
+                raise pycdlibexception.PyCdlibInvalidInput('Only uncompressed, seekable tar archives can be added')
+            data_fp = fileobj
+            manage_fp = False
+            tarobj = tar
+
+        rr = self.rock_ridge
+        joliet = self.joliet_vd is not None
+        udf = self.udf_root is not None
+        allocator = _ISO9660NameAllocator(self, self.interchange_level)
+        joliet_allocator = None
+        if joliet:
+            joliet_allocator = _JolietNameAllocator(self)
+        dirs = {'': ('/', '/')}  # type: Dict[str, Tuple[str, str]]
+        files = {}  # type: Dict[str, str]
+
+        try:
+            for member in tarobj:
+                relpath = _tar_member_path(member.name)
+                if relpath == '':
+                    continue
+
+                if member.isdir():
+                    self._add_tar_directory(relpath, member.mode & 0o7777,
+                                            dirs, allocator, joliet_allocator)
+                    continue
+
+                if not member.isfile() and not member.issym() and not member.islnk():
+                    continue
+                if member.issym() and not rr and not udf:
+                    continue
+
+                if relpath in files or relpath in dirs:
+                    raise pycdlibexception.PyCdlibInvalidInput('Tar archive member %s appears more than once' % (member.name))
+
+                (parent_rel, sep_unused, name) = relpath.rpartition('/')
+                (parent_iso, parent_joliet) = self._add_tar_directory(parent_rel,
+                                                                      None,
+                                                                      dirs,
+                                                                      allocator,
+                                                                      joliet_allocator)
+                (iso_path, existing_unused) = allocator.allocate(parent_iso, name, False)
+                joliet_path = None
+                if joliet_allocator is not None:
+                    joliet_path = joliet_allocator.allocate(parent_joliet, name,
+                                                            False)
+                udf_path = None
+                if udf:
+                    udf_path = '/' + relpath
+                rr_name = None
+                if rr:
+                    rr_name = name
+
+                if member.issym():
+                    self.add_symlink(symlink_path=iso_path if rr else None,
+                                     rr_symlink_name=rr_name,
+                                     rr_path=member.linkname if rr else None,
+                                     joliet_path=joliet_path,
+                                     udf_symlink_path=udf_path,
+                                     udf_target=member.linkname if udf else None)
+                elif member.islnk():
+                    target = _tar_member_path(member.linkname)
+                    if target not in files:
+                        raise pycdlibexception.PyCdlibInvalidInput('Tar archive member %s links to %s, which is not an earlier regular file' % (member.name, member.linkname))
+                    self.add_hard_link(iso_old_path=files[target],
+                                       iso_new_path=iso_path, rr_name=rr_name)
+                    if joliet_path is not None:
+                        self.add_hard_link(iso_old_path=files[target],
+                                           joliet_new_path=joliet_path)
+                    if udf_path is not None:
+                        self.add_hard_link(iso_old_path=files[target],
+                                           udf_new_path=udf_path)
+                    files[relpath] = iso_path
+                else:
+                    if member.issparse():
+                        raise pycdlibexception.PyCdlibInvalidInput('Sparse tar archive members (such as %s) are not supported' % (member.name))
+                    file_mode = None
+                    if rr:
+                        file_mode = stat.S_IFREG | (member.mode & 0o7777)
+                    num_bytes_to_add = self._add_fp(data_fp, member.size,
+                                                    manage_fp, iso_path,
+                                                    rr_name, joliet_path,
+                                                    udf_path, file_mode, False,
+                                                    None, member.offset_data)
+                    self._finish_add(0, num_bytes_to_add)
+                    files[relpath] = iso_path
+        finally:
+            if isinstance(tar, str):
+                tarobj.close()
+
+    def add_tree(self, local_dir, iso_path='/', rr=True, joliet='/', udf='/'):
+        # type: (str, str, bool, Optional[str], Optional[str]) -> None
+        """
+        Add the contents of a directory on the local filesystem (recursively)
+        to the ISO.  Each directory is scanned once with os.scandir(), and its
+        entries are added in sorted order.  Names are mangled to fit the
+        ISO9660 interchange level (and made unique within each directory),
+        while the original names are used for Rock Ridge, Joliet (truncated to
+        64 bytes, and made unique), and UDF.  Directories, regular files, and
+        symlinks are added, with their modes if this is a Rock Ridge ISO; files
+        that are hard links to each other share their data on the ISO.
+        Symlinks are not followed, and are skipped unless the ISO has Rock
+        Ridge or UDF; other kinds of files (such as devices) are skipped.
+        Directories that already exist on the ISO are merged with those of the
+        same name in the tree.  As with add_file(), the data of the files is
+        not read until the ISO is written.
+
+        Parameters:
+         local_dir - The directory on the local filesystem to add.
+         iso_path - The ISO9660 path of the directory to add the contents to.
+         rr - Whether to add Rock Ridge names (ignored if the ISO is not a Rock
+              Ridge one).
+         joliet - The Joliet path of the directory to add the contents to, or
+                  None to leave them out of Joliet (ignored if the ISO is not a
+                  Joliet one).
+         udf - The UDF path of the directory to add the contents to, or None
+               to leave them out of UDF (ignored if the ISO is not a UDF one).
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This object is not initialized; call either open() or new() to create an ISO')
+
+        if not os.path.isdir(local_dir):
+            raise pycdlibexception.PyCdlibInvalidInput('%s is not a directory' % (local_dir))
+
+        use_rr = bool(self.rock_ridge) and rr
+        if self.joliet_vd is None:
+            joliet = None
+        if self.udf_root is None:
+            udf = None
+
+        top = self._find_iso_record(utils.normpath(iso_path))
+        if not top.is_dir():
+            raise pycdlibexception.PyCdlibInvalidInput('%s is not a directory on the ISO' % (iso_path))
+
+        allocator = _ISO9660NameAllocator(self, self.interchange_level)
+        joliet_allocator = _JolietNameAllocator(self)
+        # Maps (st_dev, st_ino) of files with more than one link to the
+        # ISO9660 path they were first added at.
+        links = {}  # type: Dict[Tuple[int, int], str]
+        # The space for all of the new entries is accounted for at once at the
+        # end; each entry takes whole extents, so the sizes are rounded up.
+        num_bytes_to_add = 0
+
+        dirs = collections.deque([(local_dir, iso_path, joliet, udf)])  # type: Deque[Tuple[str, str, Optional[str], Optional[str]]]
+        # The new files are added to each directory in one go once all of its
+        # entries have been seen, rather than one at a time.
+        self._pending_children = {}
+        try:
+            while dirs:
+                (localpath, parent_iso, parent_joliet, parent_udf) = dirs.popleft()
+                with os.scandir(localpath) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+
+                for entry in entries:
+                    name = entry.name
+                    st = entry.stat(follow_symlinks=False)
+                    is_dir = stat.S_ISDIR(st.st_mode)
+                    is_link = stat.S_ISLNK(st.st_mode)
+                    if not is_dir and not is_link and not stat.S_ISREG(st.st_mode):
+                        continue
+                    if is_link and not use_rr and udf is None:
+                        continue
+
+                    (entry_iso, existing) = allocator.allocate(parent_iso, name, is_dir)
+                    rr_name = name if use_rr else None
+                    joliet_path = None
+                    if parent_joliet is not None:
+                        joliet_path = joliet_allocator.allocate(parent_joliet,
+                                                                name,
+                                                                is_dir and existing)
+                    udf_path = None
+                    if parent_udf is not None:
+                        udf_path = parent_udf.rstrip('/') + '/' + name
+
+                    if is_dir:
+                        if not existing:
+                            file_mode = 0o040555
+                            if use_rr:
+                                file_mode = stat.S_IFDIR | (st.st_mode & 0o7777)
+                            num_bytes = self._add_dir(entry_iso, rr_name,
+                                                      joliet_path, file_mode,
+                                                      udf_path)
+                            num_bytes_to_add += utils.ceiling_div(num_bytes, self.logical_block_size) * self.logical_block_size
+                            allocator.new_directory(entry_iso)
+                            if joliet_path is not None:
+                                joliet_allocator.new_directory(joliet_path)
+                        dirs.append((entry.path, entry_iso, joliet_path, udf_path))
+                    elif is_link:
+                        # add_symlink() does its own accounting, so flush ours
+                        # first.
+                        num_bytes_to_add += self._add_pending_children()
+                        self._finish_add(0, num_bytes_to_add)
+                        num_bytes_to_add = 0
+                        target = os.readlink(entry.path)
+                        self.add_symlink(symlink_path=entry_iso if use_rr else None,
+                                         rr_symlink_name=rr_name,
+                                         rr_path=target if use_rr else None,
+                                         joliet_path=joliet_path,
+                                         udf_symlink_path=udf_path,
+                                         udf_target=target if udf_path is not None else None)
+                    elif st.st_nlink > 1 and (st.st_dev, st.st_ino) in links:
+                        # The file being linked to may not have been added to
+                        # its directory yet.
+                        num_bytes_to_add += self._add_pending_children()
+                        self._finish_add(0, num_bytes_to_add)
+                        num_bytes_to_add = 0
+                        old_path = links[(st.st_dev, st.st_ino)]
+                        self.add_hard_link(iso_old_path=old_path,
+                                           iso_new_path=entry_iso, rr_name=rr_name)
+                        if joliet_path is not None:
+                            self.add_hard_link(iso_old_path=old_path,
+                                               joliet_new_path=joliet_path)
+                        if udf_path is not None:
+                            self.add_hard_link(iso_old_path=old_path,
+                                               udf_new_path=udf_path)
+                    else:
+                        file_mode = None
+                        if use_rr:
+                            file_mode = stat.S_IFREG | (st.st_mode & 0o7777)
+                        num_bytes = self._add_fp(entry.path, st.st_size, True,
+                                                 entry_iso, rr_name, joliet_path,
+                                                 udf_path, file_mode, False)
+                        num_bytes_to_add += utils.ceiling_div(num_bytes, self.logical_block_size) * self.logical_block_size
+                        if st.st_nlink > 1:
+                            links[(st.st_dev, st.st_ino)] = entry_iso
+
+                num_bytes_to_add += self._add_pending_children()
+        finally:
+            # Whatever was added before a failure must still be accounted for,
+            # or its records would be left without extents.
+            try:
+                num_bytes_to_add += self._add_pending_children()
+            finally:
+                self._pending_children = None
+                self._finish_add(0, num_bytes_to_add)
+
     def modify_file_in_place(self, fp, length, iso_path, rr_name=None,  # pylint: disable=unused-argument
                              joliet_path=None, udf_path=None):          # pylint: disable=unused-argument
         # type: (BinaryIO, int, str, Optional[str], Optional[str], Optional[str]) -> None
@@ -4483,40 +5633,20 @@ class PyCdlib:
             utils.copy_data(data_len, self.logical_block_size, data_fp, self._cdfp)
             utils.zero_pad(self._cdfp, data_len, self.logical_block_size)
 
-        # Finally write out the directory record entry.
-        # This is a little tricky because of what things mean.  First of all,
-        # child.extents_to_here represents the total number of extents up to
-        # this child in the parent.  Thus, to get the absolute extent offset,
-        # we start with the parent's extent location, add on the number of
-        # extents to here, and remove 1 (since our offset will be zero-based).
-        # Second, child.offset_to_here is the *last* byte that the child uses,
-        # so to get the start of it we subtract off the length of the child.
-        # Then we can multiply the extent location by the logical block size,
-        # add on the offset, and get to the absolute location in the file.
-        first_joliet = True
+        # Finally write out the directory record entries.
         for record, is_pvd_unused in child.inode.linked_records:
             if isinstance(record, dr.DirectoryRecord):
-                if self.joliet_vd is not None and id(record.vd) == id(self.joliet_vd) and first_joliet:
-                    first_joliet = False
+                if self.joliet_vd is not None and id(record.vd) == id(self.joliet_vd):
                     self.joliet_vd.remove_from_space_size(record.get_data_length())
                     self.joliet_vd.add_to_space_size(length)
-                if record.parent is None:
-                    raise pycdlibexception.PyCdlibInternalError('Modifying file with empty parent')
-                abs_extent_loc = record.parent.extent_location() + record.extents_to_here - 1
-                offset = record.offset_to_here - record.dr_len
-                abs_offset = abs_extent_loc * self.logical_block_size + offset
-            elif isinstance(record, udfmod.UDFFileEntry):
-                abs_offset = record.extent_location() * self.logical_block_size
-            else:
-                # This should never happen
-                raise pycdlibexception.PyCdlibInternalError('Invalid record type')
+                    break
 
-            record.set_data_length(length)
+        for abs_offset, rec in self._update_linked_records_length(child.inode, length):
             self._cdfp.seek(abs_offset)
-            self._cdfp.write(record.record())
+            self._cdfp.write(rec)
 
     def add_hard_link(self, **kwargs):
-        # type: (str) -> None
+        # type: (Optional[str]) -> None
         """
         Add a hard link to the ISO.  Hard links are alternate names for the
         same file contents that don't take up any additional space on the the
@@ -4594,11 +5724,17 @@ class PyCdlib:
 
         old_rec = dr.DirectoryRecord()  # type: Union[dr.DirectoryRecord, udfmod.UDFFileEntry]
         fmode = 0
+        zisofs = None
         if iso_old_path is not None:
             # A link from a file on the ISO9660 filesystem...
             old_rec = self._find_iso_record(iso_old_path)
             if old_rec.rock_ridge is not None:
                 fmode = old_rec.rock_ridge.get_file_mode()
+                # A new ISO9660 name for zisofs-compressed data has to be
+                # marked as compressed as well.
+                zf = old_rec.rock_ridge.zisofs_record()
+                if zf is not None:
+                    zisofs = (zf.uncompressed_size, zf.log2_block_size)
         elif joliet_old_path is not None:
             # A link from a file on the Joliet filesystem...
             old_rec = self._find_joliet_record(joliet_old_path)
@@ -4619,7 +5755,7 @@ class PyCdlib:
         num_bytes_to_add = self._add_hard_link_to_inode(old_rec.inode,
                                                         old_rec.get_data_length(),
                                                         fmode, boot_catalog_old,
-                                                        **kwargs)
+                                                        zisofs, **kwargs)
 
         self._finish_add(0, num_bytes_to_add)
 
@@ -4719,6 +5855,27 @@ class PyCdlib:
         if file_mode is None:
             file_mode = 0o040555
 
+        num_bytes_to_add = self._add_dir(iso_path, rr_name, joliet_path,
+                                         file_mode, udf_path)
+
+        self._finish_add(0, num_bytes_to_add)
+
+    def _add_dir(self, iso_path, rr_name, joliet_path, file_mode, udf_path):
+        # type: (Optional[str], Optional[str], Optional[str], int, Optional[str]) -> int
+        """
+        An internal method to add a directory to the ISO.  The caller is
+        responsible for calling _finish_add() with the number of bytes this
+        returns.
+
+        Parameters:
+         iso_path - The ISO9660 absolute path to use for the directory.
+         rr_name - The Rock Ridge name to use for the directory.
+         joliet_path - The Joliet absolute path to use for the directory.
+         file_mode - The POSIX file mode to use for the directory.
+         udf_path - The UDF absolute path to use for the directory.
+        Returns:
+         The number of additional bytes needed on the ISO to fit this directory.
+        """
         num_bytes_to_add = 0
         if iso_path is not None:
             iso_path_bytes = utils.normpath(iso_path)
@@ -4842,7 +5999,7 @@ class PyCdlib:
             if self.udf_logical_volume_integrity is not None:
                 self.udf_logical_volume_integrity.logical_volume_impl_use.num_dirs += 1
 
-        self._finish_add(0, num_bytes_to_add)
+        return num_bytes_to_add
 
     def add_joliet_directory(self, joliet_path):
         # type: (str) -> None
@@ -5111,9 +6268,8 @@ class PyCdlib:
         if boot_info_table:
             orig_len = boot_dirrecord.get_data_length()
             bi_table = eltorito.EltoritoBootInfoTable()
-            with inode.InodeOpenData(boot_dirrecord.inode, self.logical_block_size) as (data_fp, data_len):
-                bi_table.new(self.pvd, boot_dirrecord.inode, orig_len,
-                             self._calculate_eltorito_boot_info_table_csum(data_fp, data_len))
+            # The checksum is calculated when the boot file is written out.
+            bi_table.new(self.pvd, boot_dirrecord.inode, orig_len, None)
 
             boot_dirrecord.inode.add_boot_info_table(bi_table)
 
@@ -5218,7 +6374,7 @@ class PyCdlib:
 
         for entry in entries_to_remove:
             if entry.inode is not None:
-                new_list = []
+                new_list = inode.LinkedRecords()
                 for linkrec, is_pvd in entry.inode.linked_records:
                     if id(linkrec) != id(entry):
                         new_list.append((linkrec, is_pvd))
@@ -5542,13 +6698,14 @@ class PyCdlib:
         if num_paths != 1:
             raise pycdlibexception.PyCdlibInvalidInput("Must specify one, and only one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path'")
 
-        if 'joliet_path' in kwargs:
-            return self._get_joliet_entry(self._normalize_joliet_path(kwargs['joliet_path']))
-        if 'rr_path' in kwargs:
-            return self._get_rr_entry(utils.normpath(kwargs['rr_path']))
-        if 'udf_path' in kwargs:
-            return self._get_udf_entry(kwargs['udf_path'])
-        return self._get_iso_entry(utils.normpath(kwargs['iso_path']))
+        with self._io_operation('lookup'):
+            if 'joliet_path' in kwargs:
+                return self._get_joliet_entry(self._normalize_joliet_path(kwargs['joliet_path']))
+            if 'rr_path' in kwargs:
+                return self._get_rr_entry(utils.normpath(kwargs['rr_path']))
+            if 'udf_path' in kwargs:
+                return self._get_udf_entry(kwargs['udf_path'])
+            return self._get_iso_entry(utils.normpath(kwargs['iso_path']))
 
     def add_isohybrid(self, part_entry=1, mbr_id=None, part_offset=0,
                       geometry_sectors=32, geometry_heads=64, part_type=None,
@@ -5806,6 +6963,161 @@ class PyCdlib:
 
         self._reshuffle_extents()
 
+    def set_sort_weight(self, weight, iso_path=None, rr_path=None,
+                        joliet_path=None, udf_path=None):
+        # type: (int, Optional[str], Optional[str], Optional[str], Optional[str]) -> None
+        """
+        Set the sort weight of a file, which controls where its data is placed
+        on the ISO (like the -sort option of genisoimage).  Files with a higher
+        weight have their data placed before files with a lower weight; files
+        with the same weight (by default, 0) are placed in the order they are
+        found when walking the directories.  The weight belongs to the data of
+        the file, so it applies to all of the hard links to it.  Exactly one of
+        iso_path, rr_path, joliet_path, or udf_path must be specified.
+
+        Parameters:
+         weight - The sort weight for the file.
+         iso_path - The path on the ISO of the file.
+         rr_path - The Rock Ridge path on the ISO of the file.
+         joliet_path - The Joliet path on the ISO of the file.
+         udf_path - The UDF path on the ISO of the file.
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This object is not initialized; call either open() or new() to create an ISO')
+
+        if len([x for x in (iso_path, rr_path, joliet_path, udf_path) if x is not None]) != 1:
+            raise pycdlibexception.PyCdlibInvalidInput("Must specify one, and only one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path'")
+
+        rec = None  # type: Optional[Union[dr.DirectoryRecord, udfmod.UDFFileEntry]]
+        if iso_path is not None:
+            rec = self._find_iso_record(utils.normpath(iso_path))
+        elif rr_path is not None:
+            rec = self._find_rr_record(utils.normpath(rr_path))
+        elif joliet_path is not None:
+            rec = self._find_joliet_record(self._normalize_joliet_path(joliet_path))
+        elif udf_path is not None:
+            if self.udf_root is None:
+                raise pycdlibexception.PyCdlibInvalidInput('Can only specify a UDF path for a UDF ISO')
+            (ident_unused, rec) = self._find_udf_record(utils.normpath(udf_path))
+
+        if rec is None or rec.inode is None:
+            raise pycdlibexception.PyCdlibInvalidInput('Can only set the sort weight of a file with data')
+
+        self._set_inode_sort_weight(rec.inode, weight)
+
+        if self._always_consistent:
+            self._reshuffle_extents()
+        else:
+            self._needs_reshuffle = True
+
+    def set_sort_weights(self, weight_cb, path_type='iso_path'):
+        # type: (Callable[[str], Optional[int]], str) -> None
+        """
+        Set the sort weights (see set_sort_weight()) of many files at once.
+        All of the files in the given namespace are walked, and weight_cb is
+        called with the absolute path of each of them; it should return the
+        sort weight for the file, or None to leave it alone.
+
+        Parameters:
+         weight_cb - The function to call for each file.
+         path_type - The namespace to walk; one of 'iso_path', 'rr_path',
+                     'joliet_path', or 'udf_path'.
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This object is not initialized; call either open() or new() to create an ISO')
+
+        if path_type not in ('iso_path', 'rr_path', 'joliet_path', 'udf_path'):
+            raise pycdlibexception.PyCdlibInvalidInput("The path type must be one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path'")
+
+        dirs = collections.deque(['/'])
+        while dirs:
+            dirpath = dirs.popleft()
+            for child in self.list_children(**{path_type: dirpath}):
+                if child is None or child.is_dot() or child.is_dotdot():
+                    continue
+
+                if isinstance(child, udfmod.UDFFileEntry):
+                    encoding = 'utf-8'
+                    if child.file_ident is not None:
+                        encoding = child.file_ident.encoding
+                    name = child.file_identifier().decode(encoding)
+                elif path_type == 'rr_path':
+                    name = child.rock_ridge.name().decode('utf-8')  # type: ignore
+                elif path_type == 'joliet_path':
+                    name = child.file_identifier().decode('utf-16_be')
+                else:
+                    name = child.file_identifier().decode('utf-8')
+
+                path = dirpath.rstrip('/') + '/' + name
+                if child.is_dir():
+                    dirs.append(path)
+                elif child.inode is not None:
+                    weight = weight_cb(path)
+                    if weight is not None:
+                        self._set_inode_sort_weight(child.inode, weight)
+
+        if self._always_consistent:
+            self._reshuffle_extents()
+        else:
+            self._needs_reshuffle = True
+
+    def _set_inode_sort_weight(self, ino, weight):
+        # type: (inode.Inode, int) -> None
+        """
+        An internal method to set the sort weight of an Inode.
+
+        Parameters:
+         ino - The Inode to set the sort weight of.
+         weight - The sort weight.
+        Returns:
+         Nothing.
+        """
+        if not isinstance(weight, int):
+            raise pycdlibexception.PyCdlibInvalidInput('The sort weight must be an integer')
+
+        ino.sort_weight = weight
+
+    def set_data_alignment(self, alignment, min_size=0):
+        # type: (int, int) -> None
+        """
+        Set the alignment of file data on the ISO.  Normally the data of each
+        file starts at the next free logical block; with this set, the data of
+        every file of at least min_size bytes starts at a multiple of
+        alignment bytes from the start of the ISO instead.  This keeps large
+        files aligned to the pages or chunks of the storage the ISO is served
+        from, at the cost of some unused space between files.  The space used
+        for the alignment is accounted for in the size of the ISO (and of the
+        UDF partition).
+
+        Parameters:
+         alignment - The alignment in bytes; must be a power of two.  An
+                     alignment of the logical block size (or less) turns
+                     alignment off.
+         min_size - The size in bytes a file must be to be aligned.
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This object is not initialized; call either open() or new() to create an ISO')
+
+        if alignment <= 0 or alignment & (alignment - 1) != 0:
+            raise pycdlibexception.PyCdlibInvalidInput('The data alignment must be a power of two')
+
+        if min_size < 0:
+            raise pycdlibexception.PyCdlibInvalidInput('The minimum size for data alignment cannot be negative')
+
+        self._data_alignment = alignment
+        self._data_alignment_min_size = min_size
+
+        if self._always_consistent:
+            self._reshuffle_extents()
+        else:
+            self._needs_reshuffle = True
+
     def set_relocated_name(self, name, rr_name):
         # type: (str, str) -> None
         """
@@ -5940,7 +7252,7 @@ class PyCdlib:
                 dirs.appendleft(dirdict[name])
 
     def open_file_from_iso(self, **kwargs):
-        # type: (str) -> pycdlibio.PyCdlibIO
+        # type: (str) -> Union[pycdlibio.PyCdlibIO, zisofsmod.ZisofsIO]
         """
         Open a file for reading in a context manager.  This allows the user to
         operate on the file in user-defined chunks (utilizing the read() method
@@ -5952,7 +7264,8 @@ class PyCdlib:
          joliet_path - The absolute Joliet path to the file on the ISO.
          udf_path - The absolute UDF path to the file on the ISO.
         Returns:
-         A PyCdlibIO object allowing access to the file.
+         A PyCdlibIO object allowing access to the file, or a ZisofsIO object
+         that decompresses it if the file is zisofs-compressed.
         """
         if not self._initialized:
             raise pycdlibexception.PyCdlibInvalidInput('This object is not initialized; call either open() or new() to create an ISO')
@@ -5991,6 +7304,11 @@ class PyCdlib:
         if rec.inode is None:
             raise pycdlibexception.PyCdlibInvalidInput('File has no data')
 
+        if isinstance(rec, dr.DirectoryRecord) and rec.rock_ridge is not None:
+            zf = rec.rock_ridge.zisofs_record()
+            if zf is not None:
+                return zisofsmod.ZisofsIO(pycdlibio.PyCdlibIO(rec.inode, self.logical_block_size), zf)
+
         return pycdlibio.PyCdlibIO(rec.inode, self.logical_block_size)
 
     def has_rock_ridge(self):
@@ -0,0 +1,759 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""
+Support for reading very large ISOs without keeping the whole directory tree
+in memory.
+"""
+
+import collections
+import os
+
+from pycdlib import ciso
+from pycdlib import dr
+from pycdlib import inode
+from pycdlib import path_table_record
+from pycdlib import pycdlib
+from pycdlib import pycdlibexception
+from pycdlib import pycdlibio
+from pycdlib import utils
+from pycdlib import zisofs
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import BinaryIO, Dict, Generator, List, Optional, Tuple, Union  # NOQA pylint: disable=unused-import
+    # NOTE: these imports have to be here to avoid circular deps
+    from pycdlib import blockcache  # NOQA pylint: disable=unused-import
+    from pycdlib import headervd  # NOQA pylint: disable=unused-import
+
+
+class _Volume:
+    """
+    An internal class to hold the parts of a volume descriptor that are kept
+    resident: the index of the path table, and the dot record of the root
+    directory (which carries the Rock Ridge information needed to parse any
+    other directory).
+    """
+    __slots__ = ('vd', 'encoding', 'index', 'root_dot')
+
+    def __init__(self, vd, encoding, ptrs, root_dot):
+        # type: (headervd.PrimaryOrSupplementaryVD, str, List[path_table_record.PathTableRecord], dr.DirectoryRecord) -> None
+        self.vd = vd
+        self.encoding = encoding
+        self.index = path_table_record.PathTableIndex(ptrs)
+        self.root_dot = root_dot
+
+
+def _check_path_kwargs(kwargs, allowed):
+    # type: (Dict[str, str], Tuple[str, ...]) -> str
+    """
+    An internal function to check the path keyword arguments passed to one of
+    the lookup methods.
+
+    Parameters:
+     kwargs - The keyword arguments to check.
+     allowed - The keywords other than the paths that are allowed.
+    Returns:
+     The name of the path keyword that was passed.
+    """
+    path_type = ''
+    num_paths = 0
+    for key, value in kwargs.items():
+        if key in ('joliet_path', 'rr_path', 'iso_path'):
+            if value is not None:
+                num_paths += 1
+                path_type = key
+        elif key == 'udf_path':
+            raise pycdlibexception.PyCdlibInvalidInput('UDF paths are not supported by the read-only reader')
+        elif key not in allowed:
+            raise pycdlibexception.PyCdlibInvalidInput("Invalid keyword, must be one of 'iso_path', 'rr_path', or 'joliet_path'")
+
+    if num_paths != 1:
+        raise pycdlibexception.PyCdlibInvalidInput("Must specify one, and only one of 'iso_path', 'rr_path', or 'joliet_path'")
+
+    return path_type
+
+
+def _parse_volume(iso, vd, encoding):
+    # type: (pycdlib.PyCdlib, headervd.PrimaryOrSupplementaryVD, str) -> _Volume
+    """
+    An internal function to parse the path tables and the root dot record of
+    a volume descriptor.
+
+    Parameters:
+     iso - The PyCdlib object that is parsing the ISO.
+     vd - The volume descriptor to parse.
+     encoding - The encoding of the names on this volume descriptor.
+    Returns:
+     The _Volume object for the volume descriptor.
+    """
+    # pylint: disable=protected-access
+    ptrs, extent_to_ptr_unused = iso._parse_path_table(vd.path_table_size(),
+                                                       vd.path_table_location_le)
+    be_ptrs, be_extent_to_ptr_unused = iso._parse_path_table(vd.path_table_size(),
+                                                             vd.path_table_location_be)
+    for index, ptr in enumerate(ptrs):
+        if not ptr.equal_to_be(be_ptrs[index]):
+            raise pycdlibexception.PyCdlibInvalidISO('Little-endian and big-endian path table records do not agree')
+
+    root = vd.root_directory_record()
+    iso._seek_to_extent(root.extent_location())
+    data = iso._cdfp.read(iso.logical_block_size)
+    # pylint: enable=protected-access
+    if not data or data[0] == 0:
+        raise pycdlibexception.PyCdlibInvalidISO('Invalid directory record')
+    root_dot = dr.DirectoryRecord()
+    root_dot.parse(vd, data[:data[0]], root)
+
+    return _Volume(vd, encoding, ptrs, root_dot)
+
+
+class PyCdlibReadOnly:
+    """
+    A class to look up and read files on an existing ISO while keeping the
+    memory use bounded.  Only the volume descriptors and path tables stay
+    resident; directory extents are read from the ISO when they are needed,
+    and the parsed directories are kept in a least-recently-used cache that
+    is bounded by the total number of Directory Records it holds.  The
+    records returned from this class are read-only views; they cannot be
+    passed back into a PyCdlib object.
+    """
+    __slots__ = ('_initialized', '_iso', '_block_cache', '_managing_fp',
+                 '_iso_size', '_cache_size', '_cache', '_cached_records',
+                 '_pvd', '_joliet', '_rock_ridge', 'cache_hits', 'cache_misses')
+
+    def __init__(self, cache_size=65536, block_cache=None):
+        # type: (int, Optional[blockcache.BlockCache]) -> None
+        """
+        Create a new read-only reader.
+
+        Parameters:
+         cache_size - The maximum number of Directory Records to keep in the
+                      cache of parsed directories.  The most recently used
+                      directory is always kept, even if it alone is larger.
+         block_cache - An optional blockcache.BlockCache to send all of the
+                       reads of the ISO through.
+        Returns:
+         Nothing.
+        """
+        if cache_size < 1:
+            raise pycdlibexception.PyCdlibInvalidInput('The cache size must be a positive number')
+
+        self._initialized = False
+        self._block_cache = block_cache
+        self._iso = pycdlib.PyCdlib(block_cache=block_cache)
+        self._managing_fp = False
+        self._iso_size = 0
+        self._cache_size = cache_size
+        self._cache = collections.OrderedDict()  # type: collections.OrderedDict[int, dr.DirectoryRecord]
+        self._cached_records = 0
+        self._pvd = None  # type: Optional[_Volume]
+        self._joliet = None  # type: Optional[_Volume]
+        self._rock_ridge = False
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def open(self, filename):
+        # type: (str) -> None
+        """
+        Open up an existing ISO for reading.  If the file is a CISO or ZISO
+        block-compressed container, the ISO inside of it is opened.
+
+        Parameters:
+         filename - The filename containing the ISO to open up.
+        Returns:
+         Nothing.
+        """
+        if self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This object already has an ISO; either close it or create a new object')
+
+        fp = open(filename, 'rb')
+        self._managing_fp = True
+        try:
+            fp = ciso.wrap_if_compressed(fp, close_fp=True)
+            self._open_fp(fp)
+        except Exception:
+            fp.close()
+            self._managing_fp = False
+            raise
+
+    def open_fp(self, fp):
+        # type: (BinaryIO) -> None
+        """
+        Open up an existing ISO for reading.  Note that the file object passed
+        in here must stay open for the lifetime of this object, as directory
+        extents and file data are read from it on demand.
+
+        Parameters:
+         fp - The file object containing the ISO to open up.
+        Returns:
+         Nothing.
+        """
+        if self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This object already has an ISO; either close it or create a new object')
+
+        self._open_fp(fp)
+
+    def _open_fp(self, fp):
+        # type: (BinaryIO) -> None
+        """
+        An internal method to parse the volume descriptors and path tables of
+        an ISO.
+
+        Parameters:
+         fp - The file object containing the ISO to open up.
+        Returns:
+         Nothing.
+        """
+        if hasattr(fp, 'mode') and 'b' not in fp.mode:
+            raise pycdlibexception.PyCdlibInvalidInput("The file to open must be in binary mode (add 'b' to the open flags)")
+
+        # Everything is parsed into a new PyCdlib object, and only kept once
+        # parsing has succeeded, so a bad ISO leaves this object untouched.
+        # pylint: disable=protected-access
+        iso = pycdlib.PyCdlib(block_cache=self._block_cache)
+        iso._cdfp = iso._wrap_input(fp)
+        iso._parse_volume_descriptors()
+        iso.logical_block_size = iso.pvd.logical_block_size()
+        for br in iso.brs:
+            iso._check_and_parse_eltorito(br)
+        iso_size = iso._get_iso_size()
+
+        pvd = _parse_volume(iso, iso.pvd, 'utf-8')
+        joliet = None  # type: Optional[_Volume]
+        for svd in iso.svds:
+            if (svd.flags & 0x1) == 0 and svd.escape_sequences[:3] in (b'%/@', b'%/C', b'%/E'):
+                if joliet is not None:
+                    raise pycdlibexception.PyCdlibInvalidISO('Only a single Joliet SVD is supported')
+                iso.joliet_vd = svd
+                joliet = _parse_volume(iso, svd, 'utf-16_be')
+        # pylint: enable=protected-access
+
+        self._iso = iso
+        self._iso_size = iso_size
+        self._pvd = pvd
+        self._joliet = joliet
+        self._rock_ridge = pvd.root_dot.rock_ridge is not None
+        self._initialized = True
+
+    def _parse_directory(self, vol, extent):
+        # type: (_Volume, int) -> dr.DirectoryRecord
+        """
+        An internal method to read and parse all of the Directory Records in a
+        directory extent.  The records are attached to a stand-in for the
+        directory (parsed from its own dot record) rather than to the record
+        in the parent, so that a cached directory never keeps its ancestors
+        alive.
+
+        Parameters:
+         vol - The _Volume that the directory is on.
+         extent - The extent of the directory.
+        Returns:
+         The stand-in Directory Record, with all of the records as children.
+        """
+        # pylint: disable=protected-access
+        iso = self._iso
+        cdfp = iso._cdfp
+        log_block_size = iso.logical_block_size
+        vd = vol.vd
+
+        iso._seek_to_extent(extent)
+        data = cdfp.read(log_block_size)
+        if not data or data[0] == 0:
+            raise pycdlibexception.PyCdlibInvalidISO('Invalid directory record')
+
+        owner = dr.DirectoryRecord()
+        if extent == vd.root_directory_record().extent_location():
+            owner.parse(vd, data[:data[0]], None)
+        else:
+            owner.parse(vd, data[:data[0]], vol.root_dot)
+            # The stand-in takes its name from the path table, since adding
+            # children to it treats RR_MOVED specially.
+            num = vol.index.num_for_extent(extent)
+            if num is not None:
+                owner.file_ident = vol.index.record(num).directory_identifier
+
+        length = owner.get_data_length()
+        if length > len(data):
+            data += cdfp.read(length - len(data))
+
+        boot_catalog_extent = -1
+        if iso.eltorito_boot_catalog is not None:
+            boot_catalog_extent = iso.eltorito_boot_catalog.extent_location()
+
+        offset = 0
+        last_record = None  # type: Optional[dr.DirectoryRecord]
+        while offset < length:
+            if offset > (len(data) - 1):
+                raise pycdlibexception.PyCdlibInvalidISO('Invalid directory record')
+            lenbyte = data[offset]
+            if lenbyte == 0:
+                padsize = log_block_size - (offset % log_block_size)
+                if data[offset:offset + padsize] != b'\x00' * padsize:
+                    raise pycdlibexception.PyCdlibInvalidISO('Invalid padding on ISO')
+                offset += padsize
+                continue
+
+            new_record = dr.DirectoryRecord()
+            new_record.parse(vd, data[offset:offset + lenbyte], owner)
+            offset += lenbyte
+
+            if new_record.rock_ridge is not None and new_record.rock_ridge.dr_entries.ce_record is not None:
+                ce_record = new_record.rock_ridge.dr_entries.ce_record
+                iso._seek_to_extent(ce_record.bl_cont_area)
+                cdfp.seek(ce_record.offset_cont_area, os.SEEK_CUR)
+                con_block = cdfp.read(ce_record.len_cont_area)
+                new_record.rock_ridge.parse(con_block, False,
+                                            new_record.rock_ridge.bytes_to_skip,
+                                            True, new_record.file_identifier())
+
+            if not new_record.is_dir():
+                len_to_use = new_record.get_data_length()
+                extent_to_use = new_record.extent_location()
+                if len_to_use == 0 or new_record.is_symlink():
+                    len_to_use = 0
+                    extent_to_use = 0
+                if extent_to_use != boot_catalog_extent:
+                    if extent_to_use * log_block_size + len_to_use > self._iso_size:
+                        len_to_use = self._iso_size - extent_to_use * log_block_size
+                    ino = inode.Inode()
+                    ino.parse(extent_to_use, len_to_use, cdfp, log_block_size)
+                    new_record.inode = ino
+
+            try:
+                owner.track_child(new_record, log_block_size)
+            except pycdlibexception.PyCdlibInvalidInput:
+                # As when opening with PyCdlib, duplicate names are only
+                # allowed for the extents of a very large file.
+                if new_record.is_dir() or last_record is None or last_record.file_identifier() != new_record.file_identifier():
+                    raise
+                owner.track_child(new_record, log_block_size, True)
+
+            last_record = new_record
+        # pylint: enable=protected-access
+
+        return owner
+
+    def _listing(self, vol, extent):
+        # type: (_Volume, int) -> dr.DirectoryRecord
+        """
+        An internal method to get the parsed directory at an extent, going
+        through the cache.
+
+        Parameters:
+         vol - The _Volume that the directory is on.
+         extent - The extent of the directory.
+        Returns:
+         The stand-in Directory Record for the directory (see
+         _parse_directory).
+        """
+        owner = self._cache.get(extent)
+        if owner is not None:
+            self.cache_hits += 1
+            self._cache.move_to_end(extent)
+            return owner
+
+        self.cache_misses += 1
+        owner = self._parse_directory(vol, extent)
+        self._cache[extent] = owner
+        self._cached_records += len(owner.children)
+        while self._cached_records > self._cache_size and len(self._cache) > 1:
+            old_extent_unused, old = self._cache.popitem(last=False)
+            self._cached_records -= len(old.children)
+
+        return owner
+
+    def _moved_record(self, vol, rec):
+        # type: (_Volume, dr.DirectoryRecord) -> Optional[dr.DirectoryRecord]
+        """
+        An internal method to find the Directory Record that a Rock Ridge
+        child link points to.
+
+        Parameters:
+         vol - The _Volume to look in.
+         rec - The Directory Record with the child link.
+        Returns:
+         The Directory Record of the relocated directory, or None if it could
+         not be found.
+        """
+        if rec.rock_ridge is None:
+            return None
+
+        extent = rec.rock_ridge.child_link_extent()
+        num = vol.index.num_for_extent(extent)
+        if num is None:
+            return None
+        parent_num = vol.index.record(num).parent_directory_num
+        parent = self._listing(vol, vol.index.record(parent_num).extent_location)
+        for child in parent.children[2:]:
+            if child.extent_location() == extent and child.is_dir():
+                return child
+
+        return None
+
+    def _find_child(self, vol, extent, name, rr):
+        # type: (_Volume, int, bytes, bool) -> Optional[dr.DirectoryRecord]
+        """
+        An internal method to find a child by name in a directory.
+
+        Parameters:
+         vol - The _Volume that the directory is on.
+         extent - The extent of the directory.
+         name - The name of the child to look for.
+         rr - Whether the name is a Rock Ridge name.
+        Returns:
+         The Directory Record of the child, or None if it could not be found.
+        """
+        owner = self._listing(vol, extent)
+
+        child = None
+        if rr:
+            thelist = owner.rr_children
+            lo = 0
+            hi = len(thelist)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                rock_ridge = thelist[mid].rock_ridge
+                if rock_ridge is None:
+                    raise pycdlibexception.PyCdlibInvalidInput('Record without Rock Ridge entry on Rock Ridge ISO')
+                if rock_ridge.name() < name:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo != len(thelist):
+                rock_ridge = thelist[lo].rock_ridge
+                if rock_ridge is not None and rock_ridge.name() == name:
+                    child = thelist[lo]
+        else:
+            thelist = owner.children
+            tmpdr = dr.DirectoryRecord()
+            tmpdr.file_ident = name
+            lo = 2
+            hi = len(thelist)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if thelist[mid] < tmpdr:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo != len(thelist) and thelist[lo].file_ident == name:
+                child = thelist[lo]
+
+        if child is not None and child.rock_ridge is not None and child.rock_ridge.child_link_record_exists():
+            child = self._moved_record(vol, child)
+
+        return child
+
+    def _volume_for(self, path_type):
+        # type: (str) -> _Volume
+        """
+        An internal method to get the _Volume to use for a type of path.
+
+        Parameters:
+         path_type - One of 'iso_path', 'rr_path', or 'joliet_path'.
+        Returns:
+         The _Volume to use.
+        """
+        if path_type == 'joliet_path':
+            if self._joliet is None:
+                raise pycdlibexception.PyCdlibInvalidInput('A Joliet path can only be specified for a Joliet ISO')
+            return self._joliet
+
+        if path_type == 'rr_path' and not self._rock_ridge:
+            raise pycdlibexception.PyCdlibInvalidInput('Cannot fetch a rr_path from a non-Rock Ridge ISO')
+
+        if self._pvd is None:
+            raise pycdlibexception.PyCdlibInternalError('Read-only reader has no PVD')
+        return self._pvd
+
+    def _find_record(self, vol, path, rr):
+        # type: (_Volume, bytes, bool) -> dr.DirectoryRecord
+        """
+        An internal method to find the Directory Record for a path.  All of
+        the directories leading up to the last component are looked up in the
+        path table index when possible, so only the directory containing the
+        last component needs to be read, no matter how deep it is.
+
+        Parameters:
+         vol - The _Volume to look in.
+         path - The normalized path to look up.
+         rr - Whether the path is a Rock Ridge path.
+        Returns:
+         The Directory Record for the path.
+        """
+        if path == b'/':
+            return vol.vd.root_directory_record()
+
+        encoding = vol.encoding
+        if rr:
+            encoding = 'utf-8'
+        names = [name.decode('utf-8').encode(encoding) for name in utils.split_path(path)]
+
+        extent = vol.index.record(1).extent_location
+        num = 1  # type: Optional[int]
+        pos = 0
+        while True:
+            if not rr and num is not None:
+                # Rock Ridge names are not in the path table, and directories
+                # that were relocated are not under their original parent, so
+                # anything not found here falls back to reading directories.
+                num, followed = vol.index.resolve(names[pos:-1], num)
+                pos += followed
+                extent = vol.index.record(num).extent_location
+
+            child = self._find_child(vol, extent, names[pos], rr)
+            if child is None:
+                break
+            if pos == len(names) - 1:
+                return child
+            if not child.is_dir():
+                break
+            extent = child.extent_location()
+            num = vol.index.num_for_extent(extent)
+            pos += 1
+
+        raise pycdlibexception.PyCdlibInvalidInput('Could not find path')
+
+    def _lookup(self, path_type, path):
+        # type: (str, str) -> Tuple[_Volume, dr.DirectoryRecord]
+        """
+        An internal method to look up a path of the given type.
+
+        Parameters:
+         path_type - One of 'iso_path', 'rr_path', or 'joliet_path'.
+         path - The path to look up.
+        Returns:
+         A tuple of the _Volume and the Directory Record for the path.
+        """
+        vol = self._volume_for(path_type)
+        return vol, self._find_record(vol, utils.normpath(path), path_type == 'rr_path')
+
+    def _yield_children(self, vol, rec, rr):
+        # type: (_Volume, dr.DirectoryRecord, bool) -> Generator
+        """
+        An internal method to yield all of the children of a directory, the
+        same way that PyCdlib.list_children() does.
+
+        Parameters:
+         vol - The _Volume that the directory is on.
+         rec - The Directory Record of the directory.
+         rr - Whether to follow Rock Ridge relocation entries or not.
+        Yields:
+         Children of the directory.
+        Returns:
+         Nothing.
+        """
+        if not rec.is_dir():
+            raise pycdlibexception.PyCdlibInvalidInput('Record is not a directory!')
+
+        owner = self._listing(vol, rec.extent_location())
+
+        last = b''
+        for child in owner.children:
+            fi = child.file_identifier()
+            if fi == last:
+                continue
+            last = fi
+
+            if rr and child.rock_ridge is not None:
+                # Directories that were relocated into RR_MOVED are shown at
+                # their original location instead.
+                if child.rock_ridge.relocated_record():
+                    continue
+                if child.rock_ridge.child_link_record_exists():
+                    moved = self._moved_record(vol, child)
+                    if moved is not None:
+                        child = moved
+
+            yield child
+
+    def _check_open(self):
+        # type: () -> None
+        """
+        An internal method to make sure that an ISO is open.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This object is not open; call open() first')
+
+    def get_record(self, **kwargs):
+        # type: (str) -> dr.DirectoryRecord
+        """
+        Get the directory record for a particular path.
+
+        Parameters:
+         iso_path - The absolute path on the ISO9660 filesystem to get the
+                    record for.
+         rr_path - The absolute path on the Rock Ridge filesystem to get the
+                   record for.
+         joliet_path - The absolute path on the Joliet filesystem to get the
+                       record for.
+        Returns:
+         A dr.DirectoryRecord object that represents the path.
+        """
+        self._check_open()
+
+        path_type = _check_path_kwargs(kwargs, ())
+        vol_unused, rec = self._lookup(path_type, kwargs[path_type])
+        return rec
+
+    def list_children(self, **kwargs):
+        # type: (str) -> Generator
+        """
+        Generate a list of all of the file/directory objects in the
+        specified location on the ISO.
+
+        Parameters:
+         iso_path - The absolute path on the ISO to list the children for.
+         rr_path - The absolute Rock Ridge path on the ISO to list the children for.
+         joliet_path - The absolute Joliet path on the ISO to list the children for.
+        Yields:
+         Children of this path.
+        Returns:
+         Nothing.
+        """
+        self._check_open()
+
+        path_type = _check_path_kwargs(kwargs, ())
+        vol, rec = self._lookup(path_type, kwargs[path_type])
+        for c in self._yield_children(vol, rec, path_type == 'rr_path'):  # pylint: disable=use-yield-from
+            yield c
+
+    def walk(self, **kwargs):
+        # type: (str) -> Generator
+        """
+        Walk the entries on the ISO, starting at the given path.  One, and only
+        one, of iso_path, rr_path, and joliet_path is allowed.  Similar to
+        os.walk(), yield a 3-tuple of (path-to-here, dirlist, filelist) for
+        each directory level.
+
+        Parameters:
+         iso_path - The absolute ISO path to the starting entry on the ISO.
+         rr_path - The absolute Rock Ridge path to the starting entry on the ISO.
+         joliet_path - The absolute Joliet path to the starting entry on the ISO.
+         encoding - The encoding to use for returned strings.
+        Yields:
+         3-tuples of (path-to-here, dirlist, filelist)
+        Returns:
+         Nothing.
+        """
+        self._check_open()
+
+        path_type = _check_path_kwargs(kwargs, ('encoding',))
+        user_encoding = kwargs.get('encoding')
+        vol, rec = self._lookup(path_type, kwargs[path_type])
+        rr = path_type == 'rr_path'
+        default_encoding = vol.encoding
+        if rr:
+            default_encoding = 'utf-8'
+
+        start = utils.normpath(kwargs[path_type]).decode('utf-8')
+        dirs = collections.deque([(start, rec)])
+        while dirs:
+            relpath, dir_record = dirs.popleft()
+
+            dirlist = []
+            filelist = []
+            dirdict = {}
+
+            for child in reversed(list(self._yield_children(vol, dir_record, rr))):
+                if child.is_dot() or child.is_dotdot():
+                    continue
+
+                encoding = default_encoding
+                if user_encoding is not None:
+                    encoding = user_encoding
+
+                if rr and child.rock_ridge is not None:
+                    name = child.rock_ridge.name()
+                else:
+                    name = child.file_identifier()
+
+                encoded = name.decode(encoding)
+
+                if child.is_dir():
+                    dirlist.append(encoded)
+                    dirdict[encoded] = child
+                else:
+                    filelist.append(encoded)
+
+            yield relpath, dirlist, filelist
+
+            # We allow the user to modify dirlist along the way, so we
+            # add the children to dirs *after* yield returns.
+            for name in dirlist:
+                dirs.appendleft((relpath.rstrip('/') + '/' + name, dirdict[name]))
+
+    def open_file_from_iso(self, **kwargs):
+        # type: (str) -> Union[pycdlibio.PyCdlibIO, zisofs.ZisofsIO]
+        """
+        Open a file for reading in a context manager.  This allows the user to
+        operate on the file in user-defined chunks (utilizing the read() method
+        of the returned context manager).
+
+        Parameters:
+         iso_path - The absolute ISO path to the file on the ISO.
+         rr_path - The absolute Rock Ridge path to the file on the ISO.
+         joliet_path - The absolute Joliet path to the file on the ISO.
+        Returns:
+         A PyCdlibIO object allowing access to the file, or a ZisofsIO object
+         that decompresses it if the file is zisofs-compressed.
+        """
+        self._check_open()
+
+        path_type = _check_path_kwargs(kwargs, ())
+        vol_unused, rec = self._lookup(path_type, kwargs[path_type])
+
+        if not rec.is_file():
+            raise pycdlibexception.PyCdlibInvalidInput('Path to open must be a file')
+
+        if rec.inode is None:
+            raise pycdlibexception.PyCdlibInvalidInput('File has no data')
+
+        if rec.rock_ridge is not None:
+            zf = rec.rock_ridge.zisofs_record()
+            if zf is not None:
+                return zisofs.ZisofsIO(pycdlibio.PyCdlibIO(rec.inode, self._iso.logical_block_size), zf)
+
+        return pycdlibio.PyCdlibIO(rec.inode, self._iso.logical_block_size)
+
+    def close(self):
+        # type: () -> None
+        """
+        Close the ISO and drop everything that was cached for it.  The object
+        can then be re-used to open another ISO.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        self._check_open()
+
+        if self._managing_fp:
+            self._iso._cdfp.close()  # pylint: disable=protected-access
+            self._managing_fp = False
+        self._iso = pycdlib.PyCdlib(block_cache=self._block_cache)
+        self._cache = collections.OrderedDict()
+        self._cached_records = 0
+        self._pvd = None
+        self._joliet = None
+        self._rock_ridge = False
+        self._initialized = False
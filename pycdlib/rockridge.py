@@ -25,7 +25,7 @@ from pycdlib import utils
 
 # For mypy annotations
 if False:  # pylint: disable=using-constant-test
-    from typing import Dict, List, Optional  # NOQA pylint: disable=unused-import
+    from typing import Any, Dict, List, Optional, Tuple  # NOQA pylint: disable=unused-import
     # NOTE: this has to be here to avoid circular deps
     from pycdlib import dr  # NOQA pylint: disable=unused-import,cyclic-import
 
@@ -1920,10 +1920,11 @@ class RRTFRecord:
         for index, fieldname in enumerate(self.FIELDNAMES):
             if self.time_flags & (1 << index):
                 if tflen == 7:
-                    setattr(self, fieldname, dates.DirectoryRecordDate())
+                    setattr(self, fieldname,
+                            dates.parse_directory_record_date(rrstr[offset:offset + tflen]))
                 elif tflen == 17:
                     setattr(self, fieldname, dates.VolumeDescriptorDate())
-                getattr(self, fieldname).parse(rrstr[offset:offset + tflen])
+                    getattr(self, fieldname).parse(rrstr[offset:offset + tflen])
                 offset += tflen
 
         self._initialized = True
@@ -2393,36 +2394,318 @@ class RRPDRecord:
         return 4 + len(padding)
 
 
+class RRZFRecord:
+    """
+    A class that represents a Rock Ridge zisofs (ZF) record.  This record marks
+    a file whose data is stored compressed in the zisofs format, and holds the
+    real size of the file.
+    """
+    __slots__ = ('_initialized', 'algorithm', 'header_size',
+                 'log2_block_size', 'uncompressed_size')
+
+    FMT = '<BB2sBBLL'
+
+    def __init__(self):
+        # type: () -> None
+        self._initialized = False
+
+    def parse(self, rrstr):
+        # type: (bytes) -> None
+        """
+        Parse a Rock Ridge zisofs record out of a string.
+
+        Parameters:
+         rrstr - The string to parse the record out of.
+        Returns:
+         Nothing.
+        """
+        if self._initialized:
+            raise pycdlibexception.PyCdlibInternalError('ZF record already initialized')
+
+        # We assume that the caller has already checked the su_entry_version,
+        # so we don't bother.
+
+        if len(rrstr) < RRZFRecord.length():
+            raise pycdlibexception.PyCdlibInvalidISO('Invalid length on Rock Ridge ZF record (expected 16)')
+
+        (su_len, su_entry_version_unused, self.algorithm, header_size_div4,
+         self.log2_block_size, size_le,
+         size_be) = struct.unpack_from(self.FMT, rrstr[:16], 2)
+
+        if su_len != RRZFRecord.length():
+            raise pycdlibexception.PyCdlibInvalidISO('Invalid length on Rock Ridge ZF record (expected 16)')
+        if size_le != utils.swab_32bit(size_be):
+            raise pycdlibexception.PyCdlibInvalidISO('Uncompressed size little-endian does not match big-endian')
+
+        self.header_size = header_size_div4 * 4
+        self.uncompressed_size = size_le
+
+        self._initialized = True
+
+    def new(self, uncompressed_size, log2_block_size):
+        # type: (int, int) -> None
+        """
+        Create a new Rock Ridge zisofs record.
+
+        Parameters:
+         uncompressed_size - The real size of the file.
+         log2_block_size - The base 2 logarithm of the size of the compressed
+                           blocks.
+        Returns:
+         Nothing.
+        """
+        if self._initialized:
+            raise pycdlibexception.PyCdlibInternalError('ZF record already initialized')
+
+        self.algorithm = b'pz'
+        self.header_size = 16
+        self.log2_block_size = log2_block_size
+        self.uncompressed_size = uncompressed_size
+
+        self._initialized = True
+
+    def record(self):
+        # type: () -> bytes
+        """
+        Generate a string representing the Rock Ridge zisofs record.
+
+        Parameters:
+         None.
+        Returns:
+         String containing the Rock Ridge record.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInternalError('ZF record not initialized')
+
+        return b'ZF' + struct.pack(self.FMT, RRZFRecord.length(),
+                                   SU_ENTRY_VERSION, self.algorithm,
+                                   self.header_size // 4, self.log2_block_size,
+                                   self.uncompressed_size,
+                                   utils.swab_32bit(self.uncompressed_size))
+
+    @staticmethod
+    def length():
+        # type: () -> int
+        """
+        Static method to return the length of the Rock Ridge zisofs record.
+
+        Parameters:
+         None.
+        Returns:
+         The length of this record in bytes.
+        """
+        return 16
+
+
+# The Rock Ridge entries that are kept as raw System Use bytes when parsing,
+# and only decoded the first time they are accessed.  Each maps to the bit
+# that marks it as pending decode, the slot that holds the decoded entry, the
+# class to decode it with, and whether there can be more than one of it.  The
+# remaining entries (SP, CE, ER, NM, CL, PL, and RE) are always decoded
+# eagerly, since finding the continuation area, the names, and the relocated
+# directories depends on them.
+_LAZY_ENTRIES = {
+    b'RR': (1 << 0, '_rr_record', RRRRRecord, False),
+    b'PX': (1 << 1, '_px_record', RRPXRecord, False),
+    b'ES': (1 << 2, '_es_records', RRESRecord, True),
+    b'PN': (1 << 3, '_pn_record', RRPNRecord, False),
+    b'SL': (1 << 4, '_sl_records', RRSLRecord, True),
+    b'TF': (1 << 5, '_tf_record', RRTFRecord, False),
+    b'SF': (1 << 6, '_sf_record', RRSFRecord, False),
+    b'ST': (1 << 7, '_st_record', RRSTRecord, False),
+    b'PD': (1 << 8, '_pd_records', RRPDRecord, True),
+    b'AL': (1 << 9, '_al_records', RRALRecord, True),
+    b'ZF': (1 << 10, '_zf_record', RRZFRecord, False),
+}  # type: Dict[bytes, Tuple[int, str, Any, bool]]
+
+_EAGER_ENTRIES = {
+    b'SP': 'sp_record',
+    b'CE': 'ce_record',
+    b'ER': 'er_record',
+    b'NM': 'nm_records',
+    b'CL': 'cl_record',
+    b'PL': 'pl_record',
+    b'RE': 're_record',
+}
+
+
+def _lazy_entry(rtype):
+    # type: (bytes) -> property
+    """
+    An internal function to create a property for a Rock Ridge entry that is
+    decoded from the raw System Use bytes the first time it is accessed.
+
+    Parameters:
+     rtype - The two-letter type of the entry.
+    Returns:
+     The property for the entry.
+    """
+    bit, slot, cls_unused, is_list_unused = _LAZY_ENTRIES[rtype]
+
+    def _get(self):
+        # type: (RockRidgeEntries) -> Any
+        if self._pending & bit:  # pylint: disable=protected-access
+            self._decode(rtype)  # pylint: disable=protected-access
+        return getattr(self, slot)
+
+    def _set(self, value):
+        # type: (RockRidgeEntries, Any) -> None
+        self._pending &= ~bit  # pylint: disable=protected-access
+        setattr(self, slot, value)
+
+    return property(_get, _set)
+
+
 class RockRidgeEntries:
     """
     A simple class container to hold a long list of possible Rock Ridge
-    records.
+    records.  When parsing, most of the records are kept as the raw System
+    Use bytes and only decoded when they are first accessed; see
+    _LAZY_ENTRIES.
     """
-    __slots__ = ('sp_record', 'rr_record', 'ce_record', 'px_record',
-                 'er_record', 'es_records', 'pn_record', 'sl_records',
-                 'nm_records', 'cl_record', 'pl_record', 'tf_record',
-                 'sf_record', 're_record', 'st_record', 'pd_records',
-                 'al_records')
+    __slots__ = ('sp_record', 'ce_record', 'er_record', 'nm_records',
+                 'cl_record', 'pl_record', 're_record', '_rr_record',
+                 '_px_record', '_es_records', '_pn_record', '_sl_records',
+                 '_tf_record', '_sf_record', '_st_record', '_pd_records',
+                 '_al_records', '_zf_record', '_raw', '_pending')
+
+    rr_record = _lazy_entry(b'RR')
+    px_record = _lazy_entry(b'PX')
+    es_records = _lazy_entry(b'ES')
+    pn_record = _lazy_entry(b'PN')
+    sl_records = _lazy_entry(b'SL')
+    tf_record = _lazy_entry(b'TF')
+    sf_record = _lazy_entry(b'SF')
+    st_record = _lazy_entry(b'ST')
+    pd_records = _lazy_entry(b'PD')
+    al_records = _lazy_entry(b'AL')
+    zf_record = _lazy_entry(b'ZF')
 
     def __init__(self):
         # type: () -> None
+        self._raw = b''
+        self._pending = 0
         self.sp_record = None  # type: Optional[RRSPRecord]
-        self.rr_record = None  # type: Optional[RRRRRecord]
+        self._rr_record = None  # type: Optional[RRRRRecord]
         self.ce_record = None  # type: Optional[RRCERecord]
-        self.px_record = None  # type: Optional[RRPXRecord]
+        self._px_record = None  # type: Optional[RRPXRecord]
         self.er_record = None  # type: Optional[RRERRecord]
-        self.es_records = []  # type: List[RRESRecord]
-        self.pn_record = None  # type: Optional[RRPNRecord]
-        self.sl_records = []  # type: List[RRSLRecord]
-        self.nm_records = []  # type: List[RRNMRecord]
+        self._es_records = utils.EMPTY_LIST  # type: List[RRESRecord]
+        self._pn_record = None  # type: Optional[RRPNRecord]
+        self._sl_records = utils.EMPTY_LIST  # type: List[RRSLRecord]
+        self.nm_records = utils.EMPTY_LIST  # type: List[RRNMRecord]
         self.cl_record = None  # type: Optional[RRCLRecord]
         self.pl_record = None  # type: Optional[RRPLRecord]
-        self.tf_record = None  # type: Optional[RRTFRecord]
-        self.sf_record = None  # type: Optional[RRSFRecord]
+        self._tf_record = None  # type: Optional[RRTFRecord]
+        self._sf_record = None  # type: Optional[RRSFRecord]
         self.re_record = None  # type: Optional[RRRERecord]
-        self.st_record = None  # type: Optional[RRSTRecord]
-        self.pd_records = []  # type: List[RRPDRecord]
-        self.al_records = []  # type: List[RRALRecord]
+        self._st_record = None  # type: Optional[RRSTRecord]
+        self._pd_records = utils.EMPTY_LIST  # type: List[RRPDRecord]
+        self._al_records = utils.EMPTY_LIST  # type: List[RRALRecord]
+        self._zf_record = None  # type: Optional[RRZFRecord]
+
+    def set_raw(self, raw):
+        # type: (bytes) -> None
+        """
+        Set the raw System Use bytes that pending entries will be decoded
+        from.  Any entries still pending from earlier bytes are decoded first.
+
+        Parameters:
+         raw - The raw System Use bytes.
+        Returns:
+         Nothing.
+        """
+        if self._pending:
+            for rtype, lazy in _LAZY_ENTRIES.items():
+                if self._pending & lazy[0]:
+                    self._decode(rtype)
+        self._raw = raw
+
+    def defer(self, rtype):
+        # type: (bytes) -> None
+        """
+        Mark an entry type in the raw System Use bytes as pending decode.
+
+        Parameters:
+         rtype - The two-letter type of the entry.
+        Returns:
+         Nothing.
+        """
+        self._pending |= _LAZY_ENTRIES[rtype][0]
+
+    def has_type(self, rtype):
+        # type: (bytes) -> bool
+        """
+        Determine whether an entry of the given type is present, without
+        decoding anything.
+
+        Parameters:
+         rtype - The two-letter type of the entry.
+        Returns:
+         True if an entry of the given type is present, False otherwise.
+        """
+        lazy = _LAZY_ENTRIES.get(rtype)
+        if lazy is None:
+            return bool(getattr(self, _EAGER_ENTRIES[rtype]))
+        return bool(self._pending & lazy[0] or getattr(self, lazy[1]))
+
+    def _decode(self, rtype):
+        # type: (bytes) -> None
+        """
+        An internal method to decode all of the entries of one type from the
+        raw System Use bytes.
+
+        Parameters:
+         rtype - The two-letter type of the entries to decode.
+        Returns:
+         Nothing.
+        """
+        bit, slot, cls, is_list = _LAZY_ENTRIES[rtype]
+
+        recs = []
+        raw = self._raw
+        offset = 0
+        # The structure of the raw bytes was already checked when parsing.
+        while offset + 4 <= len(raw):
+            su_len = raw[offset + 2]
+            if su_len == 0:
+                break
+            if raw[offset:offset + 2] == rtype:
+                rec = cls()
+                rec.parse(raw[offset:])
+                recs.append(rec)
+            offset += su_len
+
+        # Only mark the entries as decoded once they all parsed, so that a
+        # corrupt entry raises each time it is accessed.
+        self._pending &= ~bit
+        if is_list:
+            for rec in recs:
+                self.append(slot[1:], rec)
+        elif recs:
+            setattr(self, slot, recs[0])
+
+        if not self._pending:
+            self._raw = b''
+
+    def append(self, name, record):
+        # type: (str, Any) -> None
+        """
+        Append a record to one of the lists of records.  The lists all start
+        out as the shared empty list, since most of them stay empty; a real
+        list is only allocated when the first record is appended.
+
+        Parameters:
+         name - The name of the list to append to (for instance, 'nm_records').
+         record - The record to append.
+        Returns:
+         Nothing.
+        """
+        records = getattr(self, name)
+        if records is utils.EMPTY_LIST:
+            records = []
+            setattr(self, name, records)
+        records.append(record)
 
 
 # This is the class that implements the Rock Ridge extensions for PyCdlib.  The
@@ -2438,7 +2721,8 @@ class RockRidge:
     """A class representing Rock Ridge entries."""
     __slots__ = ('_initialized', 'dr_entries', 'ce_entries', 'cl_to_moved_dr',
                  'moved_to_cl_dr', 'parent_link', 'rr_version', 'ce_block',
-                 'bytes_to_skip', '_full_name')
+                 'bytes_to_skip', '_full_name', '_dr_record_cache',
+                 '_ce_record_cache')
 
     def __init__(self):
         # type: () -> None
@@ -2449,22 +2733,10 @@ class RockRidge:
         self.parent_link = None  # type: Optional[dr.DirectoryRecord]
         self.rr_version = ''
         self.ce_block = None  # type: Optional[RockRidgeContinuationBlock]
+        self._dr_record_cache = None  # type: Optional[bytes]
+        self._ce_record_cache = None  # type: Optional[bytes]
         self._initialized = False
 
-    def has_entry(self, name):
-        # type: (str) -> bool
-        """
-        An internal method to tell if we have already parsed an entry of the
-        named type.
-
-        Parameters:
-         name - The name of the entry to check.
-        Returns:
-         True if we have already parsed an entry of the named type, False
-         otherwise.
-        """
-        return getattr(self.dr_entries, name) or getattr(self.ce_entries, name)
-
     def parse(self, record, is_first_dir_record_of_root, bytes_to_skip,
               continuation, dr_name):
         # type: (bytes, bool, int, bool, bytes) -> None
@@ -2492,10 +2764,13 @@ class RockRidge:
 
         if continuation:
             entry_list = self.ce_entries
+            self._ce_record_cache = None
         else:
             entry_list = self.dr_entries
+            self._dr_record_cache = None
 
         self.bytes_to_skip = bytes_to_skip
+        entry_list.set_raw(record[bytes_to_skip:])
         offset = bytes_to_skip
         left = len(record)
         px_record_length = None
@@ -2519,14 +2794,27 @@ class RockRidge:
             if su_len == 0:
                 raise pycdlibexception.PyCdlibInvalidISO('Zero size for Rock Ridge entry length')
 
-            recslice = record[offset:]
-
             if rtype in (b'SP', b'RR', b'CE', b'PX', b'ST', b'ER',
-                         b'PN', b'CL', b'PL', b'RE', b'TF', b'SF'):
-                recname = rtype.decode('utf-8').lower() + '_record'
-                if self.has_entry(recname):
+                         b'PN', b'CL', b'PL', b'RE', b'TF', b'SF', b'ZF'):
+                if self.dr_entries.has_type(rtype) or self.ce_entries.has_type(rtype):
                     raise pycdlibexception.PyCdlibInvalidISO('Only single %s record supported' % (rtype.decode('utf-8')))
 
+            if rtype in _LAZY_ENTRIES:
+                # Most entries are only decoded when they are first used;
+                # all that is needed now is what determines the version.
+                entry_list.defer(rtype)
+                if rtype == b'PX':
+                    px_record_length = su_len
+                elif rtype == b'ES':
+                    has_es_record = True
+                elif rtype == b'SF':
+                    sf_record_length = len(record) - offset
+                offset += su_len
+                left -= su_len
+                continue
+
+            recslice = record[offset:]
+
             if rtype == b'SP':
                 if left < 7 or not is_first_dir_record_of_root:
                     raise pycdlibexception.PyCdlibInvalidISO('Invalid SUSP SP record')
@@ -2537,42 +2825,17 @@ class RockRidge:
 
                 entry_list.sp_record = RRSPRecord()
                 entry_list.sp_record.parse(recslice)
-            elif rtype == b'RR':
-                entry_list.rr_record = RRRRRecord()
-                entry_list.rr_record.parse(recslice)
             elif rtype == b'CE':
                 entry_list.ce_record = RRCERecord()
                 entry_list.ce_record.parse(recslice)
-            elif rtype == b'PX':
-                entry_list.px_record = RRPXRecord()
-                px_record_length = entry_list.px_record.parse(recslice)
-            elif rtype == b'PD':
-                pd = RRPDRecord()
-                pd.parse(recslice)
-                entry_list.pd_records.append(pd)
-            elif rtype == b'ST':
-                entry_list.st_record = RRSTRecord()
-                entry_list.st_record.parse(recslice)
             elif rtype == b'ER':
                 entry_list.er_record = RRERRecord()
                 entry_list.er_record.parse(recslice)
                 er_id = entry_list.er_record.ext_id
-            elif rtype == b'ES':
-                es = RRESRecord()
-                es.parse(recslice)
-                entry_list.es_records.append(es)
-                has_es_record = True
-            elif rtype == b'PN':
-                entry_list.pn_record = RRPNRecord()
-                entry_list.pn_record.parse(recslice)
-            elif rtype == b'SL':
-                new_sl_record = RRSLRecord()
-                new_sl_record.parse(recslice)
-                entry_list.sl_records.append(new_sl_record)
             elif rtype == b'NM':
                 new_nm_record = RRNMRecord()
                 new_nm_record.parse(recslice)
-                entry_list.nm_records.append(new_nm_record)
+                entry_list.append('nm_records', new_nm_record)
             elif rtype == b'CL':
                 entry_list.cl_record = RRCLRecord()
                 entry_list.cl_record.parse(recslice)
@@ -2582,17 +2845,6 @@ class RockRidge:
             elif rtype == b'RE':
                 entry_list.re_record = RRRERecord()
                 entry_list.re_record.parse(recslice)
-            elif rtype == b'TF':
-                entry_list.tf_record = RRTFRecord()
-                entry_list.tf_record.parse(recslice)
-            elif rtype == b'SF':
-                entry_list.sf_record = RRSFRecord()
-                entry_list.sf_record.parse(recslice)
-                sf_record_length = len(recslice)
-            elif rtype == b'AL':
-                new_al_record = RRALRecord()
-                new_al_record.parse(recslice)
-                entry_list.al_records.append(new_al_record)
             else:
                 raise pycdlibexception.PyCdlibInvalidISO('Unknown SUSP record')
             offset += su_len
@@ -2666,6 +2918,9 @@ class RockRidge:
         if entries.tf_record is not None:
             outlist.append(entries.tf_record.record())
 
+        if entries.zf_record is not None:
+            outlist.append(entries.zf_record.record())
+
         if entries.cl_record is not None:
             outlist.append(entries.cl_record.record())
 
@@ -2712,7 +2967,9 @@ class RockRidge:
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('Rock Ridge extension not initialized')
 
-        return self._record(self.dr_entries)
+        if self._dr_record_cache is None:
+            self._dr_record_cache = self._record(self.dr_entries)
+        return self._dr_record_cache
 
     def record_ce_entries(self):
         # type: () -> bytes
@@ -2728,7 +2985,9 @@ class RockRidge:
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('Rock Ridge extension not initialized')
 
-        return self._record(self.ce_entries)
+        if self._ce_record_cache is None:
+            self._ce_record_cache = self._record(self.ce_entries)
+        return self._ce_record_cache
 
     def _new_symlink(self, symlink_path, curr_dr_len):
         # type: (bytes, int) -> int
@@ -2767,14 +3026,14 @@ class RockRidge:
             # There is enough room in the directory record for at least
             # part of the symlink
             curr_comp_area_length = ALLOWED_DR_SIZE - curr_dr_len - sl_rec_header_len
-            self.dr_entries.sl_records.append(curr_sl)
+            self.dr_entries.append('sl_records', curr_sl)
             curr_dr_len += sl_rec_header_len
             sl_in_dr = True
         else:
             # Not enough room in the directory record, so proceed to
             # the continuation entry directly.
             curr_comp_area_length = RRSLRecord.maximum_component_area_length()
-            self.ce_entries.sl_records.append(curr_sl)
+            self.ce_entries.append('sl_records', curr_sl)
             if self.dr_entries.ce_record is not None:
                 self.dr_entries.ce_record.add_record(sl_rec_header_len)
             sl_in_dr = False
@@ -2812,7 +3071,7 @@ class RockRidge:
 
                     curr_sl = RRSLRecord()
                     curr_sl.new()
-                    self.ce_entries.sl_records.append(curr_sl)
+                    self.ce_entries.append('sl_records', curr_sl)
                     curr_comp_area_length = RRSLRecord.maximum_component_area_length()
                     if self.dr_entries.ce_record is not None:
                         self.dr_entries.ce_record.add_record(sl_rec_header_len)
@@ -2876,7 +3135,7 @@ class RockRidge:
             # There is enough room in the directory record for at least
             # part of one of the attributes.
             curr_comp_area_length = ALLOWED_DR_SIZE - curr_dr_len - al_rec_header_len
-            self.dr_entries.al_records.append(curr_al)
+            self.dr_entries.append('al_records', curr_al)
             curr_dr_len += al_rec_header_len
             al_in_dr = True
         else:
@@ -2885,7 +3144,7 @@ class RockRidge:
             curr_comp_area_length = RRALRecord.maximum_component_area_length()
             if self.dr_entries.ce_record is not None:
                 self.dr_entries.ce_record.add_record(al_rec_header_len)
-            self.ce_entries.al_records.append(curr_al)
+            self.ce_entries.append('al_records', curr_al)
             al_in_dr = False
 
         for attr in attr_list:
@@ -2907,7 +3166,7 @@ class RockRidge:
 
                     curr_al = RRALRecord()
                     curr_al.new()
-                    self.ce_entries.al_records.append(curr_al)
+                    self.ce_entries.append('al_records', curr_al)
                     curr_comp_area_length = RRALRecord.maximum_component_area_length()
                     if self.dr_entries.ce_record is not None:
                         self.dr_entries.ce_record.add_record(al_rec_header_len)
@@ -2973,7 +3232,7 @@ class RockRidge:
         if len_here > 0:
             curr_nm = RRNMRecord()
             curr_nm.new(rr_name[:len_here])
-            self.dr_entries.nm_records.append(curr_nm)
+            self.dr_entries.append('nm_records', curr_nm)
             curr_dr_len += RRNMRecord.length(rr_name[:len_here])
 
         offset = len_here
@@ -2990,7 +3249,7 @@ class RockRidge:
 
             curr_nm = RRNMRecord()
             curr_nm.new(rr_name[offset:offset + length])
-            self.ce_entries.nm_records.append(curr_nm)
+            self.ce_entries.append('nm_records', curr_nm)
             self.dr_entries.ce_record.add_record(RRNMRecord.length(rr_name[offset:offset + length]))
 
             offset += length
@@ -3000,8 +3259,8 @@ class RockRidge:
     def _assign_entries(self, is_first_dir_record_of_root, rr_name, file_mode,
                         symlink_path, rr_relocated_child, rr_relocated,
                         rr_relocated_parent, bytes_to_skip, curr_dr_len,
-                        attributes, date_seconds):
-        # type: (bool, bytes, int, bytes, bool, bool, bool, int, int, Dict[bytes, bytes], float) -> int
+                        attributes, date_seconds, zisofs):
+        # type: (bool, bytes, int, bytes, bool, bool, bool, int, int, Dict[bytes, bytes], float, Optional[Tuple[int, int]]) -> int
         """
         Assign Rock Ridge entries to the appropriate DR or CE record.
 
@@ -3023,6 +3282,8 @@ class RockRidge:
          attributes - Arbitrary attributes to add to the Rock Ridge entry.
          date_seconds - Time and date, in seconds, to use for this Rock Ridge
                         record.
+         zisofs - A tuple of the uncompressed size and the base 2 logarithm of
+                  the block size if the data is zisofs-compressed, or None.
         Returns:
          The length of the directory record after the Rock Ridge extension has
          been added, or -1 if the entry will not fit.
@@ -3116,6 +3377,20 @@ class RockRidge:
         if rr_record is not None:
             rr_record.append_field('TF')
 
+        # For ZF record
+        if zisofs is not None:
+            new_zf = RRZFRecord()
+            new_zf.new(zisofs[0], zisofs[1])
+            thislen = RRZFRecord.length()
+            if curr_dr_len + thislen > ALLOWED_DR_SIZE:
+                if self.dr_entries.ce_record is None:
+                    return -1
+                self.dr_entries.ce_record.add_record(thislen)
+                self.ce_entries.zf_record = new_zf
+            else:
+                curr_dr_len += thislen
+                self.dr_entries.zf_record = new_zf
+
         # For CL record
         if rr_relocated_child:
             new_cl = RRCLRecord()
@@ -3198,8 +3473,8 @@ class RockRidge:
     def new(self, is_first_dir_record_of_root, rr_name, file_mode,
             symlink_path, rr_version, rr_relocated_child, rr_relocated,
             rr_relocated_parent, bytes_to_skip, curr_dr_len, attributes,
-            date_seconds):
-        # type: (bool, bytes, int, bytes, str, bool, bool, bool, int, int, Dict[bytes, bytes], float) -> int
+            date_seconds, zisofs=None):
+        # type: (bool, bytes, int, bytes, str, bool, bool, bool, int, int, Dict[bytes, bytes], float, Optional[Tuple[int, int]]) -> int
         """
         Create a new Rock Ridge record.
 
@@ -3224,6 +3499,9 @@ class RockRidge:
                       non-standard extension, so use with care.
          date_seconds - Time and date, in seconds, to use for this Rock Ridge
                         record.
+         zisofs - A tuple of the uncompressed size and the base 2 logarithm of
+                  the block size if the data is zisofs-compressed, or None (the
+                  default).
         Returns:
          The length of the directory record after the Rock Ridge extension has
          been added.
@@ -3240,7 +3518,8 @@ class RockRidge:
                                           file_mode, symlink_path,
                                           rr_relocated_child, rr_relocated,
                                           rr_relocated_parent, bytes_to_skip,
-                                          curr_dr_len, attributes, date_seconds)
+                                          curr_dr_len, attributes, date_seconds,
+                                          zisofs)
 
         if new_dr_len < 0:
             self.dr_entries = RockRidgeEntries()
@@ -3254,7 +3533,8 @@ class RockRidge:
                                               rr_name, file_mode, symlink_path,
                                               rr_relocated_child, rr_relocated,
                                               rr_relocated_parent, bytes_to_skip,
-                                              curr_dr_len, attributes, date_seconds)
+                                              curr_dr_len, attributes, date_seconds,
+                                              zisofs)
             if new_dr_len < 0:
                 raise pycdlibexception.PyCdlibInternalError('Could not assign Rock Ridge entries')
 
@@ -3288,8 +3568,10 @@ class RockRidge:
             if self.ce_entries.px_record is None:
                 raise pycdlibexception.PyCdlibInvalidInput('No Rock Ridge file links')
             self.ce_entries.px_record.posix_file_links += 1
+            self._ce_record_cache = None
         else:
             self.dr_entries.px_record.posix_file_links += 1
+            self._dr_record_cache = None
 
     def remove_from_file_links(self):
         # type: () -> None
@@ -3308,8 +3590,10 @@ class RockRidge:
             if self.ce_entries.px_record is None:
                 raise pycdlibexception.PyCdlibInvalidInput('No Rock Ridge file links')
             self.ce_entries.px_record.posix_file_links -= 1
+            self._ce_record_cache = None
         else:
             self.dr_entries.px_record.posix_file_links -= 1
+            self._dr_record_cache = None
 
     def copy_file_links(self, src):
         # type: (RockRidge) -> None
@@ -3338,8 +3622,10 @@ class RockRidge:
             if self.ce_entries.px_record is None:
                 raise pycdlibexception.PyCdlibInvalidInput('No Rock Ridge file links')
             self.ce_entries.px_record.posix_file_links = num_links
+            self._ce_record_cache = None
         else:
             self.dr_entries.px_record.posix_file_links = num_links
+            self._dr_record_cache = None
 
     def get_file_mode(self):
         # type: () -> int
@@ -3465,8 +3751,10 @@ class RockRidge:
 
         if self.dr_entries.cl_record is not None:
             self.dr_entries.cl_record.set_log_block_num(self.cl_to_moved_dr.extent_location())
+            self._dr_record_cache = None
         elif self.ce_entries.cl_record is not None:
             self.ce_entries.cl_record.set_log_block_num(self.cl_to_moved_dr.extent_location())
+            self._ce_record_cache = None
         else:
             raise pycdlibexception.PyCdlibInvalidInput('Could not find child link record!')
 
@@ -3527,8 +3815,10 @@ class RockRidge:
 
         if self.dr_entries.pl_record is not None:
             self.dr_entries.pl_record.set_log_block_num(self.parent_link.extent_location())
+            self._dr_record_cache = None
         elif self.ce_entries.pl_record is not None:
             self.ce_entries.pl_record.set_log_block_num(self.parent_link.extent_location())
+            self._ce_record_cache = None
         else:
             raise pycdlibexception.PyCdlibInvalidInput('Could not find parent link record!')
 
@@ -3568,6 +3858,24 @@ class RockRidge:
 
         return self.dr_entries.re_record is not None or self.ce_entries.re_record is not None
 
+    def zisofs_record(self):
+        # type: () -> Optional[RRZFRecord]
+        """
+        Get the zisofs record of this Rock Ridge entry, if the data of the
+        file is stored zisofs-compressed.
+
+        Parameters:
+         None.
+        Returns:
+         The RRZFRecord, or None if the data is not zisofs-compressed.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInternalError('Rock Ridge extension not initialized')
+
+        if self.dr_entries.zf_record is not None:
+            return self.dr_entries.zf_record
+        return self.ce_entries.zf_record
+
     def update_ce_block(self, block):
         # type: (RockRidgeContinuationBlock) -> None
         """
@@ -3583,6 +3891,48 @@ class RockRidge:
 
         self.ce_block = block
 
+    def update_ce_extent(self, extent):
+        # type: (int) -> None
+        """
+        Update the extent stored in the Continuation Entry of this Rock Ridge
+        Record.
+
+        Parameters:
+         extent - The new extent for the continuation area.
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInternalError('Rock Ridge extension not initialized')
+
+        if self.dr_entries.ce_record is None:
+            raise pycdlibexception.PyCdlibInternalError('Rock Ridge extension has no Continuation Entry')
+
+        if self.dr_entries.ce_record.bl_cont_area != extent:
+            self.dr_entries.ce_record.update_extent(extent)
+            self._dr_record_cache = None
+
+    def update_ce_offset(self, offset):
+        # type: (int) -> None
+        """
+        Update the offset stored in the Continuation Entry of this Rock Ridge
+        Record.
+
+        Parameters:
+         offset - The new offset into the continuation area.
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInternalError('Rock Ridge extension not initialized')
+
+        if self.dr_entries.ce_record is None:
+            raise pycdlibexception.PyCdlibInternalError('Rock Ridge extension has no Continuation Entry')
+
+        if self.dr_entries.ce_record.offset_cont_area != offset:
+            self.dr_entries.ce_record.update_offset(offset)
+            self._dr_record_cache = None
+
 
 class RockRidgeContinuationEntry:
     """
@@ -0,0 +1,270 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""Classes to collect per-phase timings and counters from PyCdlib."""
+
+import time
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Callable, Dict, List, Optional, Union  # NOQA pylint: disable=unused-import
+
+
+class PhaseStats:
+    """
+    A class to hold the accumulated statistics for a single phase.  The
+    records and bytes are only counted by the phases where they have a
+    sensible meaning (for instance, the number of Directory Records parsed
+    and the number of bytes of directory extents read while walking the
+    directories); elsewhere they are left at 0.
+    """
+    __slots__ = ('name', 'calls', 'elapsed', 'records', 'bytes')
+
+    def __init__(self, name):
+        # type: (str) -> None
+        self.name = name
+        self.calls = 0
+        self.elapsed = 0.0
+        self.records = 0
+        self.bytes = 0
+
+    def __repr__(self):
+        # type: () -> str
+        return 'PhaseStats(%s: calls=%d, elapsed=%f, records=%d, bytes=%d)' % (self.name,
+                                                                               self.calls,
+                                                                               self.elapsed,
+                                                                               self.records,
+                                                                               self.bytes)
+
+
+class Phase:
+    """
+    A class to time a single run of a phase.  This is used as a context
+    manager; the phase is accounted for when the context exits without an
+    exception.
+    """
+    __slots__ = ('_stats', 'name', 'start', 'records', 'bytes')
+
+    def __init__(self, stats, name):
+        # type: (PyCdlibStats, str) -> None
+        self._stats = stats
+        self.name = name
+        self.start = 0.0
+        self.records = 0
+        self.bytes = 0
+
+    def __enter__(self):
+        # type: () -> Phase
+        self._stats._stack.append(self)  # pylint: disable=protected-access
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # type: (Optional[type], Optional[BaseException], object) -> None
+        elapsed = time.perf_counter() - self.start
+        self._stats._stack.pop()  # pylint: disable=protected-access
+        if exc_type is None:
+            self._stats._finish(self, elapsed)  # pylint: disable=protected-access
+
+    def count(self, records=0, nbytes=0):
+        # type: (int, int) -> None
+        """
+        Add to the number of records and bytes processed by this phase.
+
+        Parameters:
+         records - The number of records to add.
+         nbytes - The number of bytes to add.
+        Returns:
+         Nothing.
+        """
+        self.records += records
+        self.bytes += nbytes
+
+
+class _NullPhase:
+    """
+    A class that stands in for a Phase when statistics are disabled, so that
+    the instrumented code does not need to check.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        # type: () -> _NullPhase
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # type: (Optional[type], Optional[BaseException], object) -> None
+        pass
+
+    def count(self, records=0, nbytes=0):
+        # type: (int, int) -> None
+        """
+        Ignore the records and bytes processed by this phase.
+
+        Parameters:
+         records - The number of records to ignore.
+         nbytes - The number of bytes to ignore.
+        Returns:
+         Nothing.
+        """
+
+
+NULL_PHASE = _NullPhase()
+
+
+class WriteProgress:
+    """
+    A class to describe the progress of a write, as passed to progress
+    callbacks that take an info argument.  The throughput is the average
+    number of bytes per second since the write started, and the ETA is the
+    estimated number of seconds until it finishes (or None if it cannot be
+    estimated yet).
+    """
+    __slots__ = ('phase', 'done', 'total', 'elapsed', 'throughput', 'eta')
+
+    def __init__(self, phase, done, total, elapsed):
+        # type: (str, int, int, float) -> None
+        self.phase = phase
+        self.done = done
+        self.total = total
+        self.elapsed = elapsed
+        self.throughput = 0.0
+        self.eta = None  # type: Optional[float]
+        if elapsed > 0:
+            self.throughput = done / elapsed
+        if self.throughput > 0:
+            self.eta = (total - done) / self.throughput
+
+    def __repr__(self):
+        # type: () -> str
+        return 'WriteProgress(%s: done=%d, total=%d, elapsed=%f)' % (self.phase,
+                                                                     self.done,
+                                                                     self.total,
+                                                                     self.elapsed)
+
+
+class PyCdlibStats:
+    """
+    A class to collect wall time and counters for each phase of opening,
+    modifying, and writing an ISO.  Pass an instance to the PyCdlib
+    constructor to enable collection.  Phases may nest (for instance, the
+    extents are reshuffled as part of writing), in which case the time of the
+    inner phase is also included in the time of the outer one.
+    """
+    __slots__ = ('phases', 'phase_cb', '_stack')
+
+    def __init__(self, phase_cb=None):
+        # type: (Optional[Callable[[PhaseStats, float, int, int], None]]) -> None
+        """
+        Create a new statistics object.
+
+        Parameters:
+         phase_cb - If not None, a function to call each time a phase finishes.
+                    The callback function must have a signature of:
+                    def func(phase_stats, elapsed, records, nbytes), where
+                    phase_stats is the accumulated PhaseStats object for the
+                    phase, and the rest describe just the run that finished.
+        Returns:
+         Nothing.
+        """
+        self.phases = {}  # type: Dict[str, PhaseStats]
+        self.phase_cb = phase_cb
+        self._stack = []  # type: List[Phase]
+
+    def phase(self, name):
+        # type: (str) -> Phase
+        """
+        Create a context manager that times a run of the named phase.
+
+        Parameters:
+         name - The name of the phase.
+        Returns:
+         A Phase object to use as a context manager.
+        """
+        return Phase(self, name)
+
+    def count(self, records=0, nbytes=0):
+        # type: (int, int) -> None
+        """
+        Add to the number of records and bytes processed by the innermost
+        phase that is currently running.  If no phase is running, this does
+        nothing.
+
+        Parameters:
+         records - The number of records to add.
+         nbytes - The number of bytes to add.
+        Returns:
+         Nothing.
+        """
+        if self._stack:
+            self._stack[-1].count(records, nbytes)
+
+    def _finish(self, phase, elapsed):
+        # type: (Phase, float) -> None
+        """
+        An internal method to account for a finished run of a phase.
+
+        Parameters:
+         phase - The Phase that finished.
+         elapsed - The wall time the phase took, in seconds.
+        Returns:
+         Nothing.
+        """
+        stats = self.phases.get(phase.name)
+        if stats is None:
+            stats = PhaseStats(phase.name)
+            self.phases[phase.name] = stats
+        stats.calls += 1
+        stats.elapsed += elapsed
+        stats.records += phase.records
+        stats.bytes += phase.bytes
+
+        if self.phase_cb is not None:
+            self.phase_cb(stats, elapsed, phase.records, phase.bytes)
+
+    def reset(self):
+        # type: () -> None
+        """
+        Throw away all of the statistics collected so far.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        self.phases = {}
+
+    def as_dict(self):
+        # type: () -> Dict[str, Dict[str, Union[int, float]]]
+        """
+        Get the statistics collected so far as plain dictionaries, suitable
+        for serializing.
+
+        Parameters:
+         None.
+        Returns:
+         A dictionary mapping phase names to dictionaries of calls, elapsed,
+         records, and bytes.
+        """
+        ret = {}  # type: Dict[str, Dict[str, Union[int, float]]]
+        for name, stats in self.phases.items():
+            ret[name] = {
+                'calls': stats.calls,
+                'elapsed': stats.elapsed,
+                'records': stats.records,
+                'bytes': stats.bytes,
+            }
+        return ret
@@ -0,0 +1,414 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""
+Support for streaming the contents of an ISO out as a tar archive.
+"""
+
+import calendar
+import collections
+import io
+import tarfile
+
+from pycdlib import dr
+from pycdlib import inode
+from pycdlib import pycdlibexception
+from pycdlib import pycdlibio
+from pycdlib import udf as udfmod
+from pycdlib import utils
+from pycdlib import zisofs
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Any, BinaryIO, Deque, Dict, List, Optional, Tuple, Union  # NOQA pylint: disable=unused-import
+    # NOTE: these imports have to be here to avoid circular deps
+    from pycdlib import pycdlib  # NOQA pylint: disable=unused-import
+
+_PATH_TYPES = ('iso_path', 'rr_path', 'joliet_path', 'udf_path')
+
+
+def _choose_path_type(iso, path_type):
+    # type: (pycdlib.PyCdlib, Optional[str]) -> str
+    """
+    An internal function to pick the namespace to walk.
+
+    Parameters:
+     iso - The PyCdlib object to walk.
+     path_type - The requested path type, or None to pick the richest
+                 namespace on the ISO (UDF, then Rock Ridge, then Joliet, then
+                 ISO9660).
+    Returns:
+     The path type to use.
+    """
+    if path_type is None:
+        if iso.has_udf():
+            return 'udf_path'
+        if iso.has_rock_ridge():
+            return 'rr_path'
+        if iso.has_joliet():
+            return 'joliet_path'
+        return 'iso_path'
+
+    if path_type not in _PATH_TYPES:
+        raise pycdlibexception.PyCdlibInvalidInput("The path type must be one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path'")
+    if path_type == 'rr_path' and not iso.has_rock_ridge():
+        raise pycdlibexception.PyCdlibInvalidInput('Cannot fetch a rr_path from a non-Rock Ridge ISO')
+    if path_type == 'joliet_path' and not iso.has_joliet():
+        raise pycdlibexception.PyCdlibInvalidInput('Cannot fetch a joliet_path from a non-Joliet ISO')
+    if path_type == 'udf_path' and not iso.has_udf():
+        raise pycdlibexception.PyCdlibInvalidInput('Can only specify a UDF path for a UDF ISO')
+
+    return path_type
+
+
+def child_name(rec, path_type):
+    # type: (Union[dr.DirectoryRecord, udfmod.UDFFileEntry], str) -> str
+    """
+    A function to get the name of a record in the given namespace.
+
+    Parameters:
+     rec - The record to get the name of.
+     path_type - The path type being walked.
+    Returns:
+     The name of the record.
+    """
+    if isinstance(rec, udfmod.UDFFileEntry):
+        encoding = 'utf-8'
+        if rec.file_ident is not None:
+            encoding = rec.file_ident.encoding
+        return rec.file_identifier().decode(encoding)
+
+    if path_type == 'rr_path' and rec.rock_ridge is not None:
+        return rec.rock_ridge.name().decode('utf-8')
+    if path_type == 'joliet_path':
+        return rec.file_identifier().decode('utf-16_be')
+    return rec.file_identifier().decode('utf-8')
+
+
+def dr_mtime(rec):
+    # type: (dr.DirectoryRecord) -> int
+    """
+    A function to get the modification time of a Directory Record as seconds
+    since the epoch.
+
+    Parameters:
+     rec - The Directory Record.
+    Returns:
+     The modification time.
+    """
+    date = rec.date
+    if date.month == 0 or date.day_of_month == 0:
+        return 0
+    secs = calendar.timegm((1900 + date.years_since_1900, date.month,
+                            date.day_of_month, date.hour, date.minute,
+                            date.second))
+    return secs - date.gmtoffset * 15 * 60
+
+
+def udf_mtime(rec):
+    # type: (udfmod.UDFFileEntry) -> int
+    """
+    A function to get the modification time of a UDF File Entry as seconds
+    since the epoch.
+
+    Parameters:
+     rec - The UDF File Entry.
+    Returns:
+     The modification time.
+    """
+    ts = rec.mod_time
+    secs = calendar.timegm((ts.year, ts.month, ts.day, ts.hour, ts.minute,
+                            ts.second))
+    if ts.tz != -2047:
+        secs -= ts.tz * 60
+    return secs
+
+
+def udf_mode(permissions):
+    # type: (int) -> int
+    """
+    A function to convert UDF permissions (ECMA-167 Part 4, 14.9.5) into
+    POSIX permission bits.
+
+    Parameters:
+     permissions - The UDF permissions.
+    Returns:
+     The POSIX permission bits.
+    """
+    return (((permissions >> 10) & 0x7) << 6) | (((permissions >> 5) & 0x7) << 3) | (permissions & 0x7)
+
+
+def _fill_tarinfo(info, rec):
+    # type: (tarfile.TarInfo, Union[dr.DirectoryRecord, udfmod.UDFFileEntry]) -> None
+    """
+    An internal function to fill in the mode, owner, and time of a TarInfo
+    from the metadata of a record.
+
+    Parameters:
+     info - The TarInfo to fill in.
+     rec - The record to take the metadata from.
+    Returns:
+     Nothing.
+    """
+    if isinstance(rec, udfmod.UDFFileEntry):
+        info.mode = udf_mode(rec.perms)
+        if rec.uid != 0xffffffff:
+            info.uid = rec.uid
+        if rec.gid != 0xffffffff:
+            info.gid = rec.gid
+        info.mtime = udf_mtime(rec)
+        return
+
+    info.mtime = dr_mtime(rec)
+    if info.type == tarfile.DIRTYPE:
+        info.mode = 0o555
+    else:
+        info.mode = 0o444
+    if rec.rock_ridge is not None:
+        px = rec.rock_ridge.dr_entries.px_record
+        if px is None:
+            px = rec.rock_ridge.ce_entries.px_record
+        if px is not None:
+            info.mode = px.posix_file_mode & 0o7777
+            info.uid = px.posix_user_id
+            info.gid = px.posix_group_id
+
+
+def symlink_target(iso, rec):
+    # type: (pycdlib.PyCdlib, Union[dr.DirectoryRecord, udfmod.UDFFileEntry]) -> str
+    """
+    A function to get the target of a symlink.
+
+    Parameters:
+     iso - The PyCdlib object the record is on.
+     rec - The symlink record.
+    Returns:
+     The target of the symlink.
+    """
+    if isinstance(rec, udfmod.UDFFileEntry):
+        if rec.inode is None:
+            return ''
+        with pycdlibio.PyCdlibIO(rec.inode, iso.logical_block_size) as infp:
+            return udfmod.bytes_to_symlink(infp.read())
+
+    if rec.rock_ridge is None:
+        return ''
+    return rec.rock_ridge.symlink_path().decode('utf-8')
+
+
+class RecordReader:
+    """
+    A class that reads the data of one file, as tarfile or a comparison
+    needs it.  Data is read from each of the records that make up the file in
+    turn (files larger than 4GiB are split over several records), and zisofs
+    data is decompressed.  If the ISO lies about the size of a file and the
+    data runs out early, zeros are returned so that the length stays
+    consistent.
+    """
+    __slots__ = ('_sources', '_current', '_left')
+
+    def __init__(self, sources, length):
+        # type: (List[Any], int) -> None
+        self._sources = collections.deque(sources)
+        self._current = None  # type: Optional[Any]
+        self._left = length
+
+    def read(self, size=-1):
+        # type: (int) -> bytes
+        """
+        Read up to size bytes of the file.
+
+        Parameters:
+         size - The number of bytes to read; if negative, read the rest of the
+                file.
+        Returns:
+         The data.
+        """
+        if size < 0:
+            size = self._left
+        size = min(size, self._left)
+        chunks = []  # type: List[bytes]
+        want = size
+        while want > 0:
+            if self._current is None:
+                if not self._sources:
+                    break
+                self._current = self._sources.popleft()
+                self._current.__enter__()
+            data = self._current.read(want)
+            if not data:
+                self._current.close()
+                self._current = None
+                continue
+            chunks.append(data)
+            want -= len(data)
+
+        if want > 0:
+            chunks.append(b'\x00' * want)
+        self._left -= size
+        if self._left == 0 and self._current is not None:
+            self._current.close()
+            self._current = None
+        return b''.join(chunks)
+
+
+def file_sources(iso, rec, path_type, catalog_records):
+    # type: (pycdlib.PyCdlib, Union[dr.DirectoryRecord, udfmod.UDFFileEntry], str, List[Any]) -> Tuple[List[Any], int]
+    """
+    A function to get the file objects that make up the data of a file, along
+    with its total length.
+
+    Parameters:
+     iso - The PyCdlib object the record is on.
+     rec - The file record.
+     path_type - The path type being walked.
+     catalog_records - The records that point to the El Torito boot catalog.
+    Returns:
+     A tuple of the list of file objects and the length of the data.
+    """
+    for catrec in catalog_records:
+        if catrec is rec:
+            data = iso.eltorito_boot_catalog.record()  # type: ignore
+            data += b'\x00' * (rec.get_data_length() - len(data))
+            return [io.BytesIO(data)], len(data)
+
+    if rec.inode is None:
+        return [], 0
+
+    if isinstance(rec, dr.DirectoryRecord) and path_type in ('rr_path', 'iso_path') and rec.rock_ridge is not None:
+        zf = rec.rock_ridge.zisofs_record()
+        if zf is not None:
+            return [zisofs.ZisofsIO(pycdlibio.PyCdlibIO(rec.inode, iso.logical_block_size), zf)], zf.uncompressed_size
+
+    sources = []  # type: List[Any]
+    length = 0
+    cur = rec  # type: Optional[Union[dr.DirectoryRecord, udfmod.UDFFileEntry]]
+    while cur is not None and cur.inode is not None:
+        sources.append(pycdlibio.PyCdlibIO(cur.inode, iso.logical_block_size))
+        length += cur.get_data_length()
+        if isinstance(cur, udfmod.UDFFileEntry):
+            break
+        cur = cur.data_continuation
+
+    return sources, length
+
+
+def extent_key(rec, index):
+    # type: (Union[dr.DirectoryRecord, udfmod.UDFFileEntry], int) -> Tuple[int, int]
+    """
+    A function to generate the sort key that puts files in the order of their
+    data on the ISO.  Data that is not on the original ISO (such as newly
+    added files) is put at the end, in the order it was found.
+
+    Parameters:
+     rec - The file record.
+     index - The order in which the record was found while walking.
+    Returns:
+     The sort key.
+    """
+    ino = rec.inode
+    if ino is not None and ino.original_data_location == inode.Inode.DATA_ON_ORIGINAL_ISO:
+        return (0, ino.orig_extent_loc)
+    return (1, index)
+
+
+def write_tar_fp(iso, outfp, path_type=None, start_path='/',
+                 blocksize=1024 * 1024):
+    # type: (pycdlib.PyCdlib, BinaryIO, Optional[str], str, int) -> None
+    """
+    Write the contents of an ISO out as a tar archive.  All of the directories
+    and symlinks are written first, then the files in the order that their
+    data appears on the ISO, so the ISO is read in a single forward pass with
+    large sequential reads.  Files that share data (hard links) are written
+    once, with the other names stored as tar hard links.  The output only
+    needs to support write(), so it may be a pipe or a socket.
+
+    Parameters:
+     iso - The PyCdlib object to write out.
+     outfp - The file object to write the tar archive to.
+     path_type - The namespace to walk; one of 'iso_path', 'rr_path',
+                 'joliet_path', or 'udf_path'.  If None (the default), the
+                 richest namespace on the ISO is used (UDF, then Rock Ridge,
+                 then Joliet, then ISO9660).
+     start_path - The directory on the ISO to start from; names in the
+                  archive are relative to it.
+     blocksize - The size of reads from the ISO and writes to the output.
+    Returns:
+     Nothing.
+    """
+    path_type = _choose_path_type(iso, path_type)
+    start_path = utils.normpath(start_path).decode('utf-8')
+
+    catalog_records = []  # type: List[Any]
+    if iso.eltorito_boot_catalog is not None:
+        catalog_records = iso.eltorito_boot_catalog.dirrecords
+
+    # Walk the namespace, writing out the metadata-only entries right away
+    # and saving the files for later.
+    # copybufsize is passed through a dictionary since the typing stubs for
+    # tarfile.open() do not know about it.
+    options = {'copybufsize': blocksize}  # type: Dict[str, Any]
+    tar = tarfile.open(fileobj=outfp, mode='w|', format=tarfile.PAX_FORMAT,  # pylint: disable=consider-using-with
+                       bufsize=blocksize, **options)
+    try:
+        files = []  # type: List[Tuple[str, Union[dr.DirectoryRecord, udfmod.UDFFileEntry]]]
+        dirs = collections.deque([(start_path, '')])  # type: Deque[Tuple[str, str]]
+        while dirs:
+            (isopath, relpath) = dirs.popleft()
+            for child in iso.list_children(**{path_type: isopath}):
+                if child is None or child.is_dot() or child.is_dotdot():
+                    continue
+
+                name = child_name(child, path_type)
+                child_rel = relpath + '/' + name if relpath else name
+                child_iso = isopath.rstrip('/') + '/' + name
+
+                if child.is_symlink():
+                    info = tarfile.TarInfo(child_rel)
+                    info.type = tarfile.SYMTYPE
+                    info.linkname = symlink_target(iso, child)
+                    _fill_tarinfo(info, child)
+                    tar.addfile(info)
+                elif child.is_dir():
+                    info = tarfile.TarInfo(child_rel)
+                    info.type = tarfile.DIRTYPE
+                    _fill_tarinfo(info, child)
+                    tar.addfile(info)
+                    dirs.append((child_iso, child_rel))
+                else:
+                    files.append((child_rel, child))
+
+        order = sorted(range(len(files)),
+                       key=lambda i: extent_key(files[i][1], i))
+        written = {}  # type: Dict[int, str]
+        for i in order:
+            (relpath, rec) = files[i]
+            info = tarfile.TarInfo(relpath)
+            _fill_tarinfo(info, rec)
+            if rec.inode is not None and id(rec.inode) in written:
+                info.type = tarfile.LNKTYPE
+                info.linkname = written[id(rec.inode)]
+                tar.addfile(info)
+                continue
+
+            (sources, length) = file_sources(iso, rec, path_type,
+                                             catalog_records)
+            info.size = length
+            tar.addfile(info, RecordReader(sources, length))
+            if rec.inode is not None:
+                written[id(rec.inode)] = relpath
+    finally:
+        tar.close()
@@ -0,0 +1,354 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""
+Support for stamping out many nearly-identical ISOs from a single mastered
+base image.
+"""
+
+import io
+import os
+
+from pycdlib import pycdlib
+from pycdlib import pycdlibexception
+from pycdlib import udf as udfmod
+from pycdlib import utils
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Any, BinaryIO, Dict, IO, List, Optional, Tuple, Union  # NOQA pylint: disable=unused-import
+    # NOTE: these imports have to be here to avoid circular deps
+    from pycdlib import dr  # NOQA pylint: disable=unused-import
+    from pycdlib import inode  # NOQA pylint: disable=unused-import
+
+
+def add_slot(iso, capacity, iso_path, rr_name=None, joliet_path=None,
+             udf_path=None, file_mode=None):
+    # type: (pycdlib.PyCdlib, int, str, Optional[str], Optional[str], Optional[str], Optional[int]) -> None
+    """
+    Add a reserved slot to an ISO that is being mastered as a template base.
+    A slot is a regular file filled with zeros; the number of extents it
+    occupies is the maximum amount of data that can later be stamped into it.
+
+    Parameters:
+     iso - The PyCdlib object to add the slot to.
+     capacity - The number of bytes to reserve for the slot.
+     iso_path - The ISO9660 absolute path to the slot on the ISO.
+     rr_name - The Rock Ridge name of the slot on the ISO.
+     joliet_path - The Joliet absolute path to the slot on the ISO.
+     udf_path - The UDF absolute path to the slot on the ISO.
+     file_mode - The POSIX file_mode to apply to this slot.  This only
+                 applies if this is a Rock Ridge ISO.  If this is None (the
+                 default), the permissions from the original file are used.
+    Returns:
+     Nothing.
+    """
+    if capacity < 0:
+        raise pycdlibexception.PyCdlibInvalidInput('The slot capacity must be non-negative')
+
+    iso.add_fp(io.BytesIO(b'\x00' * capacity), capacity, iso_path, rr_name,
+               joliet_path, file_mode, udf_path)
+
+
+def _copy_base(infp, outfp, length, blocksize):
+    # type: (IO[Any], BinaryIO, int, int) -> None
+    """
+    An internal function to copy the base image into the output.  When both
+    sides are real files, the copy is done in the kernel (which allows
+    filesystems that support it to share the underlying blocks); otherwise it
+    falls back to a regular copy.
+
+    Parameters:
+     infp - The file object to copy from.
+     outfp - The file object to copy to.
+     length - The number of bytes to copy.
+     blocksize - The blocksize to use for the fallback copy.
+    Returns:
+     Nothing.
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            in_fd = infp.fileno()
+            out_fd = outfp.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            pass
+        else:
+            outfp.flush()
+            offset = 0
+            try:
+                while offset < length:
+                    copied = os.copy_file_range(in_fd, out_fd, length - offset,  # pylint: disable=no-member
+                                                offset, offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+            except OSError:
+                pass
+            if offset == length:
+                return
+            # If the kernel copy did not finish, redo it the slow way.
+
+    infp.seek(0)
+    outfp.seek(0)
+    utils.copy_data(length, blocksize, infp, outfp)
+
+
+def _save_udf_alloc_descs(ino):
+    # type: (inode.Inode) -> List[Tuple[udfmod.UDFFileEntry, List[Union[udfmod.UDFShortAD, udfmod.UDFLongAD, udfmod.UDFInlineAD]], List[int]]]
+    """
+    An internal function to save the allocation descriptors of the UDF File
+    Entries linked to an inode.  Shortening a UDF File Entry shortens (and may
+    remove) its allocation descriptors, and just setting the length back
+    doesn't restore them.
+
+    Parameters:
+     ino - The inode whose UDF File Entries should be saved.
+    Returns:
+     A list of tuples of the UDF File Entry, its allocation descriptors, and
+     their extent lengths.
+    """
+    saved = []
+    for record, is_pvd_unused in ino.linked_records:
+        if isinstance(record, udfmod.UDFFileEntry):
+            saved.append((record, list(record.alloc_descs),
+                          [desc.extent_length for desc in record.alloc_descs]))
+    return saved
+
+
+class PyCdlibTemplate:
+    """
+    A class to stamp out variants of a base ISO.  The base ISO is parsed once;
+    each stamp then copies the base image and patches only the data of the
+    requested slots and the records that describe them.
+    """
+    __slots__ = ('_initialized', '_iso', '_base_fp', '_base_size', '_slots')
+
+    def __init__(self):
+        # type: () -> None
+        self._initialized = False
+        self._iso = pycdlib.PyCdlib()
+        self._slots = {}  # type: Dict[bytes, dr.DirectoryRecord]
+
+    def open(self, filename):
+        # type: (str) -> None
+        """
+        Open up a base ISO to stamp variants from.
+
+        Parameters:
+         filename - The filename containing the base ISO.
+        Returns:
+         Nothing.
+        """
+        if self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This template is already open; close it first')
+
+        self._iso.open(filename)
+        self._open_common()
+
+    def open_fp(self, fp):
+        # type: (BinaryIO) -> None
+        """
+        Open up a base ISO to stamp variants from.  Note that the file object
+        passed in here must stay open for the lifetime of this object.
+
+        Parameters:
+         fp - The file object containing the base ISO.
+        Returns:
+         Nothing.
+        """
+        if self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This template is already open; close it first')
+
+        self._iso.open_fp(fp)
+        self._open_common()
+
+    def _open_common(self):
+        # type: () -> None
+        """
+        An internal method to finish opening a base ISO.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        self._base_fp = self._iso._cdfp  # pylint: disable=protected-access
+        self._base_fp.seek(0, os.SEEK_END)
+        self._base_size = self._base_fp.tell()
+        self._slots = {}
+        self._initialized = True
+
+    def add_slot(self, iso_path):
+        # type: (str) -> int
+        """
+        Mark a file on the base ISO as a slot that can be stamped.
+
+        Parameters:
+         iso_path - The ISO9660 absolute path to the file on the base ISO.
+        Returns:
+         The capacity of the slot, in bytes.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This template is not open; call open() first')
+
+        path = utils.normpath(iso_path)
+        child = self._iso._find_iso_record(path)  # pylint: disable=protected-access
+        if not child.is_file():
+            raise pycdlibexception.PyCdlibInvalidInput('Only files can be used as template slots')
+        if child.inode is None:
+            raise pycdlibexception.PyCdlibInternalError('Child file found without inode')
+        if child.data_continuation is not None:
+            raise pycdlibexception.PyCdlibInvalidInput('Multi-extent files cannot be used as template slots')
+
+        self._slots[path] = child
+
+        return self._capacity(child)
+
+    def _capacity(self, child):
+        # type: (dr.DirectoryRecord) -> int
+        """
+        An internal method to get the number of bytes available to a slot.
+
+        Parameters:
+         child - The Directory Record of the slot.
+        Returns:
+         The capacity of the slot, in bytes.
+        """
+        log_block_size = self._iso.logical_block_size
+        return utils.ceiling_div(child.get_data_length(), log_block_size) * log_block_size
+
+    def slot_capacity(self, iso_path):
+        # type: (str) -> int
+        """
+        Get the number of bytes that can be stamped into a slot.
+
+        Parameters:
+         iso_path - The ISO9660 absolute path to the slot.
+        Returns:
+         The capacity of the slot, in bytes.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This template is not open; call open() first')
+
+        path = utils.normpath(iso_path)
+        if path not in self._slots:
+            raise pycdlibexception.PyCdlibInvalidInput('Path %s is not a template slot' % (iso_path))
+
+        return self._capacity(self._slots[path])
+
+    def stamp_fp(self, outfp, slot_data, blocksize=32768):
+        # type: (BinaryIO, Dict[str, Union[bytes, Tuple[BinaryIO, int]]], int) -> None
+        """
+        Write out a variant of the base ISO to a file object.  The data for
+        each slot can either be a bytes object or a tuple of (file object,
+        length); slots that are not mentioned keep the contents of the base.
+
+        Parameters:
+         outfp - The file object to write the variant to.  It must be opened
+                 for reading and writing, and must be seekable.
+         slot_data - A dictionary mapping slot ISO9660 paths to the new data.
+         blocksize - The blocksize to use when copying data.
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This template is not open; call open() first')
+
+        # Validate everything before touching the output.
+        updates = []
+        for iso_path, data in slot_data.items():
+            path = utils.normpath(iso_path)
+            if path not in self._slots:
+                raise pycdlibexception.PyCdlibInvalidInput('Path %s is not a template slot' % (iso_path))
+            if isinstance(data, bytes):
+                data_fp = io.BytesIO(data)  # type: BinaryIO
+                length = len(data)
+            else:
+                data_fp, length = data
+            child = self._slots[path]
+            if length > self._capacity(child):
+                raise pycdlibexception.PyCdlibInvalidInput('Data for slot %s is larger than the slot capacity' % (iso_path))
+            updates.append((child, data_fp, length))
+
+        _copy_base(self._base_fp, outfp, self._base_size, blocksize)
+
+        log_block_size = self._iso.logical_block_size
+        for child, data_fp, length in updates:
+            if child.inode is None:
+                raise pycdlibexception.PyCdlibInternalError('Child file found without inode')
+
+            outfp.seek(child.extent_location() * log_block_size)
+            utils.copy_data(length, blocksize, data_fp, outfp)
+            # Clear out whatever the base had in the rest of the slot.
+            outfp.write(b'\x00' * (self._capacity(child) - length))
+
+            orig_length = child.inode.get_data_length()
+            saved = _save_udf_alloc_descs(child.inode)
+            base_lengths = {}
+            for abs_offset, rec in self._iso._update_linked_records_length(child.inode, orig_length):  # pylint: disable=protected-access
+                base_lengths[abs_offset] = len(rec)
+            try:
+                patches = self._iso._update_linked_records_length(child.inode, length)  # pylint: disable=protected-access
+            finally:
+                # Put the in-memory metadata back to the base values so that
+                # the next variant starts from the same place.
+                for file_entry, alloc_descs, extent_lengths in saved:
+                    file_entry.alloc_descs = alloc_descs
+                    for desc, extent_length in zip(alloc_descs, extent_lengths):
+                        desc.extent_length = extent_length
+                    file_entry.info_len = orig_length
+                self._iso._update_linked_records_length(child.inode, orig_length)  # pylint: disable=protected-access
+            for abs_offset, rec in patches:
+                outfp.seek(abs_offset)
+                outfp.write(rec)
+                # A UDF File Entry that needs fewer allocation descriptors is
+                # shorter than the one in the base; clear the rest of it.
+                outfp.write(b'\x00' * (base_lengths[abs_offset] - len(rec)))
+
+        outfp.seek(0, os.SEEK_END)
+
+    def stamp(self, filename, slot_data, blocksize=32768):
+        # type: (str, Dict[str, Union[bytes, Tuple[BinaryIO, int]]], int) -> None
+        """
+        Write out a variant of the base ISO to a file.  See stamp_fp() for a
+        description of the slot data.
+
+        Parameters:
+         filename - The filename to write the variant to.
+         slot_data - A dictionary mapping slot ISO9660 paths to the new data.
+         blocksize - The blocksize to use when copying data.
+        Returns:
+         Nothing.
+        """
+        with open(filename, 'w+b') as fp:
+            self.stamp_fp(fp, slot_data, blocksize)
+
+    def close(self):
+        # type: () -> None
+        """
+        Close the base ISO.  The object can then be re-used for another base.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if not self._initialized:
+            raise pycdlibexception.PyCdlibInvalidInput('This template is not open; call open() first')
+
+        self._iso.close()
+        self._slots = {}
+        self._initialized = False
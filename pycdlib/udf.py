@@ -16,6 +16,7 @@
 
 """Classes to support UDF."""
 
+import binascii
 import io
 import logging
 import random
@@ -85,10 +86,12 @@ crc_ccitt_table = (0, 4129, 8258, 12387, 16516, 20645, 24774, 28903, 33032,
 _logger = logging.getLogger('pycdlib')
 
 
-def crc_ccitt(data):
+def _crc_ccitt_table_lookup(data):
     # type: (bytes) -> int
     """
-    Calculate the CRC over a range of bytes using the CCITT polynomial.
+    Calculate the CRC over a range of bytes using the CCITT polynomial, one
+    byte at a time using the table above.  This is the reference
+    implementation, used when binascii.crc_hqx is not available.
 
     Parameters:
      data - The array of bytes to calculate the CRC over.
@@ -102,6 +105,27 @@ def crc_ccitt(data):
     return crc
 
 
+_crc_hqx = getattr(binascii, 'crc_hqx', None)
+
+
+def crc_ccitt(data):
+    # type: (bytes) -> int
+    """
+    Calculate the CRC over a range of bytes using the CCITT polynomial.
+
+    Parameters:
+     data - The array of bytes to calculate the CRC over.
+    Returns:
+     The CCITT CRC of the data.
+    """
+    if _crc_hqx is None:
+        return _crc_ccitt_table_lookup(data)
+
+    # binascii.crc_hqx implements the same CRC (polynomial 0x1021, no
+    # reflection) in C; a starting value of 0 matches the table code.
+    return _crc_hqx(data, 0)
+
+
 def _ostaunicode(src):
     # type: (str) -> bytes
     """Internal function to create an OSTA byte string from a source string."""
@@ -615,12 +639,8 @@ def _compute_csum(data):
     Returns:
      The checksum.
     """
-    csum = 0
-    for byte in data:
-        csum += byte
-    csum -= data[4]
-
-    return csum % 256
+    # Byte 4 is the checksum field itself, so it does not take part.
+    return (sum(data) - data[4]) % 256
 
 
 class UDFTag:
@@ -3825,7 +3845,8 @@ class UDFFileEntry:
                  'log_block_recorded', 'unique_id', 'len_extended_attrs',
                  'desc_tag', 'icb_tag', 'alloc_descs', 'fi_descs', 'parent',
                  'access_time', 'mod_time', 'attr_time', 'extended_attr_icb',
-                 'impl_ident', 'extended_attrs', 'file_ident', 'inode')
+                 'impl_ident', 'extended_attrs', 'file_ident', 'inode',
+                 '_record_cache')
 
     FMT = '<16s20sLLLHBBLQQ12s12s12sL16s32sQLL'
 
@@ -3839,6 +3860,7 @@ class UDFFileEntry:
         self.file_ident = None  # type: Optional[UDFFileIdentifierDescriptor]
         self.inode = None  # type: Optional[inode.Inode]
         self.new_extent_loc = -1
+        self._record_cache = None  # type: Optional[bytes]
 
     def parse(self, data, extent, parent, desc_tag):
         # type: (bytes, int, Optional[UDFFileEntry], UDFTag) -> None
@@ -3922,6 +3944,9 @@ class UDFFileEntry:
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('UDF File Entry not initialized')
 
+        if self._record_cache is not None:
+            return self._record_cache
+
         len_alloc_descs = 0
         for desc in self.alloc_descs:
             len_alloc_descs += desc.length()
@@ -3939,7 +3964,8 @@ class UDFFileEntry:
         for desc in self.alloc_descs:
             rec += desc.record()
 
-        return self.desc_tag.record(rec) + rec
+        self._record_cache = self.desc_tag.record(rec) + rec
+        return self._record_cache
 
     def extent_location(self):
         # type: () -> int
@@ -4059,6 +4085,7 @@ class UDFFileEntry:
         self.new_extent_loc = new_location
         self.desc_tag.tag_location = tag_location
         self.unique_id = new_location
+        self._record_cache = None
 
     def add_file_ident_desc(self, new_fi_desc, logical_block_size):
         # type: (UDFFileIdentifierDescriptor, int) -> int
@@ -4096,6 +4123,7 @@ class UDFFileEntry:
         self.alloc_descs[0].extent_length = self.info_len
         if new_fi_desc.is_dir():
             self.file_link_count += 1
+        self._record_cache = None
 
         return new_num_extents - old_num_extents
 
@@ -4138,6 +4166,7 @@ class UDFFileEntry:
         self.info_len -= UDFFileIdentifierDescriptor.length(len(this_desc.fi))
         new_num_extents = utils.ceiling_div(self.info_len, logical_block_size)
         self.alloc_descs[0].extent_length = self.info_len
+        self._record_cache = None
 
         del self.fi_descs[desc_index]
 
@@ -4161,6 +4190,7 @@ class UDFFileEntry:
         for desc in self.alloc_descs:
             desc.log_block_num = current_assignment
             current_assignment += utils.ceiling_div(desc.extent_length, 2048)
+        self._record_cache = None
 
     def get_data_length(self):
         # type: () -> int
@@ -4211,9 +4241,20 @@ class UDFFileEntry:
                 index += 1
                 len_left -= this_len
 
-            self.alloc_descs = self.alloc_descs[:alloc_descs_needed]
+            if alloc_descs_needed == 0:
+                # Keep one (empty) descriptor, which ends the list according
+                # to Ecma-167 4/14.14.1.1, so that the length can be increased
+                # again later.
+                self.alloc_descs[0].extent_length = 0
+                alloc_descs_needed = 1
+
+            if alloc_descs_needed < len(self.alloc_descs):
+                self.alloc_descs = self.alloc_descs[:alloc_descs_needed]
+                # The record got shorter, so the CRC has to cover less.
+                self.desc_tag.desc_crc_length = -1
 
         self.info_len = length
+        self._record_cache = None
 
     def is_file(self):
         # type: () -> bool
@@ -4373,7 +4414,7 @@ class UDFFileIdentifierDescriptor:
     __slots__ = ('_initialized', 'orig_extent_loc', 'new_extent_loc',
                  'desc_tag', 'file_characteristics', 'len_fi', 'len_impl_use',
                  'fi', 'isdir', 'isparent', 'icb', 'impl_use', 'file_entry',
-                 'encoding', 'parent')
+                 'encoding', 'parent', '_record_cache')
 
     FMT = '<16sHBB16sH'
 
@@ -4387,6 +4428,7 @@ class UDFFileIdentifierDescriptor:
         self.isdir = False
         self.parent = None  # type: Optional[UDFFileEntry]
         self.new_extent_loc = -1
+        self._record_cache = None  # type: Optional[bytes]
 
     @classmethod
     def length(cls, namelen):
@@ -4527,6 +4569,9 @@ class UDFFileIdentifierDescriptor:
         if not self._initialized:
             raise pycdlibexception.PyCdlibInternalError('UDF File Identifier Descriptor not initialized')
 
+        if self._record_cache is not None:
+            return self._record_cache
+
         if self.len_fi > 0:
             if self.encoding == 'latin-1':
                 prefix = b'\x08'
@@ -4542,7 +4587,8 @@ class UDFFileIdentifierDescriptor:
                           self.file_characteristics, self.len_fi,
                           self.icb.record(),
                           self.len_impl_use) + self.impl_use + fi + b'\x00' * UDFFileIdentifierDescriptor.pad(struct.calcsize(self.FMT) + self.len_impl_use + self.len_fi)
-        return self.desc_tag.record(rec[16:]) + rec[16:]
+        self._record_cache = self.desc_tag.record(rec[16:]) + rec[16:]
+        return self._record_cache
 
     def extent_location(self):
         # type: () -> int
@@ -4626,6 +4672,7 @@ class UDFFileIdentifierDescriptor:
 
         self.new_extent_loc = new_location
         self.desc_tag.tag_location = tag_location
+        self._record_cache = None
 
     def set_icb(self, new_location, tag_location):
         # type: (int, int) -> None
@@ -4643,6 +4690,7 @@ class UDFFileIdentifierDescriptor:
             raise pycdlibexception.PyCdlibInternalError('UDF File Identifier not initialized')
 
         self.icb.set_extent_location(new_location, tag_location)
+        self._record_cache = None
 
     def __lt__(self, other):
         # type: (UDFFileIdentifierDescriptor) -> bool
@@ -5532,6 +5580,42 @@ def symlink_to_bytes(symlink_target):
     return symlink_data
 
 
+def bytes_to_symlink(symlink_data):
+    # type: (bytes) -> str
+    """
+    Generate a Unix-like path from UDF symlink data; the reverse of
+    symlink_to_bytes().
+
+    Parameters:
+     symlink_data - The UDF data corresponding to the symlink.
+    Returns:
+     The Unix-like path that is the symlink.
+    """
+    comps = []  # type: List[str]
+    offset = 0
+    while offset + 4 <= len(symlink_data):
+        (comp_type, ident_len) = struct.unpack_from('=BB', symlink_data, offset)
+        ident = symlink_data[offset + 4:offset + 4 + ident_len]
+        offset += 4 + ident_len
+        if comp_type in (1, 2):
+            comps = ['']
+        elif comp_type == 3:
+            comps.append('..')
+        elif comp_type == 4:
+            comps.append('.')
+        elif comp_type == 5:
+            if ident[:1] == b'\x10':
+                comps.append(ident[1:].decode('utf-16_be'))
+            else:
+                comps.append(ident[1:].decode('latin-1'))
+        else:
+            raise pycdlibexception.PyCdlibInvalidISO('Invalid UDF symlink component type %d' % (comp_type))
+
+    if comps == ['']:
+        return '/'
+    return '/'.join(comps)
+
+
 def _parse_allocation_descriptors(flags, data, length, start_offset, extent):
     # type: (int, bytes, int, int, int) -> List[Union[UDFShortAD, UDFLongAD, UDFInlineAD]]
     """
@@ -38,7 +38,7 @@ if sys.platform == "win32":
 
 # For mypy annotations
 if False:  # pylint: disable=using-constant-test
-    from typing import Any, BinaryIO, Generator, IO, List, Optional, Tuple  # NOQA pylint: disable=unused-import
+    from typing import Any, BinaryIO, Callable, Generator, IO, List, NoReturn, Optional, Tuple  # NOQA pylint: disable=unused-import
 
 
 def swab_32bit(x):
@@ -91,8 +91,8 @@ def ceiling_div(numer, denom):
     return -(-numer // denom)
 
 
-def copy_data_yield(data_length, blocksize, infp, outfp):
-    # type: (int, int, BinaryIO, IO[Any]) -> Generator
+def copy_data_yield(data_length, blocksize, infp, outfp, data_cb=None):
+    # type: (int, int, IO[Any], IO[Any], Optional[Callable[[bytes], None]]) -> Generator
     """
     A utility function to copy data from the input file object to the output
     file object.
@@ -102,6 +102,8 @@ def copy_data_yield(data_length, blocksize, infp, outfp):
      blocksize - How much data to copy per iteration.
      infp - The file object to copy data from.
      outfp - The file object to copy data to.
+     data_cb - An optional callable that is passed each piece of data as it
+               is copied.
     Returns:
      Nothing.
     """
@@ -116,13 +118,15 @@ def copy_data_yield(data_length, blocksize, infp, outfp):
         data_len = len(data)
         if data_len != readsize:
             data_len = left
+        if data_cb is not None:
+            data_cb(data)
         outfp.write(data)
         left -= data_len
         yield data_len
 
 
 def copy_data(data_length, blocksize, infp, outfp):
-    # type: (int, int, BinaryIO, IO[Any]) -> None
+    # type: (int, int, IO[Any], IO[Any]) -> None
     """
     A utility function to copy data from the input file object to the output
     file object.
@@ -604,3 +608,33 @@ class Win32RawDevice:
         if to is None:
             to = self.geometry[-2]  # logical bytes per sector value
         return math.floor(size / to) * to
+
+
+class _EmptyList(list):
+    """
+    A class for a list that is always empty.  A single instance of this is
+    shared by all of the objects that would otherwise each hold their own
+    empty list (for instance, the children of a file Directory Record), which
+    saves a lot of memory on large ISOs.  Any attempt to modify it is a bug, so
+    it raises an exception; owners must replace it with a real list first.
+    """
+    __slots__ = ()
+
+    def _modify(self, *args, **kwargs):  # pylint: disable=unused-argument
+        # type: (Any, Any) -> NoReturn
+        """
+        An internal method to reject modification of the shared empty list.
+
+        Parameters:
+         args - Ignored.
+         kwargs - Ignored.
+        Returns:
+         Never returns.
+        """
+        raise pycdlibexception.PyCdlibInternalError('Trying to modify the shared empty list')
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _modify
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _modify
+
+
+EMPTY_LIST = _EmptyList()
@@ -0,0 +1,337 @@
+# Copyright (C) 2026  Chris Lalancette <clalancette@gmail.com>
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation;
+# version 2.1 of the License.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301  USA
+
+"""
+Support for the zisofs format, in which the data of a file on a Rock Ridge ISO
+is stored compressed (as marked by a ZF entry), as used by Linux.
+"""
+
+import io
+import os
+import struct
+import zlib
+
+from pycdlib import pycdlibexception
+
+# For mypy annotations
+if False:  # pylint: disable=using-constant-test
+    from typing import Any, BinaryIO, IO, List, Optional, Tuple  # NOQA pylint: disable=unused-import
+    # NOTE: these imports have to be here to avoid circular deps
+    from pycdlib import pycdlibio  # NOQA pylint: disable=unused-import
+    from pycdlib import rockridge  # NOQA pylint: disable=unused-import
+
+MAGIC = b'\x37\xe4\x53\x96\xc9\xdb\xd6\x07'
+HEADER_SIZE = 16
+DEFAULT_LOG2_BLOCK_SIZE = 15
+MAX_SIZE = 2**32 - 1
+
+
+def compress_fp(infp, length, outfp, log2_block_size=DEFAULT_LOG2_BLOCK_SIZE,
+                level=9):
+    # type: (BinaryIO, int, IO[bytes], int, int) -> int
+    """
+    Compress data into the zisofs format: a header, a table of pointers to the
+    start of each block, and the blocks compressed one by one with zlib.
+    Blocks that are all zeros are not stored at all.
+
+    Parameters:
+     infp - The file object to compress, read from its current position.
+     length - The number of bytes to compress.
+     outfp - The file object to write the compressed data to, at its current
+             position.
+     log2_block_size - The base 2 logarithm of the block size (15, 16, or 17).
+     level - The zlib compression level.
+    Returns:
+     The number of bytes written.
+    """
+    if log2_block_size not in (15, 16, 17):
+        raise pycdlibexception.PyCdlibInvalidInput('The zisofs block size must be 2**15, 2**16, or 2**17')
+    if length > MAX_SIZE:
+        raise pycdlibexception.PyCdlibInvalidInput('zisofs can only compress files smaller than 4GiB')
+
+    block_size = 1 << log2_block_size
+    num_blocks = (length + block_size - 1) // block_size
+    table_len = (num_blocks + 1) * 4
+
+    start = outfp.tell()
+    outfp.write(MAGIC + struct.pack('<LBB2s', length, HEADER_SIZE // 4,
+                                    log2_block_size, b'\x00\x00'))
+    outfp.write(b'\x00' * table_len)
+
+    pointers = []  # type: List[int]
+    offset = HEADER_SIZE + table_len
+    zero_block = b'\x00' * block_size
+    left = length
+    while left > 0:
+        data = infp.read(min(block_size, left))
+        if not data:
+            raise pycdlibexception.PyCdlibInvalidInput('Data ended before the given length')
+        left -= len(data)
+        pointers.append(offset)
+        if data == zero_block[:len(data)]:
+            continue
+        comp = zlib.compress(data, level)
+        outfp.write(comp)
+        offset += len(comp)
+    pointers.append(offset)
+
+    end = outfp.tell()
+    outfp.seek(start + HEADER_SIZE)
+    outfp.write(struct.pack('<%dL' % (len(pointers)), *pointers))
+    outfp.seek(end)
+
+    return offset
+
+
+class ZisofsIO(io.RawIOBase):
+    """
+    A read-only file object that decompresses the data of a zisofs file on the
+    fly.  The block pointer table is read when the file is entered, and each
+    read only decompresses the blocks that it covers, so seeking is cheap.
+    This is returned in place of a pycdlibio.PyCdlibIO object for files that
+    have a Rock Ridge ZF entry.
+    """
+    __slots__ = ('_raw', '_zf', '_pointers', '_block_size', '_offset',
+                 '_last_block', '_last_data', '_open')
+
+    def __init__(self, raw, zf):
+        # type: (pycdlibio.PyCdlibIO, rockridge.RRZFRecord) -> None
+        super(ZisofsIO, self).__init__()  # pylint: disable=super-with-arguments
+        if zf.algorithm != b'pz':
+            raise pycdlibexception.PyCdlibInvalidInput('Unsupported zisofs algorithm %r' % (zf.algorithm))
+        self._raw = raw
+        self._zf = zf
+        self._pointers = ()  # type: Tuple[int, ...]
+        self._block_size = 1 << zf.log2_block_size
+        self._offset = 0
+        self._last_block = -1
+        self._last_data = b''
+        self._open = True
+
+    def __enter__(self):
+        self._raw.__enter__()
+        num_blocks = (self._zf.uncompressed_size + self._block_size - 1) // self._block_size
+        self._raw.seek(0)
+        header = self._raw.read(self._zf.header_size + (num_blocks + 1) * 4)
+        if len(header) != self._zf.header_size + (num_blocks + 1) * 4 or header[:8] != MAGIC:
+            raise pycdlibexception.PyCdlibInvalidISO('Invalid zisofs header')
+        self._pointers = struct.unpack_from('<%dL' % (num_blocks + 1), header,
+                                            self._zf.header_size)
+        return self
+
+    def __exit__(self, *args):
+        self._raw.__exit__()
+
+    def _check_open(self):
+        # type: () -> None
+        """
+        An internal method to make sure that the file is still open.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if not self._open:
+            raise pycdlibexception.PyCdlibInvalidInput('I/O operation on closed file.')
+
+    def _read_block(self, blk):
+        # type: (int) -> bytes
+        """
+        An internal method to read and decompress a single block.  The last
+        block read is kept, since reads are often smaller than a block.
+
+        Parameters:
+         blk - The number of the block to read.
+        Returns:
+         The uncompressed data of the block.
+        """
+        if blk == self._last_block:
+            return self._last_data
+
+        expected = min(self._block_size,
+                       self._zf.uncompressed_size - blk * self._block_size)
+        start = self._pointers[blk]
+        end = self._pointers[blk + 1]
+        if end < start:
+            raise pycdlibexception.PyCdlibInvalidISO('Invalid zisofs block pointers')
+        if start == end:
+            data = b'\x00' * expected
+        else:
+            self._raw.seek(start)
+            try:
+                data = zlib.decompress(self._raw.read(end - start))
+            except zlib.error as e:
+                raise pycdlibexception.PyCdlibInvalidISO('Invalid zisofs block %d (%s)' % (blk, e))
+            if len(data) != expected:
+                raise pycdlibexception.PyCdlibInvalidISO('Invalid zisofs block %d (wrong size)' % (blk))
+
+        self._last_block = blk
+        self._last_data = data
+        return data
+
+    def read(self, size=None):
+        # type: (Optional[int]) -> bytes
+        """
+        Read and return up to size bytes.
+
+        Parameters:
+         size - Optional parameter to read size number of bytes; if None or
+                negative, all remaining bytes in the file will be read
+        Returns:
+         The number of bytes requested or the rest of the data left in the file,
+         whichever is smaller.  If the file is at or past EOF, returns an empty
+         bytestring.
+        """
+        self._check_open()
+        end = self._zf.uncompressed_size
+        if size is not None and size >= 0:
+            end = min(end, self._offset + size)
+
+        chunks = []  # type: List[bytes]
+        pos = self._offset
+        while pos < end:
+            blk = pos // self._block_size
+            data = self._read_block(blk)
+            offset = pos - blk * self._block_size
+            chunk = data[offset:offset + end - pos]
+            chunks.append(chunk)
+            pos += len(chunk)
+
+        self._offset = max(pos, self._offset)
+        return b''.join(chunks)
+
+    def readall(self):
+        # type: () -> bytes
+        """
+        Read and return the remaining bytes in the file.
+
+        Parameters:
+         None.
+        Returns:
+         The rest of the data left in the file.
+        """
+        return self.read(-1)
+
+    def readinto(self, b):
+        # type: (Any) -> int
+        """
+        Read bytes into a pre-allocated, writable bytes-like object.
+
+        Parameters:
+         b - The buffer to read into.
+        Returns:
+         The number of bytes read.
+        """
+        view = memoryview(b).cast('B')
+        data = self.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # type: (int, int) -> int
+        """
+        Change the stream position.
+
+        Parameters:
+         offset - The byte offset to seek to.
+         whence - The position in the file to start from (0 for start, 1 for
+                  current, 2 for end)
+        Returns:
+         The new absolute position.
+        """
+        self._check_open()
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._offset + offset
+        elif whence == os.SEEK_END:
+            pos = self._zf.uncompressed_size + offset
+        else:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid value for whence (options are 0, 1, and 2)')
+
+        if pos < 0:
+            raise pycdlibexception.PyCdlibInvalidInput('Invalid offset value (cannot seek before start of file)')
+        self._offset = pos
+        return pos
+
+    def tell(self):
+        # type: () -> int
+        """
+        Return the current stream position.
+
+        Parameters:
+         None.
+        Returns:
+         The current stream position.
+        """
+        self._check_open()
+        return self._offset
+
+    def length(self):
+        # type: () -> int
+        """
+        Return the uncompressed length of the file.
+
+        Parameters:
+         None.
+        Returns:
+         The length of the file.
+        """
+        self._check_open()
+        return self._zf.uncompressed_size
+
+    def readable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is readable.
+
+        Parameters:
+         None.
+        Returns:
+         True in all cases.
+        """
+        self._check_open()
+        return True
+
+    def seekable(self):
+        # type: () -> bool
+        """
+        Determine whether this file is seekable.
+
+        Parameters:
+         None.
+        Returns:
+         True in all cases.
+        """
+        self._check_open()
+        return True
+
+    def close(self):
+        # type: () -> None
+        """
+        Close this file stream.
+
+        Parameters:
+         None.
+        Returns:
+         Nothing.
+        """
+        if self._open:
+            self._open = False
+            self._last_data = b''
+            self._raw.close()
+        super(ZisofsIO, self).close()  # pylint: disable=super-with-arguments
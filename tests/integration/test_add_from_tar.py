@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+import tarfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+
+
+def _add_member(tar, name, data=None, **kwargs):
+    info = tarfile.TarInfo(name)
+    for key, value in kwargs.items():
+        setattr(info, key, value)
+    if data is not None:
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+    else:
+        tar.addfile(info)
+
+def _make_tar(tmpdir, compression=''):
+    tarname = os.path.join(str(tmpdir), 'test.tar' + ('.' + compression if compression else ''))
+    with tarfile.open(tarname, 'w:' + compression) as tar:
+        _add_member(tar, 'bin', type=tarfile.DIRTYPE, mode=0o750)
+        _add_member(tar, 'bin/tool', b'#!/bin/sh\n', mode=0o755)
+        _add_member(tar, 'bin/Tool', b'other\n', mode=0o644)
+        # A file whose parent directory has no entry of its own.
+        _add_member(tar, './usr/share/doc/readme.txt', b'read me\n' * 1000,
+                    mode=0o644)
+        _add_member(tar, 'bin/sh', type=tarfile.SYMTYPE, linkname='tool')
+        _add_member(tar, 'bin/tool2', type=tarfile.LNKTYPE, linkname='bin/tool')
+        _add_member(tar, 'dev/null', type=tarfile.CHRTYPE)
+    return tarname
+
+def test_add_from_tar_rock_ridge(tmpdir):
+    tarname = _make_tar(tmpdir)
+
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09', joliet=3)
+    iso.add_from_tar(tarname)
+
+    # The data is referenced in place in the archive.
+    rec = iso.get_record(rr_path='/usr/share/doc/readme.txt')
+    assert(rec.inode.data_fp == tarname)
+    with tarfile.open(tarname) as tar:
+        assert(rec.inode.fp_offset == tar.getmember('./usr/share/doc/readme.txt').offset_data)
+
+    outfile = os.path.join(str(tmpdir), 'fromtar.iso')
+    iso.write(outfile)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    assert(sorted(iso.get_record(iso_path=p).file_identifier() for p in ('/BIN/TOOL.;1', '/BIN/TOOL000.;1')) == [b'TOOL.;1', b'TOOL000.;1'])
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, rr_path='/bin/Tool')
+    assert(out.getvalue() == b'other\n')
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, joliet_path='/usr/share/doc/readme.txt')
+    assert(out.getvalue() == b'read me\n' * 1000)
+    assert(iso.get_record(rr_path='/bin').rock_ridge.get_file_mode() == 0o040750)
+    assert(iso.get_record(rr_path='/bin/tool').rock_ridge.get_file_mode() == 0o100755)
+    assert(iso.get_record(rr_path='/bin/sh').rock_ridge.symlink_path() == b'tool')
+    assert(iso.get_record(rr_path='/bin/tool2').extent_location() == iso.get_record(rr_path='/bin/tool').extent_location())
+    # Devices are skipped.
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput):
+        iso.get_record(rr_path='/dev')
+    iso.close()
+
+def test_add_from_tar_fileobj_udf(tmpdir):
+    tarname = _make_tar(tmpdir)
+
+    iso = pycdlib.PyCdlib()
+    iso.new(udf='2.60')
+    with tarfile.open(tarname) as tar:
+        iso.add_from_tar(tar)
+        out = io.BytesIO()
+        iso.write_fp(out)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(out)
+    data = io.BytesIO()
+    iso.get_file_from_iso_fp(data, udf_path='/bin/tool2')
+    assert(data.getvalue() == b'#!/bin/sh\n')
+    assert(iso.get_record(udf_path='/bin/sh').is_symlink())
+    iso.close()
+
+def test_add_from_tar_merges_existing_dirs(tmpdir):
+    tarname = _make_tar(tmpdir)
+
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    iso.add_directory('/USR')
+    iso.add_from_tar(tarname)
+    assert(iso.get_record(iso_path='/USR/SHARE/DOC/README.TXT;1').get_data_length() == 8000)
+    # Without Rock Ridge or UDF there is nowhere to put the symlink.
+    assert(sorted(c.file_identifier() for c in iso.list_children(iso_path='/BIN'))[2:] == [b'TOOL.;1', b'TOOL000.;1', b'TOOL2.;1'])
+    iso.close()
+
+def test_add_from_tar_compressed(tmpdir):
+    tarname = _make_tar(tmpdir, 'gz')
+
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    with tarfile.open(tarname) as tar:
+        with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+            iso.add_from_tar(tar)
+    assert(str(excinfo.value) == 'Only uncompressed, seekable tar archives can be added')
+    with pytest.raises(tarfile.ReadError):
+        iso.add_from_tar(tarname)
+    iso.close()
+
+def test_add_from_tar_joliet_long_names(tmpdir):
+    tarname = os.path.join(str(tmpdir), 'long.tar')
+    prefix = 'a' * 70
+    with tarfile.open(tarname, 'w:') as tar:
+        _add_member(tar, prefix + '1.txt', b'one\n', mode=0o644)
+        _add_member(tar, prefix + '2.txt', b'two\n', mode=0o644)
+        _add_member(tar, 'README', b'readme\n', mode=0o644)
+
+    iso = pycdlib.PyCdlib()
+    iso.new(interchange_level=4, rock_ridge='1.09', joliet=3)
+    iso.add_from_tar(tarname)
+
+    # The names are the same in their first 64 characters, so the second one
+    # gets a number before its extension.
+    names = sorted(c.file_identifier().decode('utf-16_be') for c in iso.list_children(joliet_path='/')
+                   if not c.is_dot() and not c.is_dotdot())
+    assert(names == ['README', 'a' * 57 + '000.txt', 'a' * 64])
+    # An extensionless name doesn't get a trailing separator.
+    assert(iso.get_record(iso_path='/README').get_data_length() == 7)
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(out)
+    data = io.BytesIO()
+    iso.get_file_from_iso_fp(data, joliet_path='/' + 'a' * 57 + '000.txt')
+    assert(data.getvalue() == b'two\n')
+    iso.close()
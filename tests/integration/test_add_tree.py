@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+
+
+def _make_tree(tmpdir):
+    top = tmpdir.mkdir('tree')
+    sub = top.mkdir('subdir')
+    deep = sub.mkdir('deeper')
+    with open(os.path.join(str(top), 'readme.txt'), 'wb') as outfp:
+        outfp.write(b'readme\n')
+    # These two mangle to the same ISO9660 name.
+    with open(os.path.join(str(top), 'long-file-name.txt'), 'wb') as outfp:
+        outfp.write(b'first\n')
+    with open(os.path.join(str(top), 'long_file_name.txt'), 'wb') as outfp:
+        outfp.write(b'second\n')
+    with open(os.path.join(str(deep), 'data.bin'), 'wb') as outfp:
+        outfp.write(b'\x01' * 5000)
+    os.chmod(os.path.join(str(deep), 'data.bin'), 0o640)
+    os.link(os.path.join(str(deep), 'data.bin'), os.path.join(str(sub), 'link.bin'))
+    os.symlink('subdir/deeper/data.bin', os.path.join(str(top), 'sym'))
+    os.mkfifo(os.path.join(str(top), 'fifo'))
+    return str(top)
+
+def _get(iso, **kwargs):
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, **kwargs)
+    return out.getvalue()
+
+def test_add_tree_all_namespaces(tmpdir):
+    top = _make_tree(tmpdir)
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09', joliet=3, udf='2.60')
+    iso.add_tree(top)
+
+    assert(_get(iso, rr_path='/readme.txt') == b'readme\n')
+    assert(_get(iso, joliet_path='/long-file-name.txt') == b'first\n')
+    assert(_get(iso, udf_path='/long_file_name.txt') == b'second\n')
+    assert(_get(iso, rr_path='/subdir/deeper/data.bin') == b'\x01' * 5000)
+    assert(iso.get_record(rr_path='/subdir/deeper/data.bin').rock_ridge.get_file_mode() & 0o7777 == 0o640)
+    assert(iso.get_record(rr_path='/sym').rock_ridge.symlink_path() == b'subdir/deeper/data.bin')
+    assert(iso.get_record(udf_path='/sym').is_symlink())
+
+    # The colliding names got unique ISO9660 names.
+    names = sorted(iso.list_children(iso_path='/'), key=lambda c: c.file_identifier())
+    iso_names = [c.file_identifier() for c in names if not c.is_dot() and not c.is_dotdot()]
+    assert(len(iso_names) == len(set(iso_names)))
+    assert(b'LONG_FIL.TXT;1' in iso_names)
+
+    # The hard link shares its data.
+    assert(iso.get_record(rr_path='/subdir/link.bin').inode is iso.get_record(rr_path='/subdir/deeper/data.bin').inode)
+
+    # The FIFO was skipped.
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput):
+        iso.get_record(rr_path='/fifo')
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(out)
+    assert(_get(iso, udf_path='/subdir/link.bin') == b'\x01' * 5000)
+    assert(_get(iso, joliet_path='/subdir/deeper/data.bin') == b'\x01' * 5000)
+    iso.close()
+
+def test_add_tree_plain_iso_into_subdir(tmpdir):
+    top = _make_tree(tmpdir)
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    iso.add_directory('/DEST')
+    iso.add_fp(io.BytesIO(b'old'), 3, '/DEST/README.TXT;1')
+    iso.add_tree(top, iso_path='/DEST')
+
+    # The existing name is kept, and the new file got another one.
+    assert(_get(iso, iso_path='/DEST/README.TXT;1') == b'old')
+    assert(_get(iso, iso_path='/DEST/READM000.TXT;1') == b'readme\n')
+    assert(_get(iso, iso_path='/DEST/SUBDIR/DEEPER/DATA.BIN;1') == b'\x01' * 5000)
+    # No Rock Ridge or UDF, so no symlink.
+    names = [c.file_identifier() for c in iso.list_children(iso_path='/DEST')]
+    assert(b'SYM.;1' not in names)
+    iso.close()
+
+def test_add_tree_merge_and_errors(tmpdir):
+    top = _make_tree(tmpdir)
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09')
+    iso.add_directory('/SUBDIR', rr_name='subdir')
+    iso.add_tree(top, rr=True)
+    assert(_get(iso, rr_path='/subdir/link.bin') == b'\x01' * 5000)
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.add_tree(os.path.join(top, 'readme.txt'))
+    assert(str(excinfo.value) == '%s is not a directory' % (os.path.join(top, 'readme.txt')))
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.add_tree(top, iso_path='/README.TXT;1')
+    assert(str(excinfo.value) == '/README.TXT;1 is not a directory on the ISO')
+    iso.close()
+
+def test_add_tree_failure_keeps_iso_consistent(tmpdir):
+    top = tmpdir.mkdir('tree')
+    with open(os.path.join(str(top), 'a.txt'), 'wb') as outfp:
+        outfp.write(b'a' * 3000)
+    # Eight levels of directories are too deep for a plain ISO.
+    os.makedirs(os.path.join(str(top), *['d%d' % (i) for i in range(8)]))
+
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.add_tree(str(top))
+    assert(str(excinfo.value) == 'Directory levels too deep (maximum is 7)')
+
+    # What was added before the failure is still accounted for.
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(out)
+    assert(_get(iso, iso_path='/A.TXT;1') == b'a' * 3000)
+    assert(iso.get_record(iso_path='/D0/D1/D2/D3/D4/D5/D6').is_dir())
+    iso.close()
+
+def test_add_tree_many_collisions(tmpdir):
+    top = tmpdir.mkdir('tree')
+    for i in range(2000):
+        with open(os.path.join(str(top), 'file%05d.txt' % (i)), 'wb') as outfp:
+            outfp.write(b'%d' % (i))
+
+    # At interchange level 1 all of these mangle to FILE0000.TXT, which is
+    # more than the 3-digit numbers alone can make unique.
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    iso.add_tree(str(top))
+    names = [c.file_identifier() for c in iso.list_children(iso_path='/')
+             if not c.is_dot() and not c.is_dotdot()]
+    assert(len(names) == 2000)
+    assert(len(set(names)) == 2000)
+    assert(b'FILE0999.TXT;1' in names)
+    assert(b'FILE1000.TXT;1' in names)
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(out)
+    assert(len(list(iso.list_children(iso_path='/'))) == 2002)
+    iso.close()
+
+def test_add_tree_joliet_long_names(tmpdir):
+    top = tmpdir.mkdir('tree')
+    prefix = 'x' * 66
+    for suffix in ('a', 'b'):
+        with open(os.path.join(str(top), prefix + suffix), 'wb') as outfp:
+            outfp.write(suffix.encode())
+
+    iso = pycdlib.PyCdlib()
+    iso.new(joliet=3)
+    iso.add_tree(str(top))
+    assert(_get(iso, joliet_path='/' + 'x' * 64) == b'a')
+    assert(_get(iso, joliet_path='/' + 'x' * 61 + '000') == b'b')
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.blockcache
+import pycdlib.iostats
+import pycdlib.readonly
+
+
+def _make_iso():
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09', joliet=3, udf='2.60')
+    iso.add_directory('/DIR1', rr_name='dir1', joliet_path='/dir1', udf_path='/dir1')
+    for i in range(10):
+        data = b'%d' % (i) * 3000
+        iso.add_fp(io.BytesIO(data), len(data), '/DIR1/FILE%d.;1' % (i),
+                   rr_name='file%d' % (i), joliet_path='/dir1/file%d' % (i),
+                   udf_path='/dir1/file%d' % (i))
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+    return out
+
+def _extract(iso, **kwargs):
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, **kwargs)
+    return out.getvalue()
+
+def test_block_cache_open_and_extract():
+    isofp = _make_iso()
+    cache = pycdlib.blockcache.BlockCache()
+    iso = pycdlib.PyCdlib(block_cache=cache)
+    iso.open_fp(isofp)
+
+    assert(cache.stats.misses > 0)
+    for i in range(10):
+        expected = b'%d' % (i) * 3000
+        assert(_extract(iso, iso_path='/DIR1/FILE%d.;1' % (i)) == expected)
+        assert(_extract(iso, udf_path='/dir1/file%d' % (i)) == expected)
+    assert(cache.stats.hits > 0)
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    assert(out.getvalue() == isofp.getvalue())
+
+    iso.close()
+
+def test_block_cache_shared_between_instances():
+    isofp = _make_iso()
+    cache = pycdlib.blockcache.BlockCache()
+
+    st1 = pycdlib.iostats.IOStats()
+    iso1 = pycdlib.PyCdlib(io_stats=st1, block_cache=cache)
+    iso1.open_fp(isofp)
+
+    st2 = pycdlib.iostats.IOStats()
+    iso2 = pycdlib.PyCdlib(io_stats=st2, block_cache=cache)
+    iso2.open_fp(isofp)
+
+    # The second open was served from the blocks that the first one read.
+    assert(st1.input.reads > 0)
+    assert(st2.input.bytes_read < st1.input.bytes_read)
+    assert(_extract(iso2, rr_path='/dir1/file3') == b'3' * 3000)
+
+    iso1.close()
+    iso2.close()
+
+def test_block_cache_modify_in_place(tmpdir):
+    path = os.path.join(str(tmpdir), 'cached.iso')
+    with open(path, 'wb') as outfp:
+        outfp.write(_make_iso().getvalue())
+
+    cache = pycdlib.blockcache.BlockCache()
+    iso = pycdlib.PyCdlib(block_cache=cache)
+    with open(path, 'r+b') as fp:
+        iso.open_fp(fp)
+        assert(_extract(iso, iso_path='/DIR1/FILE1.;1') == b'1' * 3000)
+        iso.modify_file_in_place(io.BytesIO(b'x' * 3500), 3500, '/DIR1/FILE1.;1')
+        assert(_extract(iso, iso_path='/DIR1/FILE1.;1') == b'x' * 3500)
+        iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open(path)
+    assert(_extract(iso, iso_path='/DIR1/FILE1.;1') == b'x' * 3500)
+    iso.close()
+
+def test_block_cache_readonly():
+    isofp = _make_iso()
+    cache = pycdlib.blockcache.BlockCache()
+    ro = pycdlib.readonly.PyCdlibReadOnly(block_cache=cache)
+    ro.open_fp(isofp)
+
+    with ro.open_file_from_iso(rr_path='/dir1/file7') as infp:
+        assert(infp.read() == b'7' * 3000)
+    assert(cache.stats.misses > 0)
+
+    ro.close()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.ciso
+import pycdlib.readonly
+
+
+def _new_iso():
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09')
+    for f in range(4):
+        data = (('line %d of a mostly-text file\n' % (f)) * 5000).encode('utf-8')
+        iso.add_fp(io.BytesIO(data), len(data), '/TEXT%d.;1' % (f), rr_name='text%d' % (f))
+    data = os.urandom(50000)
+    iso.add_fp(io.BytesIO(data), len(data), '/RANDOM.;1', rr_name='random')
+    return iso
+
+def _write_ciso(iso, **kwargs):
+    raw = io.BytesIO()
+    iso.write_fp(raw)
+    out = io.BytesIO()
+    writer = pycdlib.ciso.CisoWriter(out, **kwargs)
+    iso.write_fp(writer)
+    writer.close()
+    return raw.getvalue(), out
+
+def test_ciso_write_and_read():
+    iso = _new_iso()
+    raw, out = _write_ciso(iso, threads=3)
+    iso.close()
+    assert(out.getvalue()[:4] == b'CISO')
+    assert(len(out.getvalue()) < len(raw) // 2)
+
+    cfp = pycdlib.ciso.CisoFile(out)
+    assert(cfp.size == len(raw))
+    assert(cfp.block_size == 2048)
+    assert(cfp.read() == raw)
+    for offset, length in ((0, 1), (2047, 2), (40000, 70000), (len(raw) - 5, 100)):
+        cfp.seek(offset)
+        assert(cfp.read(length) == raw[offset:offset + length])
+
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(cfp)
+    data = io.BytesIO()
+    iso.get_file_from_iso_fp(data, rr_path='/text2')
+    assert(data.getvalue() == (('line 2 of a mostly-text file\n') * 5000).encode('utf-8'))
+    iso.close()
+    cfp.close()
+
+def test_ciso_open_transparently(tmpdir):
+    iso = _new_iso()
+    raw_unused, out = _write_ciso(iso, block_size=4096)
+    iso.close()
+
+    outfile = os.path.join(str(tmpdir), 'test.cso')
+    with open(outfile, 'wb') as outfp:
+        outfp.write(out.getvalue())
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    assert(isinstance(iso._cdfp, pycdlib.ciso.CisoFile))
+    with iso.open_file_from_iso(rr_path='/text0') as infp:
+        assert(infp.read(10) == b'line 0 of ')
+    iso.close()
+
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    ro.open(outfile)
+    with ro.open_file_from_iso(rr_path='/text3') as infp:
+        assert(infp.read(10) == b'line 3 of ')
+    ro.close()
+
+    iso = pycdlib.PyCdlib()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.open(outfile, 'r+b')
+    assert(str(excinfo.value) == 'Compressed ISO containers can only be opened read-only')
+
+def test_ciso_plain_blocks():
+    data = os.urandom(10000)
+    out = io.BytesIO()
+    writer = pycdlib.ciso.CisoWriter(out, threads=1)
+    writer.write(data)
+    writer.close()
+
+    index = struct.unpack('<6I', out.getvalue()[24:48])
+    assert(all(entry & 0x80000000 for entry in index[:4]))
+
+    cfp = pycdlib.ciso.CisoFile(out)
+    assert(cfp.read() == data)
+
+def test_ciso_sparse_writes():
+    out = io.BytesIO()
+    writer = pycdlib.ciso.CisoWriter(out)
+    writer.seek(10000)
+    writer.write(b'end')
+    writer.seek(5)
+    writer.write(b'start')
+    assert(writer.seek(0, os.SEEK_END) == 10003)
+    writer.close()
+
+    cfp = pycdlib.ciso.CisoFile(out)
+    assert(cfp.read() == b'\x00' * 5 + b'start' + b'\x00' * 9990 + b'end')
+
+def test_ciso_errors():
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.ciso.CisoFile(io.BytesIO(b'XISO' + b'\x00' * 20))
+    assert(str(excinfo.value) == 'Invalid compressed ISO magic')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.ciso.CisoWriter(io.BytesIO(), block_size=3000)
+    assert(str(excinfo.value) == 'The block size must be a power of 2')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.ciso.CisoWriter(io.BytesIO(), fmt=b'DAX\x00')
+    assert(str(excinfo.value) == "Unknown container format b'DAX\\x00'")
+
+    header = struct.pack('<4sIQIBB2s', b'CISO', 24, 4096, 2048, 1, 0, b'\x00\x00')
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.ciso.CisoFile(io.BytesIO(header + b'\x00' * 8))
+    assert(str(excinfo.value) == 'Invalid compressed ISO block index')
+
+    out = io.BytesIO()
+    writer = pycdlib.ciso.CisoWriter(out)
+    writer.write(b'x' * 4096)
+    writer.close()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        writer.write(b'x')
+    assert(str(excinfo.value) == 'I/O operation on closed file.')
+
+    damaged = bytearray(out.getvalue())
+    damaged[36:] = b'\xff' * (len(damaged) - 36)
+    cfp = pycdlib.ciso.CisoFile(io.BytesIO(bytes(damaged)))
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput):
+        cfp.read()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+
+
+def _file_data(num):
+    # Deliberately not a multiple of the block size, so there is padding.
+    return (b'%d' % (num)) * (700 + num * 37)
+
+def _write_many(tmpdir, name, num_files):
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    for num in range(num_files):
+        data = _file_data(num)
+        iso.add_fp(io.BytesIO(data), len(data), '/F%d.;1' % (num))
+    outfile = os.path.join(str(tmpdir), name)
+    iso.write(outfile)
+    iso.close()
+    return outfile
+
+def _rewrite(infile):
+    iso = pycdlib.PyCdlib()
+    iso.open(infile)
+    runs = iso._data_runs()
+    out = io.BytesIO()
+    iso.write_fp(out, blocksize=3000)
+    iso.close()
+    return (runs, out.getvalue())
+
+def test_coalesced_rewrite_identical(tmpdir):
+    outfile = _write_many(tmpdir, 'many.iso', 40)
+    (runs, data) = _rewrite(outfile)
+
+    assert(len(runs) == 1)
+    assert(len(runs[0]) == 40)
+    with open(outfile, 'rb') as infp:
+        assert(data == infp.read())
+
+def test_coalesced_rewrite_zeroes_padding(tmpdir):
+    outfile = _write_many(tmpdir, 'garbage.iso', 5)
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    recs = [iso.get_record(iso_path='/F%d.;1' % (num)) for num in range(5)]
+    iso.close()
+
+    # Scribble over the padding after each file on the original.
+    with open(outfile, 'r+b') as fp:
+        for rec in recs:
+            end = rec.extent_location() * 2048 + rec.get_data_length()
+            fp.seek(end)
+            fp.write(b'\xff' * (2048 - end % 2048))
+
+    (runs, data) = _rewrite(outfile)
+    assert(len(runs) == 1)
+    for (num, rec) in enumerate(recs):
+        start = rec.extent_location() * 2048
+        length = rec.get_data_length()
+        assert(data[start:start + length] == _file_data(num))
+        assert(data[start + length:start + 2048 * ((length + 2047) // 2048)].count(b'\x00') == 2048 - length % 2048)
+
+def test_coalesced_rewrite_modified(tmpdir):
+    outfile = _write_many(tmpdir, 'modified.iso', 10)
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    iso.rm_file('/F3.;1')
+    iso.add_fp(io.BytesIO(b'new'), 3, '/NEW.;1')
+    out = io.BytesIO()
+    iso.write_fp(out, blocksize=5000)
+    runs = iso._data_runs()
+    # Removing a file breaks the run, and the new file is on its own.
+    assert(len(runs) > 1)
+    assert(sum(len(run) for run in runs) == 10)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(out)
+    for num in range(10):
+        if num == 3:
+            continue
+        check = io.BytesIO()
+        iso.get_file_from_iso_fp(check, iso_path='/F%d.;1' % (num))
+        assert(check.getvalue() == _file_data(num))
+    check = io.BytesIO()
+    iso.get_file_from_iso_fp(check, iso_path='/NEW.;1')
+    assert(check.getvalue() == b'new')
+    iso.close()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+
+
+_FILES = (('SMALL1', 100), ('BIG1', 70000), ('SMALL2', 3000), ('BIG2', 200000))
+
+def _data(name, size):
+    return (name.encode('utf-8') * size)[:size]
+
+def _add_files(iso, udf=False):
+    for (name, size) in _FILES:
+        data = _data(name, size)
+        iso.add_fp(io.BytesIO(data), len(data), '/%s.;1' % (name),
+                   udf_path='/%s' % (name.lower()) if udf else None)
+
+def _check(iso, alignment_extents, min_size):
+    for (name, size) in _FILES:
+        extent = iso.get_record(iso_path='/%s.;1' % (name)).extent_location()
+        if size >= min_size:
+            assert(extent % alignment_extents == 0)
+
+def _roundtrip(iso, tmpdir, name, udf=False):
+    outfile = os.path.join(str(tmpdir), name)
+    iso.write(outfile)
+    assert(os.stat(outfile).st_size == iso.pvd.space_size * 2048)
+
+    iso2 = pycdlib.PyCdlib()
+    iso2.open(outfile)
+    for (fname, size) in _FILES:
+        out = io.BytesIO()
+        iso2.get_file_from_iso_fp(out, iso_path='/%s.;1' % (fname))
+        assert(out.getvalue() == _data(fname, size))
+        if udf:
+            out = io.BytesIO()
+            iso2.get_file_from_iso_fp(out, udf_path='/%s' % (fname.lower()))
+            assert(out.getvalue() == _data(fname, size))
+    return iso2
+
+def test_data_alignment_new(tmpdir):
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    _add_files(iso)
+    iso.force_consistency()
+    unaligned_size = iso.pvd.space_size
+
+    iso.set_data_alignment(65536, 65536)
+    iso.force_consistency()
+    _check(iso, 32, 65536)
+    assert(iso.pvd.space_size > unaligned_size)
+
+    iso2 = _roundtrip(iso, tmpdir, 'aligned.iso')
+    _check(iso2, 32, 65536)
+    iso2.close()
+
+    # Turning alignment back off gives the space back.
+    iso.set_data_alignment(2048)
+    iso.force_consistency()
+    assert(iso.pvd.space_size == unaligned_size)
+    iso.close()
+
+def test_data_alignment_udf(tmpdir):
+    iso = pycdlib.PyCdlib()
+    iso.new(udf='2.60')
+    _add_files(iso, udf=True)
+    part_length = iso.udf_main_descs.partitions[0].part_length
+    iso.set_data_alignment(4096)
+    iso.force_consistency()
+    _check(iso, 2, 0)
+    pad = iso.udf_main_descs.partitions[0].part_length - part_length
+    assert(pad >= 0)
+    assert(iso.udf_logical_volume_integrity.size_tables[0] == iso.udf_main_descs.partitions[0].part_length)
+
+    iso2 = _roundtrip(iso, tmpdir, 'aligned-udf.iso', udf=True)
+    _check(iso2, 2, 0)
+    iso2.close()
+    iso.close()
+
+def test_data_alignment_opened(tmpdir):
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    _add_files(iso)
+    outfile = os.path.join(str(tmpdir), 'plain.iso')
+    iso.write(outfile)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    iso.set_data_alignment(1024 * 1024, 100000)
+    iso2 = _roundtrip(iso, tmpdir, 'realigned.iso')
+    _check(iso2, 512, 100000)
+    iso2.close()
+    iso.close()
+
+def test_data_alignment_errors():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.set_data_alignment(3000)
+    assert(str(excinfo.value) == 'The data alignment must be a power of two')
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.set_data_alignment(4096, -1)
+    assert(str(excinfo.value) == 'The minimum size for data alignment cannot be negative')
+    iso.close()
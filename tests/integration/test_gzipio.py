@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import io
+import os
+import sys
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.gzipio
+
+
+def _make_iso():
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09')
+    for d in range(4):
+        iso.add_directory('/DIR%d' % (d), rr_name='dir%d' % (d))
+        for f in range(4):
+            data = os.urandom(100000 * (f + 1))
+            iso.add_fp(io.BytesIO(data), len(data), '/DIR%d/FILE%d.;1' % (d, f),
+                       rr_name='file%d' % (f))
+    iso.add_fp(io.BytesIO(b'last\n'), 5, '/LAST.;1', rr_name='last')
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+    return out.getvalue()
+
+def _check_random_reads(gzfp, raw):
+    for offset, length in ((0, 10), (len(raw) - 100, 100), (123456, 70000),
+                           (32768, 2048), (len(raw) // 2, 300000), (5, 1)):
+        gzfp.seek(offset)
+        assert(gzfp.read(length) == raw[offset:offset + length])
+    gzfp.seek(-10, os.SEEK_END)
+    assert(gzfp.read() == raw[-10:])
+    assert(gzfp.read(10) == b'')
+
+def _check_iso(gzfp, raw):
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(gzfp)
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, rr_path='/last')
+    assert(out.getvalue() == b'last\n')
+    rec = iso.get_record(rr_path='/dir2/file3')
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, rr_path='/dir2/file3')
+    start = rec.extent_location() * 2048
+    assert(out.getvalue() == raw[start:start + rec.get_data_length()])
+    iso.close()
+
+def test_gzipio_plain_gzip():
+    raw = _make_iso()
+    compressed = io.BytesIO(gzip.compress(raw))
+
+    gzfp = pycdlib.gzipio.SeekableGzipFile(compressed, spacing=256 * 1024)
+    assert(gzfp.size == len(raw))
+    # A plain gzip file has no flush points, so the checkpoints are all
+    # snapshots of the decompressor.
+    kinds = [cp.kind for cp in gzfp.index.checkpoints]
+    assert(kinds[0] == pycdlib.gzipio.KIND_MEMBER)
+    assert(len(kinds) > 4)
+    assert(set(kinds[1:]) == set([pycdlib.gzipio.KIND_STATE]))
+
+    _check_random_reads(gzfp, raw)
+    _check_iso(gzfp, raw)
+    gzfp.close()
+
+def test_gzipio_flushed_save_load():
+    raw = _make_iso()
+    compressed = io.BytesIO()
+    pycdlib.gzipio.compress_fp(io.BytesIO(raw), compressed, spacing=256 * 1024)
+    assert(gzip.decompress(compressed.getvalue()) == raw)
+
+    index = pycdlib.gzipio.build_index(compressed, spacing=256 * 1024)
+    kinds = [cp.kind for cp in index.checkpoints]
+    assert(len(kinds) > 4)
+    assert(set(kinds[1:]) == set([pycdlib.gzipio.KIND_BLOCK]))
+
+    saved = io.BytesIO()
+    index.save(saved)
+    saved.seek(0)
+    loaded = pycdlib.gzipio.load_index(saved)
+    assert(len(loaded) == len(index))
+    assert(loaded.size == len(raw))
+
+    gzfp = pycdlib.gzipio.SeekableGzipFile(compressed, index=loaded)
+    _check_random_reads(gzfp, raw)
+    _check_iso(gzfp, raw)
+    gzfp.close()
+
+def test_gzipio_sync_flush():
+    raw = os.urandom(200000) + b'\x00' * 500000 + os.urandom(300000)
+    comp = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    data = b''
+    for i in range(0, len(raw), 100000):
+        data += comp.compress(raw[i:i + 100000])
+        data += comp.flush(zlib.Z_SYNC_FLUSH)
+    data += comp.flush()
+
+    index = pycdlib.gzipio.build_index(io.BytesIO(data), spacing=100000)
+    assert(pycdlib.gzipio.KIND_BLOCK in [cp.kind for cp in index.checkpoints])
+
+    saved = io.BytesIO()
+    index.save(saved)
+    saved.seek(0)
+    gzfp = pycdlib.gzipio.SeekableGzipFile(io.BytesIO(data),
+                                           index=pycdlib.gzipio.load_index(saved))
+    _check_random_reads(gzfp, raw)
+    gzfp.close()
+
+def test_gzipio_multiple_members():
+    raw = os.urandom(300000)
+    data = b''.join(gzip.compress(raw[i:i + 50000]) for i in range(0, len(raw), 50000))
+    data += b'\x00' * 100
+
+    index = pycdlib.gzipio.build_index(io.BytesIO(data), spacing=50000)
+    assert(len(index) == 6)
+    assert(set(cp.kind for cp in index.checkpoints) == set([pycdlib.gzipio.KIND_MEMBER]))
+
+    gzfp = pycdlib.gzipio.SeekableGzipFile(io.BytesIO(data), index=index)
+    assert(gzfp.size == len(raw))
+    _check_random_reads(gzfp, raw)
+    gzfp.close()
+
+def test_gzipio_errors():
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.gzipio.SeekableGzipFile(io.BytesIO(b'not gzip'))
+    assert(str(excinfo.value) == 'The file is not gzip-compressed')
+
+    data = gzip.compress(os.urandom(10000))
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.gzipio.SeekableGzipFile(io.BytesIO(data[:-100]))
+    assert(str(excinfo.value) == 'Invalid gzip data (truncated)')
+
+    index = pycdlib.gzipio.build_index(io.BytesIO(data))
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.gzipio.SeekableGzipFile(io.BytesIO(data + b'x'), index=index)
+    assert(str(excinfo.value) == 'The gzip index does not match the file')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.gzipio.load_index(io.BytesIO(b'PYCDGZIY' + b'\x00' * 40))
+    assert(str(excinfo.value) == 'Invalid gzip index')
+
+    gzfp = pycdlib.gzipio.SeekableGzipFile(io.BytesIO(data), index=index)
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        gzfp.seek(-1)
+    assert(str(excinfo.value) == 'Invalid offset value (cannot seek before start of file)')
+    gzfp.close()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        gzfp.read(1)
+    assert(str(excinfo.value) == 'I/O operation on closed file.')
+
+def test_gzipio_empty():
+    gzfp = pycdlib.gzipio.SeekableGzipFile(io.BytesIO(gzip.compress(b'')))
+    assert(gzfp.size == 0)
+    assert(gzfp.read() == b'')
+    gzfp.close()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+import http.server
+import io
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.blockcache
+import pycdlib.httpio
+
+
+class _RangeHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get('Range'))
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/test.iso')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path != '/test.iso':
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        data = server.data
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if match is None or not server.ranges:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+                server.full_bodies += 1
+            except OSError:
+                pass
+            finally:
+                server.body_done.set()
+            return
+
+        first = int(match.group(1))
+        last = min(int(match.group(2)), len(data) - 1)
+        if first >= len(data):
+            self.send_response(416)
+            self.send_header('Content-Range', 'bytes */%d' % (len(data)))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = data[first:last + 1]
+        self.send_response(206)
+        self.send_header('Content-Range', 'bytes %d-%d/%d' % (first, last, len(data)))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, data, ranges=True):
+        http.server.ThreadingHTTPServer.__init__(self, ('127.0.0.1', 0), _RangeHandler)
+        self.data = data
+        self.ranges = ranges
+        self.requests = []
+        self.connections = 0
+        self.full_bodies = 0
+        self.body_done = threading.Event()
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        http.server.ThreadingHTTPServer.process_request(self, request, client_address)
+
+
+def _serve(data, ranges=True):
+    server = _Server(data, ranges)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, 'http://127.0.0.1:%d' % (server.server_address[1])
+
+def _make_iso(big):
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09', joliet=3)
+    iso.add_fp(io.BytesIO(big), len(big), '/BIG.;1', rr_name='big', joliet_path='/big')
+    iso.add_fp(io.BytesIO(b'small\n'), 6, '/SMALL.;1', rr_name='small', joliet_path='/small')
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+    return out.getvalue()
+
+def test_httpio_open_and_extract():
+    data = _make_iso(b'\xaa' * (4 * 1024 * 1024))
+    server, base = _serve(data)
+    try:
+        fp = pycdlib.httpio.HTTPRangeFile(base + '/test.iso')
+        assert(fp.size == len(data))
+
+        iso = pycdlib.PyCdlib()
+        iso.open_fp(fp)
+        assert([c.file_identifier() for c in iso.list_children(iso_path='/')][2:] == [b'BIG.;1', b'SMALL.;1'])
+        out = io.BytesIO()
+        iso.get_file_from_iso_fp(out, rr_path='/small')
+        assert(out.getvalue() == b'small\n')
+        iso.close()
+
+        # Only the metadata and the small file were transferred, all over a
+        # single persistent connection.
+        assert(fp.bytes_fetched < 1024 * 1024)
+        assert(fp.connections == 1)
+        assert(server.connections == 1)
+        fp.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_httpio_read_and_seek():
+    data = bytes(bytearray(i % 251 for i in range(300000)))
+    server, base = _serve(data)
+    try:
+        cache = pycdlib.blockcache.BlockCache(max_bytes=1024 * 1024, block_size=65536, readahead=0,
+                                                  bypass_size=1024 * 1024)
+        fp = pycdlib.httpio.HTTPRangeFile(base + '/test.iso', cache=cache)
+        requests = fp.requests
+
+        fp.seek(1000)
+        assert(fp.read(200000) == data[1000:201000])
+        # The four missing blocks were coalesced into one request.
+        assert(fp.requests == requests + 1)
+
+        fp.seek(70000)
+        assert(fp.read(10) == data[70000:70010])
+        assert(fp.requests == requests + 1)
+        assert(cache.stats.hits == 1)
+
+        assert(fp.seek(-10, os.SEEK_END) == len(data) - 10)
+        assert(fp.read() == data[-10:])
+        assert(fp.read(10) == b'')
+
+        buf = bytearray(5)
+        fp.seek(3)
+        assert(fp.readinto(buf) == 5)
+        assert(bytes(buf) == data[3:8])
+        fp.close()
+
+        with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+            fp.read(1)
+        assert(str(excinfo.value) == 'I/O operation on closed file.')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_httpio_redirect():
+    data = b'x' * 5000
+    server, base = _serve(data)
+    try:
+        fp = pycdlib.httpio.HTTPRangeFile(base + '/redirect')
+        assert(fp.size == 5000)
+        assert(fp.read(10) == b'x' * 10)
+        fp.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_httpio_no_range_support():
+    server, base = _serve(b'x' * 5000, ranges=False)
+    try:
+        with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+            pycdlib.httpio.HTTPRangeFile(base + '/test.iso')
+        assert(str(excinfo.value) == 'The server for %s/test.iso does not support range requests' % (base))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_httpio_no_range_support_skips_body():
+    server, base = _serve(b'x' * (64 * 1024 * 1024), ranges=False)
+    try:
+        with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput):
+            pycdlib.httpio.HTTPRangeFile(base + '/test.iso')
+        # The client hung up instead of downloading the whole file.
+        assert(server.body_done.wait(30))
+        assert(server.full_bodies == 0)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_httpio_not_found():
+    server, base = _serve(b'x' * 5000)
+    try:
+        with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+            pycdlib.httpio.HTTPRangeFile(base + '/missing.iso')
+        assert(str(excinfo.value) == 'HTTP request for %s/missing.iso failed with status 404' % (base))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_httpio_bad_scheme():
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.httpio.HTTPRangeFile('ftp://example.com/test.iso')
+    assert(str(excinfo.value) == 'Only http and https URLs are supported')
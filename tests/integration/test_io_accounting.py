@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.iostats
+
+
+def _make_iso():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    foostr = b'foo\n'
+    iso.add_fp(io.BytesIO(foostr), len(foostr), '/FOO.;1')
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+    return out
+
+def test_io_accounting_operations():
+    st = pycdlib.iostats.IOStats()
+    iso = pycdlib.PyCdlib(io_stats=st)
+    iso.open_fp(_make_iso())
+
+    assert(st.operations['open'].reads > 0)
+    assert(st.operations['open'].writes == 0)
+    open_bytes = st.input.bytes_read
+
+    iso.get_record(iso_path='/FOO.;1')
+    assert(st.operations['lookup'].reads == 0)
+
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, iso_path='/FOO.;1')
+    assert(out.getvalue() == b'foo\n')
+    assert(st.operations['extract'].reads == 1)
+    assert(st.operations['extract'].bytes_read == 4)
+    assert(st.input.bytes_read == open_bytes + 4)
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    assert(st.operations['write'].bytes_written == st.output.bytes_written)
+    assert(st.output.bytes_written > 0)
+    assert(st.operations['write'].bytes_read == 4)
+
+    iso.close()
+
+def test_io_accounting_open_file(tmpdir):
+    isofile = os.path.join(str(tmpdir), 'test.iso')
+    with open(isofile, 'wb') as outfp:
+        outfp.write(_make_iso().getvalue())
+
+    st = pycdlib.iostats.IOStats()
+    iso = pycdlib.PyCdlib(io_stats=st)
+    iso.open(isofile)
+
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, iso_path='/FOO.;1')
+    assert(out.getvalue() == b'foo\n')
+    assert(st.operations['extract'].reads == 1)
+
+    iso.close()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.isodiff
+
+
+def _build(tmpdir, name, files, boot=False, symlink_target='dir1/aaa'):
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09', joliet=3)
+    iso.add_directory('/DIR1', rr_name='dir1', joliet_path='/dir1')
+    for (fname, data) in sorted(files.items()):
+        iso.add_fp(io.BytesIO(data), len(data), '/DIR1/%s.;1' % (fname.upper()),
+                   rr_name=fname, joliet_path='/dir1/%s' % (fname))
+    iso.add_symlink(symlink_path='/SYM.;1', rr_symlink_name='sym',
+                    rr_path=symlink_target)
+    if boot:
+        data = b'\x00' * 2048
+        iso.add_fp(io.BytesIO(data), len(data), '/BOOT.;1', rr_name='boot')
+        iso.add_eltorito('/BOOT.;1', '/BOOT.CAT;1', rr_bootcatname='boot.cat')
+    outfile = os.path.join(str(tmpdir), name)
+    iso.write(outfile)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    return iso
+
+def _by_key(changes):
+    # The two ISOs may have been built a second apart, so ignore the times.
+    ret = {}
+    for c in changes:
+        if c.kind == pycdlib.isodiff.Change.MODIFIED:
+            c.fields.pop('mtime', None)
+            if not c.fields:
+                continue
+        ret[(c.namespace, c.path)] = c
+    return ret
+
+def test_isodiff_identical(tmpdir):
+    old = _build(tmpdir, 'old.iso', {'aaa': b'a' * 3000, 'bbb': b'b' * 10},
+                 boot=True)
+    new = pycdlib.PyCdlib()
+    new.open(os.path.join(str(tmpdir), 'old.iso'))
+    assert(pycdlib.isodiff.diff_isos(old, new, check_data=True) == [])
+    old.close()
+    new.close()
+
+def test_isodiff_changes(tmpdir):
+    old = _build(tmpdir, 'old.iso', {'aaa': b'a' * 3000, 'bbb': b'b' * 10,
+                                     'ccc': b'c'})
+    new = _build(tmpdir, 'new.iso', {'aaa': b'a' * 3001, 'bbb': b'B' * 10,
+                                     'ddd': b'd'}, boot=True,
+                 symlink_target='dir1/bbb')
+
+    changes = _by_key(pycdlib.isodiff.diff_isos(old, new))
+
+    assert(changes[('rr_path', '/dir1/aaa')].kind == pycdlib.isodiff.Change.MODIFIED)
+    assert(changes[('rr_path', '/dir1/aaa')].fields == {'size': (3000, 3001)})
+    assert(changes[('joliet_path', '/dir1/aaa')].fields == {'size': (3000, 3001)})
+    assert(changes[('iso_path', '/DIR1/CCC.;1')].kind == pycdlib.isodiff.Change.REMOVED)
+    assert(changes[('rr_path', '/dir1/ddd')].kind == pycdlib.isodiff.Change.ADDED)
+    assert(changes[('rr_path', '/dir1/ddd')].fields['size'] == (None, 1))
+    assert(changes[('rr_path', '/sym')].fields == {'target': ('dir1/aaa', 'dir1/bbb')})
+    assert(changes[('rr_path', '/boot')].kind == pycdlib.isodiff.Change.ADDED)
+    assert(changes[('eltorito', 'initial')].kind == pycdlib.isodiff.Change.ADDED)
+    assert(changes[('eltorito', 'initial')].fields['boot_size'] == (None, 2048))
+
+    # Same-size content changes are only found when asked for.
+    assert(('rr_path', '/dir1/bbb') not in changes)
+    changes = _by_key(pycdlib.isodiff.diff_isos(old, new, path_types=['rr_path'],
+                                                check_data=True))
+    assert(list(changes[('rr_path', '/dir1/bbb')].fields.keys()) == ['sha256'])
+    assert(('joliet_path', '/dir1/bbb') not in changes)
+    assert(('rr_path', '/dir1/aaa') in changes)
+    assert('sha256' not in changes[('rr_path', '/dir1/aaa')].fields)
+
+    old.close()
+    new.close()
+
+def test_isodiff_namespace_only_on_one_side(tmpdir):
+    old = pycdlib.PyCdlib()
+    old.new()
+    old.add_fp(io.BytesIO(b'foo'), 3, '/FOO.;1')
+    new = pycdlib.PyCdlib()
+    new.new(udf='2.60')
+    new.add_fp(io.BytesIO(b'foo'), 3, '/FOO.;1', udf_path='/foo')
+
+    changes = _by_key(pycdlib.isodiff.diff_isos(old, new, check_data=True))
+    assert(list(changes.keys()) == [('udf_path', '/foo')])
+    assert(changes[('udf_path', '/foo')].kind == pycdlib.isodiff.Change.ADDED)
+    old.close()
+    new.close()
+
+def test_isodiff_bad_path_type():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.isodiff.diff_isos(iso, iso, path_types=['bogus'])
+    assert(str(excinfo.value) == "The path type must be one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path'")
+    iso.close()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+
+
+NUM_DIRS = 20
+FILES_PER_DIR = 100
+
+
+def _make_iso(rock_ridge):
+    iso = pycdlib.PyCdlib()
+    if rock_ridge:
+        iso.new(rock_ridge='1.09', joliet=3)
+    else:
+        iso.new()
+
+    for d in range(NUM_DIRS):
+        kwargs = {}
+        if rock_ridge:
+            kwargs = {'rr_name': 'dir%d' % (d), 'joliet_path': '/dir%d' % (d)}
+        iso.add_directory('/DIR%d' % (d), **kwargs)
+        for f in range(FILES_PER_DIR):
+            if rock_ridge:
+                kwargs = {'rr_name': 'file%d' % (f),
+                          'joliet_path': '/dir%d/file%d' % (d, f)}
+            iso.add_fp(io.BytesIO(b'x'), 1, '/DIR%d/FILE%d.;1' % (d, f),
+                       **kwargs)
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+
+    return out
+
+
+def _bytes_per_entry(isofp):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        iso = pycdlib.PyCdlib()
+        iso.open_fp(isofp)
+        gc.collect()
+        current, peak_unused = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    num_entries = 0
+    for dirname_unused, dirlist, filelist in iso.walk(iso_path='/'):
+        num_entries += len(dirlist) + len(filelist)
+    assert(num_entries == NUM_DIRS * (FILES_PER_DIR + 1))
+
+    iso.close()
+
+    return current / num_entries
+
+
+def test_memory_per_entry():
+    assert(_bytes_per_entry(_make_iso(False)) < 800)
+
+
+def test_memory_per_entry_rock_ridge_joliet():
+    # Each entry here has both an ISO9660 record with Rock Ridge and a Joliet
+    # record.
+    assert(_bytes_per_entry(_make_iso(True)) < 2400)
@@ -6600,3 +6600,122 @@ def test_new_isolevel1_largefile(tmpdir):
     assert(str(excinfo.value) == 'File sizes for interchange level < 3 must be less than 4GiB')
 
     iso.close()
+
+def test_new_write_progress_bytes():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+
+    foostr = b'f' * 100000
+    iso.add_fp(io.BytesIO(foostr), len(foostr), '/FOO.;1')
+
+    calls = []
+    def _progress(done, total):
+        calls.append((done, total))
+
+    out = io.BytesIO()
+    iso.write_fp(out, blocksize=2048, progress_cb=_progress, progress_bytes=65536)
+
+    assert(len(calls) == 3)
+    assert(calls[0][0] == 0)
+    assert(calls[-1][0] == calls[-1][1])
+    assert(calls[-1][1] == len(out.getvalue()))
+
+    iso.close()
+
+def test_new_write_progress_interval():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+
+    foostr = b'f' * 100000
+    iso.add_fp(io.BytesIO(foostr), len(foostr), '/FOO.;1')
+
+    calls = []
+    def _progress(done, total, opaque):
+        opaque.append(done)
+
+    out = io.BytesIO()
+    iso.write_fp(out, blocksize=2048, progress_cb=_progress,
+                 progress_opaque=calls, progress_interval=3600.0)
+
+    assert(calls == [0, len(out.getvalue())])
+
+    iso.close()
+
+def test_new_write_progress_info():
+    iso = pycdlib.PyCdlib()
+    iso.new(udf='2.60')
+
+    foostr = b'foo\n'
+    iso.add_fp(io.BytesIO(foostr), len(foostr), '/FOO.;1', udf_path='/foo')
+
+    infos = []
+    def _progress(done, total, opaque, info):
+        infos.append(info)
+
+    iso.write_fp(io.BytesIO(), progress_cb=_progress)
+
+    phases = []
+    for info in infos:
+        if not phases or phases[-1] != info.phase:
+            phases.append(info.phase)
+    assert(phases == ['descriptors', 'directory_records', 'udf_entries',
+                      'file_data', 'finished'])
+    assert(infos[-1].done == infos[-1].total)
+    assert(infos[-1].eta is None or infos[-1].eta == 0.0)
+    assert(infos[-1].elapsed >= infos[0].elapsed)
+
+    iso.close()
+
+def test_new_write_progress_bad_callback():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+
+    def _progress(done):
+        pass
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.write_fp(io.BytesIO(), progress_cb=_progress)
+    assert(str(excinfo.value) == 'The progress callback must take 2, 3, or 4 arguments')
+
+    iso.close()
+
+def test_new_write_progress_negative_granularity():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.write_fp(io.BytesIO(), progress_bytes=-1)
+    assert(str(excinfo.value) == 'The progress granularity must be non-negative')
+
+    iso.close()
+
+def test_new_rr_lazy_decode_roundtrip():
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09')
+
+    foostr = b'foo\n'
+    iso.add_fp(io.BytesIO(foostr), len(foostr), '/FOO.;1', rr_name='foo')
+    iso.add_directory('/DIR1', rr_name='dir1')
+    iso.add_symlink('/SYM.;1', 'sym', 'foo')
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+
+    iso.open_fp(out)
+
+    rec = iso.get_record(rr_path='/foo')
+    # Only the entries needed to build the tree are decoded when opening.
+    assert(rec.rock_ridge.dr_entries.has_type(b'PX'))
+    assert(rec.rock_ridge.dr_entries._pending != 0)
+    assert(rec.rock_ridge.name() == b'foo')
+    assert(rec.rock_ridge.get_file_mode() == 0o100444)
+
+    sym = iso.get_record(rr_path='/sym')
+    assert(sym.rock_ridge.symlink_path() == b'foo')
+
+    rewritten = io.BytesIO()
+    iso.write_fp(rewritten)
+    assert(rewritten.getvalue() == out.getvalue())
+
+    iso.close()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.stats
+
+
+def test_stats_open_write():
+    st = pycdlib.stats.PyCdlibStats()
+
+    iso = pycdlib.PyCdlib(stats=st)
+    iso.new(rock_ridge='1.09', joliet=3, udf='2.60')
+    iso.add_directory('/DIR1', rr_name='dir1', joliet_path='/dir1',
+                      udf_path='/dir1')
+    foostr = b'foo\n'
+    iso.add_fp(io.BytesIO(foostr), len(foostr), '/DIR1/FOO.;1', rr_name='foo',
+               joliet_path='/dir1/foo', udf_path='/dir1/foo')
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+
+    for phase in ('reshuffle_extents', 'write_descriptors',
+                  'write_directory_records', 'write_udf_entries',
+                  'write_file_data'):
+        assert(st.phases[phase].calls == 1)
+    assert(st.phases['write_file_data'].records == 1)
+    assert(st.phases['write_file_data'].bytes >= len(foostr))
+
+    st.reset()
+    iso.open_fp(out)
+    iso.close()
+
+    for phase in ('parse_volume_descriptors', 'parse_isohybrid',
+                  'parse_eltorito', 'walk_directories',
+                  'walk_joliet_directories', 'parse_udf_descriptors',
+                  'walk_udf_directories'):
+        assert(st.phases[phase].calls == 1)
+    assert(st.phases['parse_path_tables'].calls == 2)
+    assert('write_file_data' not in st.phases)
+    # The root has dot, dotdot, and DIR1; DIR1 has dot, dotdot, and FOO.
+    assert(st.phases['walk_directories'].records == 6)
+    assert(st.phases['walk_joliet_directories'].records == 6)
+
+def test_stats_disabled():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
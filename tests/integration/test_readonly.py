@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.readonly
+
+
+def _make_iso(rock_ridge=None, joliet=None, ndirs=3, nfiles=4):
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge=rock_ridge, joliet=joliet)
+
+    for d in range(ndirs):
+        dirname = 'DIR%d' % (d)
+        iso.add_directory('/' + dirname, rr_name=dirname.lower() if rock_ridge else None,
+                          joliet_path='/' + dirname.lower() if joliet else None)
+        for f in range(nfiles):
+            data = ('%d-%d\n' % (d, f)).encode('utf-8')
+            iso_path = '/%s/FILE%d.;1' % (dirname, f)
+            iso.add_fp(io.BytesIO(data), len(data), iso_path,
+                       rr_name='file%d' % (f) if rock_ridge else None,
+                       joliet_path='/%s/file%d' % (dirname.lower(), f) if joliet else None)
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+    return out
+
+def _make_deep_iso():
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09')
+
+    path = ''
+    rr_path = ''
+    for level in range(1, 10):
+        path += '/DIR%d' % (level)
+        rr_path += '/dir%d' % (level)
+        iso.add_directory(path, rr_name='dir%d' % (level))
+    iso.add_fp(io.BytesIO(b'deep\n'), 5, path + '/FOO.;1', rr_name='foo')
+
+    out = io.BytesIO()
+    iso.write_fp(out)
+    iso.close()
+    return out, rr_path + '/foo'
+
+def _names(children, rr=False):
+    ret = []
+    for child in children:
+        if rr and child.rock_ridge is not None:
+            ret.append(child.rock_ridge.name())
+        else:
+            ret.append(child.file_identifier())
+    return ret
+
+def _compare(isofp, **kwargs):
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(isofp)
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    ro.open_fp(isofp)
+
+    rr = 'rr_path' in kwargs
+    assert(list(ro.walk(**kwargs)) == list(iso.walk(**kwargs)))
+    path_type = list(kwargs.keys())[0]
+    for dirpath, dirlist_unused, filelist in iso.walk(**kwargs):
+        args = {path_type: dirpath}
+        assert(_names(ro.list_children(**args), rr) == _names(iso.list_children(**args), rr))
+        for name in filelist:
+            args = {path_type: dirpath.rstrip('/') + '/' + name}
+            rec = ro.get_record(**args)
+            orig = iso.get_record(**args)
+            assert(rec.extent_location() == orig.extent_location())
+            assert(rec.get_data_length() == orig.get_data_length())
+            if not orig.is_file():
+                # A Rock Ridge child link shows up as a file in the ISO9660
+                # listing, but looking it up follows the link.
+                continue
+            with iso.open_file_from_iso(**args) as origfp:
+                expected = origfp.read()
+            with ro.open_file_from_iso(**args) as infp:
+                assert(infp.read() == expected)
+
+    ro.close()
+    iso.close()
+
+def test_readonly_iso():
+    _compare(_make_iso(), iso_path='/')
+
+def test_readonly_rr():
+    _compare(_make_iso(rock_ridge='1.09'), rr_path='/')
+
+def test_readonly_joliet():
+    _compare(_make_iso(joliet=3), joliet_path='/')
+
+def test_readonly_rr_deep():
+    isofp, rr_file = _make_deep_iso()
+    _compare(isofp, rr_path='/')
+    _compare(isofp, iso_path='/')
+
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    ro.open_fp(isofp)
+    with ro.open_file_from_iso(rr_path=rr_file) as infp:
+        assert(infp.read() == b'deep\n')
+    ro.close()
+
+def test_readonly_path_table_lookup():
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    ro.open_fp(_make_iso(ndirs=20))
+
+    rec = ro.get_record(iso_path='/DIR17/FILE2.;1')
+    assert(rec.file_identifier() == b'FILE2.;1')
+    # Only the directory holding the file had to be read.
+    assert(ro.cache_misses == 1)
+
+    rec = ro.get_record(iso_path='/DIR17')
+    assert(rec.is_dir())
+
+    ro.close()
+
+def test_readonly_cache_bounded():
+    ro = pycdlib.readonly.PyCdlibReadOnly(cache_size=20)
+    ro.open_fp(_make_iso(ndirs=10, nfiles=10))
+
+    for dirpath_unused, dirlist_unused, filelist_unused in ro.walk(iso_path='/'):
+        assert(ro._cached_records <= 20 or len(ro._cache) == 1)
+
+    assert(ro.cache_misses == 11)
+    assert(len(ro._cache) == 1)
+    ro.get_record(iso_path='/DIR0/FILE0.;1')
+    assert(ro.cache_misses == 12)
+    ro.get_record(iso_path='/DIR0/FILE1.;1')
+    assert(ro.cache_hits == 1)
+
+    ro.close()
+
+def test_readonly_file(tmpdir):
+    outfile = os.path.join(str(tmpdir), 'readonly.iso')
+    with open(outfile, 'wb') as outfp:
+        outfp.write(_make_iso().getvalue())
+
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    ro.open(outfile)
+    with ro.open_file_from_iso(iso_path='/DIR1/FILE3.;1') as infp:
+        assert(infp.read() == b'1-3\n')
+    ro.close()
+
+def test_readonly_not_found():
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    ro.open_fp(_make_iso())
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        ro.get_record(iso_path='/DIR1/NOPE.;1')
+    assert(str(excinfo.value) == 'Could not find path')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        ro.open_file_from_iso(iso_path='/DIR1')
+    assert(str(excinfo.value) == 'Path to open must be a file')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        ro.get_record(rr_path='/dir1')
+    assert(str(excinfo.value) == 'Cannot fetch a rr_path from a non-Rock Ridge ISO')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        ro.get_record(udf_path='/dir1')
+    assert(str(excinfo.value) == 'UDF paths are not supported by the read-only reader')
+
+    ro.close()
+
+def test_readonly_not_open():
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        ro.get_record(iso_path='/')
+    assert(str(excinfo.value) == 'This object is not open; call open() first')
+
+def test_readonly_open_bad_iso_then_good():
+    good = _make_iso(joliet=3)
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(good)
+    root_extent = iso.pvd.root_directory_record().extent_location()
+    iso.close()
+
+    # Break the root directory, so parsing fails after the volume descriptors
+    # have been read.
+    data = bytearray(good.getvalue())
+    data[root_extent * 2048] = 0
+
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
+        ro.open_fp(io.BytesIO(data))
+    assert(str(excinfo.value) == 'Invalid directory record')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        ro.get_record(iso_path='/')
+    assert(str(excinfo.value) == 'This object is not open; call open() first')
+
+    ro.open_fp(good)
+    with ro.open_file_from_iso(joliet_path='/dir1/file3') as infp:
+        assert(infp.read() == b'1-3\n')
+    ro.close()
+
+def test_readonly_bad_cache_size():
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.readonly.PyCdlibReadOnly(cache_size=0)
+    assert(str(excinfo.value) == 'The cache size must be a positive number')
+
+def test_readonly_deep_lookup_reads_one_directory():
+    iso = pycdlib.PyCdlib()
+    iso.new(joliet=3)
+    path = ''
+    joliet_path = ''
+    for level in range(1, 7):
+        path += '/D%d' % (level)
+        joliet_path += '/d%d' % (level)
+        iso.add_directory(path, joliet_path=joliet_path)
+    iso.add_fp(io.BytesIO(b'deep\n'), 5, path + '/FOO.;1', joliet_path=joliet_path + '/foo')
+    isofp = io.BytesIO()
+    iso.write_fp(isofp)
+    iso.close()
+
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    ro.open_fp(isofp)
+
+    rec = ro.get_record(iso_path=path + '/FOO.;1')
+    assert(rec.get_data_length() == 5)
+    assert(ro.cache_misses == 1)
+
+    with ro.open_file_from_iso(joliet_path=joliet_path + '/foo') as infp:
+        assert(infp.read() == b'deep\n')
+    assert(ro.cache_misses == 2)
+
+    ro.close()
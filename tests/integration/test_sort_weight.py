@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+
+
+def _new_iso(**kwargs):
+    iso = pycdlib.PyCdlib()
+    iso.new(**kwargs)
+    iso.add_directory('/DIR1', rr_name='dir1' if 'rock_ridge' in kwargs else None)
+    for name in ('AAA', 'BBB', 'CCC', 'DIR1/DDD'):
+        data = name.encode('utf-8') * 1000
+        iso.add_fp(io.BytesIO(data), len(data), '/%s.;1' % (name),
+                   rr_name=name.split('/')[-1].lower() if 'rock_ridge' in kwargs else None)
+    return iso
+
+def _order(iso, names):
+    extents = {name: iso.get_record(iso_path='/%s.;1' % (name)).extent_location()
+               for name in names}
+    return sorted(names, key=lambda name: extents[name])
+
+def test_sort_weight_default_order():
+    iso = _new_iso()
+    assert(_order(iso, ['AAA', 'BBB', 'CCC', 'DIR1/DDD']) == ['AAA', 'BBB', 'CCC', 'DIR1/DDD'])
+    iso.close()
+
+def test_sort_weight_per_path(tmpdir):
+    iso = _new_iso()
+    iso.set_sort_weight(10, iso_path='/DIR1/DDD.;1')
+    iso.set_sort_weight(5, iso_path='/CCC.;1')
+    iso.set_sort_weight(-1, iso_path='/AAA.;1')
+    assert(_order(iso, ['AAA', 'BBB', 'CCC', 'DIR1/DDD']) == ['DIR1/DDD', 'CCC', 'BBB', 'AAA'])
+
+    # The data is still where the records say it is after a round trip.
+    outfile = os.path.join(str(tmpdir), 'sorted.iso')
+    iso.write(outfile)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    assert(_order(iso, ['AAA', 'BBB', 'CCC', 'DIR1/DDD']) == ['DIR1/DDD', 'CCC', 'BBB', 'AAA'])
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, iso_path='/DIR1/DDD.;1')
+    assert(out.getvalue() == b'DIR1/DDD' * 1000)
+    iso.close()
+
+def test_sort_weight_callback():
+    iso = _new_iso(rock_ridge='1.09')
+    seen = []
+
+    def _weight(path):
+        seen.append(path)
+        if path == '/bbb':
+            return 3
+        return None
+
+    iso.set_sort_weights(_weight, path_type='rr_path')
+    assert(sorted(seen) == ['/aaa', '/bbb', '/ccc', '/dir1/ddd'])
+    assert(_order(iso, ['AAA', 'BBB', 'CCC', 'DIR1/DDD']) == ['BBB', 'AAA', 'CCC', 'DIR1/DDD'])
+    iso.close()
+
+def test_sort_weight_errors():
+    iso = _new_iso()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.set_sort_weight(1, iso_path='/DIR1')
+    assert(str(excinfo.value) == 'Can only set the sort weight of a file with data')
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.set_sort_weight('1', iso_path='/AAA.;1')
+    assert(str(excinfo.value) == 'The sort weight must be an integer')
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.set_sort_weight(1, iso_path='/AAA.;1', joliet_path='/aaa')
+    assert(str(excinfo.value) == "Must specify one, and only one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path'")
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.set_sort_weights(lambda path: 1, path_type='bogus')
+    assert(str(excinfo.value) == "The path type must be one of 'iso_path', 'rr_path', 'joliet_path', or 'udf_path'")
+    iso.close()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+import tarfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.tarstream
+
+
+class _PipeWriter:
+    # Only supports write(), like a pipe.
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data.extend(data)
+        return len(data)
+
+
+def _reopened_iso(tmpdir, **kwargs):
+    iso = pycdlib.PyCdlib()
+    iso.new(**kwargs)
+    rr = 'rock_ridge' in kwargs
+    udf = 'udf' in kwargs
+    iso.add_directory('/DIR1', rr_name='dir1' if rr else None,
+                      udf_path='/dir1' if udf else None)
+    for name, data in (('ZZZ', b'z' * 5000), ('AAA', b'a' * 3000),
+                       ('MMM', b'm' * 10)):
+        iso.add_fp(io.BytesIO(data), len(data), '/DIR1/%s.;1' % (name),
+                   rr_name=name.lower() if rr else None,
+                   udf_path='/dir1/%s' % (name.lower()) if udf else None)
+    iso.add_hard_link(iso_old_path='/DIR1/AAA.;1', iso_new_path='/LINK.;1',
+                      rr_name='link' if rr else None)
+    if udf:
+        iso.add_hard_link(iso_old_path='/DIR1/AAA.;1', udf_new_path='/link')
+    if rr or udf:
+        iso.add_symlink(symlink_path='/SYM.;1' if rr else None,
+                        rr_symlink_name='sym' if rr else None,
+                        rr_path='dir1/zzz' if rr else None,
+                        udf_symlink_path='/sym' if udf else None,
+                        udf_target='dir1/zzz' if udf else None)
+    outfile = os.path.join(str(tmpdir), 'tar.iso')
+    iso.write(outfile)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    return iso
+
+def _tar_of(iso, **kwargs):
+    out = _PipeWriter()
+    pycdlib.tarstream.write_tar_fp(iso, out, **kwargs)
+    return tarfile.open(fileobj=io.BytesIO(bytes(out.data)), mode='r')
+
+def test_tarstream_rock_ridge(tmpdir):
+    iso = _reopened_iso(tmpdir, rock_ridge='1.09')
+    tar = _tar_of(iso)
+    members = {m.name: m for m in tar.getmembers()}
+
+    assert(members['dir1'].isdir())
+    assert(members['dir1'].mode == 0o555)
+    assert(members['dir1/zzz'].isfile())
+    assert(tar.extractfile('dir1/zzz').read() == b'z' * 5000)
+    assert(tar.extractfile('dir1/mmm').read() == b'm' * 10)
+    assert(members['sym'].issym())
+    assert(members['sym'].linkname == 'dir1/zzz')
+
+    # Exactly one of the names for the shared data carries it.
+    aaa = [members['dir1/aaa'], members['link']]
+    assert(sorted(m.type for m in aaa) == [tarfile.REGTYPE, tarfile.LNKTYPE])
+    lnk = [m for m in aaa if m.islnk()][0]
+    assert(lnk.linkname in ('dir1/aaa', 'link'))
+
+    # The files come out in the order of their data on the ISO.
+    files = [m for m in tar.getmembers() if m.isfile()]
+    extents = [iso.get_record(rr_path='/' + m.name).extent_location() for m in files]
+    assert(extents == sorted(extents))
+    # And the metadata-only entries come before all of them.
+    kinds = [m.isfile() or m.islnk() for m in tar.getmembers()]
+    assert(kinds == sorted(kinds))
+
+    iso.close()
+
+def test_tarstream_iso9660_start_path(tmpdir):
+    iso = _reopened_iso(tmpdir)
+    tar = _tar_of(iso, path_type='iso_path', start_path='/DIR1')
+    assert(sorted(tar.getnames()) == ['AAA.;1', 'MMM.;1', 'ZZZ.;1'])
+    assert(tar.getmember('AAA.;1').mode == 0o444)
+    assert(tar.extractfile('AAA.;1').read() == b'a' * 3000)
+    iso.close()
+
+def test_tarstream_udf(tmpdir):
+    iso = _reopened_iso(tmpdir, udf='2.60')
+    tar = _tar_of(iso)
+    members = {m.name: m for m in tar.getmembers()}
+    assert(members['dir1'].isdir())
+    assert(tar.extractfile('dir1/zzz').read() == b'z' * 5000)
+    assert(members['sym'].issym())
+    assert(members['sym'].linkname == 'dir1/zzz')
+    assert(sorted(m.type for m in (members['dir1/aaa'], members['link'])) == [tarfile.REGTYPE, tarfile.LNKTYPE])
+    iso.close()
+
+def test_tarstream_new_iso_and_zisofs():
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09')
+    data = b'compress me ' * 10000
+    iso.add_fp(io.BytesIO(data), len(data), '/COMP.;1', rr_name='comp',
+               zisofs=True)
+    tar = _tar_of(iso)
+    assert(tar.extractfile('comp').read() == data)
+    iso.close()
+
+def test_tarstream_bad_path_type():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.tarstream.write_tar_fp(iso, _PipeWriter(), path_type='rr_path')
+    assert(str(excinfo.value) == 'Cannot fetch a rr_path from a non-Rock Ridge ISO')
+    iso.close()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.template
+
+
+def _make_base(outfp, **kwargs):
+    iso = pycdlib.PyCdlib()
+    iso.new(**kwargs)
+
+    joliet_path = None
+    if kwargs.get('joliet') is not None:
+        joliet_path = '/host.cfg'
+    udf_path = None
+    if kwargs.get('udf') is not None:
+        udf_path = '/host.cfg'
+    rr_name = None
+    foo_rr_name = None
+    if kwargs.get('rock_ridge') is not None:
+        rr_name = 'host.cfg'
+        foo_rr_name = 'foo'
+
+    foostr = b'foo\n'
+    iso.add_fp(io.BytesIO(foostr), len(foostr), '/FOO.;1', rr_name=foo_rr_name)
+    pycdlib.template.add_slot(iso, 3000, '/HOST.CFG;1', rr_name=rr_name,
+                              joliet_path=joliet_path, udf_path=udf_path)
+
+    iso.write_fp(outfp)
+    iso.close()
+
+def _read_file(isofp, **kwargs):
+    iso = pycdlib.PyCdlib()
+    iso.open_fp(isofp)
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, **kwargs)
+    iso.close()
+    return out.getvalue()
+
+def test_template_stamp():
+    base = io.BytesIO()
+    _make_base(base, rock_ridge='1.09', joliet=3, udf='2.60')
+
+    tmpl = pycdlib.template.PyCdlibTemplate()
+    tmpl.open_fp(base)
+    assert(tmpl.add_slot('/HOST.CFG;1') == 4096)
+    assert(tmpl.slot_capacity('/HOST.CFG;1') == 4096)
+
+    for host in (b'host1', b'longer-host-name-2'):
+        data = b'hostname=' + host + b'\n'
+        out = io.BytesIO()
+        tmpl.stamp_fp(out, {'/HOST.CFG;1': data})
+        assert(len(out.getvalue()) == len(base.getvalue()))
+
+        assert(_read_file(out, iso_path='/HOST.CFG;1') == data)
+        assert(_read_file(out, rr_path='/host.cfg') == data)
+        assert(_read_file(out, joliet_path='/host.cfg') == data)
+        assert(_read_file(out, udf_path='/host.cfg') == data)
+        assert(_read_file(out, iso_path='/FOO.;1') == b'foo\n')
+
+    tmpl.close()
+
+def test_template_stamp_empty_then_again():
+    base = io.BytesIO()
+    _make_base(base, rock_ridge='1.09', joliet=3, udf='2.60')
+
+    tmpl = pycdlib.template.PyCdlibTemplate()
+    tmpl.open_fp(base)
+    tmpl.add_slot('/HOST.CFG;1')
+
+    # An empty UDF file has no allocation descriptors; that must not leak into
+    # the template.
+    out = io.BytesIO()
+    tmpl.stamp_fp(out, {'/HOST.CFG;1': b''})
+    assert(_read_file(out, udf_path='/host.cfg') == b'')
+    assert(_read_file(out, iso_path='/HOST.CFG;1') == b'')
+
+    data = b'hostname=again\n'
+    out = io.BytesIO()
+    tmpl.stamp_fp(out, {'/HOST.CFG;1': data})
+    assert(_read_file(out, udf_path='/host.cfg') == data)
+    assert(_read_file(out, joliet_path='/host.cfg') == data)
+
+    # And the base itself is unchanged.
+    out = io.BytesIO()
+    tmpl.stamp_fp(out, {})
+    assert(out.getvalue() == base.getvalue())
+
+    tmpl.close()
+
+def test_template_stamp_file(tmpdir):
+    basefile = os.path.join(str(tmpdir), 'base.iso')
+    with open(basefile, 'wb') as outfp:
+        _make_base(outfp)
+
+    tmpl = pycdlib.template.PyCdlibTemplate()
+    tmpl.open(basefile)
+    tmpl.add_slot('/HOST.CFG;1')
+
+    outfile = os.path.join(str(tmpdir), 'variant.iso')
+    data = b'x' * 4096
+    tmpl.stamp(outfile, {'/HOST.CFG;1': (io.BytesIO(data), len(data))})
+    tmpl.close()
+
+    with open(outfile, 'rb') as infp:
+        assert(_read_file(infp, iso_path='/HOST.CFG;1') == data)
+
+def test_template_stamp_unmentioned_slot_keeps_base():
+    base = io.BytesIO()
+    _make_base(base)
+
+    tmpl = pycdlib.template.PyCdlibTemplate()
+    tmpl.open_fp(base)
+    tmpl.add_slot('/HOST.CFG;1')
+
+    out = io.BytesIO()
+    tmpl.stamp_fp(out, {'/HOST.CFG;1': b'short'})
+    out = io.BytesIO()
+    tmpl.stamp_fp(out, {})
+    assert(out.getvalue() == base.getvalue())
+
+    tmpl.close()
+
+def test_template_stamp_too_large():
+    base = io.BytesIO()
+    _make_base(base)
+
+    tmpl = pycdlib.template.PyCdlibTemplate()
+    tmpl.open_fp(base)
+    tmpl.add_slot('/HOST.CFG;1')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        tmpl.stamp_fp(io.BytesIO(), {'/HOST.CFG;1': b'x' * 4097})
+    assert(str(excinfo.value) == 'Data for slot /HOST.CFG;1 is larger than the slot capacity')
+
+    tmpl.close()
+
+def test_template_stamp_not_a_slot():
+    base = io.BytesIO()
+    _make_base(base)
+
+    tmpl = pycdlib.template.PyCdlibTemplate()
+    tmpl.open_fp(base)
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        tmpl.stamp_fp(io.BytesIO(), {'/FOO.;1': b'x'})
+    assert(str(excinfo.value) == 'Path /FOO.;1 is not a template slot')
+
+    tmpl.close()
+
+def test_template_add_slot_dir():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    iso.add_directory('/DIR1')
+    base = io.BytesIO()
+    iso.write_fp(base)
+    iso.close()
+
+    tmpl = pycdlib.template.PyCdlibTemplate()
+    tmpl.open_fp(base)
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        tmpl.add_slot('/DIR1')
+    assert(str(excinfo.value) == 'Only files can be used as template slots')
+
+    tmpl.close()
+
+def test_template_not_open():
+    tmpl = pycdlib.template.PyCdlibTemplate()
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        tmpl.add_slot('/FOO.;1')
+    assert(str(excinfo.value) == 'This template is not open; call open() first')
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pycdlib
+import pycdlib.readonly
+import pycdlib.zisofs
+
+
+def _text(num):
+    return (('line %d of a mostly-text file\n' % (num)) * 10000).encode('utf-8')
+
+def _new_iso():
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09')
+    data = _text(1)
+    iso.add_fp(io.BytesIO(data), len(data), '/TEXT1.;1', rr_name='text1',
+               zisofs=True)
+    data = b'\x00' * 100000 + b'tail'
+    iso.add_fp(io.BytesIO(data), len(data), '/SPARSE.;1', rr_name='sparse',
+               zisofs=True)
+    data = _text(2)
+    iso.add_fp(io.BytesIO(data), len(data), '/PLAIN.;1', rr_name='plain')
+    return iso
+
+def test_zisofs_add_fp_and_get():
+    iso = _new_iso()
+
+    rec = iso.get_record(iso_path='/TEXT1.;1')
+    zf = rec.rock_ridge.zisofs_record()
+    assert(zf is not None)
+    assert(zf.algorithm == b'pz')
+    assert(zf.uncompressed_size == len(_text(1)))
+    assert(rec.get_data_length() < len(_text(1)) // 10)
+    assert(iso.get_record(iso_path='/PLAIN.;1').rock_ridge.zisofs_record() is None)
+
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, iso_path='/TEXT1.;1')
+    assert(out.getvalue() == _text(1))
+
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, rr_path='/sparse')
+    assert(out.getvalue() == b'\x00' * 100000 + b'tail')
+
+    iso.close()
+
+def test_zisofs_open_file_seek():
+    iso = _new_iso()
+    data = _text(1)
+
+    with iso.open_file_from_iso(rr_path='/text1') as infp:
+        assert(infp.length() == len(data))
+        for offset, length in ((0, 10), (32767, 2), (100000, 70000), (len(data) - 5, 100)):
+            infp.seek(offset)
+            assert(infp.read(length) == data[offset:offset + length])
+        infp.seek(-4, os.SEEK_END)
+        assert(infp.read() == data[-4:])
+        assert(infp.read() == b'')
+
+    iso.close()
+
+def test_zisofs_write_and_reparse(tmpdir):
+    iso = _new_iso()
+    outfile = os.path.join(str(tmpdir), 'zisofs.iso')
+    iso.write(outfile)
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.open(outfile)
+    zf = iso.get_record(rr_path='/sparse').rock_ridge.zisofs_record()
+    assert(zf is not None)
+    assert(zf.header_size == 16)
+    assert(zf.log2_block_size == 15)
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, rr_path='/text1')
+    assert(out.getvalue() == _text(1))
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, rr_path='/plain')
+    assert(out.getvalue() == _text(2))
+    iso.close()
+
+    ro = pycdlib.readonly.PyCdlibReadOnly()
+    ro.open(outfile)
+    with ro.open_file_from_iso(rr_path='/sparse') as infp:
+        infp.seek(99998)
+        assert(infp.read() == b'\x00\x00tail')
+    ro.close()
+
+def test_zisofs_hard_link_keeps_zf():
+    iso = _new_iso()
+    iso.add_hard_link(iso_old_path='/TEXT1.;1', iso_new_path='/LINK.;1',
+                      rr_name='link')
+    out = io.BytesIO()
+    iso.get_file_from_iso_fp(out, rr_path='/link')
+    assert(out.getvalue() == _text(1))
+    iso.close()
+
+def test_zisofs_errors():
+    iso = pycdlib.PyCdlib()
+    iso.new()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.add_fp(io.BytesIO(b'foo'), 3, '/FOO.;1', zisofs=True)
+    assert(str(excinfo.value) == 'zisofs compression can only be used on Rock Ridge ISOs')
+    iso.close()
+
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09', joliet=3)
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        iso.add_fp(io.BytesIO(b'foo'), 3, '/FOO.;1', rr_name='foo',
+                   joliet_path='/foo', zisofs=True)
+    assert(str(excinfo.value) == 'zisofs compression can only be used with an iso_path')
+    iso.close()
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput):
+        pycdlib.zisofs.compress_fp(io.BytesIO(b'foo'), 3, io.BytesIO(), 12)
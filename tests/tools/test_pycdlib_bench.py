@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+
+pycdlib_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+pycdlib_exe = os.path.join(pycdlib_root, 'tools', 'pycdlib-bench')
+
+
+class ProcessException(Exception):
+    def __init__(self, msg):
+        Exception.__init__(self, msg)
+
+
+def run_bench(args):
+    process = subprocess.Popen([sys.executable, pycdlib_exe] + args,
+                               env={
+                                   'PATH': os.environ['PATH'],
+                                   'PYTHONPATH': pycdlib_root,
+                               },
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+
+    out, err = process.communicate()
+
+    ret = process.wait()
+    if ret != 0:
+        raise ProcessException('Process failed: %s\n%s' % (out, err))
+
+    return out
+
+
+def test_pycdlib_bench_json(tmpdir):
+    outfile = os.path.join(str(tmpdir), 'results.json')
+    run_bench(['-case', 'everything-10k', '-case', 'flat-1k', '-entries', '50',
+               '-samples', '10', '-repeat', '2', '-label', 'test',
+               '-format', 'json', '-output', outfile])
+
+    with open(outfile, 'r') as infp:
+        results = json.load(infp)
+
+    assert(results['format'] == 1)
+    assert(results['label'] == 'test')
+    assert([case['name'] for case in results['cases']] == ['everything-10k', 'flat-1k'])
+
+    deep = results['cases'][0]
+    assert(deep['config']['udf'])
+    assert(deep['config']['isohybrid'])
+    assert(deep['directories'] == 5)
+    assert(deep['files'] == 45)
+    for op in ('add', 'write', 'open', 'walk', 'lookup', 'extract', 'modify', 'reshuffle'):
+        assert(len(deep['timings'][op]) == 2)
+        assert(deep['summary'][op]['min'] >= 0)
+
+    flat = results['cases'][1]
+    assert(flat['directories'] == 0)
+    assert(flat['files'] == 50)
+
+def test_pycdlib_bench_custom_compare(tmpdir):
+    basefile = os.path.join(str(tmpdir), 'base.json')
+    run_bench(['-case', 'custom', '-shape', 'deep', '-entries', '30',
+               '-rock-ridge', '-joliet', '-samples', '5', '-format', 'json',
+               '-output', basefile])
+
+    out = run_bench(['-case', 'custom', '-shape', 'deep', '-entries', '30',
+                     '-rock-ridge', '-joliet', '-samples', '5',
+                     '-compare', basefile])
+    lines = out.decode('utf-8').splitlines()
+    assert(lines[0].startswith('custom: 3 directories, 27 files'))
+    assert(len(lines) == 9)
+
+def test_pycdlib_bench_deterministic(tmpdir):
+    # The generated ISO layout (and therefore its size) must not change
+    # between runs.
+    sizes = []
+    for _ in range(2):
+        out = run_bench(['-case', 'deep-udf-50k', '-entries', '40', '-samples',
+                         '5', '-format', 'json'])
+        sizes.append(json.loads(out)['cases'][0]['iso_size'])
+    assert(sizes[0] == sizes[1])
+
+def test_pycdlib_bench_flat_udf():
+    out = run_bench(['-case', 'flat-udf-20k', '-entries', '30', '-samples',
+                     '5', '-format', 'json'])
+    case = json.loads(out)['cases'][0]
+    assert(case['name'] == 'flat-udf-20k')
+    assert(case['config']['udf'])
+    assert(case['directories'] == 0)
+    assert(case['files'] == 30)
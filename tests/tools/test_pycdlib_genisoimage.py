@@ -3,6 +3,8 @@ import subprocess
 
 import pytest
 
+import pycdlib
+
 pycdlib_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 pycdlib_exe = os.path.join(pycdlib_root, 'tools', 'pycdlib-genisoimage')
 
@@ -195,3 +197,38 @@ def test_pycdlib_genisoimage_bootfile_bad(tmpdir):
 
     _do_test('genisoimage')
     _do_test(pycdlib_exe)
+
+
+def test_pycdlib_genisoimage_sort(tmpdir):
+    indir = tmpdir.mkdir('sort')
+    outfile = str(indir) + '.iso'
+    for name in ('aaa', 'bbb', 'ccc'):
+        with open(os.path.join(str(indir), name), 'wb') as outfp:
+            outfp.write(name.encode('utf-8') * 1000)
+    sortfile = os.path.join(str(tmpdir), 'sortfile')
+    with open(sortfile, 'w') as outfp:
+        outfp.write('%s 10\n' % (os.path.join(str(indir), 'ccc')))
+        outfp.write('*/aaa -5\n')
+
+    run_process([pycdlib_exe, '-iso-level', '1', '-no-pad', '-sort', sortfile,
+                 '-o', str(outfile), str(indir)])
+
+    iso = pycdlib.PyCdlib()
+    iso.open(str(outfile))
+    extents = [iso.get_record(iso_path='/%s.;1' % (name)).extent_location()
+               for name in ('CCC', 'BBB', 'AAA')]
+    iso.close()
+    assert(extents == sorted(extents))
+
+
+def test_pycdlib_genisoimage_sort_bad(tmpdir):
+    indir = tmpdir.mkdir('sortbad')
+    outfile = str(indir) + '.iso'
+    sortfile = os.path.join(str(tmpdir), 'sortfile')
+    with open(sortfile, 'w') as outfp:
+        outfp.write('nothing_here\n')
+
+    with pytest.raises(ProcessException) as excinfo:
+        run_process([pycdlib_exe, '-iso-level', '1', '-sort', sortfile,
+                     '-o', str(outfile), str(indir)])
+    assert('Incorrect sort file format: nothing_here' in str(excinfo.value))
@@ -0,0 +1,63 @@
+import io
+import os
+import subprocess
+import sys
+import tarfile
+
+import pycdlib
+
+pycdlib_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+pycdlib_exe = os.path.join(pycdlib_root, 'tools', 'pycdlib-iso2tar')
+
+
+class ProcessException(Exception):
+    def __init__(self, msg):
+        Exception.__init__(self, msg)
+
+
+def run_iso2tar(args):
+    process = subprocess.Popen([sys.executable, pycdlib_exe] + args,
+                               env={
+                                   'PATH': os.environ['PATH'],
+                                   'PYTHONPATH': pycdlib_root,
+                               },
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+
+    out, err = process.communicate()
+
+    ret = process.wait()
+    if ret != 0:
+        raise ProcessException('Process failed: %s\n%s' % (out, err))
+
+    return out
+
+
+def _make_iso(tmpdir):
+    iso = pycdlib.PyCdlib()
+    iso.new(rock_ridge='1.09')
+    iso.add_directory('/DIR1', rr_name='dir1')
+    iso.add_fp(io.BytesIO(b'foo\n'), 4, '/DIR1/FOO.;1', rr_name='foo')
+    outfile = os.path.join(str(tmpdir), 'iso2tar.iso')
+    iso.write(outfile)
+    iso.close()
+    return outfile
+
+
+def test_pycdlib_iso2tar_stdout(tmpdir):
+    isofile = _make_iso(tmpdir)
+    out = run_iso2tar([isofile])
+
+    tar = tarfile.open(fileobj=io.BytesIO(out), mode='r')
+    assert(tar.getnames() == ['dir1', 'dir1/foo'])
+    assert(tar.extractfile('dir1/foo').read() == b'foo\n')
+
+
+def test_pycdlib_iso2tar_output_file(tmpdir):
+    isofile = _make_iso(tmpdir)
+    tarname = os.path.join(str(tmpdir), 'out.tar')
+    run_iso2tar(['-path-type', 'iso', '-start-path', '/DIR1', '-o', tarname,
+                 isofile])
+
+    with tarfile.open(tarname) as tar:
+        assert(tar.getnames() == ['FOO.;1'])
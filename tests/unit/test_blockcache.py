@@ -0,0 +1,149 @@
+import io
+import os
+import sys
+
+import pytest
+
+prefix = '.'
+for i in range(0, 3):
+    if os.path.isdir(os.path.join(prefix, 'pycdlib')):
+        sys.path.insert(0, prefix)
+        break
+    else:
+        prefix = '../' + prefix
+
+import pycdlib.blockcache
+import pycdlib.pycdlibexception
+
+
+def _data(length):
+    return bytes(bytearray(i % 251 for i in range(length)))
+
+def test_blockcache_read_hits():
+    data = _data(10000)
+    cache = pycdlib.blockcache.BlockCache(block_size=1024, readahead=0)
+    fp = cache.wrap(io.BytesIO(data))
+
+    fp.seek(100)
+    assert(fp.read(2000) == data[100:2100])
+    assert(cache.stats.misses == 3)
+    assert(cache.stats.hits == 0)
+    assert(fp.tell() == 2100)
+
+    fp.seek(1500)
+    assert(fp.read(10) == data[1500:1510])
+    assert(cache.stats.hits == 1)
+    assert(cache.stats.misses == 3)
+
+def test_blockcache_readahead():
+    data = _data(10000)
+    cache = pycdlib.blockcache.BlockCache(block_size=1024, readahead=2)
+    fp = cache.wrap(io.BytesIO(data))
+
+    assert(fp.read(10) == data[:10])
+    assert(cache.stats.misses == 1)
+    assert(cache.stats.readahead == 2)
+    assert(len(cache) == 3)
+
+    fp.seek(2048)
+    assert(fp.read(1024) == data[2048:3072])
+    assert(cache.stats.hits == 1)
+
+def test_blockcache_eof():
+    data = _data(2500)
+    cache = pycdlib.blockcache.BlockCache(block_size=1024, readahead=4)
+    fp = cache.wrap(io.BytesIO(data))
+
+    fp.seek(2000)
+    assert(fp.read(1000) == data[2000:])
+    assert(fp.tell() == 2500)
+    assert(fp.read(10) == b'')
+    fp.seek(0)
+    assert(fp.read(3000) == data)
+    assert(fp.seek(0, os.SEEK_END) == 2500)
+
+def test_blockcache_eviction():
+    data = _data(10000)
+    cache = pycdlib.blockcache.BlockCache(max_bytes=2048, block_size=1024, readahead=0)
+    fp = cache.wrap(io.BytesIO(data))
+
+    for offset in (0, 1024, 2048, 0):
+        fp.seek(offset)
+        assert(fp.read(1024) == data[offset:offset + 1024])
+    assert(len(cache) == 2)
+    assert(cache.stats.evictions == 2)
+    assert(cache.stats.misses == 4)
+
+def test_blockcache_bypass():
+    data = _data(10000)
+    cache = pycdlib.blockcache.BlockCache(block_size=1024, bypass_size=4096)
+    fp = cache.wrap(io.BytesIO(data))
+
+    assert(fp.read(5000) == data[:5000])
+    assert(fp.read() == data[5000:])
+    assert(cache.stats.bypassed == 2)
+    assert(len(cache) == 0)
+
+def test_blockcache_readinto():
+    data = _data(10000)
+    cache = pycdlib.blockcache.BlockCache(block_size=1024)
+    fp = cache.wrap(io.BytesIO(data))
+
+    buf = bytearray(100)
+    fp.seek(1000)
+    assert(fp.readinto(buf) == 100)
+    assert(bytes(buf) == data[1000:1100])
+
+def test_blockcache_write_invalidates():
+    data = _data(10000)
+    cache = pycdlib.blockcache.BlockCache(block_size=1024)
+    backing = io.BytesIO(data)
+    fp = cache.wrap(backing)
+
+    assert(fp.read(10) == data[:10])
+    fp.seek(5)
+    fp.write(b'xyz')
+    fp.seek(0)
+    assert(fp.read(10) == data[:5] + b'xyz' + data[8:10])
+    # Attributes that aren't cached go straight through.
+    assert(fp.getvalue() == backing.getvalue())
+
+def test_blockcache_shared_objects():
+    data = _data(10000)
+    cache = pycdlib.blockcache.BlockCache(block_size=1024, readahead=0)
+    backing = io.BytesIO(data)
+
+    fp1 = cache.wrap(backing)
+    fp2 = cache.wrap(backing)
+    fp3 = cache.wrap(io.BytesIO(data))
+    fp1.read(10)
+    fp2.read(10)
+    assert(cache.stats.hits == 1)
+    fp3.read(10)
+    assert(cache.stats.misses == 2)
+
+def test_blockcache_shared_files(tmpdir):
+    path = os.path.join(str(tmpdir), 'data')
+    with open(path, 'wb') as outfp:
+        outfp.write(_data(10000))
+
+    cache = pycdlib.blockcache.BlockCache(block_size=1024, readahead=0)
+    with open(path, 'rb') as infp1:
+        with open(path, 'rb') as infp2:
+            cache.wrap(infp1).read(10)
+            cache.wrap(infp2).read(10)
+    assert(cache.stats.hits == 1)
+    assert(cache.stats.misses == 1)
+
+def test_blockcache_bad_args():
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.blockcache.BlockCache(block_size=0)
+    assert(str(excinfo.value) == 'The block size must be a positive number')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.blockcache.BlockCache(max_bytes=100)
+    assert(str(excinfo.value) == 'The cache must be able to hold at least one block')
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        pycdlib.blockcache.BlockCache(readahead=-1)
+    assert(str(excinfo.value) == 'The readahead must be non-negative')
@@ -102,6 +102,36 @@ def test_dirrecorddate_compare_not_equal():
 
     assert(drdate2 != drdate)
 
+def test_dirrecorddate_fields():
+    drdate = pycdlib.dates.DirectoryRecordDate()
+    drdate.parse(b'\x76\x07\x12\x15\x21\x05\xfc')
+    assert(drdate.years_since_1900 == 118)
+    assert(drdate.month == 7)
+    assert(drdate.day_of_month == 18)
+    assert(drdate.hour == 21)
+    assert(drdate.minute == 33)
+    assert(drdate.second == 5)
+    assert(drdate.gmtoffset == -4)
+    assert(drdate.record() == b'\x76\x07\x12\x15\x21\x05\xfc')
+
+def test_dirrecorddate_fields_not_initialized():
+    drdate = pycdlib.dates.DirectoryRecordDate()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
+        drdate.month
+    assert(str(excinfo.value) == 'Directory Record Date not initialized')
+
+def test_dirrecorddate_parse_too_short():
+    drdate = pycdlib.dates.DirectoryRecordDate()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
+        drdate.parse(b'\x76\x07')
+    assert(str(excinfo.value) == 'Directory Record Date is too short')
+
+def test_parse_directory_record_date_shared():
+    drdate = pycdlib.dates.parse_directory_record_date(b'\x76\x07\x12\x15\x21\x00\x00')
+    drdate2 = pycdlib.dates.parse_directory_record_date(bytes(bytearray(b'\x76\x07\x12\x15\x21\x00\x00')))
+    assert(drdate is drdate2)
+    assert(drdate.hour == 21)
+
 def test_volumedescdate_record_not_initialized():
     voldate = pycdlib.dates.VolumeDescriptorDate()
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
@@ -227,6 +227,63 @@ def test_dr_add_child_not_initialized():
         dr.add_child(None, 2048)
     assert(str(excinfo.value) == 'Directory Record not initialized')
 
+def _new_root_with_dots(pvd):
+    root = pycdlib.dr.DirectoryRecord()
+    root.new_root(pvd, 1, 2048, time.time())
+    dot = pycdlib.dr.DirectoryRecord()
+    dot.new_dot(pvd, root, 1, '', 2048, False, 0, time.time())
+    root.track_child(dot, 2048)
+    dotdot = pycdlib.dr.DirectoryRecord()
+    dotdot.new_dotdot(pvd, root, 1, '', 2048, False, False, 0, time.time())
+    root.track_child(dotdot, 2048)
+    return root
+
+def _new_file_in(pvd, parent, name):
+    rec = pycdlib.dr.DirectoryRecord()
+    rec.new_file(pvd, 0, name, parent, 1, '', b'', False, 0, time.time())
+    return rec
+
+def test_dr_add_children_not_initialized():
+    dr = pycdlib.dr.DirectoryRecord()
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
+        dr.add_children([], 2048)
+    assert(str(excinfo.value) == 'Directory Record not initialized')
+
+def test_dr_add_children_matches_add_child():
+    pvd = pycdlib.headervd.pvd_factory(b'', b'', 0, 0, 0, b'', b'', b'', b'', b'', b'', b'', 0.0, b'', False)
+    names = [b'F%04d.;1' % (i) for i in range(200, 0, -1)]
+
+    one_by_one = _new_root_with_dots(pvd)
+    grew = 0
+    for name in names:
+        if one_by_one.add_child(_new_file_in(pvd, one_by_one, name), 2048):
+            grew += 2048
+    assert(grew > 0)
+
+    bulk = _new_root_with_dots(pvd)
+    assert(bulk.add_children([_new_file_in(pvd, bulk, name) for name in names], 2048) == grew)
+
+    assert([c.file_ident for c in bulk.children] == [c.file_ident for c in one_by_one.children])
+    assert([(c.extents_to_here, c.offset_to_here, c.index_in_parent) for c in bulk.children] ==
+           [(c.extents_to_here, c.offset_to_here, c.index_in_parent) for c in one_by_one.children])
+    assert(bulk.data_length == one_by_one.data_length)
+    assert(bulk.children[0].data_length == bulk.data_length)
+
+def test_dr_add_children_duplicate_dir():
+    pvd = pycdlib.headervd.pvd_factory(b'', b'', 0, 0, 0, b'', b'', b'', b'', b'', b'', b'', 0.0, b'', False)
+    root = _new_root_with_dots(pvd)
+    subdir = pycdlib.dr.DirectoryRecord()
+    subdir.new_dir(pvd, b'DIR1', root, 1, '', b'', 2048, False, False, False,
+                   0o040555, time.time())
+    root.add_child(subdir, 2048)
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
+        root.add_children([_new_file_in(pvd, root, b'DIR1')], 2048)
+    assert(str(excinfo.value) == 'Failed adding duplicate name to parent')
+    # Nothing was added.
+    assert(len(root.children) == 3)
+
 def test_dr_track_child_not_initialized():
     dr = pycdlib.dr.DirectoryRecord()
 
@@ -377,3 +434,37 @@ def test_dr_file_too_big():
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidInput) as excinfo:
         dr.new_file(pvd, 2**32, b'', None, 1, '', b'', False, 0, 0)
     assert(str(excinfo.value) == 'Maximum supported file length is 2^32-1')
+
+def test_dr_record_cached():
+    pvd = pycdlib.headervd.pvd_factory(b'', b'', 0, 0, 0, b'', b'', b'', b'', b'', b'', b'', 0.0, b'', False)
+    root_dr = pycdlib.dr.DirectoryRecord()
+    root_dr.new_root(pvd, 1, 2048, time.time())
+    root_dr.set_data_location(23, 0)
+
+    rec = root_dr.record()
+    assert(root_dr.record() is rec)
+
+    # Setting the same values again should not invalidate the cache.
+    root_dr.set_data_location(root_dr.extent_location(), 0)
+    root_dr.set_data_length(root_dr.get_data_length())
+    assert(root_dr.record() is rec)
+
+def test_dr_record_cache_invalidated():
+    pvd = pycdlib.headervd.pvd_factory(b'', b'', 0, 0, 0, b'', b'', b'', b'', b'', b'', b'', 0.0, b'', False)
+    root_dr = pycdlib.dr.DirectoryRecord()
+    root_dr.new_root(pvd, 1, 2048, time.time())
+    root_dr.set_data_location(23, 0)
+
+    rec = root_dr.record()
+    root_dr.set_data_location(24, 0)
+    rec2 = root_dr.record()
+    assert(rec2 != rec)
+    assert(struct.unpack_from('<L', rec2, 2)[0] == 24)
+
+    root_dr.set_data_length(4096)
+    rec3 = root_dr.record()
+    assert(struct.unpack_from('<L', rec3, 10)[0] == 4096)
+
+    root_dr.change_existence(True)
+    rec4 = root_dr.record()
+    assert(rec4[25] & (1 << pycdlib.dr.DirectoryRecord.FILE_FLAG_EXISTENCE_BIT))
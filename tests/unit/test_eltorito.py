@@ -284,3 +284,36 @@ def test_eltorito_boot_catalog_add_extent_location_not_initialized():
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
         bc.update_catalog_extent(0)
     assert(str(excinfo.value) == 'El Torito Boot Catalog not initialized')
+
+def test_eltorito_validation_entry_checksum():
+    # The checksum of data that already includes its checksum is always 0.
+    data = b'\x01\x00\x00\x00' + b'\x00' * 24 + b'\x00\x00\x55\xaa'
+    csum = pycdlib.eltorito.EltoritoValidationEntry._checksum(data)
+    assert(csum == 0x55aa)
+    data = data[:28] + struct.pack('<H', csum) + data[30:]
+    assert(pycdlib.eltorito.EltoritoValidationEntry._checksum(data) == 0)
+
+def test_eltorito_boot_info_table_checksum():
+    data = bytes(range(256)) * 37 + b'\x7f\xff\x01'
+    expected = 0
+    padded = data + b'\x00' * (-len(data) % 4)
+    for i in range(64, len(padded), 4):
+        expected = (expected + struct.unpack_from('<L', padded, i)[0]) & 0xffffffff
+
+    # Feed the data in odd-sized pieces to check that split words are handled.
+    csum = pycdlib.eltorito.EltoritoBootInfoTableChecksum()
+    for i in range(0, len(data), 37):
+        csum.update(data[i:i + 37])
+    assert(csum.digest() == expected)
+
+    csum = pycdlib.eltorito.EltoritoBootInfoTableChecksum()
+    csum.update(data)
+    assert(csum.digest() == expected)
+
+def test_eltorito_boot_info_table_record_no_csum():
+    bi = pycdlib.eltorito.EltoritoBootInfoTable()
+    bi.new(None, None, 0, None)
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
+        bi.record()
+    assert(str(excinfo.value) == 'The Eltorito Boot Info Table checksum has not been calculated')
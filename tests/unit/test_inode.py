@@ -66,3 +66,32 @@ def test_inode_update_fp_not_initialized():
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
         ino.update_fp(None, 0)
     assert(str(excinfo.value) == 'Inode is not initialized')
+
+def test_linked_records():
+    links = pycdlib.inode.LinkedRecords()
+    assert(not links)
+    assert(list(links) == [])
+
+    links.append(('a', True))
+    links.append(('b', False))
+    links.append(('c', True))
+    assert(len(links) == 3)
+    assert(list(links) == [('a', True), ('b', False), ('c', True)])
+    assert(links[0] == ('a', True))
+    assert(links[-1] == ('c', True))
+
+    del links[0]
+    assert(list(links) == [('b', False), ('c', True)])
+    del links[-1]
+    assert(list(links) == [('b', False)])
+    del links[0]
+    assert(not links)
+
+def test_linked_records_bad_index():
+    links = pycdlib.inode.LinkedRecords()
+    links.append(('a', False))
+
+    with pytest.raises(IndexError):
+        links[1]
+    with pytest.raises(IndexError):
+        del links[-2]
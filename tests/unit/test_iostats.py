@@ -0,0 +1,84 @@
+import io
+import os
+import sys
+
+prefix = '.'
+for i in range(0, 3):
+    if os.path.isdir(os.path.join(prefix, 'pycdlib')):
+        sys.path.insert(0, prefix)
+        break
+    else:
+        prefix = '../' + prefix
+
+import pycdlib.iostats
+
+
+def test_iostats_accounting_file():
+    st = pycdlib.iostats.IOStats()
+    fp = st.wrap_input(io.BytesIO(b'\x00' * 10000))
+
+    assert(fp.read(100) == b'\x00' * 100)
+    assert(fp.seek(4096) == 4096)
+    assert(fp.read(2048) == b'\x00' * 2048)
+    assert(fp.seek(0, os.SEEK_CUR) == 6144)
+    buf = bytearray(3)
+    assert(fp.readinto(buf) == 3)
+    assert(fp.tell() == 6147)
+    # Attributes that aren't accounted for go straight through.
+    assert(fp.getvalue() == b'\x00' * 10000)
+
+    assert(st.input.reads == 3)
+    assert(st.input.bytes_read == 2151)
+    assert(st.input.read_sizes == {2: 1, 64: 1, 2048: 1})
+    assert(st.input.seeks == 2)
+    assert(st.input.seek_distances == {0: 1, 2048: 1})
+    assert(st.output.reads == 0)
+
+def test_iostats_output():
+    st = pycdlib.iostats.IOStats()
+    out = io.BytesIO()
+    fp = st.wrap_output(out)
+    fp.write(b'a' * 5)
+    fp.seek(1)
+    fp.write(b'b')
+
+    assert(out.getvalue() == b'abaaa')
+    assert(st.output.writes == 2)
+    assert(st.output.bytes_written == 6)
+    assert(st.output.write_sizes == {1: 1, 4: 1})
+    assert(st.output.seek_distances == {4: 1})
+
+def test_iostats_operation():
+    st = pycdlib.iostats.IOStats()
+    fp = st.wrap_input(io.BytesIO(b'\x00' * 100))
+    fp.read(10)
+
+    for i in range(2):
+        with st.operation('extract'):
+            fp.seek(0)
+            fp.read(50)
+
+    extract = st.operations['extract']
+    assert(extract.reads == 2)
+    assert(extract.bytes_read == 100)
+    assert(extract.read_sizes == {32: 2})
+    assert(st.input.reads == 3)
+
+def test_iostats_reset_as_dict():
+    st = pycdlib.iostats.IOStats()
+    fp = st.wrap_input(io.BytesIO(b'\x00' * 100))
+    with st.operation('open'):
+        fp.read(10)
+
+    d = st.as_dict()
+    assert(d['input']['reads'] == 1)
+    assert(d['input']['read_sizes'] == {8: 1})
+    assert(d['operations']['open']['bytes_read'] == 10)
+
+    st.reset()
+    assert(st.as_dict()['input'] == pycdlib.iostats.IOCounters().as_dict())
+    assert(st.operations == {})
+
+    # Wrapped file objects keep counting into the reset counters.
+    fp.read(1)
+    assert(st.input.reads == 1)
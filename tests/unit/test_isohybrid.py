@@ -334,3 +334,11 @@ def test_isohybrid_update_mac_not_mac():
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
         isohybrid.update_mac(1, 1)
     assert(str(excinfo.value) == 'Attempted to set Mac lba on a non-Mac ISO')
+
+def test_crc32_known_value():
+    assert(pycdlib.isohybrid.crc32(b'123456789') == 0xcbf43926)
+
+def test_crc32_matches_table():
+    data = bytes(bytearray(range(256))) * 9 + b'\xff\x00\x01'
+    for length in (0, 1, 2, 16, 255, len(data)):
+        assert(pycdlib.isohybrid.crc32(data[:length]) == pycdlib.isohybrid._crc32_table_lookup(data[:length]))
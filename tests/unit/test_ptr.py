@@ -72,3 +72,76 @@ def test_path_table_record_equal_to_be_not_initialized():
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
         ptr.equal_to_be(None)
     assert(str(excinfo.value) == 'Path Table Record not initialized')
+
+def test_path_table_record_record_cached():
+    ptr = pycdlib.path_table_record.PathTableRecord()
+    ptr.new_dir(b'foo')
+    ptr.update_extent_location(24)
+    ptr.update_parent_directory_number(1)
+
+    le = ptr.record_little_endian()
+    be = ptr.record_big_endian()
+    assert(ptr.record_little_endian() is le)
+    assert(ptr.record_big_endian() is be)
+
+    # Setting the same values again should not invalidate the cache.
+    ptr.update_extent_location(24)
+    ptr.update_parent_directory_number(1)
+    assert(ptr.record_little_endian() is le)
+    assert(ptr.record_big_endian() is be)
+
+def test_path_table_record_record_cache_invalidated():
+    ptr = pycdlib.path_table_record.PathTableRecord()
+    ptr.new_dir(b'foo')
+    ptr.update_extent_location(24)
+    ptr.update_parent_directory_number(1)
+
+    le = ptr.record_little_endian()
+    be = ptr.record_big_endian()
+
+    ptr.update_extent_location(25)
+    assert(ptr.record_little_endian() == b'\x03\x00\x19\x00\x00\x00\x01\x00foo\x00')
+    assert(ptr.record_big_endian() == b'\x03\x00\x00\x00\x00\x19\x00\x01foo\x00')
+
+    ptr.update_parent_directory_number(2)
+    assert(ptr.record_little_endian() == b'\x03\x00\x19\x00\x00\x00\x02\x00foo\x00')
+    assert(ptr.record_big_endian() == b'\x03\x00\x00\x00\x00\x19\x00\x02foo\x00')
+    assert(le != ptr.record_little_endian())
+    assert(be != ptr.record_big_endian())
+
+def _make_ptr(name, extent, parent_num):
+    ptr = pycdlib.path_table_record.PathTableRecord()
+    if name == b'\x00':
+        ptr.new_root()
+    else:
+        ptr.new_dir(name)
+    ptr.update_extent_location(extent)
+    ptr.update_parent_directory_number(parent_num)
+    return ptr
+
+def test_path_table_index():
+    ptrs = [_make_ptr(b'\x00', 20, 1), _make_ptr(b'A', 21, 1),
+            _make_ptr(b'B', 22, 1), _make_ptr(b'C', 23, 2),
+            _make_ptr(b'C', 24, 3)]
+    index = pycdlib.path_table_record.PathTableIndex(ptrs)
+
+    assert(index.child(1, b'A') == 2)
+    assert(index.child(2, b'C') == 4)
+    assert(index.child(3, b'C') == 5)
+    assert(index.child(1, b'C') is None)
+    assert(index.child(1, b'\x00') is None)
+    assert(index.num_for_extent(24) == 5)
+    assert(index.num_for_extent(30) is None)
+    assert(index.record(4).extent_location == 23)
+
+    assert(index.resolve([b'B', b'C']) == (5, 2))
+    assert(index.resolve([b'A', b'C', b'D']) == (4, 2))
+    assert(index.resolve([b'D']) == (1, 0))
+    assert(index.resolve([b'C'], 3) == (5, 1))
+
+def test_path_table_index_bad_num():
+    index = pycdlib.path_table_record.PathTableIndex([_make_ptr(b'\x00', 20, 1)])
+
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
+        index.record(2)
+    assert(str(excinfo.value) == 'Invalid directory number 2')
@@ -1140,6 +1140,34 @@ def test_rr_parse_oneten():
     rr.parse(b'SF\x0c\x01\x00\x00\x00\x00\x00\x00\x00\x00', False, 0, False, b'')
     assert(rr.rr_version == '1.10')
 
+def test_rr_parse_lazy_px_record():
+    rr = pycdlib.rockridge.RockRidge()
+    rr.parse(b'NM\x0a\x01\x00file1PX\x24\x01\x24\x81\x00\x00\x00\x00\x81\x24\x01\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', False, 0, False, b'')
+    assert(rr.name() == b'file1')
+    assert(rr.dr_entries.has_type(b'PX'))
+    assert(rr.dr_entries.px_record.posix_file_mode == 0o100444)
+    assert(rr.get_file_mode() == 0o100444)
+
+def test_rr_parse_lazy_bad_px_record():
+    rr = pycdlib.rockridge.RockRidge()
+    rr.parse(b'PX\x24\x01\x24\x81\x00\x00\x00\x00\x81\x25\x01\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', False, 0, False, b'')
+    for i in range(2):
+        with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
+            rr.dr_entries.px_record
+        assert(str(excinfo.value) == 'PX record big and little-endian file mode do not agree')
+
+def test_rr_parse_lazy_double_tf_record():
+    rr = pycdlib.rockridge.RockRidge()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
+        rr.parse(b'TF\x05\x01\x00TF\x05\x01\x00', False, 0, False, b'')
+    assert(str(excinfo.value) == 'Only single TF record supported')
+
+def test_rr_parse_lazy_multiple_sl_records():
+    rr = pycdlib.rockridge.RockRidge()
+    rr.parse(b'SL\x08\x01\x01\x00\x01aSL\x08\x01\x00\x00\x01b', False, 0, False, b'')
+    assert(len(rr.dr_entries.sl_records) == 2)
+    assert(rr.symlink_path() == b'a/b')
+
 def test_rr_parse_invalid_size():
     rr = pycdlib.rockridge.RockRidge()
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
@@ -1510,3 +1538,68 @@ def test_rrcontblock_remove_entry_no_entry():
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
         rr.remove_entry(0, 0)
     assert(str(excinfo.value) == 'Could not find an entry for the RR CE entry in the CE block!')
+
+def test_rr_record_dr_entries_cached():
+    rr = pycdlib.rockridge.RockRidge()
+    rr.new(False, b'foo', 0o100444, b'', '1.09', False, False, False, 0, 34, {}, 0.0)
+
+    rec = rr.record_dr_entries()
+    assert(rr.record_dr_entries() is rec)
+
+    rr.add_to_file_links()
+    rec2 = rr.record_dr_entries()
+    assert(rec2 is not rec)
+    assert(rec2 != rec)
+
+    rr.remove_from_file_links()
+    assert(rr.record_dr_entries() == rec)
+
+def test_rr_update_ce_extent_cache():
+    rr = pycdlib.rockridge.RockRidge()
+    rr.parse(b'CE\x1c\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00', False, 0, False, b'')
+
+    rec = rr.record_dr_entries()
+    rr.update_ce_extent(0)
+    rr.update_ce_offset(0)
+    assert(rr.record_dr_entries() is rec)
+
+    rr.update_ce_extent(24)
+    assert(rr.dr_entries.ce_record.bl_cont_area == 24)
+    assert(rr.record_dr_entries() != rec)
+
+    rec = rr.record_dr_entries()
+    rr.update_ce_offset(100)
+    assert(rr.dr_entries.ce_record.offset_cont_area == 100)
+    assert(rr.record_dr_entries() != rec)
+
+def test_rr_update_ce_extent_no_ce():
+    rr = pycdlib.rockridge.RockRidge()
+    rr.parse(b'PD\x04\x01', False, 0, False, b'')
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
+        rr.update_ce_extent(24)
+    assert(str(excinfo.value) == 'Rock Ridge extension has no Continuation Entry')
+
+# ZF record
+def test_rrzfrecord_new_record_parse():
+    zf = pycdlib.rockridge.RRZFRecord()
+    zf.new(100000, 15)
+    rec = zf.record()
+    assert(len(rec) == pycdlib.rockridge.RRZFRecord.length())
+    zf2 = pycdlib.rockridge.RRZFRecord()
+    zf2.parse(rec)
+    assert(zf2.algorithm == b'pz')
+    assert(zf2.header_size == 16)
+    assert(zf2.log2_block_size == 15)
+    assert(zf2.uncompressed_size == 100000)
+
+def test_rrzfrecord_parse_invalid_size():
+    zf = pycdlib.rockridge.RRZFRecord()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
+        zf.parse(b'ZF\x0f\x01pz\x04\x0f' + b'\x00' * 7)
+    assert(str(excinfo.value) == 'Invalid length on Rock Ridge ZF record (expected 16)')
+
+def test_rrzfrecord_parse_mismatched_size():
+    zf = pycdlib.rockridge.RRZFRecord()
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
+        zf.parse(b'ZF\x10\x01pz\x04\x0f\x01\x00\x00\x00\x00\x00\x00\x02')
+    assert(str(excinfo.value) == 'Uncompressed size little-endian does not match big-endian')
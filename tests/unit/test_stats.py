@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+prefix = '.'
+for i in range(0, 3):
+    if os.path.isdir(os.path.join(prefix, 'pycdlib')):
+        sys.path.insert(0, prefix)
+        break
+    else:
+        prefix = '../' + prefix
+
+import pycdlib.stats
+
+
+def test_stats_phase():
+    st = pycdlib.stats.PyCdlibStats()
+    for i in range(2):
+        with st.phase('outer') as outer:
+            outer.count(1, 10)
+            with st.phase('inner'):
+                st.count(2, 20)
+
+    assert(st.phases['outer'].calls == 2)
+    assert(st.phases['outer'].records == 2)
+    assert(st.phases['outer'].bytes == 20)
+    assert(st.phases['inner'].calls == 2)
+    assert(st.phases['inner'].records == 4)
+    assert(st.phases['inner'].bytes == 40)
+    assert(st.phases['outer'].elapsed >= st.phases['inner'].elapsed)
+
+def test_stats_phase_cb():
+    seen = []
+    def _cb(phase_stats, elapsed, records, nbytes):
+        seen.append((phase_stats.name, phase_stats.calls, records, nbytes))
+
+    st = pycdlib.stats.PyCdlibStats(_cb)
+    with st.phase('one') as phase:
+        phase.count(3, 4)
+    with st.phase('one'):
+        pass
+
+    assert(seen == [('one', 1, 3, 4), ('one', 2, 0, 0)])
+
+def test_stats_phase_exception():
+    st = pycdlib.stats.PyCdlibStats()
+    with pytest.raises(ValueError):
+        with st.phase('fail'):
+            raise ValueError('boom')
+
+    assert('fail' not in st.phases)
+    # Counting outside of any phase is silently ignored.
+    st.count(1, 1)
+    assert(st.phases == {})
+
+def test_stats_reset_as_dict():
+    st = pycdlib.stats.PyCdlibStats()
+    with st.phase('one') as phase:
+        phase.count(1, 2)
+
+    d = st.as_dict()
+    assert(list(d.keys()) == ['one'])
+    assert(d['one']['calls'] == 1)
+    assert(d['one']['records'] == 1)
+    assert(d['one']['bytes'] == 2)
+
+    st.reset()
+    assert(st.as_dict() == {})
+
+def test_stats_null_phase():
+    with pycdlib.stats.NULL_PHASE as phase:
+        phase.count(1, 1)
@@ -1993,6 +1993,19 @@ def test_file_entry_set_data_length_not_initialized():
         entry.set_data_length(0)
     assert(str(excinfo.value) == 'UDF File Entry not initialized')
 
+def test_file_entry_set_data_length_zero_and_back():
+    entry = pycdlib.udf.UDFFileEntry()
+    entry.new(3000, 'file', None, 2048)
+    reclen = len(entry.record())
+    entry.set_data_length(0)
+    # The (empty) descriptor is kept, so the length can be increased again.
+    assert(len(entry.alloc_descs) == 1)
+    assert(entry.alloc_descs[0].extent_length == 0)
+    assert(len(entry.record()) == reclen)
+    entry.set_data_length(100)
+    assert(entry.get_data_length() == 100)
+    assert(entry.alloc_descs[0].extent_length == 100)
+
 def test_file_entry_is_file_not_initialized():
     entry = pycdlib.udf.UDFFileEntry()
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
@@ -2711,3 +2724,16 @@ def test_descriptor_sequence_append_to_list():
     with pytest.raises(pycdlib.pycdlibexception.PyCdlibInvalidISO) as excinfo:
         seq.append_to_list('pvds', pvd2)
     assert(str(excinfo.value) == 'Descriptors with same sequence number do not have the same contents')
+
+# CRC and checksum
+def test_crc_ccitt_known_value():
+    assert(pycdlib.udf.crc_ccitt(b'123456789') == 0x31c3)
+
+def test_crc_ccitt_matches_table():
+    data = bytes(bytearray(range(256))) * 9 + b'\xff\x00\x01'
+    for length in (0, 1, 2, 16, 255, len(data)):
+        assert(pycdlib.udf.crc_ccitt(data[:length]) == pycdlib.udf._crc_ccitt_table_lookup(data[:length]))
+
+def test_compute_csum():
+    data = b'\x01\x02\x03\x04\xff\x05\x06\x07\x08\x09\x0a\x0b\x0c\x0d\x0e\x0f'
+    assert(pycdlib.udf._compute_csum(data) == (sum(data) - 0xff) % 256)
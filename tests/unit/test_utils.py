@@ -219,3 +219,13 @@ def test_file_object_does_not_support_binary_real_file(tmpdir):
     testout = tmpdir.join('foo')
     with open(str(testout), 'w') as outfp:
         assert(not pycdlib.utils.file_object_supports_binary(outfp))
+
+def test_empty_list_is_empty():
+    assert(pycdlib.utils.EMPTY_LIST == [])
+    assert(len(pycdlib.utils.EMPTY_LIST) == 0)
+
+def test_empty_list_modify():
+    with pytest.raises(pycdlib.pycdlibexception.PyCdlibInternalError) as excinfo:
+        pycdlib.utils.EMPTY_LIST.append(1)
+    assert(str(excinfo.value) == 'Trying to modify the shared empty list')
+    assert(pycdlib.utils.EMPTY_LIST == [])